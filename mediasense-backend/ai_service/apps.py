@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class AIServiceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai_service"
-    verbose_name = "AI服务" 
\ No newline at end of file
+    verbose_name = "AI服务"
+
+    def ready(self):
+        # 连接文章内容更新信号
+        from . import signals  # noqa: F401
@@ -520,10 +520,11 @@ class AIService:
         Returns:
             Dict[int, Dict[str, Any]]: 分析结果字典
         """
-        # 查找所有未分析的新闻
+        # 查找所有未分析的新闻，近似重复的文章只分析原文
         unprocessed_news = NewsArticle.objects.filter(
             Q(analysis_results__isnull=True)  # 没有任何分析结果
-            | Q(analysis_results__is_valid=False)  # 或之前的分析无效
+            | Q(analysis_results__is_valid=False),  # 或之前的分析无效
+            duplicate_of__isnull=True
         ).distinct()
 
         if not unprocessed_news.exists():
@@ -548,8 +549,8 @@ class AIService:
         Returns:
             Dict[int, Dict[str, Any]]: 分析结果字典
         """
-        # 构建查询条件
-        query = Q()
+        # 构建查询条件，近似重复的文章只分析原文
+        query = Q(duplicate_of__isnull=True)
         if start_date:
             query &= Q(created_at__gte=start_date)
         if end_date:
@@ -0,0 +1,26 @@
+"""
+AI服务信号处理
+
+抓取刷新更新了已入库文章的内容后，原有的分析结果标记为无效，并提交异步任务重新分析。
+"""
+
+import logging
+
+from django.dispatch import receiver
+
+from news.signals import article_content_changed
+
+from .models import AnalysisResult
+from .tasks import reanalyze_articles
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(article_content_changed, dispatch_uid="ai_service_reanalyze_changed_articles")
+def reanalyze_changed_articles(sender, article_ids, **kwargs):
+    """内容有变化的文章的分析结果已过期，标记为无效后交给异步任务重新分析"""
+    try:
+        AnalysisResult.objects.filter(news_id__in=article_ids).update(is_valid=False)
+        reanalyze_articles.delay(list(article_ids))
+    except Exception as e:
+        logger.error(f"提交重新分析任务失败: {str(e)}", exc_info=True)
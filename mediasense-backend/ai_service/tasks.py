@@ -8,7 +8,7 @@ from django.utils import timezone
 
 from news.models import NewsArticle
 
-from .models import AnalysisSchedule, BatchAnalysisResult, BatchAnalysisTask, ScheduleExecution
+from .models import AnalysisResult, AnalysisSchedule, BatchAnalysisResult, BatchAnalysisTask, ScheduleExecution
 from .services import AIService
 
 logger = logging.getLogger(__name__)
@@ -76,6 +76,58 @@ def process_batch_analysis(task_id):
         return {"task_id": task_id, "status": "failed", "error": str(e)}
 
 
+@shared_task
+def reanalyze_articles(article_ids):
+    """
+    重新分析内容有变化的文章
+    只重新执行文章已有的分析类型，没有分析过的文章仍按调度任务分析
+    :param article_ids: 文章ID列表
+    """
+    try:
+        # 近似重复的文章只分析原文
+        analysis_types = {}
+        for news_id, analysis_type in AnalysisResult.objects.filter(
+            news_id__in=article_ids, is_valid=False, news__duplicate_of__isnull=True
+        ).values_list("news_id", "analysis_type"):
+            analysis_types.setdefault(news_id, []).append(analysis_type)
+
+        if not analysis_types:
+            return {"status": "success", "total": 0, "processed": 0}
+
+        articles = NewsArticle.objects.in_bulk(list(analysis_types))
+        ai_service = AIService()
+
+        # 运行异步分析
+        results = {}
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            for news_id, types in analysis_types.items():
+                if news_id in articles:
+                    results.update(
+                        loop.run_until_complete(ai_service.batch_analyze([articles[news_id]], analysis_types=types))
+                    )
+        finally:
+            loop.close()
+
+        # 分析失败的结果保持无效，等待下次分析
+        processed = 0
+        for article_id, article_results in results.items():
+            for analysis_type, result in article_results.items():
+                if isinstance(result, dict) and result.get("success") is False:
+                    continue
+                AnalysisResult.objects.filter(news_id=article_id, analysis_type=analysis_type).update(
+                    result=result, is_valid=True, error_message="", updated_at=timezone.now()
+                )
+                processed += 1
+
+        return {"status": "success", "total": len(articles), "processed": processed}
+
+    except Exception as e:
+        logger.error(f"重新分析文章失败: {str(e)}", exc_info=True)
+        return {"status": "failed", "error": str(e)}
+
+
 @shared_task
 def cleanup_old_analysis_results():
     """
@@ -120,8 +172,8 @@ def process_schedule_execution(execution_id):
         end_time = timezone.now()
         start_time = end_time - timedelta(minutes=schedule.time_window)
 
-        # 构建查询条件
-        query = Q(created_at__range=(start_time, end_time))
+        # 构建查询条件，近似重复的文章只分析原文
+        query = Q(created_at__range=(start_time, end_time), duplicate_of__isnull=True)
         if schedule.categories:
             query &= Q(category_id__in=schedule.categories)
 
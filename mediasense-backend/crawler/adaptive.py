@@ -0,0 +1,136 @@
+"""
+自适应抓取间隔
+
+根据每次抓取新增的文章数调整数据源的实际抓取间隔（AIMD）：
+- 新增文章数达到目标值，说明数据源更新频繁，间隔按比例缩短
+- 没有新增文章（包括 304 未修改），间隔按固定步长增加
+- 介于两者之间时保持不变
+
+间隔限制在 [最小间隔, 最大间隔] 之间，CrawlerConfig.interval 作为初始值。
+可通过 config_data 按数据源覆盖：
+    adaptive: false 关闭自适应，固定使用 interval
+    min_interval / max_interval: 间隔上下限（分钟）
+"""
+
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IntervalPolicy:
+    """抓取间隔调整策略，时间单位均为分钟"""
+
+    min_interval: float
+    max_interval: float
+    increase_step: float
+    decrease_factor: float
+    target_yield: float
+    smoothing: float
+
+    @classmethod
+    def for_config(cls, config) -> 'IntervalPolicy':
+        """
+        获取数据源的调整策略，config_data 中的上下限优先于全局配置
+        :param config: CrawlerConfig
+        :return: IntervalPolicy
+        """
+        config_data = config.config_data or {}
+        min_interval = float(
+            config_data.get('min_interval') or getattr(settings, 'CRAWLER_ADAPTIVE_MIN_INTERVAL', 5)
+        )
+        max_interval = float(
+            config_data.get('max_interval') or getattr(settings, 'CRAWLER_ADAPTIVE_MAX_INTERVAL', 1440)
+        )
+        return cls(
+            min_interval=min_interval,
+            max_interval=max(max_interval, min_interval),
+            increase_step=float(getattr(settings, 'CRAWLER_ADAPTIVE_STEP', 10)),
+            decrease_factor=float(getattr(settings, 'CRAWLER_ADAPTIVE_DECREASE', 0.5)),
+            target_yield=float(getattr(settings, 'CRAWLER_ADAPTIVE_TARGET_YIELD', 2)),
+            smoothing=float(getattr(settings, 'CRAWLER_ADAPTIVE_SMOOTHING', 0.3)),
+        )
+
+    def clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_interval(self, interval: float, new_items: int) -> float:
+        """
+        根据本次新增文章数计算下一次的间隔
+        :param interval: 当前间隔
+        :param new_items: 本次新增文章数
+        :return: 新的间隔
+        """
+        if new_items >= self.target_yield:
+            interval *= self.decrease_factor
+        elif new_items == 0:
+            interval += self.increase_step
+        return self.clamp(interval)
+
+
+def is_adaptive(config) -> bool:
+    """数据源是否启用自适应间隔"""
+    if not getattr(settings, 'CRAWLER_ADAPTIVE_INTERVAL', True):
+        return False
+    return bool((config.config_data or {}).get('adaptive', True))
+
+
+def get_effective_interval(config) -> float:
+    """
+    数据源实际使用的抓取间隔
+    :param config: CrawlerConfig
+    :return: 间隔（分钟）
+    """
+    if is_adaptive(config) and config.adaptive_interval:
+        return config.adaptive_interval
+    return float(config.interval)
+
+
+def get_next_run_time(config) -> Optional[datetime.datetime]:
+    """
+    数据源的下次运行时间
+    :param config: CrawlerConfig
+    :return: 下次运行时间，从未运行过时返回None表示立即运行
+    """
+    if not config.last_run_time:
+        return None
+    return config.last_run_time + datetime.timedelta(minutes=get_effective_interval(config))
+
+
+def is_due(config, now: Optional[datetime.datetime] = None) -> bool:
+    """数据源是否到达运行时间"""
+    next_run_time = get_next_run_time(config)
+    return next_run_time is None or (now or timezone.now()) >= next_run_time
+
+
+def record_crawl_result(config, result: Dict[str, Any]):
+    """
+    按本次抓取结果更新新增文章数的滑动平均和自适应间隔
+    抓取失败时不调整，由重试机制处理
+    :param config: CrawlerConfig
+    :param result: crawl_website 返回的结果
+    """
+    if result.get('status') != 'success':
+        return
+
+    new_items = 0 if result.get('not_modified') else int(result.get('saved', 0) or 0)
+    policy = IntervalPolicy.for_config(config)
+    config.yield_ewma = policy.smoothing * new_items + (1 - policy.smoothing) * (config.yield_ewma or 0.0)
+
+    update_fields = ['yield_ewma']
+    if is_adaptive(config):
+        current = config.adaptive_interval or policy.clamp(float(config.interval))
+        config.adaptive_interval = policy.next_interval(current, new_items)
+        update_fields.append('adaptive_interval')
+        if config.adaptive_interval != current:
+            logger.info(f"调整抓取间隔: {config.name}, 新增{new_items}篇, "
+                        f"{current:.1f} -> {config.adaptive_interval:.1f}分钟")
+
+    if config.pk:
+        config.save(update_fields=update_fields)
@@ -0,0 +1,212 @@
+"""
+抓取响应归档
+
+fetch_data 获取的原始响应体按 SHA-256 内容哈希压缩保存，相同内容只保存一份；
+请求URL、响应头、编码和抓取时间记录在 FetchArchive 中。解析规则或选择器出错后，
+可以通过 reparse 命令用当前的解析计划重新解析归档，不需要重新抓取。
+
+存储后端由 CRAWLER_ARCHIVE_STORAGE 配置，格式与 Django 的 STORAGES 条目相同，
+默认为本地文件系统，也可以换成 django-storages 的对象存储后端。
+归档保留 CRAWLER_ARCHIVE_TTL_DAYS 天，由Celery定时任务清理过期记录和不再引用的内容。
+
+数据源可通过 config_data['archive'] 关闭归档。
+"""
+
+import datetime
+import gzip
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .fetcher import FetchResponse
+from .models import FetchArchive
+from .persistence import chunked
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORAGE = {
+    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'OPTIONS': {'location': 'crawler_archive'},
+}
+
+
+def is_enabled(config=None) -> bool:
+    """
+    是否归档数据源的响应
+    :param config: 爬虫配置
+    """
+    if not getattr(settings, 'CRAWLER_ARCHIVE_ENABLED', False):
+        return False
+    if config is not None:
+        return bool(config.config_data.get('archive', True))
+    return True
+
+
+def get_archive_storage() -> Storage:
+    """按 CRAWLER_ARCHIVE_STORAGE 创建存储后端"""
+    storage_config = getattr(settings, 'CRAWLER_ARCHIVE_STORAGE', DEFAULT_STORAGE)
+    backend = import_string(storage_config.get('BACKEND', DEFAULT_STORAGE['BACKEND']))
+    return backend(**storage_config.get('OPTIONS', {}))
+
+
+def blob_name(content_hash: str) -> str:
+    """内容哈希对应的存储路径，按前缀分两级目录"""
+    return f'{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.gz'
+
+
+def _store_blob(storage: Storage, content_hash: str, body: bytes) -> int:
+    """
+    保存压缩后的响应体，内容已存在时不重复写入
+    :return: 压缩后大小
+    """
+    name = blob_name(content_hash)
+    if storage.exists(name):
+        return storage.size(name)
+
+    level = getattr(settings, 'CRAWLER_ARCHIVE_COMPRESS_LEVEL', 6)
+    compressed = gzip.compress(body, compresslevel=level)
+    saved_name = storage.save(name, ContentFile(compressed))
+    if saved_name != name:
+        # 其他worker同时写入了相同内容，存储后端自动改了文件名
+        storage.delete(saved_name)
+    return len(compressed)
+
+
+def archive_response(config, response, fetched_at: Optional[datetime.datetime] = None) -> Optional[FetchArchive]:
+    """
+    归档一次抓取的原始响应
+    同一URL的响应内容与上次相同时只更新最近抓取时间
+    :param config: 爬虫配置
+    :param response: requests.Response 或 FetchResponse
+    :param fetched_at: 抓取时间，默认为当前时间
+    :return: 归档记录，未启用或响应体过大时返回None
+    """
+    body = getattr(response, 'content', None)
+    if not isinstance(body, bytes) or not config.pk or not is_enabled(config):
+        return None
+
+    max_size = getattr(settings, 'CRAWLER_ARCHIVE_MAX_SIZE', 10 * 1024 * 1024)
+    if len(body) > max_size:
+        logger.warning(f"响应体过大，不归档: {config.name}, {len(body)}字节")
+        return None
+
+    fetched_at = fetched_at or timezone.now()
+    url = getattr(response, 'url', None)
+    if not isinstance(url, str) or not url:
+        url = config.source_url
+    headers = {str(key): str(value) for key, value in (getattr(response, 'headers', None) or {}).items()}
+    encoding = getattr(response, 'encoding', None)
+    if not isinstance(encoding, str):
+        encoding = ''
+    content_hash = hashlib.sha256(body).hexdigest()
+
+    compressed_size = _store_blob(get_archive_storage(), content_hash, body)
+
+    latest = FetchArchive.objects.filter(config_id=config.pk, url=url).order_by('-last_fetched_at').first()
+    if latest is not None and latest.content_hash == content_hash:
+        latest.last_fetched_at = fetched_at
+        latest.headers = headers
+        latest.save(update_fields=['last_fetched_at', 'headers'])
+        return latest
+
+    return FetchArchive.objects.create(
+        config_id=config.pk,
+        url=url,
+        status_code=getattr(response, 'status_code', 200),
+        headers=headers,
+        encoding=encoding[:32],
+        content_hash=content_hash,
+        size=len(body),
+        compressed_size=compressed_size,
+        fetched_at=fetched_at,
+        last_fetched_at=fetched_at
+    )
+
+
+def load_body(record: FetchArchive, storage: Optional[Storage] = None) -> bytes:
+    """
+    读取归档的原始响应体
+    :raises: FileNotFoundError 内容已被清理时
+    """
+    storage = storage or get_archive_storage()
+    with storage.open(blob_name(record.content_hash), 'rb') as blob:
+        return gzip.decompress(blob.read())
+
+
+def to_response(record: FetchArchive, storage: Optional[Storage] = None) -> FetchResponse:
+    """把归档记录还原为 FetchResponse，交给爬虫重新解析"""
+    return FetchResponse(
+        url=record.url,
+        status_code=record.status_code,
+        headers=record.headers,
+        content=load_body(record, storage),
+        encoding=record.encoding or None
+    )
+
+
+def get_archives(config_ids: Optional[Iterable[int]] = None, since: Optional[datetime.datetime] = None,
+                 latest_only: bool = True):
+    """
+    查询待重新解析的归档记录
+    :param config_ids: 只查询这些数据源
+    :param since: 只查询该时间之后抓取的归档
+    :param latest_only: 每个URL只取最近一次归档
+    :return: 按数据源和抓取时间排序的归档记录
+    """
+    queryset = FetchArchive.objects.select_related('config')
+    if config_ids:
+        queryset = queryset.filter(config_id__in=list(config_ids))
+    if since is not None:
+        queryset = queryset.filter(last_fetched_at__gte=since)
+    queryset = queryset.order_by('config_id', 'url', '-last_fetched_at')
+    if not latest_only:
+        return list(queryset)
+
+    records = []
+    seen = set()
+    for record in queryset:
+        key = (record.config_id, record.url)
+        if key not in seen:
+            seen.add(key)
+            records.append(record)
+    return records
+
+
+def purge_archive(ttl_days: Optional[float] = None, now: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+    """
+    删除过期的归档记录，以及不再被任何记录引用的内容
+    :param ttl_days: 保留天数，默认为 CRAWLER_ARCHIVE_TTL_DAYS
+    :param now: 当前时间
+    :return: 清理统计
+    """
+    if ttl_days is None:
+        ttl_days = getattr(settings, 'CRAWLER_ARCHIVE_TTL_DAYS', 30)
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=ttl_days)
+
+    expired = FetchArchive.objects.filter(last_fetched_at__lt=cutoff)
+    hashes = set(expired.values_list('content_hash', flat=True))
+    records, _ = expired.delete()
+
+    storage = get_archive_storage()
+    blobs = 0
+    for batch in chunked(sorted(hashes), 500):
+        live = set(
+            FetchArchive.objects.filter(content_hash__in=batch).values_list('content_hash', flat=True)
+        )
+        for content_hash in batch:
+            if content_hash in live:
+                continue
+            try:
+                storage.delete(blob_name(content_hash))
+                blobs += 1
+            except Exception as e:
+                logger.error(f"删除归档内容失败: {content_hash}, {str(e)}")
+
+    logger.info(f"归档清理完成: 删除记录{records}条, 内容{blobs}个")
+    return {'records': records, 'blobs': blobs}
@@ -0,0 +1,176 @@
+"""
+数据源熔断器
+
+每个数据源一个熔断器，状态保存在 CrawlerConfig 上：
+- closed（关闭）：正常调度，记录连续失败次数
+- open（打开）：连续失败次数或最近任务的出错率超过阈值后打开，冷却期内不再调度、不再重试
+- half_open（半开）：冷却期结束后只放行一次探测抓取，成功则关闭，失败则重新打开
+
+打开期间 next_run_at 推迟到冷却结束，按索引查询到期数据源时自然跳过。
+"""
+
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_CHOICES = (
+    (CLOSED, '关闭'),
+    (OPEN, '打开'),
+    (HALF_OPEN, '半开'),
+)
+
+# 计算出错率的任务状态：已完成、出错
+FINISHED_TASK_STATUSES = (2, 4)
+ERROR_TASK_STATUS = 4
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """熔断策略"""
+
+    failure_threshold: int
+    error_rate: float
+    window: int
+    min_samples: int
+    cooldown: float
+
+    @classmethod
+    def from_settings(cls) -> 'BreakerPolicy':
+        return cls(
+            failure_threshold=int(getattr(settings, 'CRAWLER_BREAKER_FAILURE_THRESHOLD', 5)),
+            error_rate=float(getattr(settings, 'CRAWLER_BREAKER_ERROR_RATE', 0.8)),
+            window=int(getattr(settings, 'CRAWLER_BREAKER_WINDOW', 10)),
+            min_samples=int(getattr(settings, 'CRAWLER_BREAKER_MIN_SAMPLES', 5)),
+            cooldown=float(getattr(settings, 'CRAWLER_BREAKER_COOLDOWN', 600)),
+        )
+
+    def should_trip(self, failures: int, error_rate: Optional[float]) -> bool:
+        """
+        是否打开熔断器
+        :param failures: 连续失败次数
+        :param error_rate: 最近任务的出错率，样本不足时为None
+        """
+        if failures >= self.failure_threshold:
+            return True
+        return error_rate is not None and error_rate >= self.error_rate
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'CRAWLER_BREAKER_ENABLED', True)
+
+
+def get_error_rate(config, policy: BreakerPolicy, failed: bool) -> Optional[float]:
+    """
+    最近任务的出错率，计入本次尚未写入任务表的结果
+    :param config: CrawlerConfig
+    :param policy: 熔断策略
+    :param failed: 本次是否失败
+    :return: 出错率，样本数不足时返回None
+    """
+    from .models import CrawlerTask
+
+    statuses = list(
+        CrawlerTask.objects.filter(config=config, status__in=FINISHED_TASK_STATUSES)
+        .order_by('-id')
+        .values_list('status', flat=True)[:max(0, policy.window - 1)]
+    )
+    statuses.append(ERROR_TASK_STATUS if failed else FINISHED_TASK_STATUSES[0])
+    if len(statuses) < policy.min_samples:
+        return None
+    return sum(1 for status in statuses if status == ERROR_TASK_STATUS) / len(statuses)
+
+
+def get_probe_time(config, policy: Optional[BreakerPolicy] = None) -> Optional[datetime.datetime]:
+    """
+    熔断器允许下一次探测的时间
+    :param config: CrawlerConfig
+    :return: 关闭状态返回None
+    """
+    if config.breaker_state == CLOSED or not config.breaker_changed_at:
+        return None
+    policy = policy or BreakerPolicy.from_settings()
+    return config.breaker_changed_at + datetime.timedelta(seconds=policy.cooldown)
+
+
+def _transition(config, state: str, now: datetime.datetime):
+    logger.warning(f"数据源熔断器状态变化: {config.name} {config.breaker_state} -> {state}, "
+                   f"连续失败{config.breaker_failures}次")
+    config.breaker_state = state
+    config.breaker_changed_at = now
+    if state == OPEN:
+        config.breaker_trips += 1
+
+
+def allow_dispatch(config, now: Optional[datetime.datetime] = None) -> bool:
+    """
+    是否允许调度该数据源
+    冷却期结束后只有一个调度方能通过条件更新进入半开状态，获得唯一的探测机会；
+    探测超过冷却期仍未返回结果时允许再次探测
+    :param config: CrawlerConfig
+    :param now: 当前时间
+    :return: 是否允许调度
+    """
+    if not is_enabled() or config.breaker_state == CLOSED:
+        return True
+
+    now = now or timezone.now()
+    probe_time = get_probe_time(config)
+    if probe_time is not None and now < probe_time:
+        return False
+
+    updated = type(config)._default_manager.filter(
+        pk=config.pk,
+        breaker_state=config.breaker_state,
+        breaker_changed_at=config.breaker_changed_at
+    ).update(breaker_state=HALF_OPEN, breaker_changed_at=now)
+    if not updated:
+        return False
+
+    logger.info(f"数据源熔断器进入半开状态，放行一次探测: {config.name}")
+    config.breaker_state = HALF_OPEN
+    config.breaker_changed_at = now
+    return True
+
+
+def record_outcome(config, result: Dict[str, Any], now: Optional[datetime.datetime] = None):
+    """
+    按本次抓取结果更新熔断器
+    :param config: CrawlerConfig
+    :param result: crawl_website 返回的结果，跳过的抓取不计入
+    :param now: 当前时间
+    """
+    status = result.get('status')
+    if not is_enabled() or status not in ('success', 'error'):
+        return
+
+    now = now or timezone.now()
+    update_fields = ['breaker_failures']
+    if status == 'success':
+        if config.breaker_state == CLOSED and not config.breaker_failures:
+            return
+        if config.breaker_state != CLOSED:
+            _transition(config, CLOSED, now)
+            update_fields += ['breaker_state', 'breaker_changed_at']
+        config.breaker_failures = 0
+    else:
+        config.breaker_failures += 1
+        policy = BreakerPolicy.from_settings()
+        if config.breaker_state == HALF_OPEN or (
+            config.breaker_state == CLOSED
+            and policy.should_trip(config.breaker_failures, get_error_rate(config, policy, failed=True))
+        ):
+            _transition(config, OPEN, now)
+            update_fields += ['breaker_state', 'breaker_changed_at', 'breaker_trips']
+
+    if config.pk:
+        config.save(update_fields=update_fields)
@@ -0,0 +1,175 @@
+"""
+响应编码识别
+
+按开销从小到大依次判断响应编码：
+1. BOM
+2. HTTP头 Content-Type 中的 charset（ISO-8859-1 是很多服务器的默认值，不可信，跳过）
+3. 文档开头的 <meta charset> 或 XML 声明
+4. 数据源上次识别出的编码（CrawlerConfig.detected_encoding）
+5. 统计识别，只取前 CRAWLER_CHARSET_DETECT_BYTES 字节样本
+
+统计识别的结果会记在爬虫配置上，之后的抓取直接使用，不再识别；
+记住的编码无法解码样本时重新识别。
+"""
+
+import codecs
+import logging
+import re
+from typing import Any, Mapping, Optional, Tuple
+
+from charset_normalizer import from_bytes
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 编码来源
+BOM = 'bom'
+HEADER = 'header'
+DECLARED = 'declared'
+REMEMBERED = 'remembered'
+DETECTED = 'detected'
+DEFAULT = 'default'
+
+DEFAULT_ENCODING = 'utf-8'
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# 服务器默认值，不能说明真实编码
+_UNTRUSTED = {'iso8859-1', 'ascii'}
+
+# GB2312/GBK页面中经常混有超出字符集的字符，统一按超集GB18030解码
+_SUPERSETS = {'gb2312': 'gb18030', 'gbk': 'gb18030'}
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([^\s;"\']+)', re.I)
+_XML_DECLARATION_RE = re.compile(rb'^\s*<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([A-Za-z0-9._:-]+)', re.I)
+
+
+def normalize(name: Any) -> Optional[str]:
+    """
+    规范化编码名称
+    :param name: 编码名称
+    :return: Python编解码器名称，无法识别时返回None
+    """
+    if not isinstance(name, str) or not name.strip():
+        return None
+    try:
+        codec = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    return _SUPERSETS.get(codec, codec)
+
+
+def bom_charset(content: bytes) -> Optional[str]:
+    """根据BOM判断编码"""
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def header_charset(headers: Optional[Mapping[str, str]]) -> Optional[str]:
+    """
+    从 Content-Type 中取出 charset
+    :param headers: 响应头
+    :return: 规范化后的编码，未声明或不可信时返回None
+    """
+    if not headers or not hasattr(headers, 'items'):
+        return None
+    content_type = None
+    for key, value in headers.items():
+        if isinstance(key, str) and key.lower() == 'content-type':
+            content_type = value
+            break
+    if not isinstance(content_type, str):
+        return None
+    match = _HEADER_CHARSET_RE.search(content_type)
+    encoding = normalize(match.group(1)) if match else None
+    if encoding in _UNTRUSTED:
+        return None
+    return encoding
+
+
+def declared_charset(content: bytes) -> Optional[str]:
+    """
+    从文档开头的XML声明或 <meta charset> 中取出编码
+    :param content: 响应体
+    :return: 规范化后的编码，未声明时返回None
+    """
+    head = content[:getattr(settings, 'CRAWLER_CHARSET_SNIFF_BYTES', 4096)]
+    match = _XML_DECLARATION_RE.search(head) or _META_CHARSET_RE.search(head)
+    encoding = normalize(match.group(1).decode('ascii')) if match else None
+    if encoding is None or encoding in _UNTRUSTED:
+        return None
+    if encoding.startswith('utf-16') or encoding.startswith('utf-32'):
+        # 能按ASCII读出声明，说明实际不是UTF-16/32
+        return DEFAULT_ENCODING
+    return encoding
+
+
+def can_decode(content: bytes, encoding: str) -> bool:
+    """样本能否按该编码解码，样本末尾被截断的多字节字符不算错误"""
+    sample = content[:getattr(settings, 'CRAWLER_CHARSET_DETECT_BYTES', 64 * 1024)]
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return True
+
+
+def detect_charset(content: bytes) -> Tuple[str, bool]:
+    """
+    统计识别编码，只使用响应体开头的样本
+    :param content: 响应体
+    :return: (编码, 结果是否可以记住)；样本全是ASCII时无法判断，结果不记住
+    """
+    sample = content[:getattr(settings, 'CRAWLER_CHARSET_DETECT_BYTES', 64 * 1024)]
+    if sample.isascii():
+        return DEFAULT_ENCODING, len(sample) == len(content)
+    # 合法的UTF-8很少是其他编码的文本，先做一次严格解码
+    if can_decode(sample, DEFAULT_ENCODING):
+        return DEFAULT_ENCODING, True
+
+    best = from_bytes(sample).best()
+    encoding = normalize(best.encoding) if best is not None else None
+    if encoding is None:
+        return DEFAULT_ENCODING, False
+    return encoding, True
+
+
+def resolve_encoding(content: bytes, headers: Optional[Mapping[str, str]] = None,
+                     remembered: Optional[str] = None) -> Tuple[str, str]:
+    """
+    识别响应编码
+    :param content: 响应体
+    :param headers: 响应头
+    :param remembered: 数据源上次识别出的编码
+    :return: (编码, 来源)
+    """
+    encoding = bom_charset(content)
+    if encoding:
+        return encoding, BOM
+
+    encoding = header_charset(headers)
+    if encoding:
+        return encoding, HEADER
+
+    encoding = declared_charset(content)
+    if encoding:
+        return encoding, DECLARED
+
+    if not content:
+        return DEFAULT_ENCODING, DEFAULT
+
+    remembered = normalize(remembered)
+    if remembered and can_decode(content, remembered):
+        return remembered, REMEMBERED
+
+    encoding, confident = detect_charset(content)
+    return encoding, DETECTED if confident else DEFAULT
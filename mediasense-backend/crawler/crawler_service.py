@@ -13,6 +13,7 @@ import pytz
 from news.models import NewsArticle
 from news.serializers import NewsArticleCreateSerializer
 import json
+from .dateparse import parse_date
 
 logger = logging.getLogger(__name__)
 
@@ -493,44 +494,14 @@ class CrawlerService:
 
     @staticmethod
     def _parse_datetime(date_str: str) -> Optional[datetime.datetime]:
-        """解析日期时间字符串"""
+        """解析日期时间字符串，不带时区的时间按UTC处理"""
         if not date_str:
             return None
-            
-        try:
-            # 尝试直接解析
-            dt = parse_datetime(date_str)
-            if dt:
-                return dt
-                
-            # 尝试常见的日期格式
-            formats = [
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%d %H:%M',
-                '%Y-%m-%d',
-                '%Y年%m月%d日 %H:%M:%S',
-                '%Y年%m月%d日 %H:%M',
-                '%Y年%m月%d日',
-                '%a, %d %b %Y %H:%M:%S %z',  # RSS常用格式
-                '%a, %d %b %Y %H:%M:%S %Z',
-                '%Y-%m-%dT%H:%M:%S%z',       # ISO格式
-                '%Y-%m-%dT%H:%M:%S.%f%z'
-            ]
-            
-            for fmt in formats:
-                try:
-                    dt = datetime.datetime.strptime(date_str, fmt)
-                    if not dt.tzinfo:
-                        dt = dt.replace(tzinfo=pytz.UTC)
-                    return dt
-                except ValueError:
-                    continue
-                    
-            return None
-            
-        except Exception as e:
-            logger.error(f"日期解析失败: {date_str}, 错误: {str(e)}")
-            return None
+
+        dt = parse_date(date_str)
+        if dt is not None and not dt.tzinfo:
+            dt = dt.replace(tzinfo=pytz.UTC)
+        return dt
 
     @staticmethod
     def _get_field_value(item, path):
@@ -3,38 +3,28 @@ import logging
 import requests
 import json
 import re
-from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from django.utils import timezone
 from datetime import datetime
-import dateutil.parser
 from ..exceptions import FetchError, ParseError
+from ..pagination import PaginationExecutor
+from ..parse_plan import FieldPath
 import time
 import concurrent.futures
 from functools import wraps
+from urllib.parse import urlencode
 import copy
 
 logger = logging.getLogger(__name__)
 
 def rate_limit(func):
-    """请求频率限制装饰器"""
+    """
+    请求频率限制装饰器
+    限速额度按主机在所有worker之间共享，限速器只返回需要等待的时间
+    """
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        rate_limit_config = self.config.config_data.get('rate_limit', {})
-        if rate_limit_config:
-            requests_limit = rate_limit_config.get('requests', 1)
-            time_window = rate_limit_config.get('per_seconds', 1)
-            
-            current_time = time.time()
-            if hasattr(self, '_last_request_time'):
-                elapsed = current_time - self._last_request_time
-                if elapsed < time_window / requests_limit:
-                    sleep_time = time_window / requests_limit - elapsed
-                    logger.debug(f"频率限制: 休眠 {sleep_time:.2f} 秒")
-                    time.sleep(sleep_time)
-                    
-            self._last_request_time = time.time()
-            
+        self.wait_for_request_slot()
         return func(self, *args, **kwargs)
     return wrapper
 
@@ -69,11 +59,11 @@ class APICrawler(BaseCrawler):
             self.session.cookies.update(self.config.config_data['cookies'])
             
         self._cache = {}
-        self._last_request_time = 0
 
-    def _prepare_request_kwargs(self) -> Dict[str, Any]:
+    def _prepare_request_kwargs(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         准备请求参数
+        :param params: 查询参数，默认为 config_data['params']
         :return: 请求参数字典
         """
         kwargs = {
@@ -83,7 +73,8 @@ class APICrawler(BaseCrawler):
         }
         
         # 处理请求参数
-        params = self.config.config_data.get('params', {})
+        if params is None:
+            params = self.config.config_data.get('params', {})
         if params:
             kwargs['params'] = params
         
@@ -108,9 +99,10 @@ class APICrawler(BaseCrawler):
         return kwargs
 
     @rate_limit
-    def fetch_data(self) -> Dict[str, Any]:
+    def fetch_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         获取API数据
+        :param params: 查询参数，默认为 config_data['params']，分页时每页单独传入
         :return: 包含状态和数据的字典
         :raises: FetchError 当获取数据失败时
         """
@@ -121,6 +113,8 @@ class APICrawler(BaseCrawler):
             cache_config = self.config.config_data.get('cache', {})
             if cache_config.get('enabled'):
                 cache_key = self.source_url
+                if params:
+                    cache_key = f'{self.source_url}?{urlencode(sorted(params.items()))}'
                 cache_data = self._cache.get(cache_key)
                 if cache_data:
                     cache_time = cache_data.get('timestamp', 0)
@@ -128,86 +122,19 @@ class APICrawler(BaseCrawler):
                         logger.info("使用缓存数据")
                         return cache_data
             
-            # 准备请求参数
-            kwargs = self._prepare_request_kwargs()
-            method = self.config.config_data.get('method', 'GET').upper()
-            
-            # 处理动态请求头
-            dynamic_headers = self.config.config_data.get('dynamic_headers', {})
-            if dynamic_headers:
-                for key, value in dynamic_headers.items():
-                    if isinstance(value, str):
-                        kwargs['headers'][key] = value
-                    elif callable(value):
-                        try:
-                            kwargs['headers'][key] = value()
-                        except Exception as e:
-                            logger.error(f"生成动态请求头失败: {str(e)}")
-            
             # 发送请求
-            if method == 'POST':
-                kwargs['json'] = self.config.config_data.get('body', {})
-                if 'params' in kwargs and not kwargs['params']:
-                    del kwargs['params']
-                response = self.session.post(self.source_url, **kwargs)
-            else:
-                response = self.session.get(self.source_url, **kwargs)
-                
-            response.raise_for_status()
-            
-            # 处理响应编码
-            if response.encoding == 'ISO-8859-1':
-                response.encoding = response.apparent_encoding
-            
-            try:
-                result = {
-                    'status': 'success',
-                    'message': '成功获取API数据',
-                    'data': response.json(),
-                    'timestamp': time.time()
-                }
-                
-                # 验证响应
-                if not self._validate_response(result['data']):
-                    return {
-                        'status': 'error',
-                        'message': '响应验证失败',
-                        'data': []
-                    }
-                
-                # 更新缓存
-                if cache_config.get('enabled'):
-                    self._cache[cache_key] = result
-                    
-                return result
-                
-            except (json.JSONDecodeError, ValueError):
-                # 尝试从JavaScript中提取JSON
-                pattern = r'({[^{]*?"newsstream":[^}]*?})'
-                match = re.search(pattern, response.text)
-                if match:
-                    try:
-                        return {
-                            'status': 'success',
-                            'message': '成功从JavaScript中提取JSON数据',
-                            'data': json.loads(match.group(1))
-                        }
-                    except json.JSONDecodeError as e:
-                        error_msg = f"解析JSON数据失败: {str(e)}"
-                        logger.error(error_msg)
-                        return {
-                            'status': 'error',
-                            'message': error_msg,
-                            'data': []
-                        }
-                else:
-                    error_msg = "解析JSON数据失败: 未找到有效的JSON数据"
-                    logger.error(error_msg)
-                    return {
-                        'status': 'error',
-                        'message': error_msg,
-                        'data': []
-                    }
+            method, kwargs = self._build_request(params)
+            response = self.request(self.source_url, method=method, **kwargs)
+
+            result = self._handle_response(response)
+            if result['status'] == 'success':
+                self.archive_response(response)
+
+            # 更新缓存
+            if cache_config.get('enabled') and result['status'] == 'success' and 'timestamp' in result:
+                self._cache[cache_key] = result
+
+            return result
                     
         except requests.exceptions.RequestException as e:
             error_msg = f"网络请求失败: {str(e)}"
@@ -226,6 +153,186 @@ class APICrawler(BaseCrawler):
                 'data': []
             }
 
+    async def fetch_data_async(self) -> Dict[str, Any]:
+        """
+        通过共享的异步抓取器获取API数据
+        :return: 包含状态和数据的字典
+        """
+        try:
+            logger.info(f"开始异步获取API数据: {self.source_url}")
+            await self.wait_for_request_slot_async()
+
+            method, kwargs = self._build_request()
+
+            proxies = self.session.proxies or {}
+            scheme = self.source_url.split(':', 1)[0]
+            cookies = self.session.cookies.get_dict()
+            headers = kwargs['headers']
+            if cookies:
+                headers['Cookie'] = '; '.join(f'{key}={value}' for key, value in cookies.items())
+
+            response = await self.fetch_async(
+                self.source_url,
+                method=method,
+                headers=headers,
+                params=kwargs.get('params'),
+                json_body=kwargs.get('json'),
+                timeout=kwargs.get('timeout'),
+                proxy=proxies.get(scheme),
+                verify=self.session.verify is not False,
+                allow_redirects=kwargs.get('allow_redirects', True)
+            )
+            result = self._handle_response(response)
+            if result['status'] == 'success':
+                await self.archive_response_async(response)
+            return result
+
+        except FetchError as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': []
+            }
+        except Exception as e:
+            error_msg = f"获取API数据失败: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': []
+            }
+
+    def can_run_async(self) -> bool:
+        """
+        分页、并发、重试和本地缓存都依赖同步流程，这些配置下整体在线程池中运行
+        """
+        config_data = self.config.config_data
+        return not (
+            config_data.get('pagination', {}).get('enabled')
+            or config_data.get('concurrency', {}).get('enabled')
+            or config_data.get('cache', {}).get('enabled')
+            or config_data.get('retry', {}).get('max_attempts', 1) > 1
+        )
+
+    def use_conditional_get(self) -> bool:
+        """
+        分页和并发请求的参数每次都不同，只对单次GET请求使用条件请求
+        """
+        config_data = self.config.config_data
+        return (
+            super().use_conditional_get()
+            and config_data.get('method', 'GET').upper() == 'GET'
+            and not config_data.get('pagination', {}).get('enabled')
+            and not config_data.get('concurrency', {}).get('enabled')
+        )
+
+    def _build_request(self, params: Optional[Dict[str, Any]] = None):
+        """
+        构建请求方法和请求参数
+        :param params: 查询参数，默认为 config_data['params']
+        :return: (请求方法, 请求参数字典)
+        """
+        kwargs = self._prepare_request_kwargs(params)
+        method = self.config.config_data.get('method', 'GET').upper()
+        
+        # 处理动态请求头
+        dynamic_headers = self.config.config_data.get('dynamic_headers', {})
+        if dynamic_headers:
+            for key, value in dynamic_headers.items():
+                if isinstance(value, str):
+                    kwargs['headers'][key] = value
+                elif callable(value):
+                    try:
+                        kwargs['headers'][key] = value()
+                    except Exception as e:
+                        logger.error(f"生成动态请求头失败: {str(e)}")
+
+        # 条件请求头
+        kwargs['headers'].update(self.get_conditional_headers())
+        
+        if method == 'POST':
+            kwargs['json'] = self.config.config_data.get('body', {})
+            if 'params' in kwargs and not kwargs['params']:
+                del kwargs['params']
+                
+        return method, kwargs
+
+    def _handle_response(self, response) -> Dict[str, Any]:
+        """
+        处理API响应
+        :param response: requests.Response 或 FetchResponse
+        :return: 包含状态和数据的字典
+        """
+        if response.status_code == 304:
+            return self.not_modified_result()
+
+        try:
+            response.raise_for_status()
+        except (requests.exceptions.RequestException, FetchError) as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': []
+            }
+
+        # 处理响应编码
+        self.resolve_encoding(response)
+
+        try:
+            result = {
+                'status': 'success',
+                'message': '成功获取API数据',
+                'data': response.json(),
+                'timestamp': time.time()
+            }
+            
+            # 验证响应
+            if not self._validate_response(result['data']):
+                return {
+                    'status': 'error',
+                    'message': '响应验证失败',
+                    'data': []
+                }
+                
+            self.update_validators(response)
+            return result
+            
+        except (json.JSONDecodeError, ValueError):
+            # 尝试从JavaScript中提取JSON
+            pattern = r'({[^{]*?"newsstream":[^}]*?})'
+            match = re.search(pattern, response.text)
+            if match:
+                try:
+                    return {
+                        'status': 'success',
+                        'message': '成功从JavaScript中提取JSON数据',
+                        'data': json.loads(match.group(1))
+                    }
+                except json.JSONDecodeError as e:
+                    error_msg = f"解析JSON数据失败: {str(e)}"
+                    logger.error(error_msg)
+                    return {
+                        'status': 'error',
+                        'message': error_msg,
+                        'data': []
+                    }
+            else:
+                error_msg = "解析JSON数据失败: 未找到有效的JSON数据"
+                logger.error(error_msg)
+                return {
+                    'status': 'error',
+                    'message': error_msg,
+                    'data': []
+                }
+
+    def build_fetch_result(self, response) -> Dict[str, Any]:
+        """重新解析归档时与 fetch_data 使用相同的响应处理"""
+        return self._handle_response(response)
+
     def parse_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         解析API响应数据
@@ -240,89 +347,23 @@ class APICrawler(BaseCrawler):
                 logger.error(f"获取API数据失败: {data.get('message')}")
                 return []
                 
-            # 获取数据路径
-            data_path = self.config.config_data.get('data_path', '')
-            if not data_path:
-                logger.error(f'数据路径未配置: {self.source_name}')
+            plan = self.plan.api
+            news_list = self._select_news_list(data['data'], plan)
+            if news_list is None:
                 return []
                 
-            # 根据数据路径获取新闻列表
-            news_list = data['data']
-            for key in data_path.split('.'):
-                if not isinstance(news_list, dict):
-                    logger.error(f'无效的数据路径: {data_path}, 当前值: {news_list}')
-                    return []
-                news_list = news_list.get(key, {})
-                
-            if not isinstance(news_list, list):
-                news_list = [news_list] if news_list else []
+            # 已入库的文章不再解析
+            link = plan.link
+            known_urls = self.get_known_urls(
+                link.get(item) for item in news_list if link and isinstance(item, dict)
+            )
                 
             # 解析每条新闻
-            articles = []
-            for item in news_list:
-                try:
-                    if not isinstance(item, dict):
-                        continue
-                        
-                    # 获取字段值
-                    title = self._get_field_value(item, self.config.config_data.get('title_path'))
-                    if not title:
-                        logger.warning("跳过无标题文章")
-                        continue
-                        
-                    url = self._get_field_value(item, self.config.config_data.get('link_path'))
-                    if not url or not url.startswith(('http://', 'https://')):
-                        logger.warning(f"跳过无效URL: {url}")
-                        continue
-                        
-                    author = self._get_field_value(item, self.config.config_data.get('author_path'))
-                    source = self._get_field_value(item, self.config.config_data.get('source_path'))
-                    pub_time = self._get_field_value(item, self.config.config_data.get('pub_time_path'))
-                    content = self._get_field_value(item, self.config.config_data.get('content_path'))
-                    description = self._get_field_value(item, self.config.config_data.get('description_path'))
-                    
-                    # 获取新闻详情
-                    if not content and url:
-                        try:
-                            detail_response = self.session.get(url, timeout=30)
-                            detail_response.raise_for_status()
-                            detail_soup = BeautifulSoup(detail_response.text, 'html.parser')
-                            
-                            # 使用选择器获取内容
-                            content_selector = self.config.config_data.get('content_selector')
-                            if content_selector:
-                                content_elem = detail_soup.select_one(content_selector)
-                                if content_elem:
-                                    content = content_elem.get_text(separator='\n').strip()
-                                    
-                        except Exception as e:
-                            logger.error(f'获取新闻详情失败: {str(e)}', exc_info=True)
-                            
-                    # 构建文章数据
-                    article = {
-                        'title': title,
-                        'url': url,
-                        'content': content or description or '',
-                        'description': description or '',
-                        'author': author or '',
-                        'source': source or self.source_name,
-                        'pub_time': self._parse_datetime(pub_time) if pub_time else timezone.now(),
-                        'tags': [],
-                        'images': []
-                    }
-                    
-                    # 验证内容长度
-                    min_length = self.config.config_data.get('validation', {}).get('min_content_length', 0)
-                    if min_length and len(article['content']) < min_length:
-                        logger.warning(f"跳过内容长度不足的文章: {article['title']}")
-                        continue
-                    
-                    articles.append(article)
-                    logger.debug(f"成功解析文章: {article['title']}")
-                        
-                except Exception as e:
-                    logger.error(f"解析文章失败: {str(e)}", exc_info=True)
-                    continue
+            articles, pending_details = self._build_articles(news_list, known_urls)
+
+            # 并发获取新闻详情，失败或超时的文章保留摘要
+            self._fill_details(articles, pending_details)
+            articles = self._filter_short(articles)
                     
             logger.info(f"API解析完成，共获取{len(articles)}篇文章")
             return articles
@@ -331,7 +372,158 @@ class APICrawler(BaseCrawler):
             error_msg = f"API解析失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return []
-            
+
+    def parse_items(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        解析全部新闻，不查询已入库的URL、不抓取详情页，在解析进程池中执行
+        缺少正文的文章带有 _pending_detail 标记，由 complete_items 抓取详情页
+        :param data: fetch_data返回的数据字典
+        :return: 解析后的文章列表
+        """
+        if data.get('status') != 'success' or not data.get('data'):
+            return []
+        news_list = self._select_news_list(data['data'], self.plan.api)
+        if news_list is None:
+            return []
+        articles, pending_details = self._build_articles(news_list)
+        for index in pending_details:
+            articles[index]['_pending_detail'] = True
+        return articles
+
+    def complete_items(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        跳过已入库的文章，抓取缺少正文的详情页，再按最小长度过滤
+        :param articles: parse_items 的结果
+        :return: 新文章列表
+        """
+        known_urls = self.get_known_urls(article['url'] for article in articles)
+        fresh = []
+        pending_details = []
+        for article in articles:
+            pending = article.pop('_pending_detail', False)
+            if article['url'] in known_urls:
+                self.skipped_known += 1
+                continue
+            if pending:
+                pending_details.append(len(fresh))
+            fresh.append(article)
+
+        self._fill_details(fresh, pending_details)
+        fresh = self._filter_short(fresh)
+        logger.info(f"API解析完成，共获取{len(fresh)}篇文章")
+        return fresh
+
+    def _select_news_list(self, data: Any, plan) -> Optional[List[Any]]:
+        """
+        按数据路径取出新闻列表
+        :param data: 响应JSON
+        :param plan: API解析计划
+        :return: 新闻列表，数据路径未配置或无效时返回None
+        """
+        if not plan.data_path:
+            logger.error(f'数据路径未配置: {self.source_name}')
+            return None
+
+        # 根据数据路径获取新闻列表
+        news_list = data
+        for key in plan.data_path:
+            if not isinstance(news_list, dict):
+                logger.error(f'无效的数据路径: {".".join(plan.data_path)}, 当前值: {news_list}')
+                return None
+            news_list = news_list.get(key, {})
+
+        if not isinstance(news_list, list):
+            news_list = [news_list] if news_list else []
+        return news_list
+
+    def _build_articles(self, news_list: List[Any],
+                        known_urls: Iterable[str] = frozenset()) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        将新闻列表转换为文章数据
+        :param news_list: 新闻列表
+        :param known_urls: 已入库的URL，跳过这些新闻
+        :return: (文章列表, 缺少正文需要抓取详情页的文章下标)
+        """
+        parse_plan = self.plan
+        plan = parse_plan.api
+        link = plan.link
+        articles = []
+        pending_details = []
+        for item in news_list:
+            try:
+                if not isinstance(item, dict):
+                    continue
+                    
+                # 获取字段值
+                title = plan.title.get(item) if plan.title else None
+                if not title:
+                    logger.warning("跳过无标题文章")
+                    continue
+                    
+                url = link.get(item) if link else None
+                if not url or not url.startswith(('http://', 'https://')):
+                    logger.warning(f"跳过无效URL: {url}")
+                    continue
+
+                if url in known_urls:
+                    self.skipped_known += 1
+                    continue
+                    
+                author = plan.author.get(item) if plan.author else None
+                source = plan.source.get(item) if plan.source else None
+                pub_time = plan.pub_time.get(item) if plan.pub_time else None
+                content = plan.content.get(item) if plan.content else None
+                description = plan.description.get(item) if plan.description else None
+                
+                # 构建文章数据
+                article = {
+                    'title': title,
+                    'url': url,
+                    'content': content or description or '',
+                    'description': description or '',
+                    'author': author or '',
+                    'source': source or self.source_name,
+                    'pub_time': (
+                        parse_plan.parse_date(pub_time)
+                    ) if pub_time else timezone.now(),
+                    'tags': [],
+                    'images': []
+                }
+                
+                # 缺少正文的文章稍后统一抓取详情页
+                if not content:
+                    pending_details.append(len(articles))
+                
+                articles.append(article)
+                logger.debug(f"成功解析文章: {article['title']}")
+                    
+            except Exception as e:
+                logger.error(f"解析文章失败: {str(e)}", exc_info=True)
+                continue
+        return articles, pending_details
+
+    def _fill_details(self, articles: List[Dict[str, Any]], pending_details: List[int]):
+        """并发获取新闻详情，失败或超时的文章保留摘要"""
+        if not pending_details:
+            return
+        contents = self.fetch_detail_contents([articles[index]['url'] for index in pending_details])
+        for index, content in zip(pending_details, contents):
+            if content:
+                articles[index]['content'] = content
+
+    def _filter_short(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """跳过正文长度不足 min_content_length 的文章"""
+        min_length = self.plan.api.min_content_length
+        if not min_length:
+            return articles
+        valid_articles = []
+        for article in articles:
+            if len(article['content']) < min_length:
+                logger.warning(f"跳过内容长度不足的文章: {article['title']}")
+                continue
+            valid_articles.append(article)
+        return valid_articles
+
     def _get_field_value(self, data: Dict[str, Any], path: Optional[str]) -> Any:
         """
         根据路径获取字段值
@@ -339,28 +531,12 @@ class APICrawler(BaseCrawler):
         :param path: 字段路径，使用点号分隔，支持数组索引如 'items[0].title'
         :return: 字段值，如果路径无效则返回None
         """
-        if not path:
+        field_path = FieldPath.compile(path)
+        if field_path is None:
             return None
             
         try:
-            value = data
-            parts = re.split(r'\.|\[|\]', path)
-            parts = [p for p in parts if p]  # 移除空字符串
-            
-            for part in parts:
-                if part.isdigit():  # 处理数组索引
-                    index = int(part)
-                    if not isinstance(value, (list, tuple)) or index >= len(value):
-                        return None
-                    value = value[index]
-                else:  # 处理字典键
-                    if not isinstance(value, dict):
-                        return None
-                    value = value.get(part)
-                    if value is None:
-                        return None
-            return value
-            
+            return field_path.get(data)
         except Exception as e:
             logger.error(f"获取字段值失败: {str(e)}", exc_info=True)
             return None
@@ -373,29 +549,7 @@ class APICrawler(BaseCrawler):
         """
         if not date_str:
             return None
-            
-        try:
-            return dateutil.parser.parse(date_str)
-        except (ValueError, TypeError):
-            try:
-                # 尝试常见的日期格式
-                formats = [
-                    '%Y-%m-%dT%H:%M:%SZ',  # ISO格式
-                    '%Y-%m-%d %H:%M:%S',   # 标准格式
-                    '%Y/%m/%d %H:%M:%S',   # 斜线分隔
-                    '%Y-%m-%d',            # 仅日期
-                    '%Y/%m/%d',            # 仅日期（斜线）
-                ]
-                
-                for fmt in formats:
-                    try:
-                        return datetime.strptime(date_str, fmt)
-                    except ValueError:
-                        continue
-                        
-                return None
-            except Exception:
-                return None
+        return self.plan.parse_date(date_str)
 
     def _validate_response(self, data: Dict[str, Any]) -> bool:
         """
@@ -403,19 +557,18 @@ class APICrawler(BaseCrawler):
         :param data: 响应数据
         :return: 验证是否通过
         """
-        validation = self.config.config_data.get('validation', {})
-        if not validation:
+        plan = self.plan.api
+        if not plan.has_validation:
             return True
             
         try:
             # 获取数据路径
-            data_path = self.config.config_data.get('data_path', '')
-            if not data_path:
+            if not plan.data_path:
                 return True
                 
             # 根据数据路径获取新闻列表
             items = data
-            for key in data_path.split('.'):
+            for key in plan.data_path:
                 if not isinstance(items, dict):
                     return True
                 items = items.get(key, {})
@@ -424,28 +577,27 @@ class APICrawler(BaseCrawler):
                 items = [items]
                 
             # 检查数量限制
-            max_items = validation.get('max_items')
+            max_items = plan.max_items
             if max_items and len(items) > max_items:
                 logger.error(f"数据项数量超过限制: {len(items)} > {max_items}")
                 return False
                 
             # 检查必需字段
-            required_fields = validation.get('required_fields', [])
             for item in items:
                 if not isinstance(item, dict):
                     continue
-                for field in required_fields:
-                    if not self._get_field_value(item, field):
-                        logger.error(f"缺少必需字段: {field}")
+                for field in plan.required_fields:
+                    if not field.get(item):
+                        logger.error(f"缺少必需字段: {field.path}")
                         return False
                         
             # 检查内容长度
-            min_length = validation.get('min_content_length')
+            min_length = plan.min_content_length
             if min_length:
                 for item in items:
                     if not isinstance(item, dict):
                         continue
-                    content = self._get_field_value(item, self.config.config_data.get('content_path', '')) or ''
+                    content = (plan.content.get(item) if plan.content else None) or ''
                     if len(content) < min_length:
                         logger.error(f"内容长度不足: {len(content)} < {min_length}")
                         return False
@@ -525,6 +677,14 @@ class APICrawler(BaseCrawler):
                 'data': []
             }
 
+    def fetch_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        带重试地获取一个分页页面，由 PaginationExecutor 在线程池中调用
+        :param params: 该页的查询参数
+        :return: 包含状态和数据的字典
+        """
+        return self._retry_request(self.fetch_data, params)
+
     def _retry_request(self, func, *args, **kwargs) -> Dict[str, Any]:
         """
         执行带重试的请求
@@ -545,7 +705,7 @@ class APICrawler(BaseCrawler):
                     time.sleep(delay)
                     
                 result = func(*args, **kwargs)
-                if result['status'] == 'success':
+                if result['status'] in ('success', 'not_modified'):
                     return result
                 last_error = result
                     
@@ -572,57 +732,7 @@ class APICrawler(BaseCrawler):
             # 处理分页
             pagination = self.config.config_data.get('pagination', {})
             if pagination.get('enabled'):
-                all_items = []
-                current_page = pagination.get('start_page', 1)
-                max_pages = pagination.get('max_pages', 1)
-                page_param = pagination.get('page_param', 'page')
-                size_param = pagination.get('size_param', 'size')
-                page_size = pagination.get('page_size', 20)
-                
-                # 保存原始参数
-                original_params = self.config.config_data.get('params', {}).copy()
-                
-                try:
-                    while current_page <= max_pages:
-                        # 更新分页参数
-                        if 'params' not in self.config.config_data:
-                            self.config.config_data['params'] = {}
-                        self.config.config_data['params'][page_param] = current_page
-                        if size_param:
-                            self.config.config_data['params'][size_param] = page_size
-                        
-                        # 获取当前页数据
-                        page_result = self._retry_request(self.fetch_data)
-                        if page_result['status'] != 'success':
-                            break
-                            
-                        # 解析数据
-                        items = self.parse_response(page_result)
-                        if not items:
-                            break
-                            
-                        all_items.extend(items)
-                        current_page += 1
-                        
-                        # 检查是否有更多数据
-                        if not pagination.get('has_more_data', True):
-                            break
-                        
-                    if all_items:
-                        return {
-                            'status': 'success',
-                            'message': '成功获取并解析分页数据',
-                            'data': all_items
-                        }
-                    else:
-                        return {
-                            'status': 'error',
-                            'message': '未获取到有效文章',
-                            'data': []
-                        }
-                finally:
-                    # 恢复原始参数
-                    self.config.config_data['params'] = original_params
+                return PaginationExecutor(self, pagination).run()
             
             # 处理并发请求
             concurrency = self.config.config_data.get('concurrency', {})
@@ -632,11 +742,19 @@ class APICrawler(BaseCrawler):
             
             # 执行带重试的请求
             result = self._retry_request(self.fetch_data)
+            if result['status'] == 'not_modified':
+                return self.not_modified_run_result()
             if result['status'] != 'success':
                 return result
             
             # 解析数据
             articles = self.parse_response(result)
+            if not articles and self.skipped_known:
+                return {
+                    'status': 'success',
+                    'message': '没有新文章',
+                    'data': []
+                }
             if not articles:
                 return {
                     'status': 'error',
@@ -674,15 +792,12 @@ class APICrawler(BaseCrawler):
                 kwargs['json'] = self.config.config_data.get('body', {})
                 if 'params' in kwargs and not kwargs['params']:
                     del kwargs['params']
-                response = self.session.post(self.source_url, **kwargs)
-            else:
-                response = self.session.get(self.source_url, **kwargs)
+            response = self.request(self.source_url, method=method, **kwargs)
                 
             response.raise_for_status()
             
             # 处理响应编码
-            if response.encoding == 'ISO-8859-1':
-                response.encoding = response.apparent_encoding
+            self.resolve_encoding(response)
             
             try:
                 result = {
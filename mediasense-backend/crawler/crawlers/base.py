@@ -1,6 +1,19 @@
+import asyncio
 import datetime
 import logging
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+from ..dateparse import to_naive_utc
+from ..detail_fetcher import DetailFetcher
+from ..exceptions import FetchError
+from ..fetcher import FetchResponse, get_fetcher
+from ..html_backend import HTML_PARSER, LXML, get_text, parse_html
+from .. import charset, parse_pool
+from ..parse_plan import ParsePlan, get_parse_plan
+from ..proxy import get_proxy_selector, is_proxy_failure
+from ..ratelimit import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +30,21 @@ class BaseCrawler:
         self.source_name = config.name
         self.headers = config.headers or {}
         self.enabled = config.status == 1 and config.is_active
+        self.skipped_known = 0
+        # 重新解析归档时为True，不发送网络请求，也不更新数据源状态
+        self.replaying = False
+        # 抓取时记录的数据源状态，由服务层在入库成功后保存，见 crawler.source_state
+        self.source_state: Dict[str, Any] = {}
+        # 由服务层逐页入库时为True，run()可以在 pages 中逐页返回文章，见 crawler.pagination
+        self.streaming = False
+
+    @property
+    def plan(self) -> ParsePlan:
+        """
+        当前配置的解析计划，配置修改后自动重新编译
+        逐条解析前取一次，不要在循环中反复获取
+        """
+        return get_parse_plan(self.config)
         
     def fetch_data(self) -> Dict:
         """
@@ -32,7 +60,436 @@ class BaseCrawler:
         :return: 解析后的文章列表
         """
         raise NotImplementedError("子类必须实现parse_response方法")
-        
+
+    def can_parse_in_process(self, response: Dict) -> bool:
+        """
+        能否把解析交给解析进程池
+        子类实现了 parse_items 和 complete_items 时，只有不访问数据库和网络的 parse_items
+        在子进程中执行，查询已入库的URL和抓取详情页仍在当前进程中完成
+        :param response: fetch_data 的返回结果
+        """
+        return type(self).parse_items is not BaseCrawler.parse_items
+
+    def parse_items(self, response: Dict) -> List[Dict]:
+        """
+        只解析响应内容，不跳过已入库的文章、不抓取详情页
+        :param response: fetch_data 的返回结果
+        :return: 解析后的文章列表
+        """
+        raise NotImplementedError("子类实现parse_items后才能在解析进程池中解析")
+
+    def complete_items(self, articles: List[Dict]) -> List[Dict]:
+        """
+        在当前进程中补全 parse_items 的结果，如跳过已入库的文章、抓取详情页正文
+        :param articles: parse_items 的结果
+        :return: 最终的文章列表
+        """
+        return articles
+
+    def get_known_urls(self, urls: Iterable[str]) -> Set[str]:
+        """
+        查询已入库的URL，解析时直接跳过这些文章
+        可通过 config_data['skip_known'] 关闭，config_data['refresh'] 开启时默认关闭
+        :param urls: 待解析文章的URL
+        :return: 已入库的URL集合
+        """
+        config_data = self.config.config_data
+        if self.replaying or not config_data.get('skip_known', not config_data.get('refresh', False)):
+            return set()
+
+        from ..seen_index import get_seen_index
+
+        try:
+            known = get_seen_index().known(url for url in urls if isinstance(url, str))
+        except Exception as e:
+            logger.error(f"查询已抓取URL索引失败: {str(e)}", exc_info=True)
+            return set()
+        if known:
+            logger.info(f"{self.source_name} 跳过{len(known)}篇已入库的文章")
+        return known
+
+    def reserve_request_slot(self, url: Optional[str] = None) -> float:
+        """
+        按 config_data['rate_limit'] 预约一次请求，不会阻塞
+        同一主机的额度在所有worker和数据源之间共享
+        :param url: 请求URL，默认为数据源URL
+        :return: 发送请求前需要等待的秒数
+        """
+        rate_config = self.config.config_data.get('rate_limit')
+        if not rate_config:
+            return 0.0
+        try:
+            return get_rate_limiter().reserve_for(url or self.source_url, rate_config, self.config.pk)
+        except Exception as e:
+            logger.error(f"请求限速失败: {str(e)}")
+            return 0.0
+
+    def wait_for_request_slot(self, url: Optional[str] = None):
+        """同步等待限速额度"""
+        wait = self.reserve_request_slot(url)
+        if wait > 0:
+            logger.debug(f"频率限制: 休眠 {wait:.2f} 秒")
+            time.sleep(wait)
+
+    async def wait_for_request_slot_async(self, url: Optional[str] = None):
+        """异步等待限速额度，等待期间事件循环继续处理其他数据源"""
+        if not self.config.config_data.get('rate_limit'):
+            return
+        # 预约需要访问Redis，放到线程池中执行
+        wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve_request_slot, url)
+        if wait > 0:
+            logger.debug(f"频率限制: 等待 {wait:.2f} 秒")
+            await asyncio.sleep(wait)
+
+    def get_proxy(self, url: Optional[str] = None) -> Optional[str]:
+        """
+        按 config_data['proxy_pool'] 从代理池为请求主机选择代理
+        session 上已配置固定代理时不使用代理池
+        :param url: 请求URL，默认为数据源URL
+        :return: 代理地址，未启用或代理池为空时返回None
+        """
+        if not self.config.config_data.get('proxy_pool'):
+            return None
+        session = getattr(self, 'session', None)
+        if getattr(session, 'proxies', None):
+            return None
+        try:
+            return get_proxy_selector().choose(url or self.source_url)
+        except Exception as e:
+            logger.error(f"选择代理失败: {str(e)}")
+            return None
+
+    @staticmethod
+    def report_proxy(proxy: Optional[str], ok: bool, elapsed: Optional[float] = None):
+        """向代理池反馈一次请求的结果"""
+        if not proxy:
+            return
+        try:
+            get_proxy_selector().report(proxy, ok, elapsed)
+        except Exception as e:
+            logger.error(f"反馈代理结果失败: {str(e)}")
+
+    def request(self, url: str, method: str = 'GET', **kwargs):
+        """
+        通过 session 发送同步请求，启用代理池时选择代理并反馈结果
+        :param url: 请求URL
+        :param method: 请求方法
+        :param kwargs: 传给 requests.Session.get/post 等方法的参数
+        :return: requests.Response
+        """
+        import requests
+
+        if self.replaying:
+            raise FetchError(f'重新解析归档时不发送网络请求: {url}')
+        proxy = self.get_proxy(url)
+        if proxy:
+            kwargs['proxies'] = {urlsplit(url).scheme: proxy}
+        start = time.monotonic()
+        try:
+            response = getattr(self.session, method.lower())(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.report_proxy(proxy, False)
+            raise
+        self.report_proxy(proxy, not is_proxy_failure(response.status_code), time.monotonic() - start)
+        return response
+
+    async def fetch_async(self, url: str, **kwargs) -> FetchResponse:
+        """
+        通过共享的异步抓取器发送请求，启用代理池时选择代理并反馈结果
+        :param url: 请求URL
+        :param kwargs: 传给 AsyncFetcher.fetch 的参数
+        :return: FetchResponse
+        :raises: FetchError 网络请求失败时
+        """
+        if self.replaying:
+            raise FetchError(f'重新解析归档时不发送网络请求: {url}')
+        proxy = kwargs.pop('proxy', None)
+        pooled = None
+        if not proxy and self.config.config_data.get('proxy_pool'):
+            # 选择代理时可能需要从数据库加载代理池，放到线程池中执行
+            pooled = await asyncio.get_running_loop().run_in_executor(None, self.get_proxy, url)
+        start = time.monotonic()
+        try:
+            response = await get_fetcher().fetch(url, proxy=proxy or pooled, **kwargs)
+        except FetchError:
+            self.report_proxy(pooled, False)
+            raise
+        self.report_proxy(pooled, not is_proxy_failure(response.status_code), time.monotonic() - start)
+        return response
+
+    def fetch_detail_pages(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        并发抓取详情页
+        并发数、单主机并发数、超时和总时限可通过 config_data['detail'] 配置
+        :param urls: 详情页URL列表
+        :return: 与urls一一对应的页面HTML，抓取失败或超时为None
+        """
+        if not urls or self.replaying:
+            return [None] * len(urls)
+
+        detail_config = self.config.config_data.get('detail', {})
+        session = getattr(self, 'session', None)
+        fetcher = DetailFetcher(
+            headers=self.headers,
+            max_concurrency=detail_config.get('concurrency'),
+            per_host=detail_config.get('per_host'),
+            timeout=detail_config.get('timeout'),
+            deadline=detail_config.get('deadline'),
+            verify=getattr(session, 'verify', True) is not False,
+            proxies=getattr(session, 'proxies', None),
+            reserve=self.reserve_request_slot,
+            choose_proxy=self.get_proxy if self.config.config_data.get('proxy_pool') else None,
+            report_proxy=self.report_proxy,
+            encoding=self.get_remembered_encoding() or None
+        )
+        return fetcher.fetch_all(urls)
+
+    def fetch_detail_contents(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        并发抓取详情页并按 content_selector 提取正文
+        :param urls: 详情页URL列表
+        :return: 与urls一一对应的正文，未配置选择器、抓取失败或超时为None
+        """
+        content_selector = self.plan.html.content
+        if not urls or content_selector is None or self.replaying:
+            return [None] * len(urls)
+
+        pages = self.fetch_detail_pages(urls)
+
+        parser = self.plan.html.parser
+        contents = []
+        for url, html in zip(urls, pages):
+            content = None
+            if html:
+                try:
+                    content = self._extract_detail_content(html, content_selector, parser)
+                except Exception as e:
+                    logger.error(f"解析详情页失败: {url}, {str(e)}")
+            contents.append(content)
+        return contents
+
+    @staticmethod
+    def _extract_detail_content(html: str, content_selector, parser: str) -> Optional[str]:
+        """
+        按选择器提取详情页正文，lxml无法解析或没有匹配时退回 BeautifulSoup
+        :param html: 详情页HTML
+        :param content_selector: 预编译的正文选择器
+        :param parser: 解析后端
+        :return: 正文，没有匹配时返回None
+        """
+        if parser == LXML:
+            try:
+                content_elem = content_selector.select_one(parse_html(html, LXML))
+                if content_elem is not None:
+                    return get_text(content_elem, separator='\n').strip() or None
+            except Exception as e:
+                logger.debug(f"lxml解析详情页失败，使用BeautifulSoup: {str(e)}")
+        content_elem = content_selector.select_one(parse_html(html, HTML_PARSER))
+        if content_elem is None:
+            return None
+        return get_text(content_elem, separator='\n').strip() or None
+
+    def use_conditional_get(self) -> bool:
+        """是否发送条件请求，可通过 config_data['conditional_get'] 关闭"""
+        return self.config.config_data.get('conditional_get', True)
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        """
+        根据上次保存的校验头生成条件请求头
+        :return: If-None-Match / If-Modified-Since 请求头
+        """
+        if not self.use_conditional_get():
+            return {}
+
+        headers = {}
+        etag = getattr(self.config, 'etag', '')
+        last_modified = getattr(self.config, 'last_modified', '')
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def update_validators(self, response):
+        """
+        记录响应中的 ETag / Last-Modified，入库成功后由服务层保存，供下次条件请求使用
+        :param response: requests.Response 或 FetchResponse
+        """
+        if self.replaying or not self.use_conditional_get():
+            return
+
+        headers = getattr(response, 'headers', None) or {}
+        etag = headers.get('ETag') or ''
+        last_modified = headers.get('Last-Modified') or ''
+        if not isinstance(etag, str) or not isinstance(last_modified, str):
+            return
+
+        self.source_state['etag'] = etag[:255]
+        self.source_state['last_modified'] = last_modified[:64]
+
+    def get_remembered_encoding(self) -> str:
+        """数据源识别出的页面编码，本次抓取新识别的编码优先"""
+        return self.source_state.get('detected_encoding') or getattr(self.config, 'detected_encoding', '')
+
+    def resolve_encoding(self, response) -> Optional[str]:
+        """
+        识别响应编码并设置到 response.encoding
+        统计识别出的编码记在 source_state 上，入库成功后保存到数据源，之后的抓取不再识别
+        :param response: requests.Response 或 FetchResponse
+        :return: 识别出的编码，响应体不是bytes时返回None
+        """
+        content = getattr(response, 'content', None)
+        if not isinstance(content, bytes):
+            return None
+
+        remembered = self.get_remembered_encoding()
+        encoding, source = charset.resolve_encoding(content, getattr(response, 'headers', None), remembered)
+        response.encoding = encoding
+
+        if source == charset.DETECTED and encoding != remembered and not self.replaying:
+            logger.info(f"{self.source_name} 识别出页面编码: {encoding}")
+            self.source_state['detected_encoding'] = encoding
+        return encoding
+
+    def archive_response(self, response):
+        """
+        归档fetch_data获取的原始响应，供解析规则修改后重新解析
+        归档失败不影响抓取
+        :param response: requests.Response 或 FetchResponse
+        """
+        if self.replaying:
+            return
+        from ..archive import archive_response
+
+        try:
+            archive_response(self.config, response)
+        except Exception as e:
+            logger.error(f"{self.source_name} 归档响应失败: {str(e)}", exc_info=True)
+
+    async def archive_response_async(self, response):
+        """
+        在线程池中归档响应，归档需要写数据库和存储，不能在事件循环中执行
+        :param response: FetchResponse
+        """
+        if self.replaying:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.archive_response, response)
+
+    def build_fetch_result(self, response) -> Dict[str, Any]:
+        """
+        将HTTP响应转换为fetch_data的返回格式，重新解析归档时也使用该方法
+        :param response: requests.Response 或 FetchResponse
+        :return: 包含状态和数据的字典
+        """
+        return {
+            'status': 'success',
+            'message': '成功获取数据',
+            'data': response.content
+        }
+
+    def replay(self, response) -> List[Dict[str, Any]]:
+        """
+        用当前的解析计划重新解析归档的响应，不发送网络请求
+        详情页正文不会重新抓取
+        :param response: crawler.archive.to_response 还原的 FetchResponse
+        :return: 解析后的文章列表
+        """
+        self.replaying = True
+        result = self.build_fetch_result(response)
+        if not result or result.get('status') != 'success':
+            return []
+        return self.parse_response(result) or []
+
+    def not_modified_result(self) -> Dict[str, Any]:
+        """fetch_data 在数据源未更新时的返回值"""
+        logger.info(f"{self.source_name} 数据源未更新")
+        return {
+            'status': 'not_modified',
+            'message': '数据源未更新',
+            'data': None
+        }
+
+    def not_modified_run_result(self) -> Dict[str, Any]:
+        """run 在数据源未更新时的返回值，不需要解析和入库"""
+        return {
+            'status': 'success',
+            'message': '数据源未更新',
+            'data': [],
+            'not_modified': True
+        }
+
+    def parse_in_pool(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        解析fetch_data的结果，设置了 CRAWLER_PARSE_PROCESSES 时在解析进程池中执行
+        :param result: fetch_data 的返回结果
+        :return: 解析后的文章列表
+        """
+        return parse_pool.parse(self, result)
+
+    async def parse_in_pool_async(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """异步等待解析结果，未启用进程池时在线程池中解析"""
+        return await parse_pool.parse_async(self, result)
+
+    async def fetch_data_async(self) -> Dict:
+        """
+        异步获取数据
+        默认在线程池中执行同步的fetch_data，子类可以基于共享的AsyncFetcher覆盖
+        :return: 与fetch_data相同格式的数据
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.fetch_data)
+
+    def can_run_async(self) -> bool:
+        """
+        是否支持在事件循环中抓取
+        只有覆盖了fetch_data_async的爬虫才走异步抓取，其余爬虫整体在线程池中运行
+        """
+        return type(self).fetch_data_async is not BaseCrawler.fetch_data_async
+
+    async def run_async(self) -> Dict[str, Any]:
+        """
+        异步运行爬虫
+        网络请求在事件循环中完成，解析放到线程池中执行，避免阻塞其他数据源的抓取
+        :return: 与run相同格式的结果
+        """
+        loop = asyncio.get_running_loop()
+        if not self.can_run_async():
+            return await loop.run_in_executor(None, self.run)
+
+        if not self.enabled:
+            logger.info(f"{self.source_name} 爬虫已禁用")
+            return {
+                'status': 'disabled',
+                'message': f'{self.source_name} 爬虫已禁用',
+                'data': []
+            }
+
+        try:
+            result = await self.fetch_data_async()
+            if result and result.get('status') == 'not_modified':
+                return self.not_modified_run_result()
+            if not result or result.get('status') != 'success':
+                return result or {
+                    'status': 'error',
+                    'message': '获取数据失败',
+                    'data': []
+                }
+
+            articles = await self.parse_in_pool_async(result)
+            return {
+                'status': 'success',
+                'message': f'成功获取{len(articles)}篇文章',
+                'data': articles
+            }
+
+        except Exception as e:
+            logger.error(f"{self.source_name} 爬虫运行失败: {str(e)}", exc_info=True)
+            return {
+                'status': 'error',
+                'message': str(e),
+                'data': []
+            }
+
     def run(self):
         """运行爬虫"""
         if not self.enabled:
@@ -51,8 +508,10 @@ class BaseCrawler:
                     'message': '获取数据失败',
                     'data': []
                 }
+            if isinstance(response, dict) and response.get('status') == 'not_modified':
+                return self.not_modified_run_result()
             
-            articles = self.parse_response(response)
+            articles = self.parse_in_pool(response)
             return {
                 'status': 'success',
                 'message': f'成功获取{len(articles)}篇文章',
@@ -72,30 +531,21 @@ class BaseCrawler:
         return datetime.datetime.now().replace(tzinfo=None)
 
     def parse_datetime(self, timestamp):
-        """解析时间戳为 datetime 对象"""
+        """
+        解析时间字符串或时间戳为非时区感知的 datetime 对象
+        带时区的时间转换为UTC，无法解析时返回当前时间
+        """
         if not timestamp:
             return self.get_current_time()
-        
+
         try:
-            if isinstance(timestamp, (int, float)):
-                return datetime.datetime.fromtimestamp(timestamp).replace(tzinfo=None)
-            elif isinstance(timestamp, str):
-                # 尝试直接解析
-                try:
-                    dt = datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                    return dt.replace(tzinfo=None)
-                except ValueError:
-                    # 尝试解析时间戳字符串
-                    try:
-                        ts = float(timestamp)
-                        return datetime.datetime.fromtimestamp(ts).replace(tzinfo=None)
-                    except ValueError:
-                        return self.get_current_time()
-            else:
-                return self.get_current_time()
+            dt = self.plan.parse_date(timestamp)
         except Exception as e:
             logger.error(f"解析时间戳失败: {timestamp}, 错误: {str(e)}")
             return self.get_current_time()
+        if dt is None:
+            return self.get_current_time()
+        return to_naive_utc(dt)
 
     def save_news(self, news_list):
         """保存新闻列表"""
@@ -103,11 +553,13 @@ class BaseCrawler:
             logger.info("没有新闻需要保存")
             return 0, 0, 0, 0
 
+        from ..models import NewsArticle
+        from ..persistence import bulk_insert_new
+
         total = len(news_list)
-        saved = 0
-        duplicates = 0
         invalid_time = 0
         errors = 0
+        articles = []
 
         for news in news_list:
             try:
@@ -119,21 +571,17 @@ class BaseCrawler:
                 news['created_at'] = current_time
                 news['updated_at'] = current_time
 
-                # 检查是否已存在相同的新闻
-                if NewsArticle.objects.filter(url=news['url']).exists():
-                    logger.info(f"新闻已存在: {news['title']}")
-                    duplicates += 1
-                    continue
-
                 # 创建新闻对象
-                article = NewsArticle(**news)
-                article.save()
-                saved += 1
-                logger.info(f"保存新闻成功: {news['title']}")
+                articles.append(NewsArticle(**news))
 
             except Exception as e:
-                logger.error(f"保存新闻失败: {news['title']}, 错误: {str(e)}")
+                logger.error(f"保存新闻失败: {news.get('title')}, 错误: {str(e)}")
                 errors += 1
 
+        # 一次查询过滤已存在的新闻，批量写入
+        inserted, duplicates, failed = bulk_insert_new(NewsArticle, 'url', articles)
+        saved = len(inserted)
+        errors += failed
+
         logger.info(f"新闻处理完成: 总数={total}, 成功保存={saved}, 重复={duplicates}, 时间无效={invalid_time}, 错误={errors}")
-        return saved, duplicates, invalid_time, errors 
\ No newline at end of file
+        return saved, duplicates, invalid_time, errors
@@ -1,15 +1,18 @@
 import logging
-import feedparser
 import requests
-from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 from django.utils import timezone
 from .base import BaseCrawler
-from bs4 import BeautifulSoup
 from django.conf import settings
+from ..exceptions import FetchError
+from ..feed_parser import iter_feed_entries
+from ..html_backend import html_to_text
 
 logger = logging.getLogger(__name__)
 
+# 查询已入库URL的最大窗口
+ENTRY_WINDOW_MAX = 50
+
 class RSSCrawler(BaseCrawler):
     """RSS爬虫"""
 
@@ -31,28 +34,55 @@ class RSSCrawler(BaseCrawler):
         """
         try:
             logger.info(f"开始获取RSS数据: {self.source_url}")
-            response = self.session.get(
+            self.wait_for_request_slot()
+            response = self.request(
                 self.source_url,
+                headers=self.get_conditional_headers(),
                 timeout=30,
                 verify=not settings.DEBUG  # 在测试环境中禁用SSL验证
             )
-            
-            if response.status_code != 200:
-                error_msg = f'请求失败: {response.status_code}'
-                logger.error(error_msg)
-                return {
-                    'status': 'error',
-                    'message': error_msg,
-                    'data': None
-                }
+            result = self._build_fetch_result(response)
+            if result['status'] == 'success':
+                self.archive_response(response)
+            return result
 
+        except requests.exceptions.RequestException as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(error_msg)
             return {
-                'status': 'success',
-                'message': '成功获取RSS数据',
-                'data': response.content
+                'status': 'error',
+                'message': error_msg,
+                'data': None
             }
-            
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
+            error_msg = f"获取RSS数据失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': None
+            }
+
+    async def fetch_data_async(self) -> Dict[str, Any]:
+        """
+        通过共享的异步抓取器获取RSS数据
+        :return: 包含状态和数据的字典
+        """
+        try:
+            logger.info(f"开始异步获取RSS数据: {self.source_url}")
+            await self.wait_for_request_slot_async()
+            response = await self.fetch_async(
+                self.source_url,
+                headers={**self.headers, **self.get_conditional_headers()},
+                timeout=30,
+                verify=not settings.DEBUG
+            )
+            result = self._build_fetch_result(response)
+            if result['status'] == 'success':
+                await self.archive_response_async(response)
+            return result
+
+        except FetchError as e:
             error_msg = f"网络请求失败: {str(e)}"
             logger.error(error_msg)
             return {
@@ -69,9 +99,40 @@ class RSSCrawler(BaseCrawler):
                 'data': None
             }
 
+    def _build_fetch_result(self, response) -> Dict[str, Any]:
+        """
+        将HTTP响应转换为fetch_data的返回格式
+        :param response: requests.Response 或 FetchResponse
+        :return: 包含状态和数据的字典
+        """
+        if response.status_code == 304:
+            return self.not_modified_result()
+
+        if response.status_code != 200:
+            error_msg = f'请求失败: {response.status_code}'
+            logger.error(error_msg)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': None
+            }
+
+        self.update_validators(response)
+        return {
+            'status': 'success',
+            'message': '成功获取RSS数据',
+            'data': response.content
+        }
+
+    def build_fetch_result(self, response) -> Dict[str, Any]:
+        """重新解析归档时与 fetch_data 使用相同的转换"""
+        return self._build_fetch_result(response)
+
     def parse_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         解析RSS数据
+        条目按文档顺序流式解析，连续遇到 config_data['early_stop'] 篇已入库的文章后
+        停止解析剩余条目（订阅源通常按时间倒序排列），设为0时解析全部条目
         :param data: fetch_data返回的数据字典
         :return: 解析后的文章列表
         """
@@ -81,102 +142,174 @@ class RSSCrawler(BaseCrawler):
             if data.get('status') != 'success' or not data.get('data'):
                 logger.error(f"获取RSS数据失败: {data.get('message')}")
                 return []
-                
-            # 解析RSS
-            feed = feedparser.parse(data['data'])
-            
-            # 检查解析结果
-            if hasattr(feed, 'bozo_exception'):
-                logger.error(f"RSS解析错误: {feed.bozo_exception}")
-                return []
-                
-            # 获取文章列表
-            entries = feed.entries
-            logger.info(f"找到{len(entries)}个文章")
-            
+
+            parser = self.plan.html.parser
+            early_stop = self._get_early_stop()
+            entries = iter_feed_entries(data['data'])
+            consecutive_known = 0
+            total = 0
             articles = []
-            for entry in entries:
-                try:
-                    # 提取标题
-                    title = entry.get('title', '').strip()
-                    if not title:
-                        logger.warning("跳过无标题文章")
-                        continue
-                    
-                    # 提取链接
-                    url = entry.get('link', '').strip()
-                    if not url or not url.startswith(('http://', 'https://')):
-                        logger.warning(f"跳过无效URL: {url}")
-                        continue
-                    
-                    # 提取内容
-                    content = ''
-                    if hasattr(entry, 'content'):
-                        content = entry.content[0].value
-                    elif hasattr(entry, 'summary'):
-                        content = entry.summary
-                    elif hasattr(entry, 'description'):
-                        content = entry.description
-                        
-                    # 清理内容中的HTML标签
-                    if content:
-                        soup = BeautifulSoup(content, 'html.parser')
-                        content = soup.get_text(separator='\n').strip()
-                    
-                    # 提取摘要
-                    description = entry.get('summary', '').strip()
-                    if not description:
-                        description = content[:200] if content else ''
-                        
-                    # 提取作者
-                    author = entry.get('author', '').strip()
-                    
-                    # 提取发布时间
-                    pub_time = entry.get('published_parsed') or entry.get('updated_parsed')
-                    if pub_time:
-                        pub_time = datetime(*pub_time[:6])
-                    else:
-                        pub_time = timezone.now()
-                        
-                    # 提取标签
-                    tags = []
-                    if hasattr(entry, 'tags'):
-                        tags = [tag.term for tag in entry.tags]
-                        
-                    # 提取图片
-                    images = []
-                    if hasattr(entry, 'media_content'):
-                        images = [media['url'] for media in entry.media_content if 'url' in media]
-                    elif hasattr(entry, 'enclosures'):
-                        images = [enc['href'] for enc in entry.enclosures if enc.get('type', '').startswith('image/')]
-                        
-                    # 构建文章数据
-                    article = {
-                        'title': title,
-                        'url': url,
-                        'content': content,
-                        'description': description,
-                        'author': author,
-                        'source': self.source_name,
-                        'pub_time': pub_time,
-                        'tags': tags,
-                        'images': images
-                    }
-                    
-                    articles.append(article)
-                    logger.debug(f"成功解析文章: {article['title']}")
-                        
-                except Exception as e:
-                    logger.error(f"解析文章失败: {str(e)}", exc_info=True)
-                    continue
-                    
-            logger.info(f"RSS解析完成，共获取{len(articles)}篇文章")
+
+            try:
+                # 按窗口批量查询已入库的URL，遇到已入库文章后尽早停止
+                for window in self._iter_windows(entries):
+                    total += len(window)
+                    known_urls = self.get_known_urls(entry['link'] for entry in window)
+
+                    for entry in window:
+                        try:
+                            if not self._is_valid_entry(entry):
+                                continue
+
+                            if entry['link'] in known_urls:
+                                self.skipped_known += 1
+                                consecutive_known += 1
+                                if early_stop and consecutive_known >= early_stop:
+                                    break
+                                continue
+                            consecutive_known = 0
+
+                            article = self._build_article(entry, parser)
+                            articles.append(article)
+                            logger.debug(f"成功解析文章: {article['title']}")
+
+                        except Exception as e:
+                            logger.error(f"解析文章失败: {str(e)}", exc_info=True)
+                            continue
+
+                    if early_stop and consecutive_known >= early_stop:
+                        logger.info(
+                            f"{self.source_name} 连续遇到{consecutive_known}篇已入库的文章，停止解析剩余条目"
+                        )
+                        break
+            finally:
+                entries.close()
+
+            logger.info(f"RSS解析完成，共解析{total}个条目，获取{len(articles)}篇文章")
             return articles
             
         except Exception as e:
             logger.error(f"RSS解析失败: {str(e)}", exc_info=True)
             return []
 
+    def parse_items(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        解析全部条目，不查询已入库的URL，在解析进程池中执行
+        :param data: fetch_data返回的数据字典
+        :return: 解析后的文章列表
+        """
+        if data.get('status') != 'success' or not data.get('data'):
+            return []
+
+        parser = self.plan.html.parser
+        entries = iter_feed_entries(data['data'])
+        articles = []
+        try:
+            for entry in entries:
+                try:
+                    if self._is_valid_entry(entry):
+                        articles.append(self._build_article(entry, parser))
+                except Exception as e:
+                    logger.error(f"解析文章失败: {str(e)}", exc_info=True)
+        finally:
+            entries.close()
+        return articles
+
+    def complete_items(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        跳过已入库的文章，连续遇到 config_data['early_stop'] 篇后丢弃剩余文章
+        :param articles: parse_items 的结果
+        :return: 新文章列表
+        """
+        early_stop = self._get_early_stop()
+        known_urls = self.get_known_urls(article['url'] for article in articles)
+        consecutive_known = 0
+        fresh = []
+        for article in articles:
+            if article['url'] in known_urls:
+                self.skipped_known += 1
+                consecutive_known += 1
+                if early_stop and consecutive_known >= early_stop:
+                    logger.info(
+                        f"{self.source_name} 连续遇到{consecutive_known}篇已入库的文章，丢弃剩余条目"
+                    )
+                    break
+                continue
+            consecutive_known = 0
+            fresh.append(article)
+
+        logger.info(f"RSS解析完成，共解析{len(articles)}个条目，获取{len(fresh)}篇文章")
+        return fresh
+
+    def _get_early_stop(self) -> int:
+        """连续遇到多少篇已入库的文章后停止解析，0表示不停止"""
+        early_stop = self.plan.early_stop
+        if early_stop is None:
+            early_stop = getattr(settings, 'CRAWLER_RSS_EARLY_STOP', 1)
+        return early_stop
+
+    @staticmethod
+    def _is_valid_entry(entry: Dict[str, Any]) -> bool:
+        """条目是否有标题和合法的链接"""
+        if not entry['title']:
+            logger.warning("跳过无标题文章")
+            return False
+        url = entry['link']
+        if not url or not url.startswith(('http://', 'https://')):
+            logger.warning(f"跳过无效URL: {url}")
+            return False
+        return True
+
+    def _build_article(self, entry: Dict[str, Any], parser: str) -> Dict[str, Any]:
+        """
+        将订阅源条目转换为文章数据
+        :param entry: iter_feed_entries 产出的条目
+        :param parser: HTML解析后端
+        :return: 文章数据
+        """
+        # 清理内容中的HTML标签
+        content = entry['content']
+        if content and ('<' in content or '&' in content):
+            content = html_to_text(content, parser)
+        elif content:
+            content = content.strip()
+
+        # 提取摘要
+        description = entry['summary']
+        if not description:
+            description = content[:200] if content else ''
+
+        return {
+            'title': entry['title'],
+            'url': entry['link'],
+            'content': content,
+            'description': description,
+            'author': entry['author'],
+            'source': self.source_name,
+            'pub_time': entry['published'] or timezone.now(),
+            'tags': entry['tags'],
+            'images': entry['images']
+        }
+
+    @staticmethod
+    def _iter_windows(entries: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        将条目按窗口分组，窗口从小到大增长
+        新文章通常集中在订阅源开头，小窗口可以尽早遇到已入库的文章
+        :param entries: 条目迭代器
+        :return: 条目列表
+        """
+        size = 5
+        window = []
+        for entry in entries:
+            window.append(entry)
+            if len(window) >= size:
+                yield window
+                window = []
+                size = min(size * 2, ENTRY_WINDOW_MAX)
+        if window:
+            yield window
+
     def run(self) -> Dict[str, Any]:
         """
         运行爬虫
@@ -185,11 +318,13 @@ class RSSCrawler(BaseCrawler):
         try:
             # 获取RSS数据
             result = self.fetch_data()
+            if result['status'] == 'not_modified':
+                return self.not_modified_run_result()
             if result['status'] != 'success':
                 return result
                 
             # 解析数据
-            articles = self.parse_response(result)
+            articles = self.parse_in_pool(result)
             
             # 返回结果
             return {
@@ -1,8 +1,8 @@
 from .base import BaseCrawler
+import asyncio
 import logging
 import requests
-from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from django.utils import timezone
 from urllib.parse import urljoin
 import time
@@ -14,9 +14,20 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from ..exceptions import FetchError, ParseError
+from ..html_backend import HTML_PARSER, LXML, CompiledSelector, get_text, parse_html
+from ..parse_plan import HTMLPlan
+from ..sitemap import STATE_SITEMAPS, STATE_URLS, SitemapDiscovery, get_sitemap_config
 
 logger = logging.getLogger(__name__)
 
+# 站点地图模式下从详情页提取标题和摘要，按顺序取第一个匹配
+_PAGE_TITLE_SELECTORS = [CompiledSelector(selector) for selector in (
+    'meta[property="og:title"]', 'h1', 'title'
+)]
+_PAGE_SUMMARY_SELECTORS = [CompiledSelector(selector) for selector in (
+    'meta[property="og:description"]', 'meta[name="description"]'
+)]
+
 class WebCrawler(BaseCrawler):
     """Web爬虫基类"""
 
@@ -37,16 +48,52 @@ class WebCrawler(BaseCrawler):
         :return: 包含状态和数据的字典
         :raises: FetchError 当获取数据失败时
         """
+        sitemap = get_sitemap_config(self.config)
+        if sitemap is not None:
+            return SitemapDiscovery(self, sitemap).discover()
+
         try:
             logger.info(f"开始获取网页数据: {self.source_url}")
-            response = self.session.get(self.source_url, timeout=30)
+            self.wait_for_request_slot()
+            response = self.request(self.source_url, timeout=30)
             response.raise_for_status()
+            self.archive_response(response)
+            return self.build_fetch_result(response)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(error_msg)
             return {
-                'status': 'success',
-                'message': '成功获取网页数据',
-                'data': response.text
+                'status': 'error',
+                'message': error_msg,
+                'data': None
             }
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
+            error_msg = f"获取网页数据失败: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'data': None
+            }
+
+    async def fetch_data_async(self) -> Dict[str, Any]:
+        """
+        通过共享的异步抓取器获取网页数据
+        :return: 包含状态和数据的字典
+        """
+        if get_sitemap_config(self.config) is not None:
+            # 站点地图以流的方式同步读取，放到线程池中执行
+            return await asyncio.get_running_loop().run_in_executor(None, self.fetch_data)
+
+        try:
+            logger.info(f"开始异步获取网页数据: {self.source_url}")
+            await self.wait_for_request_slot_async()
+            response = await self.fetch_async(self.source_url, headers=self.headers, timeout=30)
+            response.raise_for_status()
+            await self.archive_response_async(response)
+            # 编码识别和解码是CPU密集的，放到线程池中执行
+            return await asyncio.get_running_loop().run_in_executor(None, self.build_fetch_result, response)
+        except FetchError as e:
             error_msg = f"网络请求失败: {str(e)}"
             logger.error(error_msg)
             return {
@@ -63,6 +110,19 @@ class WebCrawler(BaseCrawler):
                 'data': None
             }
 
+    def build_fetch_result(self, response) -> Dict[str, Any]:
+        """
+        将HTTP响应转换为fetch_data的返回格式
+        :param response: requests.Response 或 FetchResponse
+        :return: 包含状态和数据的字典
+        """
+        self.resolve_encoding(response)
+        return {
+            'status': 'success',
+            'message': '成功获取网页数据',
+            'data': response.text
+        }
+
     def parse_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         解析网页数据
@@ -76,113 +136,28 @@ class WebCrawler(BaseCrawler):
             if data.get('status') != 'success' or not data.get('data'):
                 logger.error(f"获取网页数据失败: {data.get('message')}")
                 return []
+
+            if data.get('sitemap'):
+                return self.parse_sitemap_entries(data['data'])
                 
-            # 解析HTML
-            soup = BeautifulSoup(data['data'], 'html.parser')
+            plan = self.plan.html
             
             # 获取文章列表选择器
-            list_selector = self.config.config_data.get('list_selector')
-            if not list_selector:
+            if not plan.list:
                 logger.error("未配置文章列表选择器")
                 return []
                 
-            # 获取文章列表
-            articles = []
-            items = soup.select(list_selector)
+            # 解析HTML并获取文章列表
+            items = self._select_items(data['data'], plan)
             logger.info(f"找到{len(items)}个文章元素")
-            
-            for item in items:
-                try:
-                    # 提取标题
-                    title_selector = self.config.config_data.get('title_selector')
-                    title_elem = item.select_one(title_selector) if title_selector else None
-                    title = title_elem.get_text().strip() if title_elem else None
-                    
-                    if not title:
-                        logger.warning("跳过无标题文章")
-                        continue
-                            
-                    # 提取链接
-                    link_selector = self.config.config_data.get('link_selector')
-                    link_elem = item.select_one(link_selector) if link_selector else None
-                    url = link_elem.get('href') if link_elem else None
-                    
-                    if url:
-                        url = urljoin(self.source_url, url)
-                    
-                    if not url or not url.startswith(('http://', 'https://')):
-                        logger.warning(f"跳过无效URL: {url}")
-                        continue
-                            
-                    # 提取作者
-                    author_selector = self.config.config_data.get('author_selector')
-                    author_elem = item.select_one(author_selector) if author_selector else None
-                    author = author_elem.get_text().strip() if author_elem else ''
-                            
-                    # 提取发布时间
-                    time_selector = self.config.config_data.get('time_selector')
-                    time_elem = item.select_one(time_selector) if time_selector else None
-                    pub_time = time_elem.get_text().strip() if time_elem else None
-                    
-                    if pub_time:
-                        try:
-                            pub_time = self.parse_datetime(pub_time)
-                        except Exception:
-                            pub_time = timezone.now()
-                    else:
-                        pub_time = timezone.now()
-                        
-                    # 提取摘要
-                    summary_selector = self.config.config_data.get('summary_selector')
-                    summary_elem = item.select_one(summary_selector) if summary_selector else None
-                    description = summary_elem.get_text().strip() if summary_elem else ''
-                    
-                    # 提取内容
-                    content = ''
-                    if self.config.config_data.get('need_content', False):
-                        try:
-                            content = self._get_article_content(url)
-                        except Exception as e:
-                            logger.error(f"获取文章内容失败: {str(e)}", exc_info=True)
-                            
-                    # 提取标签
-                    tags = []
-                    tags_selector = self.config.config_data.get('tags_selector')
-                    if tags_selector:
-                        tag_elems = item.select(tags_selector)
-                        tags = [tag.get_text().strip() for tag in tag_elems if tag.get_text().strip()]
-                        
-                    # 提取图片
-                    images = []
-                    image_selector = self.config.config_data.get('image_selector')
-                    if image_selector:
-                        img_elems = item.select(image_selector)
-                        for img in img_elems:
-                            src = img.get('src') or img.get('data-src')
-                            if src:
-                                src = urljoin(self.source_url, src)
-                                if src.startswith(('http://', 'https://')):
-                                    images.append(src)
-                            
-                    # 构建文章数据
-                    article = {
-                        'title': title,
-                        'url': url,
-                        'content': content or description,
-                        'description': description,
-                        'author': author,
-                        'source': self.source_name,
-                        'pub_time': pub_time,
-                        'tags': tags,
-                        'images': images
-                    }
-                    
-                    articles.append(article)
-                    logger.debug(f"成功解析文章: {article['title']}")
-                        
-                except Exception as e:
-                    logger.error(f"解析文章元素失败: {str(e)}", exc_info=True)
-                    continue
+
+            # 先提取链接，已入库的文章不再解析
+            item_urls = [self._extract_url(item, plan) for item in items]
+            known_urls = self.get_known_urls(item_urls)
+            articles = list(self._iter_articles(items, item_urls, plan, known_urls))
+
+            # 并发获取文章内容，失败或超时的文章保留摘要
+            self._fill_contents(articles, plan)
                     
             logger.info(f"网页解析完成，共获取{len(articles)}篇文章")
             return articles
@@ -192,32 +167,249 @@ class WebCrawler(BaseCrawler):
             logger.error(error_msg, exc_info=True)
             return []
 
-    def _get_article_content(self, url: str) -> str:
+    def can_parse_in_process(self, data: Dict[str, Any]) -> bool:
+        """站点地图的解析主要是抓取详情页，不交给解析进程池"""
+        return super().can_parse_in_process(data) and not data.get('sitemap')
+
+    def parse_items(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        解析列表页的全部文章，不查询已入库的URL、不抓取详情页，在解析进程池中执行
+        :param data: fetch_data返回的数据字典
+        :return: 解析后的文章列表
+        """
+        if data.get('status') != 'success' or not data.get('data'):
+            return []
+        plan = self.plan.html
+        if not plan.list:
+            logger.error("未配置文章列表选择器")
+            return []
+        items = self._select_items(data['data'], plan)
+        item_urls = [self._extract_url(item, plan) for item in items]
+        return list(self._iter_articles(items, item_urls, plan))
+
+    def complete_items(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        获取文章详细内容
-        :param url: 文章URL
-        :return: 文章内容
+        跳过已入库的文章并抓取详情页正文
+        :param articles: parse_items 的结果
+        :return: 新文章列表
         """
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            content_selector = self.config.config_data.get('content_selector')
-            if not content_selector:
-                return ''
+        known_urls = self.get_known_urls(article['url'] for article in articles)
+        if known_urls:
+            fresh = [article for article in articles if article['url'] not in known_urls]
+            self.skipped_known += len(articles) - len(fresh)
+            articles = fresh
+        self._fill_contents(articles, self.plan.html)
+        logger.info(f"网页解析完成，共获取{len(articles)}篇文章")
+        return articles
+
+    def _iter_articles(self, items: List[Any], item_urls: List[Optional[str]], plan: HTMLPlan,
+                       known_urls: Iterable[str] = frozenset()) -> Iterator[Dict[str, Any]]:
+        """
+        从文章元素中提取文章数据
+        :param items: 文章列表元素
+        :param item_urls: 与items一一对应的文章链接
+        :param plan: 网页解析计划
+        :param known_urls: 已入库的URL，跳过这些文章
+        :return: 文章数据，正文稍后统一抓取
+        """
+        for item, url in zip(items, item_urls):
+            try:
+                # 提取标题
+                title_elem = plan.title.select_one(item) if plan.title else None
+                title = get_text(title_elem).strip() if title_elem is not None else None
                 
-            content_elem = soup.select_one(content_selector)
-            if not content_elem:
-                return ''
+                if not title:
+                    logger.warning("跳过无标题文章")
+                    continue
                 
-            return content_elem.get_text(separator='\n').strip()
-            
-        except Exception as e:
-            logger.error(f"获取文章内容失败: {str(e)}", exc_info=True)
+                if not url or not url.startswith(('http://', 'https://')):
+                    logger.warning(f"跳过无效URL: {url}")
+                    continue
+
+                if url in known_urls:
+                    self.skipped_known += 1
+                    continue
+                        
+                # 提取作者
+                author_elem = plan.author.select_one(item) if plan.author else None
+                author = get_text(author_elem).strip() if author_elem is not None else ''
+                        
+                # 提取发布时间
+                time_elem = plan.time.select_one(item) if plan.time else None
+                pub_time = get_text(time_elem).strip() if time_elem is not None else None
+                
+                if pub_time:
+                    try:
+                        pub_time = self.parse_datetime(pub_time)
+                    except Exception:
+                        pub_time = timezone.now()
+                else:
+                    pub_time = timezone.now()
+                    
+                # 提取摘要
+                summary_elem = plan.summary.select_one(item) if plan.summary else None
+                description = get_text(summary_elem).strip() if summary_elem is not None else ''
+                
+                # 提取标签
+                tags = []
+                if plan.tags:
+                    tag_elems = plan.tags.select(item)
+                    tags = [text for text in (get_text(tag).strip() for tag in tag_elems) if text]
+                    
+                # 提取图片
+                images = []
+                if plan.image:
+                    img_elems = plan.image.select(item)
+                    for img in img_elems:
+                        src = img.get('src') or img.get('data-src')
+                        if src:
+                            src = urljoin(self.source_url, src)
+                            if src.startswith(('http://', 'https://')):
+                                images.append(src)
+                        
+                # 构建文章数据，正文稍后统一抓取
+                article = {
+                    'title': title,
+                    'url': url,
+                    'content': description,
+                    'description': description,
+                    'author': author,
+                    'source': self.source_name,
+                    'pub_time': pub_time,
+                    'tags': tags,
+                    'images': images
+                }
+                logger.debug(f"成功解析文章: {article['title']}")
+                yield article
+                    
+            except Exception as e:
+                logger.error(f"解析文章元素失败: {str(e)}", exc_info=True)
+                continue
+
+    def _fill_contents(self, articles: List[Dict[str, Any]], plan: HTMLPlan):
+        """并发抓取详情页正文，失败或超时的文章保留摘要"""
+        if articles and plan.need_content:
+            contents = self.fetch_detail_contents([article['url'] for article in articles])
+            for article, content in zip(articles, contents):
+                if content:
+                    article['content'] = content
+
+    def parse_sitemap_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        抓取站点地图中新增或更新的URL并提取文章
+        提取成功的URL在入库成功后记录 lastmod，失败的下次重新抓取
+        :param entries: SitemapDiscovery 发现的条目
+        :return: 解析后的文章列表
+        """
+        if not entries:
+            return []
+
+        plan = self.plan.html
+        pages = self.fetch_detail_pages([entry['url'] for entry in entries])
+        articles = []
+        done = []
+        for entry, html in zip(entries, pages):
+            if not html:
+                continue
+            try:
+                title, content, description = self._extract_page(html, plan)
+            except Exception as e:
+                logger.error(f"解析详情页失败: {entry['url']}, {str(e)}")
+                continue
+
+            title = entry.get('title') or title
+            if not title:
+                logger.warning(f"跳过无标题文章: {entry['url']}")
+                continue
+            articles.append({
+                'title': title,
+                'url': entry['url'],
+                'content': content or description,
+                'description': description,
+                'author': '',
+                'source': self.source_name,
+                'pub_time': self.parse_datetime(entry.get('pub_time') or entry.get('lastmod')),
+                'tags': [],
+                'images': []
+            })
+            done.append(entry)
+
+        if not self.replaying:
+            # 入库成功后再记录 lastmod；有URL没有取到文章时不记录子站点地图，下次重新读取
+            self.source_state.setdefault(STATE_URLS, []).extend(
+                {'url': entry['url'], 'lastmod': entry.get('lastmod')} for entry in done
+            )
+            if len(done) < len(entries):
+                self.source_state[STATE_SITEMAPS] = []
+        logger.info(f"站点地图解析完成，{len(entries)}个URL中获取{len(articles)}篇文章")
+        return articles
+
+    def _extract_page(self, html: str, plan: HTMLPlan) -> Tuple[str, str, str]:
+        """
+        从详情页提取标题、正文和摘要
+        :param html: 详情页HTML
+        :param plan: 网页解析计划，正文使用 content_selector
+        :return: (标题, 正文, 摘要)
+        """
+        root = None
+        if plan.parser == LXML:
+            try:
+                root = parse_html(html, LXML)
+            except Exception as e:
+                logger.debug(f"lxml解析详情页失败，使用BeautifulSoup: {str(e)}")
+        if root is None:
+            root = parse_html(html, HTML_PARSER)
+
+        def first(selectors) -> str:
+            for selector in selectors:
+                node = selector.select_one(root)
+                if node is None:
+                    continue
+                text = node.get('content') if node.get('content') is not None else get_text(node)
+                if text and text.strip():
+                    return text.strip()
             return ''
 
+        content = ''
+        if plan.content:
+            content_elem = plan.content.select_one(root)
+            if content_elem is not None:
+                content = get_text(content_elem, separator='\n').strip()
+        return first(_PAGE_TITLE_SELECTORS), content, first(_PAGE_SUMMARY_SELECTORS)
+
+    def _select_items(self, html: str, plan: HTMLPlan) -> List[Any]:
+        """
+        解析列表页并选出文章元素
+        lxml无法解析或没有选出任何元素时，退回 BeautifulSoup 重新解析
+        :param html: 列表页HTML
+        :param plan: 网页解析计划
+        :return: 文章元素列表
+        """
+        if plan.parser == LXML:
+            try:
+                items = plan.list.select(parse_html(html, LXML))
+                if items:
+                    return items
+                logger.info("lxml未找到文章元素，使用BeautifulSoup重新解析")
+            except Exception as e:
+                logger.warning(f"lxml解析网页失败，使用BeautifulSoup: {str(e)}")
+        return plan.list.select(parse_html(html, HTML_PARSER))
+
+    def _extract_url(self, item, plan: HTMLPlan) -> Optional[str]:
+        """
+        提取文章链接
+        :param item: 文章列表元素
+        :param plan: 网页解析计划
+        :return: 绝对URL
+        """
+        try:
+            link_elem = plan.link.select_one(item) if plan.link else None
+            url = link_elem.get('href') if link_elem is not None else None
+            return urljoin(self.source_url, url) if url else None
+        except Exception as e:
+            logger.error(f"提取文章链接失败: {str(e)}")
+            return None
+
     def run(self) -> Dict[str, Any]:
         """
         运行爬虫
@@ -230,7 +422,7 @@ class WebCrawler(BaseCrawler):
                 return result
                 
             # 解析数据
-            articles = self.parse_response(result)
+            articles = self.parse_in_pool(result)
             
             # 返回结果
             return {
@@ -0,0 +1,248 @@
+"""
+时间解析
+
+所有爬虫共用的时间解析：
+- ISO 8601、RFC 822、中文"YYYY年MM月DD日"和时间戳先按正则分派到快速路径，
+  不再逐个 strptime 试错
+- 按数据源记住上次成功的格式，下一次优先尝试
+- 解析结果按字符串缓存，同一批数据中重复的时间字符串只解析一次
+
+返回值保持字符串本身的时区信息：带时区偏移的返回aware datetime，
+否则返回naive datetime，由调用方决定如何转换。
+"""
+
+import datetime
+import email.utils
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import dateutil.parser
+
+logger = logging.getLogger(__name__)
+
+DATE_CACHE_SIZE = 4096
+
+ISO8601 = 'iso8601'
+RFC822 = 'rfc822'
+CHINESE = 'chinese'
+TIMESTAMP = 'timestamp'
+DATEUTIL = 'dateutil'
+
+# 也接受 '/' 分隔的日期，如 2024/03/20 10:00
+_ISO8601_RE = re.compile(
+    r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})'
+    r'(?:[T ](\d{1,2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?)?'
+    r'\s*(Z|[+-]\d{2}(?::?\d{2})?)?'
+)
+_RFC822_RE = re.compile(
+    r'(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?(?:\s+\S+)?'
+)
+_CHINESE_RE = re.compile(
+    r'(\d{4})年(\d{1,2})月(\d{1,2})日'
+    r'(?:\s*(\d{1,2})[:：](\d{2})(?:[:：](\d{2}))?)?'
+)
+_TIMESTAMP_RE = re.compile(r'\d{10}(?:\.\d+)?|\d{13}')
+
+# 快速路径都不匹配时按顺序尝试的格式
+FALLBACK_FORMATS = (
+    '%Y.%m.%d %H:%M:%S',
+    '%Y.%m.%d %H:%M',
+    '%Y.%m.%d',
+    '%Y%m%d%H%M%S',
+    '%Y%m%d',
+)
+
+
+def _parse_offset(value: Optional[str]) -> Optional[datetime.tzinfo]:
+    """解析 'Z'、'+08:00'、'+0800'、'+08' 形式的时区偏移"""
+    if not value:
+        return None
+    if value == 'Z':
+        return datetime.timezone.utc
+    sign = -1 if value[0] == '-' else 1
+    digits = value[1:].replace(':', '')
+    minutes = int(digits[:2]) * 60 + int(digits[2:4] or 0)
+    return datetime.timezone(sign * datetime.timedelta(minutes=minutes))
+
+
+def _parse_iso8601(value: str) -> Optional[datetime.datetime]:
+    match = _ISO8601_RE.fullmatch(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    return datetime.datetime(
+        int(year), int(month), int(day),
+        int(hour or 0), int(minute or 0), int(second or 0),
+        int(fraction.ljust(6, '0')) if fraction else 0,
+        tzinfo=_parse_offset(offset)
+    )
+
+
+def _parse_rfc822(value: str) -> Optional[datetime.datetime]:
+    if not _RFC822_RE.fullmatch(value):
+        return None
+    return email.utils.parsedate_to_datetime(value)
+
+
+def _parse_chinese(value: str) -> Optional[datetime.datetime]:
+    match = _CHINESE_RE.fullmatch(value)
+    if not match:
+        return None
+    return datetime.datetime(*(int(part or 0) for part in match.groups()))
+
+
+def _parse_timestamp(value: str) -> Optional[datetime.datetime]:
+    if not _TIMESTAMP_RE.fullmatch(value):
+        return None
+    ts = float(value)
+    return from_timestamp(ts / 1000 if len(value) == 13 else ts)
+
+
+def _parse_dateutil(value: str) -> Optional[datetime.datetime]:
+    return dateutil.parser.parse(value)
+
+
+_FAST_PATHS: Dict[str, Callable[[str], Optional[datetime.datetime]]] = {
+    ISO8601: _parse_iso8601,
+    RFC822: _parse_rfc822,
+    CHINESE: _parse_chinese,
+    TIMESTAMP: _parse_timestamp,
+}
+
+
+def _try(name: str, value: str) -> Optional[datetime.datetime]:
+    """
+    按名称尝试一种解析方式
+    :param name: 快速路径名称、'dateutil' 或 strptime 格式
+    :param value: 时间字符串
+    :return: datetime，不匹配时返回None
+    """
+    try:
+        if name in _FAST_PATHS:
+            return _FAST_PATHS[name](value)
+        if name == DATEUTIL:
+            return _parse_dateutil(value)
+        return datetime.datetime.strptime(value, name)
+    except (ValueError, TypeError, OverflowError, IndexError):
+        return None
+
+
+class _LRUCache:
+    """线程安全的LRU缓存，解析失败的结果（None）同样缓存"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_MISSING = object()
+_cache = _LRUCache(DATE_CACHE_SIZE)
+
+# 数据源 -> 上次成功的解析方式
+_learned: Dict[Hashable, str] = {}
+
+
+def from_timestamp(ts: float) -> datetime.datetime:
+    """时间戳转换为本地时间的naive datetime"""
+    return datetime.datetime.fromtimestamp(ts).replace(tzinfo=None)
+
+
+def to_naive_utc(dt: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """带时区的时间转换为UTC后去掉时区，naive时间原样返回"""
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _candidates(key: Optional[Hashable], formats: Iterable[str]) -> Iterable[str]:
+    """按优先级生成解析方式：上次成功的格式、配置的格式、快速路径、常见格式、dateutil"""
+    learned = _learned.get(key) if key is not None else None
+    if learned:
+        yield learned
+    for name in (*formats, *_FAST_PATHS, *FALLBACK_FORMATS, DATEUTIL):
+        if name != learned:
+            yield name
+
+
+def parse_date(value: Any, formats: Tuple[str, ...] = (),
+               key: Optional[Hashable] = None) -> Optional[datetime.datetime]:
+    """
+    解析时间
+    :param value: 时间字符串，或数字时间戳（秒）
+    :param formats: 数据源配置的 strptime 格式提示，优先于通用格式
+    :param key: 数据源标识（如配置ID），用于记住上次成功的格式
+    :return: datetime，无法解析时返回None
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return from_timestamp(value)
+        except (ValueError, OverflowError, OSError):
+            return None
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if not value:
+        return None
+
+    cache_key = (value, formats)
+    result = _cache.get(cache_key, _MISSING)
+    if result is not _MISSING:
+        return result
+
+    result = None
+    for name in _candidates(key, formats):
+        result = _try(name, value)
+        if result is not None:
+            if key is not None and _learned.get(key) != name:
+                _learned[key] = name
+                logger.debug(f"数据源 {key} 的时间格式: {name}")
+            break
+
+    _cache.set(cache_key, result)
+    return result
+
+
+def get_learned_format(key: Hashable) -> Optional[str]:
+    """获取数据源上次成功的解析方式"""
+    return _learned.get(key)
+
+
+def date_cache_info() -> Dict[str, int]:
+    """解析缓存的命中统计"""
+    return {'hits': _cache.hits, 'misses': _cache.misses, 'size': len(_cache._data)}
+
+
+def clear_date_cache():
+    """清空解析缓存和记住的格式"""
+    _cache.clear()
+    _learned.clear()
@@ -0,0 +1,148 @@
+"""
+详情页并发抓取
+
+列表页解析完成后，一次性并发抓取所有需要补全正文的详情页：
+- 总并发数和单个主机的并发数都有上限
+- 整批抓取有总时限，超时未完成的页面直接放弃
+- 结果按输入顺序返回，失败或超时的页面返回None，由调用方退回摘要
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .charset import resolve_encoding
+from .exceptions import FetchError
+from .fetcher import get_fetcher
+from .proxy import is_proxy_failure
+
+logger = logging.getLogger(__name__)
+
+
+class DetailFetcher:
+    """详情页并发抓取器"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, max_concurrency: Optional[int] = None,
+                 per_host: Optional[int] = None, timeout: Optional[float] = None,
+                 deadline: Optional[float] = None, verify: bool = True,
+                 proxies: Optional[Dict[str, str]] = None,
+                 reserve: Optional[Callable[[str], float]] = None,
+                 choose_proxy: Optional[Callable[[str], Optional[str]]] = None,
+                 report_proxy: Optional[Callable[..., None]] = None,
+                 encoding: Optional[str] = None):
+        """
+        :param headers: 请求头
+        :param max_concurrency: 最大并发请求数
+        :param per_host: 单个主机的最大并发请求数
+        :param timeout: 单个页面的超时时间（秒）
+        :param deadline: 整批抓取的总时限（秒）
+        :param verify: 是否校验SSL证书
+        :param proxies: 按协议配置的代理地址，格式同 requests.Session.proxies
+        :param reserve: 限速预约函数，传入URL返回需要等待的秒数
+        :param choose_proxy: 代理池选择函数，传入URL返回代理地址，未配置固定代理时使用
+        :param report_proxy: 代理结果反馈函数，参数为 (代理地址, 是否成功, 耗时)
+        :param encoding: 数据源识别出的页面编码，页面未声明编码时使用
+        """
+        self.headers = headers or {}
+        self.max_concurrency = max_concurrency or getattr(settings, 'CRAWLER_DETAIL_CONCURRENCY', 8)
+        self.per_host = per_host or getattr(settings, 'CRAWLER_DETAIL_PER_HOST', 2)
+        self.timeout = timeout or getattr(settings, 'CRAWLER_DETAIL_TIMEOUT', 10)
+        self.deadline = deadline or getattr(settings, 'CRAWLER_DETAIL_DEADLINE', 60)
+        self.verify = verify
+        self.proxies = proxies or {}
+        self.reserve = reserve
+        self.choose_proxy = choose_proxy
+        self.report_proxy = report_proxy
+        self.encoding = encoding
+
+    def fetch_all(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        并发抓取详情页，阻塞直到全部完成或超过总时限
+        不能在抓取事件循环线程中调用
+        :param urls: 详情页URL列表
+        :return: 与urls一一对应的页面内容，失败或超时为None
+        """
+        if not urls:
+            return []
+        return get_fetcher().submit(self.fetch_all_async(urls)).result()
+
+    def decode(self, response) -> str:
+        """
+        按声明的编码或数据源识别出的编码解码页面
+        :param response: FetchResponse
+        :return: 页面内容
+        """
+        response.encoding, _ = resolve_encoding(response.content, response.headers, self.encoding)
+        return response.text
+
+    async def fetch_all_async(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        fetch_all 的异步版本
+        :param urls: 详情页URL列表
+        :return: 与urls一一对应的页面内容，失败或超时为None
+        """
+        if not urls:
+            return []
+
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        limiter = asyncio.Semaphore(self.max_concurrency)
+        host_limiters = {}
+        results: List[Optional[str]] = [None] * len(urls)
+
+        async def fetch_one(index: int, url: str):
+            host = urlsplit(url).netloc
+            host_limiter = host_limiters.setdefault(host, asyncio.Semaphore(self.per_host))
+            async with limiter, host_limiter:
+                pooled = None
+                reported = False
+                try:
+                    # 按主机限速，预约需要访问Redis，放到线程池中执行，等待期间不占用事件循环
+                    if self.reserve:
+                        wait = await loop.run_in_executor(None, self.reserve, url)
+                        if wait > 0:
+                            await asyncio.sleep(wait)
+                    proxy = self.proxies.get(urlsplit(url).scheme)
+                    if proxy is None and self.choose_proxy:
+                        # 选择代理时可能需要从数据库加载代理池，放到线程池中执行
+                        pooled = proxy = await loop.run_in_executor(None, self.choose_proxy, url)
+                    started = time.monotonic()
+                    response = await get_fetcher().fetch(
+                        url,
+                        headers=self.headers,
+                        timeout=self.timeout,
+                        proxy=proxy,
+                        verify=self.verify
+                    )
+                    if pooled and self.report_proxy:
+                        self.report_proxy(pooled, not is_proxy_failure(response.status_code),
+                                          time.monotonic() - started)
+                        reported = True
+                    response.raise_for_status()
+                    # 编码识别和解码是CPU密集的，放到线程池中执行
+                    results[index] = await loop.run_in_executor(None, self.decode, response)
+                except FetchError as e:
+                    if pooled and self.report_proxy and not reported:
+                        self.report_proxy(pooled, False)
+                    logger.warning(f"获取详情页失败: {url}, {str(e)}")
+
+        tasks = [asyncio.ensure_future(fetch_one(index, url)) for index, url in enumerate(urls)]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception():
+                logger.error(f"获取详情页异常: {str(task.exception())}")
+
+        elapsed = time.monotonic() - start
+        succeeded = sum(1 for result in results if result is not None)
+        logger.info(
+            f"详情页抓取完成: 共{len(urls)}个, 成功{succeeded}个, 超时放弃{len(pending)}个, 耗时{elapsed:.2f}秒"
+        )
+        return results
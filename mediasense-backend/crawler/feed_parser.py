@@ -0,0 +1,259 @@
+"""
+RSS/Atom流式解析
+
+使用 lxml.etree.iterparse 逐条解析 RSS 2.0、RSS 1.0 和 Atom 条目：
+- 条目按文档顺序逐条产出，调用方可以随时停止，剩余内容不再解析
+- 每条处理完后立即释放对应的节点，解析大型订阅源时内存占用不随条目数增长
+- 文档不是合法XML时（例如未声明的HTML实体）退回 feedparser，
+  已经产出的条目不会重复产出
+
+产出的条目格式统一为:
+    {'title', 'link', 'content', 'summary', 'author', 'published', 'tags', 'images'}
+其中 published 为UTC时间的naive datetime，无法解析时为None。
+"""
+
+import copy
+import datetime
+import logging
+from io import BytesIO
+from typing import Any, Dict, Iterator, Optional, Union
+
+import feedparser
+
+from .dateparse import parse_date, to_naive_utc
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+RSS1_NS = 'http://purl.org/rss/1.0/'
+CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+DC_NS = 'http://purl.org/dc/elements/1.1/'
+MEDIA_NS = 'http://search.yahoo.com/mrss/'
+
+# 条目自身字段所在的命名空间，排除 media:title 等扩展字段
+ENTRY_NAMESPACES = ('', ATOM_NS, RSS1_NS)
+
+
+def _split_tag(tag) -> tuple:
+    """拆分 {namespace}localname 形式的标签"""
+    if not isinstance(tag, str):
+        return None, None
+    if tag.startswith('{'):
+        namespace, _, localname = tag[1:].partition('}')
+        return namespace, localname
+    return '', tag
+
+
+def _text(elem) -> str:
+    """获取元素的全部文本"""
+    return ''.join(elem.itertext()).strip()
+
+
+def _markup(elem) -> str:
+    """
+    获取元素的内容
+    Atom 中 type="xhtml" 的内容是内嵌的XHTML元素，序列化为去掉命名空间的HTML；
+    其他内容是转义后的文本
+    """
+    if elem.get('type') != 'xhtml':
+        return _text(elem)
+    fragment = copy.deepcopy(elem)
+    for node in fragment.iter():
+        if isinstance(node.tag, str):
+            node.tag = etree.QName(node).localname
+    etree.cleanup_namespaces(fragment)
+    inner = (fragment.text or '') + ''.join(
+        etree.tostring(node, encoding='unicode') for node in fragment
+    )
+    return inner.strip()
+
+
+def parse_feed_date(value: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    解析订阅源中的时间，兼容 RFC 822 和 ISO 8601 格式
+    :param value: 时间字符串
+    :return: UTC时间的naive datetime，与 feedparser 的 *_parsed 字段一致；无法解析时返回None
+    """
+    if not value:
+        return None
+    return to_naive_utc(parse_date(value))
+
+
+def _parse_entry(elem) -> Dict[str, Any]:
+    """
+    解析单个 item/entry 元素
+    :param elem: lxml元素
+    :return: 统一格式的条目
+    """
+    entry = {
+        'title': '',
+        'link': '',
+        'content': '',
+        'summary': '',
+        'author': '',
+        'published': None,
+        'tags': [],
+        'images': []
+    }
+    guid = None
+    updated = None
+    media_images = []
+    enclosure_images = []
+
+    for child in elem:
+        namespace, name = _split_tag(child.tag)
+        if name is None:
+            continue
+
+        if namespace in ENTRY_NAMESPACES:
+            if name == 'title':
+                entry['title'] = _text(child)
+            elif name == 'link':
+                if namespace == ATOM_NS:
+                    if child.get('rel', 'alternate') == 'alternate' and not entry['link']:
+                        entry['link'] = (child.get('href') or '').strip()
+                else:
+                    entry['link'] = _text(child)
+            elif name in ('description', 'summary'):
+                entry['summary'] = _markup(child)
+            elif name == 'content':
+                entry['content'] = _markup(child)
+            elif name == 'author':
+                # Atom的作者在name子元素中
+                author_name = child.find(f'{{{ATOM_NS}}}name')
+                entry['author'] = _text(author_name if author_name is not None else child)
+            elif name in ('pubDate', 'published'):
+                entry['published'] = parse_feed_date(child.text)
+            elif name == 'updated':
+                updated = child.text
+            elif name == 'category':
+                term = child.get('term') or _text(child)
+                if term:
+                    entry['tags'].append(term.strip())
+            elif name == 'guid':
+                if child.get('isPermaLink', 'true') != 'false':
+                    guid = _text(child)
+            elif name == 'enclosure':
+                if child.get('type', '').startswith('image/') and child.get('url'):
+                    enclosure_images.append(child.get('url'))
+        elif namespace == CONTENT_NS and name == 'encoded':
+            entry['content'] = _text(child)
+        elif namespace == DC_NS:
+            if name == 'creator' and not entry['author']:
+                entry['author'] = _text(child)
+            elif name == 'date' and entry['published'] is None:
+                entry['published'] = parse_feed_date(child.text)
+            elif name == 'subject' and _text(child):
+                entry['tags'].append(_text(child))
+        elif namespace == MEDIA_NS and name == 'content':
+            if child.get('url'):
+                media_images.append(child.get('url'))
+
+    if not entry['link'] and guid:
+        entry['link'] = guid
+    if entry['published'] is None:
+        entry['published'] = parse_feed_date(updated)
+    if not entry['content']:
+        entry['content'] = entry['summary']
+    entry['images'] = media_images or enclosure_images
+    return entry
+
+
+def _iter_lxml(data: bytes) -> Iterator[Dict[str, Any]]:
+    """逐条解析，处理完的节点立即释放"""
+    context = etree.iterparse(
+        BytesIO(data),
+        events=('end',),
+        tag=('{*}item', '{*}entry'),
+        resolve_entities=False,
+        no_network=True
+    )
+    try:
+        for _, elem in context:
+            entry = _parse_entry(elem)
+            # 释放已处理的条目，避免整棵树留在内存中
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+            yield entry
+    finally:
+        del context
+
+
+def _from_feedparser(entry) -> Dict[str, Any]:
+    """将 feedparser 的条目转换为统一格式"""
+    content = ''
+    if hasattr(entry, 'content'):
+        content = entry.content[0].value
+    elif hasattr(entry, 'summary'):
+        content = entry.summary
+    elif hasattr(entry, 'description'):
+        content = entry.description
+
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+
+    images = []
+    if hasattr(entry, 'media_content'):
+        images = [media['url'] for media in entry.media_content if 'url' in media]
+    elif hasattr(entry, 'enclosures'):
+        images = [enc['href'] for enc in entry.enclosures if enc.get('type', '').startswith('image/')]
+
+    return {
+        'title': entry.get('title', '').strip(),
+        'link': entry.get('link', '').strip(),
+        'content': content,
+        'summary': entry.get('summary', '').strip(),
+        'author': entry.get('author', '').strip(),
+        'published': datetime.datetime(*published[:6]) if published else None,
+        'tags': [tag.term for tag in entry.tags] if hasattr(entry, 'tags') else [],
+        'images': images
+    }
+
+
+def iter_feedparser_entries(data: Union[bytes, str]) -> Iterator[Dict[str, Any]]:
+    """
+    使用 feedparser 解析整个文档后逐条产出
+    :param data: 订阅源内容
+    :return: 统一格式的条目
+    """
+    feed = feedparser.parse(data)
+    if hasattr(feed, 'bozo_exception') and not feed.entries:
+        logger.error(f"RSS解析错误: {feed.bozo_exception}")
+        return
+    for entry in feed.entries:
+        yield _from_feedparser(entry)
+
+
+def iter_feed_entries(data: Union[bytes, str]) -> Iterator[Dict[str, Any]]:
+    """
+    按文档顺序逐条产出订阅源条目
+    :param data: 订阅源内容
+    :return: 统一格式的条目，调用方停止迭代后剩余内容不再解析
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    if etree is None:
+        yield from iter_feedparser_entries(data)
+        return
+
+    emitted = set()
+    try:
+        for entry in _iter_lxml(data):
+            emitted.add(entry['link'])
+            yield entry
+        return
+    except etree.XMLSyntaxError as e:
+        logger.warning(f"RSS不是合法的XML，使用feedparser解析: {str(e)}")
+
+    for entry in iter_feedparser_entries(data):
+        if entry['link'] and entry['link'] in emitted:
+            continue
+        yield entry
@@ -0,0 +1,208 @@
+"""
+基于aiohttp的异步抓取引擎
+
+进程内共享一个后台事件循环和一个连接池，所有爬虫的网络请求都在这个
+事件循环中并发执行，同步代码通过 submit/fetch_sync 提交协程并等待结果。
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+from multidict import CIMultiDict
+from django.conf import settings
+
+from .exceptions import FetchError
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResponse:
+    """抓取响应，接口与 requests.Response 的常用部分保持一致"""
+
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'encoding')
+
+    def __init__(self, url: str, status_code: int, headers: Mapping[str, str], content: bytes,
+                 encoding: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        """按响应编码解码内容"""
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self) -> Any:
+        """解析JSON内容"""
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        """状态码异常时抛出FetchError"""
+        if self.status_code >= 400:
+            raise FetchError(f'{self.status_code} Error for url: {self.url}')
+
+
+class AsyncFetcher:
+    """
+    异步抓取器
+
+    - 进程级共享的 aiohttp.ClientSession 和 TCPConnector
+    - limit 控制总连接数，limit_per_host 控制单个主机的并发连接数
+    - 在独立的后台线程中运行事件循环，fork 后自动重建（兼容Celery prefork）
+    """
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.limit = limit or getattr(settings, 'CRAWLER_FETCH_POOL_SIZE', 100)
+        self.limit_per_host = limit_per_host or getattr(settings, 'CRAWLER_FETCH_PER_HOST', 4)
+        self.timeout = timeout or getattr(settings, 'CRAWLER_FETCH_TIMEOUT', 30)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """确保后台事件循环已启动"""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return self._loop
+
+            # fork后的子进程不能复用父进程的事件循环和连接
+            self._pid = os.getpid()
+            self._session = None
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever,
+                name='crawler-fetch-loop',
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"抓取事件循环已启动: pid={self._pid}, limit={self.limit}, limit_per_host={self.limit_per_host}"
+            )
+            return self._loop
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话，只能在事件循环线程中调用"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def fetch(self, url: str, method: str = 'GET', headers: Optional[Dict[str, str]] = None,
+                    params: Optional[Dict[str, Any]] = None, json_body: Any = None,
+                    timeout: Optional[Any] = None, proxy: Optional[str] = None,
+                    verify: bool = True, allow_redirects: bool = True) -> FetchResponse:
+        """
+        发送请求
+        :param url: 请求URL
+        :param method: 请求方法
+        :param headers: 请求头
+        :param params: 查询参数
+        :param json_body: POST的JSON请求体
+        :param timeout: 超时时间，支持秒数或 (connect, read) 元组
+        :param proxy: 代理地址
+        :param verify: 是否校验SSL证书
+        :param allow_redirects: 是否跟随重定向
+        :return: FetchResponse
+        :raises: FetchError 网络请求失败时
+        """
+        session = await self._get_session()
+        request_kwargs = {
+            'headers': headers,
+            'params': params,
+            'proxy': proxy,
+            'allow_redirects': allow_redirects,
+            'timeout': self._build_timeout(timeout),
+        }
+        if json_body is not None:
+            request_kwargs['json'] = json_body
+        if not verify:
+            request_kwargs['ssl'] = False
+
+        try:
+            async with session.request(method, url, **request_kwargs) as response:
+                content = await response.read()
+                return FetchResponse(
+                    url=str(response.url),
+                    status_code=response.status,
+                    headers=CIMultiDict(response.headers),
+                    content=content,
+                    encoding=response.charset
+                )
+        except asyncio.TimeoutError as e:
+            raise FetchError(f'请求超时: {url}') from e
+        except aiohttp.ClientError as e:
+            raise FetchError(f'网络请求失败: {url}, {str(e)}') from e
+
+    def _build_timeout(self, timeout: Optional[Any]) -> aiohttp.ClientTimeout:
+        """将requests风格的超时配置转换为ClientTimeout"""
+        if timeout is None:
+            return aiohttp.ClientTimeout(total=self.timeout)
+        if isinstance(timeout, (tuple, list)):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """
+        将协程提交到后台事件循环
+        :param coro: 协程对象
+        :return: concurrent.futures.Future
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def fetch_sync(self, url: str, **kwargs) -> FetchResponse:
+        """在同步代码中发送请求并等待结果"""
+        return self.submit(self.fetch(url, **kwargs)).result()
+
+    def close(self):
+        """关闭会话并停止事件循环"""
+        with self._lock:
+            loop = self._loop
+            if loop is None or self._pid != os.getpid():
+                return
+            if self._session is not None and not self._session.closed:
+                asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            self._session = None
+
+
+_fetcher: Optional[AsyncFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> AsyncFetcher:
+    """获取进程级共享的抓取器"""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = AsyncFetcher()
+                atexit.register(_fetcher.close)
+    return _fetcher
@@ -0,0 +1,180 @@
+"""
+HTML解析后端
+
+支持两种解析后端：
+- lxml: 使用 lxml.html 构建文档树，CSS选择器通过 cssselect 预先翻译为XPath，速度快
+- html.parser: 使用 BeautifulSoup 和 soupsieve，兼容性最好
+
+选择器编译为 CompiledSelector，同时支持两种后端的节点，调用方不需要关心
+当前节点来自哪个后端。lxml无法解析的文档（或选择器只有soupsieve支持）
+会退回 BeautifulSoup。
+
+默认使用 html.parser，lxml 由数据源通过 config_data['html_parser'] 单独启用。
+"""
+
+import logging
+from typing import Any, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+from django.conf import settings
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import LxmlHTMLTranslator
+except ImportError:  # pragma: no cover
+    etree = None
+    LxmlHTMLTranslator = None
+
+logger = logging.getLogger(__name__)
+
+LXML = 'lxml'
+HTML_PARSER = 'html.parser'
+HTML_PARSERS = (LXML, HTML_PARSER)
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+
+# 与 BeautifulSoup 的 get_text 一致，不包含脚本、样式和注释
+_TEXT_XPATH = etree.XPath(
+    './/text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+) if etree is not None else None
+
+
+def lxml_available() -> bool:
+    """lxml和cssselect是否可用"""
+    return LxmlHTMLTranslator is not None
+
+
+class CompiledSelector:
+    """预编译的CSS选择器，同时支持 BeautifulSoup 和 lxml 节点"""
+
+    __slots__ = ('selector', 'soup', 'xpath')
+
+    def __init__(self, selector: str):
+        """
+        :param selector: CSS选择器
+        :raises: soupsieve.SelectorSyntaxError 当选择器无效时
+        """
+        self.selector = selector
+        self.soup = soupsieve.compile(selector)
+        self.xpath = None
+        if lxml_available():
+            try:
+                # 与soupsieve一致，只匹配后代节点，不匹配节点本身
+                path = LxmlHTMLTranslator().css_to_xpath(selector, prefix='descendant::')
+                self.xpath = etree.XPath(path)
+            except Exception as e:
+                logger.debug(f"选择器不支持lxml，使用BeautifulSoup: {selector}, {str(e)}")
+
+    @property
+    def supports_lxml(self) -> bool:
+        return self.xpath is not None
+
+    def select(self, node) -> List[Any]:
+        """
+        查询全部匹配节点
+        :param node: BeautifulSoup节点或lxml元素
+        :return: 匹配的节点列表
+        """
+        if isinstance(node, Tag):
+            return self.soup.select(node)
+        return self.xpath(node)
+
+    def select_one(self, node) -> Optional[Any]:
+        """
+        查询第一个匹配节点
+        :param node: BeautifulSoup节点或lxml元素
+        :return: 匹配的节点，没有匹配时返回None
+        """
+        if isinstance(node, Tag):
+            return self.soup.select_one(node)
+        result = self.xpath(node)
+        return result[0] if result else None
+
+    def __repr__(self):
+        return f'CompiledSelector({self.selector!r})'
+
+
+def resolve_parser(name: Optional[str], selectors: List[Optional[CompiledSelector]]) -> str:
+    """
+    确定数据源使用的解析后端
+    :param name: config_data['html_parser']，为空时使用 CRAWLER_HTML_PARSER
+    :param selectors: 数据源的全部选择器
+    :return: 'lxml' 或 'html.parser'
+    """
+    name = name or getattr(settings, 'CRAWLER_HTML_PARSER', HTML_PARSER)
+    if name not in HTML_PARSERS:
+        logger.warning(f"未知的HTML解析后端: {name}，使用 {HTML_PARSER}")
+        return HTML_PARSER
+    if name == LXML:
+        if not lxml_available():
+            return HTML_PARSER
+        if not all(selector.supports_lxml for selector in selectors if selector is not None):
+            return HTML_PARSER
+    return name
+
+
+def parse_html(html, parser: str = HTML_PARSER):
+    """
+    解析HTML文档
+    :param html: HTML文本
+    :param parser: 解析后端
+    :return: lxml根元素或BeautifulSoup对象
+    :raises: 当lxml无法解析文档时抛出异常，调用方退回 html.parser
+    """
+    if parser == LXML:
+        if isinstance(html, str) and html.lstrip().startswith('<?xml'):
+            # lxml不接受带编码声明的str
+            html = html.encode('utf-8')
+        return lxml.html.document_fromstring(html)
+    return BeautifulSoup(html, 'html.parser')
+
+
+def _in_preformatted(text) -> bool:
+    """文本是否位于 pre/textarea 中"""
+    elem = text.getparent()
+    if text.is_tail and elem is not None:
+        elem = elem.getparent()
+    while elem is not None:
+        if elem.tag in PRESERVE_WHITESPACE_TAGS:
+            return True
+        elem = elem.getparent()
+    return False
+
+
+def get_text(node, separator: str = '') -> str:
+    """
+    获取节点的文本，与 BeautifulSoup 的 get_text 一致
+    :param node: BeautifulSoup节点或lxml元素
+    :param separator: 文本片段之间的分隔符
+    :return: 文本
+    """
+    if isinstance(node, Tag):
+        return node.get_text(separator=separator)
+
+    parts = []
+    for text in _TEXT_XPATH(node):
+        # BeautifulSoup 将只含空白的文本折叠为一个换行或空格
+        if not text.strip(ASCII_SPACES) and not _in_preformatted(text):
+            parts.append('\n' if '\n' in text else ' ')
+        else:
+            parts.append(text)
+    return separator.join(parts)
+
+
+def html_to_text(html: str, parser: str = HTML_PARSER) -> str:
+    """
+    清理HTML标签，返回按行分隔的文本
+    :param html: HTML片段
+    :param parser: 解析后端
+    :return: 文本
+    """
+    if parser == LXML:
+        try:
+            fragment = lxml.html.fragment_fromstring(html, create_parent='div')
+            return get_text(fragment, separator='\n').strip()
+        except Exception as e:
+            logger.debug(f"lxml解析HTML片段失败，使用BeautifulSoup: {str(e)}")
+    return BeautifulSoup(html, 'html.parser').get_text(separator='\n').strip()
@@ -0,0 +1,243 @@
+"""
+分布式租约
+
+基于 Redis SET NX PX 的租约：持有者以随机令牌写入键，只有令牌一致时才能
+续期或释放，持有者崩溃后租约到期自动失效，其他进程可以重新获取。
+
+租约用于两处：
+- 调度器领导者选举，同一时间只有一个进程分发到期的爬虫任务
+- 数据源抓取租约，同一数据源同一时间只有一个worker抓取，
+  抓取期间由 LeaseHeartbeat 在后台线程中续期
+
+Redis不可用时退回进程内实现，只在当前进程内互斥。
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.conf import settings
+
+from .redis_utils import get_redis_client, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: 租约键  ARGV[1]: 令牌  ARGV[2]: 有效期(毫秒)
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1]: 租约键  ARGV[1]: 令牌
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 进程内实现：租约键 -> (令牌, 到期时间)
+_local_leases: Dict[str, Tuple[str, float]] = {}
+_local_lock = threading.Lock()
+
+
+class Lease:
+    """带令牌的租约"""
+
+    KEY_PREFIX = 'crawler:lease:'
+
+    def __init__(self, name: str, ttl: float, token: Optional[str] = None):
+        """
+        :param name: 租约名称
+        :param ttl: 有效期（秒），持有者需要在到期前续期
+        :param token: 持有者令牌，默认随机生成
+        """
+        self.name = name
+        self.key = f'{self.KEY_PREFIX}{name}'
+        self.ttl = ttl
+        self.token = token or uuid.uuid4().hex
+        self._scripts = {}
+        self._scripts_client = None
+
+    @property
+    def ttl_ms(self) -> int:
+        return max(1, int(self.ttl * 1000))
+
+    def _script(self, client, source: str):
+        if self._scripts_client is not client:
+            self._scripts = {}
+            self._scripts_client = client
+        if source not in self._scripts:
+            self._scripts[source] = client.register_script(source)
+        return self._scripts[source]
+
+    def acquire(self) -> bool:
+        """
+        尝试获取租约，不等待
+        :return: 是否获取成功
+        """
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return bool(client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        now = time.monotonic()
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            if holder is not None and holder[1] > now and holder[0] != self.token:
+                return False
+            _local_leases[self.key] = (self.token, now + self.ttl)
+            return True
+
+    def renew(self) -> bool:
+        """
+        续期，只有仍持有租约时才成功
+        :return: 是否续期成功
+        """
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return bool(self._script(client, RENEW_SCRIPT)(keys=[self.key], args=[self.token, self.ttl_ms]))
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        now = time.monotonic()
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            if holder is None or holder[0] != self.token or holder[1] <= now:
+                return False
+            _local_leases[self.key] = (self.token, now + self.ttl)
+            return True
+
+    def is_held(self) -> bool:
+        """
+        租约是否被任意持有者持有（未到期）
+        :return: 是否被持有
+        """
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return bool(client.exists(self.key))
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            return holder is not None and holder[1] > time.monotonic()
+
+    def acquire_or_renew(self) -> bool:
+        """已持有时续期，否则尝试获取"""
+        return self.renew() or self.acquire()
+
+    def release(self):
+        """释放租约，租约已被其他持有者获取时不做任何操作"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                self._script(client, RELEASE_SCRIPT)(keys=[self.key], args=[self.token])
+                return
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            if holder is not None and holder[0] == self.token:
+                del _local_leases[self.key]
+
+    def __repr__(self):
+        return f'Lease({self.name!r})'
+
+
+_scheduler_lease: Optional[Lease] = None
+
+
+def get_scheduler_lease() -> Lease:
+    """
+    调度器的领导者租约，同一时间只有持有者分发到期的爬虫任务
+    每个进程使用固定的令牌，持有期间续期即可保持领导者身份
+    """
+    global _scheduler_lease
+    if _scheduler_lease is None:
+        _scheduler_lease = Lease('scheduler', getattr(settings, 'CRAWLER_SCHEDULER_LEASE_TTL', 90))
+    return _scheduler_lease
+
+
+def get_config_lease(config_id: int, token: Optional[str] = None) -> Lease:
+    """
+    数据源的抓取租约，持有者崩溃后在有效期结束时自动释放
+    :param config_id: 配置ID
+    :param token: 已持有租约的令牌，分阶段抓取时在各阶段之间传递；默认生成新的令牌
+    :return: Lease
+    """
+    return Lease(f'config:{config_id}', getattr(settings, 'CRAWLER_CONFIG_LEASE_TTL', 120), token)
+
+
+class LeaseHeartbeat:
+    """后台线程定期为一组租约续期"""
+
+    def __init__(self, leases: Iterable[Lease] = (), interval: Optional[float] = None):
+        """
+        :param leases: 需要续期的租约
+        :param interval: 续期间隔（秒），默认为最短有效期的三分之一
+        """
+        self._leases: Set[Lease] = set(leases)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.lost: Set[str] = set()
+
+    @property
+    def interval(self) -> float:
+        if self._interval is not None:
+            return self._interval
+        with self._lock:
+            ttls = [lease.ttl for lease in self._leases]
+        return max(0.1, min(ttls, default=30) / 3)
+
+    def add(self, lease: Lease):
+        with self._lock:
+            self._leases.add(lease)
+
+    def discard(self, lease: Lease):
+        with self._lock:
+            self._leases.discard(lease)
+
+    def start(self):
+        """启动续期线程"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='lease-heartbeat', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止续期线程，不释放租约"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                leases = list(self._leases)
+            for lease in leases:
+                if not lease.renew():
+                    logger.warning(f"租约已丢失: {lease.name}")
+                    self.lost.add(lease.name)
+                    self.discard(lease)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -0,0 +1,127 @@
+"""对比 feedparser 和流式解析的性能
+
+使用 crawler/benchmarks/feeds 下的样例订阅源，按 --entries 复制条目生成
+大尺寸订阅源，分别统计以下三种方式的耗时和内存峰值：
+- feedparser: 解析整个文档
+- stream: 流式解析全部条目
+- stream+stop: 流式解析到第 --stop-after 个条目后停止，模拟遇到已入库文章
+"""
+
+import copy
+import time
+import tracemalloc
+from pathlib import Path
+
+import feedparser
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from crawler.feed_parser import ATOM_NS, iter_feed_entries
+
+FEEDS_DIR = Path(__file__).resolve().parents[2] / 'benchmarks' / 'feeds'
+
+
+def expand_feed(data: bytes, entries: int) -> bytes:
+    """
+    复制条目，生成包含指定条目数的订阅源，每个条目的链接保持唯一
+    :param data: 样例订阅源
+    :param entries: 目标条目数
+    :return: 新的订阅源内容
+    """
+    root = etree.fromstring(data, etree.XMLParser(resolve_entities=False))
+    items = root.xpath('//*[local-name()="item" or local-name()="entry"]')
+    if not items:
+        return data
+    parent = items[0].getparent()
+    for item in items:
+        parent.remove(item)
+
+    for i in range(entries):
+        item = copy.deepcopy(items[i % len(items)])
+        for link in item.xpath('*[local-name()="link"]'):
+            if link.tag == f'{{{ATOM_NS}}}link':
+                link.set('href', f"{link.get('href')}?n={i}")
+            else:
+                link.text = f'{link.text}?n={i}'
+        parent.append(item)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8')
+
+
+def measure(func, repeat: int):
+    """
+    执行并统计平均耗时和内存峰值
+    :return: (平均耗时毫秒, 内存峰值KB, 条目数)
+    """
+    count = func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024, count
+
+
+class Command(BaseCommand):
+    help = '对比 feedparser 和流式解析订阅源的耗时和内存'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entries',
+            type=int,
+            default=500,
+            help='每个订阅源复制后的条目数'
+        )
+        parser.add_argument(
+            '--stop-after',
+            type=int,
+            default=10,
+            help='stream+stop 模式解析的条目数'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='每种方式重复执行的次数'
+        )
+
+    def handle(self, *args, **options):
+        entries = options['entries']
+        stop_after = options['stop_after']
+        repeat = options['repeat']
+
+        def parse_feedparser(data):
+            return len(feedparser.parse(data).entries)
+
+        def parse_stream(data, limit=None):
+            count = 0
+            stream = iter_feed_entries(data)
+            for _ in stream:
+                count += 1
+                if limit and count >= limit:
+                    break
+            stream.close()
+            return count
+
+        self.stdout.write(f'条目数: {entries}, 提前停止位置: {stop_after}, 重复次数: {repeat}')
+        self.stdout.write(f"{'订阅源':<28}{'方式':<14}{'条目':>8}{'耗时(ms)':>12}{'内存峰值(KB)':>16}")
+
+        for path in sorted(FEEDS_DIR.glob('*.xml')):
+            data = path.read_bytes()
+            try:
+                data = expand_feed(data, entries)
+            except etree.XMLSyntaxError:
+                # 非法XML无法复制条目，直接使用样例
+                pass
+
+            results = [
+                ('feedparser', lambda: parse_feedparser(data)),
+                ('stream', lambda: parse_stream(data)),
+                ('stream+stop', lambda: parse_stream(data, stop_after)),
+            ]
+            for name, func in results:
+                elapsed, peak, count = measure(func, repeat)
+                self.stdout.write(f'{path.name:<30}{name:<16}{count:>8}{elapsed:>12.2f}{peak:>16.1f}')
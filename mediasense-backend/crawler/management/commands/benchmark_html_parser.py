@@ -0,0 +1,108 @@
+"""对比 lxml 和 html.parser 两种HTML解析后端的性能
+
+使用项目根目录的 ifeng.html 和 crawler/benchmarks/pages 下的样例页面，
+统计每个页面的解析耗时，以及按 *_selector 配置提取全部字段的耗时。
+"""
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from crawler.html_backend import HTML_PARSER, LXML, CompiledSelector, get_text, lxml_available, parse_html
+
+PAGES_DIR = Path(__file__).resolve().parents[2] / 'benchmarks' / 'pages'
+
+# 页面及对应的选择器配置，与 config_data 中的 *_selector 字段一致
+PAGES = [
+    (Path(settings.BASE_DIR) / 'ifeng.html', {
+        'list_selector': 'div.index_titleImg_4nAwo',
+        'title_selector': 'a.index_title_s7Mql',
+        'link_selector': 'a.index_title_s7Mql',
+        'image_selector': 'img',
+    }),
+    (PAGES_DIR / 'news_list.html', {
+        'list_selector': 'ul.news-list > li.news-item',
+        'title_selector': 'a.news-title',
+        'link_selector': 'a.news-title',
+        'author_selector': '.news-meta .author',
+        'time_selector': '.news-meta .time',
+        'summary_selector': 'p.news-summary',
+        'tags_selector': '.news-tags .tag',
+        'image_selector': 'img.news-cover',
+    }),
+    (PAGES_DIR / 'article.html', {
+        'content_selector': 'article .article-content',
+    }),
+]
+
+
+def extract(html: str, selectors: dict, parser: str) -> int:
+    """
+    解析页面并按选择器提取字段
+    :return: 提取到的字段数量
+    """
+    root = parse_html(html, parser)
+    count = 0
+    content = selectors.get('content')
+    if content is not None:
+        elem = content.select_one(root)
+        return 1 if elem is not None and get_text(elem, separator='\n') else 0
+
+    for item in selectors['list'].select(root):
+        for name, selector in selectors.items():
+            if name == 'list':
+                continue
+            for elem in selector.select(item):
+                if name in ('link', 'image'):
+                    value = elem.get('href') or elem.get('src') or elem.get('data-src')
+                else:
+                    value = get_text(elem).strip()
+                if value:
+                    count += 1
+    return count
+
+
+class Command(BaseCommand):
+    help = '对比 lxml 和 html.parser 解析页面的耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='每个页面重复解析的次数'
+        )
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        parsers = [LXML, HTML_PARSER] if lxml_available() else [HTML_PARSER]
+        if not lxml_available():
+            self.stdout.write(self.style.WARNING('lxml或cssselect不可用，只测试 html.parser'))
+
+        self.stdout.write(f"{'页面':<20}{'后端':<14}{'大小(KB)':>10}{'解析(ms)':>12}{'解析+提取(ms)':>16}{'字段':>8}")
+        for path, config in PAGES:
+            if not path.exists():
+                self.stdout.write(self.style.WARNING(f'页面不存在: {path}'))
+                continue
+            html = path.read_text(encoding='utf-8')
+            selectors = {
+                key[:-len('_selector')]: CompiledSelector(value) for key, value in config.items()
+            }
+
+            for parser in parsers:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    parse_html(html, parser)
+                parse_ms = (time.perf_counter() - start) / repeat * 1000
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    fields = extract(html, selectors, parser)
+                extract_ms = (time.perf_counter() - start) / repeat * 1000
+
+                self.stdout.write(
+                    f'{path.name:<22}{parser:<16}{len(html.encode("utf-8")) / 1024:>10.1f}'
+                    f'{parse_ms:>12.2f}{extract_ms:>16.2f}{fields:>8}'
+                )
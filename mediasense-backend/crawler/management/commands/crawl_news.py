@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand, CommandError
+from crawler.breaker import allow_dispatch
 from crawler.models import CrawlerConfig, CrawlerTask
 from crawler.services import CrawlerService
 from django.utils import timezone
@@ -51,7 +52,7 @@ class Command(BaseCommand):
 
             # 检查运行间隔（除非强制运行）
             if not force and config.last_run_time:
-                next_run_time = config.last_run_time + timezone.timedelta(minutes=config.interval)
+                next_run_time = config.next_run_time
                 if timezone.now() < next_run_time:
                     self.stdout.write(
                         self.style.WARNING(
@@ -62,6 +63,17 @@ class Command(BaseCommand):
                     )
                     return
 
+            # 熔断器打开时只在冷却期结束后放行一次探测（除非强制运行）
+            if not force and not allow_dispatch(config):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'爬虫 {source} 已熔断\n'
+                        f'连续失败: {config.breaker_failures}次\n'
+                        f'下次探测: {config.probe_time}'
+                    )
+                )
+                return
+
             # 创建爬虫任务
             task = CrawlerTask.objects.create(
                 config=config,
@@ -0,0 +1,31 @@
+"""重建已抓取URL索引
+
+部署后、清理文章数据后或索引容量调整后执行
+"""
+
+from django.core.management.base import BaseCommand
+from crawler.seen_index import get_seen_index
+
+
+class Command(BaseCommand):
+    help = '从 news_article.source_url 重建已抓取URL索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='每批读取的URL数量'
+        )
+
+    def handle(self, *args, **options):
+        index = get_seen_index()
+        self.stdout.write(
+            f'开始重建已抓取URL索引: 容量{index.bloom.capacity}, 误判率{index.bloom.error_rate}'
+        )
+        count = index.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'已抓取URL索引重建完成: 共{count}条URL'))
+        if count > index.bloom.capacity:
+            self.stdout.write(self.style.WARNING(
+                'URL数量超过索引容量，误判率会升高，请调大 CRAWLER_SEEN_INDEX_CAPACITY'
+            ))
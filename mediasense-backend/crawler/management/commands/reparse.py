@@ -0,0 +1,94 @@
+"""用当前的解析计划重新解析归档的抓取响应
+
+解析规则或选择器修改后执行，不发送网络请求；默认只统计解析结果，--save 时入库
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from crawler.archive import get_archive_storage, get_archives, to_response
+from crawler.services import CrawlerService
+
+
+class Command(BaseCommand):
+    help = '用当前的解析计划重新解析归档的抓取响应'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--config',
+            type=int,
+            action='append',
+            dest='config_ids',
+            help='只重新解析指定的数据源ID，可以重复指定'
+        )
+        parser.add_argument(
+            '--days',
+            type=float,
+            help='只重新解析最近几天抓取的归档'
+        )
+        parser.add_argument(
+            '--all-versions',
+            action='store_true',
+            help='重新解析每个URL的所有归档，默认只解析最近一次'
+        )
+        parser.add_argument(
+            '--save',
+            action='store_true',
+            help='保存解析出的新文章'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            if options['days'] <= 0:
+                raise CommandError('--days 必须大于0')
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+
+        records = get_archives(options['config_ids'], since, latest_only=not options['all_versions'])
+        if not records:
+            self.stdout.write(self.style.WARNING('没有符合条件的归档'))
+            return
+
+        storage = get_archive_storage()
+        crawlers = {}
+        totals = {'archives': 0, 'articles': 0, 'saved': 0, 'failed': 0}
+        for record in records:
+            config = record.config
+            if config.id not in crawlers:
+                crawlers[config.id] = CrawlerService.get_crawler(config)
+            crawler = crawlers[config.id]
+            if crawler is None:
+                self.stdout.write(self.style.WARNING(f'跳过 {config.name}: 无法创建爬虫实例'))
+                totals['failed'] += 1
+                continue
+
+            try:
+                articles = crawler.replay(to_response(record, storage))
+            except FileNotFoundError:
+                self.stdout.write(self.style.WARNING(f'跳过 {record.url}: 归档内容已被清理'))
+                totals['failed'] += 1
+                continue
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'解析失败 {record.url}: {str(e)}'))
+                totals['failed'] += 1
+                continue
+
+            totals['archives'] += 1
+            totals['articles'] += len(articles)
+            line = f'{config.name} {record.url} ({record.last_fetched_at:%Y-%m-%d %H:%M}): 解析{len(articles)}篇'
+            if options['save'] and articles:
+                result = CrawlerService._process_crawl_result(
+                    config, {'status': 'success', 'data': articles}, CrawlerService._empty_stats()
+                )
+                totals['saved'] += result.get('saved', 0)
+                line += f", 新增{result.get('saved', 0)}篇, 重复{result.get('duplicated', 0)}篇"
+            self.stdout.write(line)
+
+        summary = f"重新解析完成: 归档{totals['archives']}个, 文章{totals['articles']}篇"
+        if options['save']:
+            summary += f", 新增{totals['saved']}篇"
+        if totals['failed']:
+            summary += f", 失败{totals['failed']}个"
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawler", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawlerconfig",
+            name="etag",
+            field=models.CharField(blank=True, default="", max_length=255, verbose_name="ETag"),
+        ),
+        migrations.AddField(
+            model_name="crawlerconfig",
+            name="last_modified",
+            field=models.CharField(blank=True, default="", max_length=64, verbose_name="Last-Modified"),
+        ),
+    ]
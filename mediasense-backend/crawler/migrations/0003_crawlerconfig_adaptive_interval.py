@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0002_crawlerconfig_conditional_get'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='adaptive_interval',
+            field=models.FloatField(blank=True, null=True, verbose_name='自适应抓取间隔(分钟)'),
+        ),
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='yield_ewma',
+            field=models.FloatField(default=0.0, verbose_name='平均每次新增文章数'),
+        ),
+    ]
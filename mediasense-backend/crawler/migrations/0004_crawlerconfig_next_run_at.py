@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-17 07:45
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_next_run_at(apps, schema_editor):
+    """按上次运行时间和抓取间隔计算已有配置的下次运行时间"""
+    CrawlerConfig = apps.get_model('crawler', 'CrawlerConfig')
+    now = timezone.now()
+    configs = []
+    for config in CrawlerConfig.objects.all():
+        interval = config.interval
+        if config.adaptive_interval and (config.config_data or {}).get('adaptive', True):
+            interval = config.adaptive_interval
+        if config.last_run_time:
+            config.next_run_at = config.last_run_time + datetime.timedelta(minutes=interval)
+        else:
+            config.next_run_at = now
+        configs.append(config)
+    CrawlerConfig.objects.bulk_update(configs, ['next_run_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0003_crawlerconfig_adaptive_interval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='下次运行时间'),
+        ),
+        migrations.AddIndex(
+            model_name='crawlerconfig',
+            index=models.Index(fields=['status', 'next_run_at'], name='crawler_cra_status_d6da68_idx'),
+        ),
+        migrations.RunPython(fill_next_run_at, migrations.RunPython.noop),
+    ]
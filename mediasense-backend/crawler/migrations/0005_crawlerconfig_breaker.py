@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-17 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0004_crawlerconfig_next_run_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='breaker_changed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='熔断状态变化时间'),
+        ),
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='breaker_failures',
+            field=models.IntegerField(default=0, verbose_name='连续失败次数'),
+        ),
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='breaker_state',
+            field=models.CharField(choices=[('closed', '关闭'), ('open', '打开'), ('half_open', '半开')], default='closed', max_length=16, verbose_name='熔断状态'),
+        ),
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='breaker_trips',
+            field=models.IntegerField(default=0, verbose_name='熔断次数'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-17 08:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0005_crawlerconfig_breaker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, verbose_name='请求URL')),
+                ('status_code', models.IntegerField(default=200, verbose_name='状态码')),
+                ('headers', models.JSONField(default=dict, verbose_name='响应头')),
+                ('encoding', models.CharField(blank=True, default='', max_length=32, verbose_name='响应编码')),
+                ('content_hash', models.CharField(db_index=True, max_length=64, verbose_name='内容哈希')),
+                ('size', models.IntegerField(default=0, verbose_name='原始大小')),
+                ('compressed_size', models.IntegerField(default=0, verbose_name='压缩后大小')),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='首次抓取时间')),
+                ('last_fetched_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='最近抓取时间')),
+                ('config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archives', to='crawler.crawlerconfig', verbose_name='爬虫配置')),
+            ],
+            options={
+                'verbose_name': '抓取归档',
+                'verbose_name_plural': '抓取归档',
+                'db_table': 'crawler_fetch_archive',
+                'ordering': ['-last_fetched_at'],
+                'indexes': [models.Index(fields=['config', '-last_fetched_at'], name='crawler_fet_config__f25ce6_idx')],
+            },
+        ),
+    ]
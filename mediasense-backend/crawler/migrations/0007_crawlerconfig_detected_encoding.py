@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0006_fetcharchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlerconfig',
+            name='detected_encoding',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='识别出的页面编码'),
+        ),
+    ]
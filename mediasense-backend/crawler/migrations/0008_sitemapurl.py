@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-17 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0007_crawlerconfig_detected_encoding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapURL',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, verbose_name='URL')),
+                ('lastmod', models.DateTimeField(blank=True, null=True, verbose_name='最后修改时间')),
+                ('is_sitemap', models.BooleanField(default=False, verbose_name='是否为子站点地图')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='处理时间')),
+                ('config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sitemap_urls', to='crawler.crawlerconfig', verbose_name='爬虫配置')),
+            ],
+            options={
+                'verbose_name': '站点地图URL',
+                'verbose_name_plural': '站点地图URL',
+                'db_table': 'crawler_sitemap_url',
+                'unique_together': {('config', 'url')},
+            },
+        ),
+    ]
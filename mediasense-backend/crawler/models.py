@@ -2,6 +2,8 @@ from django.db import models
 from django.utils import timezone
 import uuid
 import logging
+from . import breaker
+from .adaptive import get_effective_interval, get_next_run_time
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +39,18 @@ class CrawlerConfig(models.Model):
     )
     is_active = models.BooleanField("是否激活", default=False)
     last_run_time = models.DateTimeField("上次运行时间", null=True, blank=True)
+    next_run_at = models.DateTimeField("下次运行时间", null=True, blank=True)
+    etag = models.CharField("ETag", max_length=255, blank=True, default="")
+    last_modified = models.CharField("Last-Modified", max_length=64, blank=True, default="")
+    detected_encoding = models.CharField("识别出的页面编码", max_length=32, blank=True, default="")
+    adaptive_interval = models.FloatField("自适应抓取间隔(分钟)", null=True, blank=True)
+    yield_ewma = models.FloatField("平均每次新增文章数", default=0.0)
+    breaker_state = models.CharField(
+        "熔断状态", max_length=16, choices=breaker.STATE_CHOICES, default=breaker.CLOSED
+    )
+    breaker_failures = models.IntegerField("连续失败次数", default=0)
+    breaker_changed_at = models.DateTimeField("熔断状态变化时间", null=True, blank=True)
+    breaker_trips = models.IntegerField("熔断次数", default=0)
     created_at = models.DateTimeField("创建时间", auto_now_add=True)
     updated_at = models.DateTimeField("更新时间", auto_now=True)
 
@@ -47,17 +61,55 @@ class CrawlerConfig(models.Model):
         indexes = [
             models.Index(fields=["status", "-updated_at"]),
             models.Index(fields=["is_active", "-updated_at"]),
+            models.Index(fields=["status", "next_run_at"]),
         ]
 
+    # 影响下次运行时间的字段
+    SCHEDULE_FIELDS = frozenset({
+        'last_run_time', 'interval', 'adaptive_interval', 'config_data', 'status',
+        'breaker_state', 'breaker_changed_at'
+    })
+
     def __str__(self):
         return self.name
 
+    @property
+    def effective_interval(self):
+        """实际使用的抓取间隔(分钟)，启用自适应时根据新增文章数调整"""
+        return get_effective_interval(self)
+
+    @property
+    def probe_time(self):
+        """熔断器打开时允许下一次探测的时间，关闭状态为None"""
+        return breaker.get_probe_time(self)
+
+    @property
+    def next_run_time(self):
+        """下次运行时间，从未运行过时为None"""
+        return get_next_run_time(self)
+
+    def refresh_next_run_at(self):
+        """
+        按上次运行时间和实际间隔重新计算 next_run_at，从未运行过的配置立即到期
+        熔断器打开时推迟到冷却期结束
+        """
+        self.next_run_at = get_next_run_time(self) or self.next_run_at or timezone.now()
+        probe_time = breaker.get_probe_time(self)
+        if probe_time is not None and probe_time > self.next_run_at:
+            self.next_run_at = probe_time
+        return self.next_run_at
+
     def save(self, *args, **kwargs):
         # 同步status和is_active状态
         if self.status == 1:
             self.is_active = True
         else:
             self.is_active = False
+
+        self.refresh_next_run_at()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.SCHEDULE_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'next_run_at'}
         super().save(*args, **kwargs)
 
 
@@ -158,12 +210,17 @@ class ProxyPool(models.Model):
         return f"{self.protocol}://{self.ip}:{self.port}"
 
     def check_availability(self, timeout=10):
-        """检查代理可用性"""
+        """
+        检查单个代理的可用性，批量检查使用 crawler.proxy.check_proxies 并发探测
+        探测地址为 CRAWLER_PROXY_PROBE_URL
+        """
         import requests
+        from django.conf import settings
 
+        probe_url = getattr(settings, 'CRAWLER_PROXY_PROBE_URL', 'https://www.baidu.com')
         try:
             start_time = timezone.now()
-            response = requests.get("https://www.baidu.com", proxies={self.protocol: self.proxy_url}, timeout=timeout)
+            response = requests.get(probe_url, proxies={self.protocol: self.proxy_url}, timeout=timeout)
             response.raise_for_status()
 
             # 更新状态
@@ -181,6 +238,61 @@ class ProxyPool(models.Model):
         return self.status == 1
 
 
+class FetchArchive(models.Model):
+    """
+    抓取响应归档记录
+    响应体按内容哈希压缩保存在 crawler.archive 的存储后端中，相同内容只保存一份
+    """
+
+    config = models.ForeignKey(
+        CrawlerConfig, on_delete=models.CASCADE, related_name="archives", verbose_name="爬虫配置"
+    )
+    url = models.URLField("请求URL", max_length=1000)
+    status_code = models.IntegerField("状态码", default=200)
+    headers = models.JSONField("响应头", default=dict)
+    encoding = models.CharField("响应编码", max_length=32, blank=True, default="")
+    content_hash = models.CharField("内容哈希", max_length=64, db_index=True)
+    size = models.IntegerField("原始大小", default=0)
+    compressed_size = models.IntegerField("压缩后大小", default=0)
+    fetched_at = models.DateTimeField("首次抓取时间", default=timezone.now)
+    last_fetched_at = models.DateTimeField("最近抓取时间", default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "抓取归档"
+        verbose_name_plural = verbose_name
+        db_table = "crawler_fetch_archive"
+        ordering = ["-last_fetched_at"]
+        indexes = [models.Index(fields=["config", "-last_fetched_at"])]
+
+    def __str__(self):
+        return f"{self.config_id} - {self.url} ({self.content_hash[:12]})"
+
+
+class SitemapURL(models.Model):
+    """
+    站点地图中已处理的URL
+    记录每个URL（以及站点地图索引中的子站点地图）上次处理时的lastmod，
+    之后只处理新增或lastmod更新的URL
+    """
+
+    config = models.ForeignKey(
+        CrawlerConfig, on_delete=models.CASCADE, related_name="sitemap_urls", verbose_name="爬虫配置"
+    )
+    url = models.URLField("URL", max_length=1000)
+    lastmod = models.DateTimeField("最后修改时间", null=True, blank=True)
+    is_sitemap = models.BooleanField("是否为子站点地图", default=False)
+    updated_at = models.DateTimeField("处理时间", auto_now=True)
+
+    class Meta:
+        verbose_name = "站点地图URL"
+        verbose_name_plural = verbose_name
+        db_table = "crawler_sitemap_url"
+        unique_together = [("config", "url")]
+
+    def __str__(self):
+        return f"{self.config_id} - {self.url}"
+
+
 class NewsArticle(models.Model):
     """
     新闻文章模型
@@ -212,10 +324,11 @@ class NewsArticle(models.Model):
         :param articles: 新闻文章列表
         :return: 成功保存的文章数量
         """
-        success_count = 0
-        duplicate_count = 0
-        error_count = 0
+        from .persistence import bulk_insert_new
+
         filtered_count = 0
+        error_count = 0
+        objs = []
         
         for article in articles:
             try:
@@ -232,36 +345,31 @@ class NewsArticle(models.Model):
                     filtered_count += 1
                     continue
                     
-                # 检查是否已存在
-                if cls.objects.filter(url=url).exists():
-                    logger.info(f'文章已存在: {url}')
-                    duplicate_count += 1
-                    continue
-                    
                 # 创建新闻文章
-                article_data = {
-                    'title': article.get('title'),
-                    'url': url,
-                    'author': article.get('author', ''),
-                    'source': article.get('source', ''),
-                    'content': article.get('content', ''),
-                    'description': article.get('description', ''),
-                    'pub_time': article.get('pub_time'),
-                    'config': article.get('config')
-                }
-                
-                # 保存文章
-                try:
-                    cls.objects.create(**article_data)
-                    success_count += 1
-                    logger.info(f'成功保存文章: {url}')
-                except Exception as e:
-                    logger.error(f'保存文章时发生错误: {url}, 错误信息: {str(e)}')
-                    error_count += 1
+                obj = cls(
+                    title=article.get('title'),
+                    url=url,
+                    author=article.get('author', ''),
+                    source=article.get('source', ''),
+                    content=article.get('content', ''),
+                    description=article.get('description', ''),
+                    pub_time=article.get('pub_time'),
+                    config=article.get('config')
+                )
+                # 批量写入前校验字段，避免INSERT IGNORE静默截断或写入默认值
+                if obj.config_id is None:
+                    raise ValueError(f'文章缺少爬虫配置: {url}')
+                obj.full_clean(exclude=['config'], validate_unique=False)
+                objs.append(obj)
                     
             except Exception as e:
                 logger.error(f'处理文章时发生错误: {str(e)}')
                 error_count += 1
+
+        # 一次查询过滤已存在的文章，批量写入
+        inserted, duplicate_count, failed_count = bulk_insert_new(cls, 'url', objs)
+        success_count = len(inserted)
+        error_count += failed_count
                 
         logger.info(f'新闻保存完成，共处理{len(articles)}条新闻，成功保存{success_count}条，重复{duplicate_count}条，过滤{filtered_count}条，错误{error_count}条')
         return success_count
@@ -0,0 +1,190 @@
+"""
+分页抓取
+
+PaginationExecutor 按 config_data['pagination'] 抓取分页API：
+- 每次并发请求 concurrency 个页面，结果按页码顺序解析
+- 每个页面使用独立的请求参数，不修改 config_data
+- 某一页没有文章或全部是已入库的文章时停止，不再请求后续页面
+
+服务层抓取时（爬虫的 streaming 为True）run() 返回逐页生成文章的 pages，服务层每完成
+一页就入库，不保留之前页面的文章；每页入库后记录检查点（已完成的页码），任务失败
+重试时从检查点的下一页继续。直接调用 run() 时返回全部文章，不记录检查点。
+
+检查点保存在Django缓存中，按数据源区分，有效期为 CRAWLER_PAGINATION_CHECKPOINT_TTL，
+全部页面完成后清除。
+"""
+
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .exceptions import FetchError
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY_PREFIX = 'crawler:pagination:'
+
+
+class PaginationExecutor:
+    """分页API的并发抓取"""
+
+    def __init__(self, crawler, pagination: Dict[str, Any]):
+        """
+        :param crawler: APICrawler，需要提供 fetch_page 和 parse_response
+        :param pagination: config_data['pagination']
+        """
+        self.crawler = crawler
+        self.start_page = pagination.get('start_page', 1)
+        self.max_pages = pagination.get('max_pages', 1)
+        self.page_param = pagination.get('page_param', 'page')
+        self.size_param = pagination.get('size_param', 'size')
+        self.page_size = pagination.get('page_size', 20)
+        self.has_more_data = pagination.get('has_more_data', True)
+        self.concurrency = max(1, pagination.get('concurrency') or getattr(
+            settings, 'CRAWLER_PAGINATION_CONCURRENCY', 4
+        ))
+        # 只有逐页入库时检查点之前的文章才已经保存
+        self.checkpoint_enabled = (
+            pagination.get('checkpoint', True) and bool(crawler.config.pk) and crawler.streaming
+        )
+        self.base_params = dict(crawler.config.config_data.get('params') or {})
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f'{CHECKPOINT_KEY_PREFIX}{self.crawler.config.pk}'
+
+    def page_params(self, page: int) -> Dict[str, Any]:
+        """
+        生成单个页面的请求参数
+        :param page: 页码
+        :return: 新的参数字典
+        """
+        params = dict(self.base_params)
+        params[self.page_param] = page
+        if self.size_param:
+            params[self.size_param] = self.page_size
+        return params
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """读取上次未完成的抓取进度"""
+        if not self.checkpoint_enabled:
+            return None
+        checkpoint = cache.get(self.checkpoint_key)
+        if not checkpoint or checkpoint.get('start_page') != self.start_page:
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, page: int):
+        """记录已完成并入库的页码"""
+        if not self.checkpoint_enabled:
+            return
+        ttl = getattr(settings, 'CRAWLER_PAGINATION_CHECKPOINT_TTL', 3600)
+        cache.set(self.checkpoint_key, {'start_page': self.start_page, 'page': page}, ttl)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_enabled:
+            cache.delete(self.checkpoint_key)
+
+    def _fetch(self, page: int) -> Dict[str, Any]:
+        """在线程池中抓取一个页面"""
+        try:
+            return self.crawler.fetch_page(self.page_params(page))
+        except Exception as e:
+            logger.error(f"获取第{page}页失败: {str(e)}", exc_info=True)
+            return {'status': 'error', 'message': str(e), 'data': []}
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                # 线程池中的数据库连接不会被请求结束时关闭
+                connection.close()
+
+    def iter_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按页码顺序逐页生成解析出的文章
+        调用方处理完一页（取下一页）后才记录该页的检查点
+        :return: 每页的文章列表
+        :raises FetchError: 某一页获取失败，或没有获取到任何文章
+        """
+        next_page = self.start_page
+        checkpoint = self.load_checkpoint()
+        if checkpoint:
+            next_page = checkpoint['page'] + 1
+            logger.info(f"{self.crawler.source_name} 从第{next_page}页继续分页抓取")
+
+        last_page = self.start_page + self.max_pages - 1
+        # 不需要判断是否还有数据时只抓取一页
+        if not self.has_more_data:
+            last_page = min(last_page, next_page)
+        failed_message = None
+        finished = False
+        # 本次或检查点之前是否已有文章
+        has_items = bool(checkpoint)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while next_page <= last_page and not finished:
+                pages = list(range(next_page, min(next_page + self.concurrency, last_page + 1)))
+                results = list(executor.map(self._fetch, pages))
+
+                for index, page in enumerate(pages):
+                    # 解析后不再保留原始响应，同一时间只保留一批响应和当前页的文章
+                    result, results[index] = results[index], None
+                    if result.get('status') != 'success':
+                        failed_message = f"获取第{page}页失败: {result.get('message')}"
+                        logger.warning(f"{self.crawler.source_name} {failed_message}")
+                        finished = True
+                        break
+
+                    skipped_before = self.crawler.skipped_known
+                    items = self.crawler.parse_response(result)
+                    result = None
+                    if not items:
+                        if self.crawler.skipped_known > skipped_before:
+                            logger.info(
+                                f"{self.crawler.source_name} 第{page}页全部是已入库的文章，停止分页"
+                            )
+                        finished = True
+                        break
+
+                    has_items = True
+                    yield items
+                    self.save_checkpoint(page)
+                next_page = pages[-1] + 1
+
+        if failed_message and has_items and self.checkpoint_enabled:
+            # 保留检查点，任务重试时从失败的页面继续
+            raise FetchError(failed_message)
+
+        self.clear_checkpoint()
+        if not has_items and not self.crawler.skipped_known:
+            raise FetchError(failed_message or '未获取到有效文章')
+
+    def run(self) -> Dict[str, Any]:
+        """
+        抓取所有页面
+        :return: 包含状态和数据的字典，逐页入库时文章在 pages 中
+        """
+        if self.crawler.streaming:
+            return {
+                'status': 'success',
+                'message': '成功获取分页数据',
+                'data': [],
+                'pages': self.iter_pages()
+            }
+
+        try:
+            all_items = [item for items in self.iter_pages() for item in items]
+        except FetchError as e:
+            return {
+                'status': 'error',
+                'message': str(e),
+                'data': []
+            }
+        return {
+            'status': 'success',
+            'message': '成功获取并解析分页数据',
+            'data': all_items
+        }
@@ -0,0 +1,228 @@
+"""
+解析计划
+
+将 CrawlerConfig.config_data 中的解析配置预先编译为不可变的解析计划：
+- API字段路径预先拆分为访问步骤
+- CSS选择器预先编译，并确定使用的HTML解析后端
+- 时间格式提示预先整理为格式列表，交给 dateparse 优先尝试
+
+解析计划按 (配置ID, config_data 指纹) 缓存，解析配置修改后自动重新编译，
+更新运行时间、自适应间隔等字段的保存不会使缓存失效。
+爬虫在逐条解析时只执行计划，不再读取和解释配置字典。
+"""
+
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .dateparse import parse_date
+from .exceptions import ParseError
+from .html_backend import CompiledSelector, resolve_parser
+
+logger = logging.getLogger(__name__)
+
+PATH_SPLIT_RE = re.compile(r'\.|\[|\]')
+
+
+@dataclass(frozen=True)
+class FieldPath:
+    """预先拆分的字段路径，支持数组索引如 'items[0].title'"""
+
+    path: str
+    steps: Tuple[Union[str, int], ...]
+
+    @classmethod
+    def compile(cls, path: Optional[str]) -> Optional['FieldPath']:
+        """
+        编译字段路径
+        :param path: 字段路径，为空时返回None
+        :return: FieldPath
+        """
+        if not path or not isinstance(path, str):
+            return None
+        steps = tuple(
+            int(part) if part.isdigit() else part
+            for part in PATH_SPLIT_RE.split(path) if part
+        )
+        return cls(path, steps)
+
+    def get(self, data: Any) -> Any:
+        """
+        按路径取值
+        :param data: 数据字典
+        :return: 字段值，路径无效时返回None
+        """
+        value = data
+        for step in self.steps:
+            if isinstance(step, int):
+                if not isinstance(value, (list, tuple)) or step >= len(value):
+                    return None
+                value = value[step]
+            else:
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(step)
+                if value is None:
+                    return None
+        return value
+
+
+@dataclass(frozen=True)
+class APIPlan:
+    """API数据源的解析计划"""
+
+    data_path: Tuple[str, ...]
+    title: Optional[FieldPath]
+    link: Optional[FieldPath]
+    author: Optional[FieldPath]
+    source: Optional[FieldPath]
+    pub_time: Optional[FieldPath]
+    content: Optional[FieldPath]
+    description: Optional[FieldPath]
+    required_fields: Tuple[FieldPath, ...]
+    min_content_length: int
+    max_items: Optional[int]
+    has_validation: bool
+
+
+@dataclass(frozen=True)
+class HTMLPlan:
+    """网页数据源的解析计划，选择器均已编译"""
+
+    list: Optional[CompiledSelector]
+    title: Optional[CompiledSelector]
+    link: Optional[CompiledSelector]
+    author: Optional[CompiledSelector]
+    time: Optional[CompiledSelector]
+    summary: Optional[CompiledSelector]
+    tags: Optional[CompiledSelector]
+    image: Optional[CompiledSelector]
+    content: Optional[CompiledSelector]
+    need_content: bool
+    parser: str
+
+
+@dataclass(frozen=True)
+class ParsePlan:
+    """数据源的解析计划"""
+
+    config_id: Optional[int]
+    fingerprint: str
+    api: APIPlan
+    html: HTMLPlan
+    date_formats: Tuple[str, ...]
+    early_stop: Optional[int]
+
+    def parse_date(self, value: Any) -> Optional[datetime]:
+        """
+        解析时间，优先尝试数据源上次成功的格式和配置的时间格式提示
+        :param value: 时间字符串或时间戳
+        :return: datetime，无法解析时返回None
+        """
+        return parse_date(value, self.date_formats, key=self.config_id)
+
+
+def _compile_selector(config_data: Dict[str, Any], key: str) -> Optional[CompiledSelector]:
+    """编译CSS选择器，选择器无效时抛出ParseError"""
+    selector = config_data.get(key)
+    if not selector:
+        return None
+    try:
+        return CompiledSelector(selector)
+    except Exception as e:
+        raise ParseError(f"无效的选择器 {key}: {selector}, {str(e)}")
+
+
+def _fingerprint(config_data: Dict[str, Any]) -> str:
+    """生成配置内容指纹，作为解析计划的缓存键"""
+    return json.dumps(config_data, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def compile_plan(config) -> ParsePlan:
+    """
+    编译解析计划
+    :param config: CrawlerConfig
+    :return: ParsePlan
+    :raises: ParseError 当选择器无效时
+    """
+    config_data = config.config_data or {}
+    validation = config_data.get('validation') or {}
+
+    data_path = config_data.get('data_path')
+    api = APIPlan(
+        data_path=tuple(data_path.split('.')) if data_path else (),
+        title=FieldPath.compile(config_data.get('title_path')),
+        link=FieldPath.compile(config_data.get('link_path')),
+        author=FieldPath.compile(config_data.get('author_path')),
+        source=FieldPath.compile(config_data.get('source_path')),
+        pub_time=FieldPath.compile(config_data.get('pub_time_path')),
+        content=FieldPath.compile(config_data.get('content_path')),
+        description=FieldPath.compile(config_data.get('description_path')),
+        required_fields=tuple(
+            path for path in (FieldPath.compile(field) for field in validation.get('required_fields', []))
+            if path is not None
+        ),
+        min_content_length=validation.get('min_content_length') or 0,
+        max_items=validation.get('max_items'),
+        has_validation=bool(validation)
+    )
+
+    selectors = {
+        name: _compile_selector(config_data, f'{name}_selector')
+        for name in ('list', 'title', 'link', 'author', 'time', 'summary', 'tags', 'image', 'content')
+    }
+    html = HTMLPlan(
+        need_content=bool(config_data.get('need_content', False)),
+        parser=resolve_parser(config_data.get('html_parser'), list(selectors.values())),
+        **selectors
+    )
+
+    date_format = config_data.get('date_format') or ()
+    if isinstance(date_format, str):
+        date_format = (date_format,)
+
+    return ParsePlan(
+        config_id=config.pk,
+        fingerprint=_fingerprint(config_data),
+        api=api,
+        html=html,
+        date_formats=tuple(date_format),
+        early_stop=config_data.get('early_stop')
+    )
+
+
+# 每个配置只保留最新版本的计划
+_plans: Dict[int, ParsePlan] = {}
+_plans_lock = threading.Lock()
+
+
+def get_parse_plan(config) -> ParsePlan:
+    """
+    获取配置的解析计划，按 (配置ID, config_data 指纹) 缓存
+    config_data 与编译时不同（包括未保存的修改）时重新编译
+    :param config: CrawlerConfig
+    :return: ParsePlan
+    :raises: ParseError 当选择器无效时
+    """
+    if config.pk is None:
+        return compile_plan(config)
+
+    plan = _plans.get(config.pk)
+    if plan is not None and plan.fingerprint == _fingerprint(config.config_data or {}):
+        return plan
+
+    plan = compile_plan(config)
+    with _plans_lock:
+        _plans[config.pk] = plan
+    logger.debug(f"编译解析计划: {config.name}")
+    return plan
+
+
+def clear_parse_plans():
+    """清空解析计划缓存"""
+    with _plans_lock:
+        _plans.clear()
@@ -0,0 +1,161 @@
+"""
+解析进程池
+
+HTML和订阅源的解析、正文清洗是CPU密集的，在线程中执行时受GIL限制，多个数据源的
+解析只能串行。设置 CRAWLER_PARSE_PROCESSES 后，爬虫把 fetch_data 的原始结果和
+配置交给进程池解析，解析可以用满所有CPU核心。
+
+子进程只执行爬虫的 parse_items，即对已获取内容的纯CPU解析；查询已入库的URL、
+抓取详情页等数据库和网络操作由当前进程的 complete_items 完成。
+没有实现 parse_items 的爬虫（以及站点地图等以抓取为主的结果）仍在线程中解析。
+
+- 进程以 spawn 方式启动并单独初始化Django，不继承父进程的数据库连接和事件循环
+- 解析计划包含编译后的选择器，无法跨进程传递；子进程按配置编译一次后缓存
+- 进程池异常（子进程崩溃、参数无法序列化）时退回在当前线程解析
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_process_count() -> int:
+    """解析进程数，0表示不使用进程池"""
+    return getattr(settings, 'CRAWLER_PARSE_PROCESSES', 0) or 0
+
+
+def _init_worker(settings_module: Optional[str]):
+    """子进程初始化Django"""
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """获取进程内共享的解析进程池，未启用时返回None"""
+    global _pool, _pool_pid
+    processes = get_process_count()
+    if processes <= 0:
+        return None
+    with _lock:
+        # fork后的子进程（如Celery prefork worker）不能复用父进程的进程池
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),)
+            )
+            _pool_pid = os.getpid()
+            logger.info(f"启动解析进程池: {processes}个进程")
+        return _pool
+
+
+def shutdown_parse_pool():
+    """关闭解析进程池"""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_pid = None
+
+
+def _reset_broken_pool(pool: ProcessPoolExecutor):
+    """进程池损坏后丢弃，下次使用时重新创建"""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is pool:
+            _pool = None
+            _pool_pid = None
+
+
+def parse_in_process(crawler_class, config, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    在子进程中解析一次抓取结果，不访问数据库和网络
+    :param crawler_class: 爬虫类
+    :param config: 爬虫配置
+    :param result: fetch_data 的返回结果
+    :return: parse_items 解析出的文章列表
+    """
+    return list(crawler_class(config).parse_items(result) or [])
+
+
+def submit_parse(crawler, result: Dict[str, Any]) -> Optional[Future]:
+    """
+    把解析提交到进程池
+    :param crawler: 爬虫实例
+    :param result: fetch_data 的返回结果
+    :return: Future，未启用进程池、爬虫不支持拆分解析或提交失败时返回None
+    """
+    pool = get_parse_pool()
+    if pool is None or not crawler.can_parse_in_process(result):
+        return None
+    try:
+        return pool.submit(parse_in_process, type(crawler), crawler.config, result)
+    except BrokenProcessPool as e:
+        logger.error(f"解析进程池不可用: {str(e)}")
+        _reset_broken_pool(pool)
+    except RuntimeError as e:
+        # 进程池已关闭
+        logger.error(f"提交解析任务失败: {str(e)}")
+        _reset_broken_pool(pool)
+    return None
+
+
+def parse(crawler, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    同步解析，启用进程池时在子进程中执行
+    :param crawler: 爬虫实例
+    :param result: fetch_data 的返回结果
+    :return: 文章列表
+    """
+    future = submit_parse(crawler, result)
+    if future is not None:
+        try:
+            articles = future.result()
+        except Exception as e:
+            _handle_failure(e)
+        else:
+            return crawler.complete_items(articles)
+    return crawler.parse_response(result)
+
+
+async def parse_async(crawler, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    在事件循环中等待解析，未启用进程池时在线程池中解析
+    :param crawler: 爬虫实例
+    :param result: fetch_data 的返回结果
+    :return: 文章列表
+    """
+    loop = asyncio.get_running_loop()
+    future = submit_parse(crawler, result)
+    if future is not None:
+        try:
+            articles = await asyncio.wrap_future(future)
+        except Exception as e:
+            _handle_failure(e)
+        else:
+            # 查询已入库的URL和抓取详情页是阻塞的，放到线程池中执行
+            return await loop.run_in_executor(None, crawler.complete_items, articles)
+    return await loop.run_in_executor(None, crawler.parse_response, result)
+
+
+def _handle_failure(error: Exception):
+    logger.error(f"进程池解析失败，改为在当前线程解析: {str(error)}", exc_info=True)
+    if isinstance(error, BrokenProcessPool) and _pool is not None:
+        _reset_broken_pool(_pool)
@@ -0,0 +1,344 @@
+"""
+文章批量入库
+
+一次 IN 查询找出批次中已存在的URL，新文章按批次 bulk_create 写入，
+避免逐条 exists() + save() 带来的大量数据库往返。
+save_stream 从生成器中每取满一个批次就写入一次，内存中只保留一个批次。
+
+刷新模式下，URL已存在的文章按内容哈希批量比较，只对哈希变化的文章执行UPDATE，
+并在事务提交后发送 news.signals.article_content_changed。
+"""
+
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from news.models import NewsArticle
+from news.signals import article_content_changed
+
+logger = logging.getLogger(__name__)
+
+# 不参与校验的字段：关联字段校验会逐条查询数据库，tags使用默认的空列表
+ARTICLE_CLEAN_EXCLUDE = ['crawler', 'category', 'reviewer', 'created_by', 'tags']
+
+# 刷新文章时更新的字段，发布时间、状态和审核信息保持不变
+REFRESH_FIELDS = [
+    'title', 'content', 'summary', 'author', 'content_hash',
+    'simhash', 'simhash_band0', 'simhash_band1', 'simhash_band2', 'simhash_band3',
+    'updated_at'
+]
+
+
+def get_batch_size() -> int:
+    """bulk_create 和 IN 查询的批次大小"""
+    return getattr(settings, 'CRAWLER_BULK_BATCH_SIZE', 500)
+
+
+def is_refresh_enabled(config=None) -> bool:
+    """
+    是否更新内容有变化的已入库文章
+    通过 config_data['refresh'] 配置，启用站点地图的数据源默认开启
+    :param config: 爬虫配置
+    """
+    if config is None:
+        return False
+    config_data = config.config_data or {}
+    return bool(config_data.get('refresh', bool(config_data.get('sitemap'))))
+
+
+def chunked(items: List[Any], size: int) -> Iterable[List[Any]]:
+    """按固定大小切分列表"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    """按固定大小切分任意可迭代对象，不需要先转换为列表"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def find_existing_urls(model, url_field: str, urls: Iterable[str],
+                       batch_size: Optional[int] = None) -> Set[str]:
+    """
+    查询已存在的URL
+    :param model: 文章模型
+    :param url_field: URL字段名
+    :param urls: 待查询的URL
+    :param batch_size: 单次IN查询的URL数量
+    :return: 已存在的URL集合
+    """
+    urls = list(set(urls))
+    batch_size = batch_size or get_batch_size()
+    existing = set()
+    for chunk in chunked(urls, batch_size):
+        existing.update(
+            model.objects.filter(**{f'{url_field}__in': chunk}).values_list(url_field, flat=True)
+        )
+    return existing
+
+
+def _get_ids(model, url_field: str, urls: List[str]) -> Dict[str, Any]:
+    """查询URL对应的主键"""
+    return dict(model.objects.filter(**{f'{url_field}__in': urls}).values_list(url_field, 'id'))
+
+
+def bulk_insert_new(model, url_field: str, objs: List[Any],
+                    batch_size: Optional[int] = None) -> Tuple[List[Any], int, int]:
+    """
+    批量写入URL不存在的文章
+    :param model: 文章模型
+    :param url_field: URL字段名
+    :param objs: 未保存的模型实例
+    :param batch_size: 批次大小
+    :return: (写入的实例列表, 重复数量, 写入失败数量)
+    """
+    batch_size = batch_size or get_batch_size()
+
+    # 批次内去重，保留第一条
+    unique_objs = {}
+    for obj in objs:
+        unique_objs.setdefault(getattr(obj, url_field), obj)
+    duplicated = len(objs) - len(unique_objs)
+
+    existing = find_existing_urls(model, url_field, unique_objs.keys(), batch_size)
+    duplicated += len(existing)
+    new_objs = [obj for url, obj in unique_objs.items() if url not in existing]
+
+    inserted = []
+    failed = 0
+    for chunk in chunked(new_objs, batch_size):
+        urls = [getattr(obj, url_field) for obj in chunk]
+        try:
+            # ignore_conflicts 不会回填主键，写入前后在同一事务中查询主键，
+            # 只有写入前不存在的主键才是本次写入的；并发写入的同一URL被跳过，计入重复
+            with transaction.atomic():
+                existing_ids = set(_get_ids(model, url_field, urls).values())
+                model.objects.bulk_create(chunk, ignore_conflicts=True)
+                ids = _get_ids(model, url_field, urls)
+        except DatabaseError as e:
+            # 批量写入失败时逐条写入，定位有问题的数据
+            logger.warning(f"批量写入失败，改为逐条写入: {str(e)}")
+            for obj in chunk:
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                    inserted.append(obj)
+                except DatabaseError as e:
+                    failed += 1
+                    logger.error(f"保存文章失败: {getattr(obj, url_field)}, 错误: {str(e)}")
+            continue
+
+        for obj in chunk:
+            pk = ids.get(getattr(obj, url_field))
+            if pk is None or pk in existing_ids:
+                duplicated += 1
+                continue
+            obj.pk = pk
+            inserted.append(obj)
+
+    return inserted, duplicated, failed
+
+
+def build_article(item: Dict[str, Any], config=None, source_name: Optional[str] = None) -> NewsArticle:
+    """
+    将清洗后的数据转换为新闻文章实例
+    :param item: 文章数据
+    :param config: 爬虫配置
+    :param source_name: 默认来源名称，默认使用配置名称
+    :return: 未保存的NewsArticle
+    :raises: ValidationError 数据不合法时
+    """
+    source_url = item.get('source_url', item.get('url', ''))
+    if not source_url:
+        raise ValidationError({'source_url': 'URL不能为空'})
+    if not source_url.startswith(('http://', 'https://')):
+        raise ValidationError({'source_url': '无效的URL格式'})
+
+    if source_name is None:
+        source_name = config.name if config else ''
+
+    article = NewsArticle(
+        title=item.get('title') or '',
+        source_url=source_url,
+        content=item.get('content', ''),
+        summary=item.get('summary', item.get('description', '')),
+        author=item.get('author', ''),
+        source=item.get('source', source_name),
+        publish_time=item.get('publish_time', item.get('pub_time')) or timezone.now(),
+        crawler_id=config.id if config else None,
+        status=item.get('status', NewsArticle.Status.DRAFT)
+    )
+    article.full_clean(exclude=ARTICLE_CLEAN_EXCLUDE, validate_unique=False)
+    article.content_hash = article.compute_content_hash()
+    return article
+
+
+def refresh_changed(objs: List[NewsArticle],
+                    batch_size: Optional[int] = None) -> Tuple[List[NewsArticle], int]:
+    """
+    比较URL已存在的文章的内容哈希，只更新哈希变化的文章
+    :param objs: 未保存的文章实例
+    :param batch_size: 批次大小
+    :return: (已更新的实例列表, 更新失败数量)
+    """
+    batch_size = batch_size or get_batch_size()
+    changed = []
+    now = timezone.now()
+    for chunk in chunked(objs, batch_size):
+        stored = {
+            source_url: (article_id, content_hash)
+            for source_url, article_id, content_hash in NewsArticle.objects.filter(
+                source_url__in=[obj.source_url for obj in chunk]
+            ).values_list('source_url', 'id', 'content_hash')
+        }
+        for obj in chunk:
+            row = stored.get(obj.source_url)
+            if row is None or row[1] == obj.content_hash:
+                continue
+            obj.pk = row[0]
+            obj.updated_at = now
+            changed.append(obj)
+
+    updated = []
+    failed = 0
+    for chunk in chunked(changed, batch_size):
+        try:
+            with transaction.atomic():
+                NewsArticle.objects.bulk_update(chunk, REFRESH_FIELDS)
+            updated.extend(chunk)
+        except DatabaseError as e:
+            failed += len(chunk)
+            logger.error(f"更新文章失败: {str(e)}")
+
+    if updated:
+        article_ids = [article.pk for article in updated]
+        transaction.on_commit(
+            lambda: article_content_changed.send(sender=NewsArticle, article_ids=article_ids)
+        )
+    return updated, failed
+
+
+def save_articles(items: List[Dict[str, Any]], config=None, stats: Optional[Dict[str, int]] = None,
+                  source_name: Optional[str] = None, refresh: Optional[bool] = None) -> Dict[str, int]:
+    """
+    批量保存新闻文章
+    :param items: 清洗后的文章记录或字典
+    :param config: 爬虫配置
+    :param stats: 统计信息，结果累加到其中
+    :param source_name: 默认来源名称
+    :param refresh: 是否更新内容有变化的已入库文章，默认按 is_refresh_enabled 判断
+    :return: 统计信息，包含 saved/duplicated/near_duplicated/filtered/errors，刷新模式下还包含 refreshed
+    """
+    if stats is None:
+        stats = {'saved': 0, 'duplicated': 0, 'filtered': 0, 'errors': 0}
+    for key in ('saved', 'duplicated', 'near_duplicated', 'filtered', 'errors'):
+        stats.setdefault(key, 0)
+    if refresh is None:
+        refresh = is_refresh_enabled(config)
+    if refresh:
+        stats.setdefault('refreshed', 0)
+
+    articles = []
+    for item in items:
+        try:
+            articles.append(build_article(item, config, source_name))
+        except ValidationError as e:
+            logger.warning(f"文章数据不合法: {item.get('source_url', item.get('url'))}, {e.messages}")
+            stats['filtered'] += 1
+        except Exception as e:
+            logger.error(f"处理文章数据失败: {str(e)}")
+            stats['errors'] += 1
+
+    if articles:
+        pending = _link_near_duplicates(articles)
+        inserted, duplicated, failed = bulk_insert_new(NewsArticle, 'source_url', articles)
+        if pending:
+            _link_batch_duplicates(pending)
+        if refresh and duplicated:
+            inserted_urls = {article.source_url for article in inserted}
+            existing = {}
+            for article in articles:
+                if article.source_url not in inserted_urls:
+                    existing.setdefault(article.source_url, article)
+            refreshed, refresh_failed = refresh_changed(list(existing.values()))
+            stats['refreshed'] += len(refreshed)
+            stats['errors'] += refresh_failed
+            duplicated -= len(refreshed) + refresh_failed
+        stats['saved'] += len(inserted)
+        stats['duplicated'] += duplicated
+        stats['near_duplicated'] += sum(1 for article in inserted if article.duplicate_of_id)
+        stats['errors'] += failed
+        _mark_seen(article.source_url for article in articles)
+
+    logger.info(f"批量保存完成: 共{len(items)}条, 保存{stats['saved']}条, 更新{stats.get('refreshed', 0)}条, "
+                f"重复{stats['duplicated']}条, "
+                f"过滤{stats['filtered']}条, 错误{stats['errors']}条")
+    return stats
+
+
+def save_stream(items: Iterable[Any], config=None, stats: Optional[Dict[str, int]] = None,
+                source_name: Optional[str] = None, batch_size: Optional[int] = None,
+                refresh: Optional[bool] = None) -> Dict[str, int]:
+    """
+    逐批保存文章，每取满 batch_size 条写入一次
+    :param items: 清洗后的文章记录或字典，可以是生成器
+    :param config: 爬虫配置
+    :param stats: 统计信息，结果累加到其中
+    :param source_name: 默认来源名称
+    :param batch_size: 每批写入的文章数，默认为 CRAWLER_BULK_BATCH_SIZE
+    :param refresh: 是否更新内容有变化的已入库文章，默认按 is_refresh_enabled 判断
+    :return: 统计信息
+    """
+    if stats is None:
+        stats = {'saved': 0, 'duplicated': 0, 'filtered': 0, 'errors': 0}
+    for batch in iter_chunks(items, batch_size or get_batch_size()):
+        save_articles(batch, config, stats, source_name=source_name, refresh=refresh)
+    return stats
+
+
+def _link_near_duplicates(articles: List[NewsArticle]) -> List[Tuple[NewsArticle, NewsArticle]]:
+    """计算文章指纹并关联已入库的原文，返回批次内的近似重复关系"""
+    if not getattr(settings, 'CRAWLER_SIMHASH_ENABLED', True):
+        return []
+
+    from .simhash import link_near_duplicates
+
+    try:
+        return link_near_duplicates(NewsArticle, articles, get_batch_size())
+    except Exception as e:
+        logger.error(f"近似重复检测失败: {str(e)}")
+        return []
+
+
+def _link_batch_duplicates(pending: List[Tuple[NewsArticle, NewsArticle]]):
+    """入库后将批次内的近似重复文章关联到同批次的原文"""
+    linked = []
+    for article, canonical in pending:
+        if article.pk and canonical.pk:
+            article.duplicate_of_id = canonical.pk
+            linked.append(article)
+    if linked:
+        try:
+            NewsArticle.objects.bulk_update(linked, ['duplicate_of'], batch_size=get_batch_size())
+        except DatabaseError as e:
+            logger.error(f"关联近似重复文章失败: {str(e)}")
+
+
+def _mark_seen(urls: Iterable[str]):
+    """将已入库的URL加入已抓取索引，下次解析时跳过"""
+    from .seen_index import get_seen_index
+
+    try:
+        get_seen_index().add_many(urls)
+    except Exception as e:
+        logger.error(f"更新已抓取URL索引失败: {str(e)}")
@@ -0,0 +1,423 @@
+"""
+分阶段抓取流水线
+
+把一次抓取拆成四个阶段，各阶段通过独立的Celery队列传递数据，可以分别扩容：
+- fetch（crawler.fetch）：获取数据源，IO密集，适合大量 gevent/线程 worker
+- parse（crawler.parse）：解析文章列表，CPU密集，适合少量 prefork worker
+- clean（crawler.clean）：清洗字段、批次内去重、按已抓取URL索引去重
+- persist（crawler.persist）：批量入库，汇总统计后完成任务
+
+解析结果按 CRAWLER_PIPELINE_BATCH_SIZE 切分为小批次，每个批次依次经过
+clean 和 persist，全部批次入库后由 chord 回调完成任务。
+
+示例：
+    celery -A mediasense worker -Q crawler.fetch -P gevent -c 100
+    celery -A mediasense worker -Q crawler.parse -P prefork -c 4
+    celery -A mediasense worker -Q crawler.clean,crawler.persist -c 4
+
+各阶段在开始时记录排队等待时间，结束时记录处理耗时，可通过
+get_pipeline_stats 查看各队列的积压数量和延迟。
+
+数据源的抓取租约在 fetch 阶段获取，令牌随消息传递，parse 阶段续期，任务完成后释放；
+clean/persist 阶段的异常随批次消息传递，complete 阶段据此按失败完成任务；其他阶段
+异常退出时由errback（fail）按失败完成任务并释放租约，不必等租约过期。
+抓取时记录的数据源状态（条件请求的校验头等）同样随消息传递，全部批次入库成功后才保存。
+"""
+
+import base64
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .locks import get_config_lease
+from .models import CrawlerTask
+from .persistence import chunked, is_refresh_enabled, save_articles
+from .records import iter_records, iter_unique
+from .redis_utils import get_redis_client, mark_redis_unavailable
+from .services import CrawlerService
+
+logger = logging.getLogger(__name__)
+
+FETCH, PARSE, CLEAN, PERSIST = 'fetch', 'parse', 'clean', 'persist'
+STAGES = (FETCH, PARSE, CLEAN, PERSIST)
+QUEUES = {stage: f'crawler.{stage}' for stage in STAGES}
+
+METRICS_KEY_PREFIX = 'crawler:pipeline:'
+
+# 进程内统计：阶段 -> 字段 -> 值
+_local_metrics: Dict[str, Dict[str, float]] = {}
+_metrics_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'CRAWLER_PIPELINE', False)
+
+
+def get_batch_size() -> int:
+    """阶段之间每条消息携带的文章数"""
+    return getattr(settings, 'CRAWLER_PIPELINE_BATCH_SIZE', 100)
+
+
+def record_stage(stage: str, enqueued_at: Optional[float], started_at: float, items: int = 0):
+    """
+    记录一次阶段执行的排队等待时间和处理耗时
+    :param stage: 阶段名称
+    :param enqueued_at: 消息入队时间（time.time()）
+    :param started_at: 开始处理时间（time.time()）
+    :param items: 处理的文章数
+    """
+    now = time.time()
+    wait = max(0.0, started_at - enqueued_at) if enqueued_at else 0.0
+    duration = now - started_at
+    values = {'count': 1, 'items': items, 'wait_total': wait, 'duration_total': duration}
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            key = f'{METRICS_KEY_PREFIX}{stage}'
+            pipe = client.pipeline()
+            for field, value in values.items():
+                pipe.hincrbyfloat(key, field, value)
+            pipe.hset(key, mapping={'last_wait': wait, 'last_duration': duration, 'last_at': now})
+            pipe.execute()
+            return
+        except Exception as e:
+            mark_redis_unavailable(e)
+
+    with _metrics_lock:
+        metrics = _local_metrics.setdefault(stage, {})
+        for field, value in values.items():
+            metrics[field] = metrics.get(field, 0) + value
+        metrics.update(last_wait=wait, last_duration=duration, last_at=now)
+
+
+def get_stage_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    各阶段的累计处理次数、平均等待时间和平均处理耗时
+    :return: {阶段: 统计}
+    """
+    raw = {}
+    client = get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            for stage in STAGES:
+                pipe.hgetall(f'{METRICS_KEY_PREFIX}{stage}')
+            for stage, values in zip(STAGES, pipe.execute()):
+                raw[stage] = {
+                    (k.decode() if isinstance(k, bytes) else k): float(v) for k, v in values.items()
+                }
+        except Exception as e:
+            mark_redis_unavailable(e)
+            raw = {}
+    if not raw:
+        with _metrics_lock:
+            raw = {stage: dict(_local_metrics.get(stage, {})) for stage in STAGES}
+
+    metrics = {}
+    for stage in STAGES:
+        values = raw.get(stage, {})
+        count = int(values.get('count', 0))
+        metrics[stage] = {
+            'processed': count,
+            'items': int(values.get('items', 0)),
+            'avg_wait': round(values.get('wait_total', 0) / count, 3) if count else 0.0,
+            'avg_duration': round(values.get('duration_total', 0) / count, 3) if count else 0.0,
+            'last_wait': round(values.get('last_wait', 0), 3),
+            'last_duration': round(values.get('last_duration', 0), 3),
+        }
+    return metrics
+
+
+def reset_stage_metrics():
+    """清空各阶段的统计"""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            client.delete(*(f'{METRICS_KEY_PREFIX}{stage}' for stage in STAGES))
+        except Exception as e:
+            mark_redis_unavailable(e)
+    with _metrics_lock:
+        _local_metrics.clear()
+
+
+def get_queue_depths() -> Dict[str, Optional[int]]:
+    """
+    各阶段队列中等待处理的消息数，无法连接消息代理时为None
+    :return: {阶段: 消息数}
+    """
+    from celery import current_app
+
+    depths = {stage: None for stage in STAGES}
+    try:
+        with current_app.connection_for_read() as conn:
+            conn.ensure_connection(max_retries=1)
+            channel = conn.default_channel
+            for stage, queue in QUEUES.items():
+                try:
+                    depths[stage] = channel.queue_declare(queue=queue, passive=True).message_count
+                except Exception:
+                    depths[stage] = 0
+    except Exception as e:
+        logger.warning(f"获取流水线队列长度失败: {str(e)}")
+    return depths
+
+
+def get_pipeline_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    各阶段的队列积压和延迟
+    :return: {阶段: {queue, depth, processed, items, avg_wait, avg_duration, ...}}
+    """
+    depths = get_queue_depths()
+    return {
+        stage: {'queue': QUEUES[stage], 'depth': depths[stage], **metrics}
+        for stage, metrics in get_stage_metrics().items()
+    }
+
+
+def encode_fetch_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """fetch_data 的结果中可能包含 bytes，转为可以JSON序列化的消息"""
+    data = result.get('data')
+    if isinstance(data, bytes):
+        return {**result, 'data': base64.b64encode(data).decode('ascii'), 'data_encoding': 'base64'}
+    return result
+
+
+def decode_fetch_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """还原 encode_fetch_result 编码的结果"""
+    if payload.get('data_encoding') == 'base64':
+        payload = {key: value for key, value in payload.items() if key != 'data_encoding'}
+        payload['data'] = base64.b64decode(payload['data'])
+    return payload
+
+
+def _get_task(task_id: str) -> CrawlerTask:
+    return CrawlerTask.objects.select_related('config').get(task_id=task_id)
+
+
+def _finish(task: CrawlerTask, result: Dict[str, Any], token: Optional[str]):
+    """
+    完成任务：更新自适应间隔和熔断器，失败时按退避重试，最后释放租约
+    :param task: 爬虫任务
+    :param result: 与 crawl_website 相同格式的结果
+    :param token: 租约令牌
+    """
+    config = task.config
+    try:
+        CrawlerService._record_yield(config, result)
+        CrawlerService._record_breaker(config, result)
+        retried = result['status'] == 'error' and CrawlerService.schedule_retry(task, result.get('message', '未知错误'))
+        if not retried:
+            CrawlerService._complete_task(task, result)
+    finally:
+        if token:
+            get_config_lease(config.id, token).release()
+
+
+def fail(task_id: str, token: Optional[str], error: Any) -> Dict[str, Any]:
+    """
+    流水线阶段异常退出时按失败完成任务并释放租约
+    :param task_id: 任务ID
+    :param token: 租约令牌
+    :param error: 异常
+    :return: 与 crawl_website 相同格式的结果
+    """
+    task = _get_task(task_id)
+    message = f"流水线执行失败: {task.config.name} - {str(error)}"
+    logger.error(message)
+    result = {'status': 'error', 'message': message, 'total': 0, **CrawlerService._empty_stats()}
+    _finish(task, result, token)
+    return result
+
+
+def failed_batch(error: Any) -> Dict[str, Any]:
+    """
+    批次在clean或persist阶段异常时交给下一阶段的消息
+    chord中的异常不一定能触发errback（如eager模式下异常直接抛出），
+    因此把错误随消息传到complete阶段，由complete按失败完成任务
+    :param error: 异常
+    :return: clean阶段格式的消息
+    """
+    return {'items': [], 'stats': CrawlerService._empty_stats(), 'error': str(error), 'enqueued_at': time.time()}
+
+
+def _renew(config_id: int, token: str):
+    if not get_config_lease(config_id, token).renew():
+        logger.warning(f"数据源抓取租约已过期: {config_id}")
+
+
+def fetch(task_id: str, enqueued_at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    fetch阶段：获取租约并请求数据源
+    :param task_id: 任务ID
+    :param enqueued_at: 消息入队时间
+    :return: 交给parse阶段的消息，任务已结束时返回None
+    """
+    started_at = time.time()
+    task = _get_task(task_id)
+    config = task.config
+
+    lease = get_config_lease(config.id)
+    if not lease.acquire():
+        _finish(task, CrawlerService._skipped_result(config), None)
+        return None
+
+    try:
+        task.status = CrawlerTask.Status.RUNNING
+        task.start_time = timezone.now()
+        task.save()
+
+        crawler = CrawlerService.get_crawler(config)
+        if not crawler:
+            raise ValueError(f"无法创建爬虫实例: {config.name}")
+
+        logger.info(f"流水线开始抓取: {config.name}")
+        result = crawler.fetch_data()
+    except Exception as e:
+        logger.error(f"流水线抓取失败: {config.name} - {str(e)}", exc_info=True)
+        result = {'status': 'error', 'message': f"爬取网站失败: {config.name} - {str(e)}"}
+    finally:
+        record_stage(FETCH, enqueued_at, started_at)
+
+    if not result or result.get('status') not in ('success', 'not_modified'):
+        message = (result or {}).get('message') or '获取数据失败'
+        _finish(task, {'status': 'error', 'message': message, 'total': 0, **CrawlerService._empty_stats()},
+                lease.token)
+        return None
+    if result['status'] == 'not_modified':
+        _finish(task, CrawlerService._process_crawl_result(
+            config, {'status': 'success', 'not_modified': True}, CrawlerService._empty_stats()
+        ), lease.token)
+        return None
+
+    return {'token': lease.token, 'result': encode_fetch_result(result), 'source_state': crawler.source_state}
+
+
+def parse(task_id: str, message: Dict[str, Any],
+          enqueued_at: Optional[float] = None) -> Optional[Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]]:
+    """
+    parse阶段：解析文章列表并切分为小批次
+    :param task_id: 任务ID
+    :param message: fetch阶段的消息
+    :param enqueued_at: 消息入队时间
+    :return: (文章批次, 汇总上下文)，任务已结束时返回None
+    """
+    started_at = time.time()
+    task = _get_task(task_id)
+    config = task.config
+    token = message['token']
+    _renew(config.id, token)
+
+    articles: List[Dict[str, Any]] = []
+    stats = CrawlerService._empty_stats()
+    source_state = dict(message.get('source_state') or {})
+    try:
+        crawler = CrawlerService.get_crawler(config)
+        if not crawler:
+            raise ValueError(f"无法创建爬虫实例: {config.name}")
+        articles = crawler.parse_response(decode_fetch_result(message['result'])) or []
+        stats['duplicated'] += crawler.skipped_known
+        source_state.update(crawler.source_state)
+    except Exception as e:
+        logger.error(f"流水线解析失败: {config.name} - {str(e)}", exc_info=True)
+        _finish(task, {'status': 'error', 'message': f"解析失败: {config.name} - {str(e)}",
+                       'total': 0, **stats}, token)
+        return None
+    finally:
+        record_stage(PARSE, enqueued_at, started_at, len(articles))
+
+    if not articles:
+        result = CrawlerService._process_crawl_result(config, {'status': 'success', 'data': []}, stats)
+        CrawlerService._save_source_state(config, source_state, result)
+        _finish(task, result, token)
+        return None
+
+    logger.info(f"流水线解析完成: {config.name}, 获取{len(articles)}条数据")
+    batches = list(chunked(articles, get_batch_size()))
+    return batches, {'token': token, 'total': len(articles), 'stats': stats, 'source_state': source_state}
+
+
+def clean(task_id: str, items: List[Dict[str, Any]], enqueued_at: Optional[float] = None) -> Dict[str, Any]:
+    """
+    clean阶段：清洗字段，去掉批次内重复和已入库的URL
+    数据源开启刷新时保留已入库的URL，由persist阶段比较内容哈希
+    :param task_id: 任务ID
+    :param items: 一批解析后的文章
+    :param enqueued_at: 消息入队时间
+    :return: 交给persist阶段的消息
+    """
+    from .seen_index import get_seen_index
+
+    started_at = time.time()
+    stats = CrawlerService._empty_stats()
+    seen_urls = set()
+    records = list(iter_unique(iter_records(items, stats), stats, seen_urls))
+    # 批次的原始数量由parse阶段统计
+    stats['total'] = 0
+
+    known = set()
+    if not is_refresh_enabled(_get_task(task_id).config):
+        try:
+            known = get_seen_index().known(seen_urls)
+        except Exception as e:
+            logger.error(f"查询已抓取URL索引失败: {str(e)}")
+    if known:
+        stats['duplicated'] += len(known)
+    cleaned_items = [record.to_dict() for record in records if record.url not in known]
+
+    record_stage(CLEAN, enqueued_at, started_at, len(items))
+    return {'items': cleaned_items, 'stats': stats, 'enqueued_at': time.time()}
+
+
+def persist(task_id: str, message: Dict[str, Any]) -> Dict[str, int]:
+    """
+    persist阶段：批量入库一个批次
+    :param task_id: 任务ID
+    :param message: clean阶段的消息
+    :return: 本批次的统计
+    """
+    if message.get('error'):
+        return {**message['stats'], 'error': message['error']}
+
+    started_at = time.time()
+    stats = message['stats']
+    items = message['items']
+    try:
+        if items:
+            save_articles(items, _get_task(task_id).config, stats)
+    except Exception as e:
+        logger.error(f"流水线入库失败: {task_id} - {str(e)}", exc_info=True)
+        stats['errors'] += len(items)
+    finally:
+        record_stage(PERSIST, message.get('enqueued_at'), started_at, len(items))
+    return stats
+
+
+def complete(task_id: str, batch_stats: List[Dict[str, int]], context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    全部批次入库后汇总统计并完成任务
+    :param task_id: 任务ID
+    :param batch_stats: 各批次 persist 阶段的统计
+    :param context: parse阶段的汇总上下文
+    :return: 与 crawl_website 相同格式的结果
+    """
+    errors = [batch['error'] for batch in batch_stats if batch.get('error')]
+    if errors:
+        return fail(task_id, context['token'], errors[0])
+
+    task = _get_task(task_id)
+    stats = dict(context['stats'])
+    for batch in batch_stats:
+        for key, value in batch.items():
+            stats[key] = stats.get(key, 0) + value
+
+    stats['total'] = context['total']
+    result = {'status': 'success', 'message': '爬取成功', **stats}
+    logger.info(f"流水线抓取完成: {task.config.name}, 统计信息: {stats}")
+    CrawlerService._save_source_state(task.config, context.get('source_state'), result)
+    _finish(task, result, context['token'])
+    return result
@@ -0,0 +1,303 @@
+"""
+代理选择
+
+ProxySelector 从代理池（ProxyPool）中为每个请求主机选择代理：
+- 按成功率和响应速度加权随机选择，成功率越高、延迟越低权重越大
+- 同一主机在粘性期内固定使用同一个代理，代理失败后重新选择
+- 每次请求后反馈结果，以滑动平均更新进程内的成功率和速度，用于选择代理
+- 定期把反馈次数折算成滑动平均，以 F() 表达式在数据库中原子更新，
+  多个进程的反馈都会计入，不会互相覆盖
+
+加载和写回代理池需要访问数据库，在事件循环中请求时通过线程池调用 choose。
+
+check_proxies 在抓取事件循环中并发探测所有代理，由Celery定时任务执行，
+探测结果同样以 F() 表达式更新，探测期间其他进程写回的反馈不会丢失，
+探测地址可通过 CRAWLER_PROXY_PROBE_URL 配置。
+
+数据源通过 config_data['proxy_pool'] 启用代理池。
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .exceptions import FetchError
+from .fetcher import get_fetcher
+
+logger = logging.getLogger(__name__)
+
+# 代理被目标站点拒绝或代理本身认证失败的状态码
+PROXY_FAILURE_STATUSES = frozenset({403, 407, 429})
+
+# ProxyPool.status
+UNCHECKED, AVAILABLE, UNAVAILABLE = 0, 1, 2
+
+
+@dataclass
+class ProxyState:
+    """代理的实时统计"""
+
+    id: int
+    url: str
+    protocol: str
+    success_rate: float
+    speed: float
+    # 上次写回后的反馈：成功次数、失败次数、计入速度的次数和总耗时（毫秒）
+    ok_count: int = 0
+    fail_count: int = 0
+    timed_count: int = 0
+    elapsed_total: float = 0.0
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.ok_count or self.fail_count)
+
+    def reset_feedback(self):
+        self.ok_count = self.fail_count = self.timed_count = 0
+        self.elapsed_total = 0.0
+
+    @property
+    def weight(self) -> float:
+        """成功率的平方除以归一化延迟，成功率的影响大于延迟"""
+        latency_scale = getattr(settings, 'CRAWLER_PROXY_LATENCY_SCALE', 1000)
+        return (max(self.success_rate, 1.0) / 100) ** 2 / (1 + self.speed / latency_scale)
+
+
+class ProxySelector:
+    """按主机粘性分配的加权代理选择器"""
+
+    def __init__(self, refresh_interval: Optional[float] = None, sticky_ttl: Optional[float] = None,
+                 smoothing: Optional[float] = None, min_success_rate: Optional[float] = None):
+        """
+        :param refresh_interval: 写回统计并重新加载代理池的间隔（秒）
+        :param sticky_ttl: 主机与代理的粘性期（秒）
+        :param smoothing: 成功率和速度滑动平均的平滑系数
+        :param min_success_rate: 成功率低于该值（0-100）的代理不再选择
+        """
+        self.refresh_interval = refresh_interval or getattr(settings, 'CRAWLER_PROXY_REFRESH_INTERVAL', 60)
+        self.sticky_ttl = sticky_ttl or getattr(settings, 'CRAWLER_PROXY_STICKY_TTL', 600)
+        self.smoothing = smoothing or getattr(settings, 'CRAWLER_PROXY_SMOOTHING', 0.2)
+        self.min_success_rate = min_success_rate if min_success_rate is not None else getattr(
+            settings, 'CRAWLER_PROXY_MIN_SUCCESS_RATE', 20
+        )
+        self._proxies: Dict[str, ProxyState] = {}
+        self._sticky: Dict[str, Tuple[str, float]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _refresh_if_stale(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+            self.refresh()
+
+    def refresh(self):
+        """写回统计并重新加载可用代理"""
+        from .models import ProxyPool
+
+        with self._lock:
+            self.flush()
+            rows = ProxyPool.objects.filter(status=AVAILABLE, success_rate__gte=self.min_success_rate)
+            self._proxies = {
+                proxy.proxy_url: ProxyState(
+                    id=proxy.id,
+                    url=proxy.proxy_url,
+                    protocol=proxy.protocol,
+                    success_rate=proxy.success_rate,
+                    speed=proxy.speed
+                )
+                for proxy in rows
+            }
+            self._sticky = {
+                host: assignment for host, assignment in self._sticky.items()
+                if assignment[0] in self._proxies
+            }
+            self._loaded_at = time.monotonic()
+            logger.debug(f"加载可用代理: {len(self._proxies)}个")
+
+    def flush(self):
+        """
+        把请求反馈的统计写回数据库
+        n次反馈按滑动平均折算为 1-(1-平滑系数)^n 的权重，在数据库中以当前值为基准原子更新；
+        成功率过低时停用，重新启用由健康检查（check_proxies）负责
+        """
+        from .models import ProxyPool
+
+        with self._lock:
+            pending = []
+            for state in self._proxies.values():
+                if state.dirty:
+                    pending.append((state.id, state.ok_count, state.fail_count,
+                                    state.timed_count, state.elapsed_total))
+                    state.reset_feedback()
+        if not pending:
+            return
+
+        for proxy_id, ok_count, fail_count, timed_count, elapsed_total in pending:
+            count = ok_count + fail_count
+            weight = 1 - (1 - self.smoothing) ** count
+            fields = {
+                'success_rate': F('success_rate') * Value(1 - weight) + Value(weight * 100.0 * ok_count / count)
+            }
+            if timed_count:
+                weight = 1 - (1 - self.smoothing) ** timed_count
+                fields['speed'] = Cast(
+                    F('speed') * Value(1 - weight) + Value(weight * elapsed_total / timed_count),
+                    output_field=IntegerField()
+                )
+            ProxyPool.objects.filter(pk=proxy_id).update(**fields)
+
+        ids = [row[0] for row in pending]
+        ProxyPool.objects.filter(id__in=ids, success_rate__lt=self.min_success_rate).update(status=UNAVAILABLE)
+
+    def choose(self, url: str) -> Optional[str]:
+        """
+        为请求选择代理，代理池过期时重新加载，不能在事件循环中直接调用
+        :param url: 请求URL
+        :return: 代理地址，代理池为空时返回None
+        """
+        parts = urlsplit(url)
+        host = parts.netloc
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_if_stale()
+
+            assignment = self._sticky.get(host)
+            if assignment is not None and assignment[1] > now and assignment[0] in self._proxies:
+                return assignment[0]
+
+            candidates = self._candidates(parts.scheme)
+            if not candidates:
+                return None
+            proxy = random.choices(candidates, weights=[state.weight for state in candidates])[0]
+            self._sticky[host] = (proxy.url, now + self.sticky_ttl)
+            return proxy.url
+
+    def _candidates(self, scheme: str) -> List[ProxyState]:
+        usable = [state for state in self._proxies.values() if state.success_rate >= self.min_success_rate]
+        matched = [state for state in usable if state.protocol == scheme]
+        return matched or usable
+
+    def report(self, proxy: Optional[str], ok: bool, elapsed: Optional[float] = None):
+        """
+        反馈一次请求的结果
+        :param proxy: choose 返回的代理地址
+        :param ok: 请求是否成功
+        :param elapsed: 请求耗时（秒），仅成功时计入速度
+        """
+        if not proxy:
+            return
+        with self._lock:
+            state = self._proxies.get(proxy)
+            if state is None:
+                return
+            state.success_rate += self.smoothing * ((100.0 if ok else 0.0) - state.success_rate)
+            if ok:
+                state.ok_count += 1
+            else:
+                state.fail_count += 1
+            if ok and elapsed is not None:
+                state.speed += self.smoothing * (elapsed * 1000 - state.speed)
+                state.timed_count += 1
+                state.elapsed_total += elapsed * 1000
+
+            if not ok:
+                # 代理失败后相关主机重新选择代理
+                self._sticky = {
+                    host: assignment for host, assignment in self._sticky.items()
+                    if assignment[0] != proxy
+                }
+                if state.success_rate < self.min_success_rate:
+                    logger.warning(f"代理成功率过低，暂停使用: {proxy} ({state.success_rate:.1f}%)")
+
+
+_selector: Optional[ProxySelector] = None
+_selector_lock = threading.Lock()
+
+
+def get_proxy_selector() -> ProxySelector:
+    """获取共享的代理选择器"""
+    global _selector
+    if _selector is None:
+        with _selector_lock:
+            if _selector is None:
+                _selector = ProxySelector()
+    return _selector
+
+
+def is_proxy_failure(status_code: int) -> bool:
+    """响应状态码是否说明代理被拒绝"""
+    return status_code in PROXY_FAILURE_STATUSES
+
+
+async def _probe(proxy, probe_url: str, timeout: float, limiter: asyncio.Semaphore) -> Tuple[bool, float]:
+    async with limiter:
+        start = time.monotonic()
+        try:
+            response = await get_fetcher().fetch(probe_url, proxy=proxy.proxy_url, timeout=timeout)
+            response.raise_for_status()
+            return True, time.monotonic() - start
+        except (FetchError, ValueError) as e:
+            logger.debug(f"代理探测失败: {proxy.proxy_url}, {str(e)}")
+            return False, time.monotonic() - start
+
+
+async def _probe_all(proxies, probe_url: str, timeout: float, concurrency: int) -> List[Tuple[bool, float]]:
+    limiter = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(_probe(proxy, probe_url, timeout, limiter) for proxy in proxies))
+
+
+def check_proxies(proxies: Optional[Iterable] = None, probe_url: Optional[str] = None,
+                  timeout: Optional[float] = None, concurrency: Optional[int] = None) -> Dict[str, int]:
+    """
+    并发探测代理可用性，更新速度、成功率和状态
+    :param proxies: ProxyPool列表，默认为全部代理
+    :param probe_url: 探测地址，默认为 CRAWLER_PROXY_PROBE_URL
+    :param timeout: 单个代理的超时（秒）
+    :param concurrency: 最大并发探测数
+    :return: 探测统计
+    """
+    from .models import ProxyPool
+
+    # 先写回本进程请求反馈的统计，探测结果在此基础上更新
+    get_proxy_selector().flush()
+    proxies = list(ProxyPool.objects.all() if proxies is None else proxies)
+    if not proxies:
+        return {'total': 0, 'available': 0, 'unavailable': 0}
+
+    probe_url = probe_url or getattr(settings, 'CRAWLER_PROXY_PROBE_URL', 'https://www.baidu.com')
+    timeout = timeout or getattr(settings, 'CRAWLER_PROXY_CHECK_TIMEOUT', 10)
+    concurrency = concurrency or getattr(settings, 'CRAWLER_PROXY_CHECK_CONCURRENCY', 20)
+
+    results = get_fetcher().submit(_probe_all(proxies, probe_url, timeout, concurrency)).result()
+
+    now = timezone.now()
+    speeds = {proxy.id: int(elapsed * 1000) for proxy, (ok, elapsed) in zip(proxies, results) if ok}
+    failed = [proxy.id for proxy, (ok, _) in zip(proxies, results) if not ok]
+    if speeds:
+        ProxyPool.objects.filter(id__in=speeds).update(
+            speed=Case(*(When(id=proxy_id, then=Value(speed)) for proxy_id, speed in speeds.items()),
+                       output_field=IntegerField()),
+            success_rate=(F('success_rate') * Value(5.0) + Value(100.0)) / Value(6.0),  # 加权计算成功率
+            status=AVAILABLE,
+            last_check_time=now
+        )
+    if failed:
+        ProxyPool.objects.filter(id__in=failed).update(
+            success_rate=F('success_rate') * Value(5.0) / Value(6.0),  # 降低成功率
+            status=UNAVAILABLE,
+            last_check_time=now
+        )
+    get_proxy_selector().refresh()
+
+    available = sum(1 for ok, _ in results if ok)
+    logger.info(f"代理探测完成: 共{len(proxies)}个, 可用{available}个")
+    return {'total': len(proxies), 'available': available, 'unavailable': len(proxies) - available}
@@ -0,0 +1,144 @@
+"""
+按主机的请求限速
+
+基于GCRA（通用信元速率算法）的限速器，同一主机的请求在所有Celery worker
+和所有数据源之间共享额度。限速器本身不休眠，只预约下一个可用时间点并
+返回需要等待的秒数，由调用方决定如何等待：同步代码 time.sleep，
+异步代码 asyncio.sleep，期间事件循环可以继续抓取其他主机。
+
+Redis可用时状态保存在Redis中，否则退回进程内实现。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .redis_utils import get_redis_client, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: 限速键  ARGV[1]: 发送间隔(微秒)  ARGV[2]: 允许的突发请求数
+# 返回需要等待的微秒数，并把理论到达时间(TAT)向后推一个间隔
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local wait = tat - (burst - 1) * interval - now
+if wait < 0 then
+    wait = 0
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000) + 1000)
+return wait
+"""
+
+
+class HostRateLimiter:
+    """按主机的GCRA限速器"""
+
+    KEY_PREFIX = 'crawler:ratelimit:'
+
+    def __init__(self):
+        self._script = None
+        self._script_client = None
+        self._local_tat: Dict[str, float] = {}
+        self._local_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url: str, rate_config: Dict[str, Any], config_id: Optional[int] = None) -> str:
+        """
+        生成限速键
+        默认按主机限速，rate_limit['scope'] 为 'config' 时按数据源限速
+        """
+        if rate_config.get('scope') == 'config' and config_id is not None:
+            return f'config:{config_id}'
+        return f'host:{urlsplit(url).netloc.lower()}'
+
+    def reserve(self, key: str, interval: float, burst: int = 1) -> float:
+        """
+        预约一次请求
+        :param key: 限速键
+        :param interval: 两次请求的最小间隔（秒）
+        :param burst: 允许的突发请求数
+        :return: 发送请求前需要等待的秒数，0表示可以立即发送
+        """
+        if interval <= 0:
+            return 0.0
+        burst = max(1, int(burst))
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._script is None or self._script_client is not client:
+                    self._script = client.register_script(GCRA_SCRIPT)
+                    self._script_client = client
+                wait_us = self._script(
+                    keys=[self.KEY_PREFIX + key],
+                    args=[int(interval * 1000000), burst]
+                )
+                return int(wait_us) / 1000000
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        with self._local_lock:
+            now = time.monotonic()
+            tat = max(self._local_tat.get(key, now), now)
+            wait = max(0.0, tat - (burst - 1) * interval - now)
+            self._local_tat[key] = tat + interval
+            return wait
+
+    def reserve_for(self, url: str, rate_config: Optional[Dict[str, Any]],
+                    config_id: Optional[int] = None) -> float:
+        """
+        按 config_data['rate_limit'] 预约一次请求
+        :param url: 请求URL
+        :param rate_config: 限速配置，格式 {'requests': 2, 'per_seconds': 1, 'burst': 1, 'scope': 'host'}
+        :param config_id: 爬虫配置ID，按数据源限速时使用
+        :return: 需要等待的秒数
+        """
+        if not rate_config:
+            return 0.0
+        requests_limit = rate_config.get('requests', 1)
+        time_window = rate_config.get('per_seconds', 1)
+        if requests_limit <= 0:
+            return 0.0
+        key = self.get_key(url, rate_config, config_id)
+        return self.reserve(key, time_window / requests_limit, rate_config.get('burst', 1))
+
+    def reset(self, key: Optional[str] = None):
+        """
+        清除限速状态
+        :param key: 限速键，为空时清除全部进程内状态
+        """
+        with self._local_lock:
+            if key is None:
+                self._local_tat.clear()
+            else:
+                self._local_tat.pop(key, None)
+        client = get_redis_client()
+        if client is not None and key is not None:
+            try:
+                client.delete(self.KEY_PREFIX + key)
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """获取共享的限速器"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = HostRateLimiter()
+    return _limiter
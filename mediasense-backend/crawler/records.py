@@ -0,0 +1,128 @@
+"""
+文章记录
+
+ArticleRecord 是清洗后的文章，使用 __slots__ 存储固定字段，比9个键的字典占用更少内存。
+解析结果经过 iter_records（清洗）和 iter_unique（运行内URL去重）两个生成器后
+交给 persistence.save_stream 按批次入库，整个过程只保留一个批次的记录。
+分页API的解析结果由 PaginationExecutor 逐页生成，同一时间只保留当前页的文章。
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ArticleRecord:
+    """清洗后的文章"""
+
+    title: str
+    url: str
+    content: str = ''
+    description: str = ''
+    author: str = ''
+    source: str = ''
+    pub_time: Optional[datetime] = None
+    tags: List[str] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """按字段名取值，接口与字典一致，供 persistence.build_article 使用"""
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，用于跨进程传递"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ''
+
+
+def clean_item(item: Any) -> Optional[ArticleRecord]:
+    """
+    清洗一条解析结果
+    :param item: 爬虫解析出的文章字典、JSON字符串或 ArticleRecord
+    :return: 文章记录，缺少标题或URL时返回None
+    """
+    if isinstance(item, ArticleRecord):
+        return item if item.title and item.url else None
+
+    if not isinstance(item, (dict, int, float, str)):
+        logger.error(f"不支持的数据类型: {type(item)}")
+        return None
+
+    # 数字类型没有URL，会在下面的必要字段检查中被过滤
+    if isinstance(item, (int, float)):
+        item = {'title': str(item), 'content': str(item), 'description': str(item)}
+
+    # 字符串尝试解析为JSON
+    if isinstance(item, str):
+        try:
+            item = json.loads(item)
+        except json.JSONDecodeError:
+            logger.error(f"JSON解析失败: {item}")
+            return None
+        if not isinstance(item, dict):
+            logger.error(f"数据必须是字典类型: {type(item)}")
+            return None
+
+    # 验证必要字段
+    title = _text(item.get('title'))
+    url = _text(item.get('url'))
+    if not title or not url:
+        logger.warning(f"缺少必要字段: {item}")
+        return None
+
+    return ArticleRecord(
+        title=title,
+        url=url,
+        content=_text(item.get('content')),
+        description=_text(item.get('description')),
+        author=_text(item.get('author')),
+        source=_text(item.get('source')),
+        pub_time=item.get('pub_time'),
+        tags=item.get('tags') or [],
+        images=item.get('images') or []
+    )
+
+
+def iter_records(items: Iterable[Any], stats: Dict[str, int]) -> Iterator[ArticleRecord]:
+    """
+    逐条清洗解析结果
+    :param items: 解析结果，可以是列表或生成器
+    :param stats: 统计信息，累加 total/filtered/errors
+    """
+    for item in items:
+        stats['total'] = stats.get('total', 0) + 1
+        try:
+            record = clean_item(item)
+        except Exception as e:
+            logger.error(f"数据清洗失败: {str(e)}")
+            stats['errors'] += 1
+            continue
+        if record is None:
+            stats['filtered'] += 1
+            continue
+        yield record
+
+
+def iter_unique(records: Iterable[ArticleRecord], stats: Dict[str, int],
+                seen: Optional[Set[str]] = None) -> Iterator[ArticleRecord]:
+    """
+    去掉同一次抓取中URL重复的文章，保留第一条
+    :param records: 文章记录
+    :param stats: 统计信息，重复的文章计入 duplicated
+    :param seen: 已经出现过的URL
+    """
+    seen = set() if seen is None else seen
+    for record in records:
+        if record.url in seen:
+            stats['duplicated'] += 1
+            continue
+        seen.add(record.url)
+        yield record
@@ -0,0 +1,87 @@
+"""
+爬虫使用的Redis连接
+
+优先使用 CRAWLER_REDIS_URL，其次复用 django_redis 缓存的连接池。
+Redis不可用时返回None，调用方退回进程内实现；连接失败后一段时间内
+不再重试，避免每次调用都等待连接超时。
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 连接失败后的重试间隔（秒）
+RETRY_INTERVAL = 30
+
+_client: Optional[redis.Redis] = None
+_client_pid: Optional[int] = None
+_retry_at = 0.0
+_lock = threading.Lock()
+
+
+def _create_client() -> Optional[redis.Redis]:
+    """根据配置创建Redis连接"""
+    url = getattr(settings, 'CRAWLER_REDIS_URL', None)
+    if url:
+        return redis.from_url(url, socket_connect_timeout=1, socket_timeout=2)
+
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.startswith('django_redis'):
+        try:
+            from django_redis import get_redis_connection
+        except ImportError:
+            return None
+        return get_redis_connection('default')
+
+    return None
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    获取Redis连接
+    :return: redis.Redis，未配置或不可用时返回None
+    """
+    global _client, _client_pid, _retry_at
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    if _client_pid == pid and time.monotonic() < _retry_at:
+        return None
+
+    with _lock:
+        if _client is not None and _client_pid == pid:
+            return _client
+
+        _client_pid = pid
+        try:
+            client = _create_client()
+            if client is not None:
+                client.ping()
+            _client = client
+            return client
+        except Exception as e:
+            logger.warning(f"Redis不可用，使用进程内实现: {str(e)}")
+            _client = None
+            _retry_at = time.monotonic() + RETRY_INTERVAL
+            return None
+
+
+def mark_redis_unavailable(error: Exception):
+    """
+    调用方执行Redis命令失败时调用，在重试间隔内退回进程内实现
+    :param error: 命令执行时的异常
+    """
+    global _client, _client_pid, _retry_at
+    logger.warning(f"Redis命令执行失败，{RETRY_INTERVAL}秒内使用进程内实现: {str(error)}")
+    with _lock:
+        _client = None
+        _client_pid = os.getpid()
+        _retry_at = time.monotonic() + RETRY_INTERVAL
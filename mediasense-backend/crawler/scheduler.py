@@ -0,0 +1,98 @@
+"""
+到期数据源调度
+
+CrawlerConfig.next_run_at 为物化并建有索引的下次运行时间，到期的数据源
+只需一次范围查询。调度器把即将到期（检查间隔内）的数据源放入最小堆，
+按堆顶的时间精确休眠，不再固定每分钟轮询。
+
+堆中的时间可能过期（如配置被修改），弹出后会再用范围查询确认是否真的到期，
+检查间隔结束后整体重新加载。
+"""
+
+import datetime
+import heapq
+import logging
+from typing import List, Optional, Tuple
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class DueScheduler:
+    """按 next_run_at 排序的最小堆"""
+
+    def __init__(self, horizon: float = 60):
+        """
+        :param horizon: 每次加载多长时间内到期的数据源（秒），也是最长休眠时间
+        """
+        self.horizon = horizon
+        self._heap: List[Tuple[datetime.datetime, int]] = []
+        self._loaded_until: Optional[datetime.datetime] = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def needs_reload(self, now: datetime.datetime) -> bool:
+        return self._loaded_until is None or now >= self._loaded_until
+
+    def load(self, now: Optional[datetime.datetime] = None):
+        """
+        加载检查间隔内到期的数据源
+        :param now: 当前时间
+        """
+        from .models import CrawlerConfig
+
+        now = now or timezone.now()
+        self._loaded_until = now + datetime.timedelta(seconds=self.horizon)
+        rows = CrawlerConfig.objects.filter(
+            status=1,
+            next_run_at__lte=self._loaded_until
+        ).values_list('next_run_at', 'id')
+        self._heap = list(rows)
+        heapq.heapify(self._heap)
+        logger.debug(f"加载即将到期的数据源: {len(self._heap)}个")
+
+    def push(self, config, now: Optional[datetime.datetime] = None):
+        """
+        数据源运行后按新的 next_run_at 放回堆中
+        仍然到期的数据源（如运行失败未更新时间）等到下次重新加载，避免反复立即执行
+        :param config: CrawlerConfig
+        :param now: 当前时间
+        """
+        now = now or timezone.now()
+        if (
+            config.status == 1
+            and config.next_run_at is not None
+            and self._loaded_until is not None
+            and now < config.next_run_at <= self._loaded_until
+        ):
+            heapq.heappush(self._heap, (config.next_run_at, config.id))
+
+    def pop_due(self, now: Optional[datetime.datetime] = None) -> List[int]:
+        """
+        弹出已到期的数据源
+        :param now: 当前时间
+        :return: 配置ID列表
+        """
+        now = now or timezone.now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, config_id = heapq.heappop(self._heap)
+            if config_id not in due:
+                due.append(config_id)
+        return due
+
+    def seconds_until_next(self, now: Optional[datetime.datetime] = None) -> float:
+        """
+        距离下一个数据源到期或下一次重新加载的秒数
+        :param now: 当前时间
+        :return: 需要休眠的秒数
+        """
+        now = now or timezone.now()
+        if self._loaded_until is None:
+            return 0.0
+        wake_at = self._loaded_until
+        if self._heap and self._heap[0][0] < wake_at:
+            wake_at = self._heap[0][0]
+        return max(0.0, (wake_at - now).total_seconds())
@@ -0,0 +1,193 @@
+"""
+已抓取URL索引
+
+基于布隆过滤器记录已入库文章的URL，爬虫解析前先查询索引，跳过已知文章，
+省去正文提取、详情页抓取和时间解析。布隆过滤器存在误判，命中的URL
+需要再经过一次数据库精确确认；未命中的URL一定是新文章。
+
+Redis可用时过滤器保存在Redis位图中，所有worker共享；否则使用进程内位图。
+"""
+
+import hashlib
+import logging
+import math
+import threading
+from typing import Iterable, List, Set
+
+from django.conf import settings
+
+from .redis_utils import get_redis_client, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """布隆过滤器参数和位置计算"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        :param capacity: 预计容纳的URL数量
+        :param error_rate: 期望误判率
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+
+    def positions(self, value: str) -> List[int]:
+        """计算值对应的位下标（双重哈希）"""
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+
+class SeenURLIndex:
+    """已抓取URL索引"""
+
+    KEY = 'crawler:seen_urls'
+
+    # 进程内位图，Redis不可用时使用
+    _local_bits = {}
+    _local_lock = threading.Lock()
+
+    def __init__(self, capacity: int = None, error_rate: float = None, key: str = None):
+        self.bloom = BloomFilter(
+            capacity or getattr(settings, 'CRAWLER_SEEN_INDEX_CAPACITY', 1000000),
+            error_rate or getattr(settings, 'CRAWLER_SEEN_INDEX_ERROR_RATE', 0.001)
+        )
+        self.key = key or self.KEY
+
+    def _get_local_bits(self, key: str = None) -> bytearray:
+        key = key or self.key
+        with self._local_lock:
+            bits = self._local_bits.get(key)
+            if bits is None or len(bits) * 8 < self.bloom.size:
+                bits = self._local_bits[key] = bytearray((self.bloom.size + 7) // 8)
+            return bits
+
+    def might_contain_many(self, urls: List[str]) -> List[bool]:
+        """
+        查询URL是否可能已存在
+        :param urls: URL列表
+        :return: 与urls一一对应，False表示一定不存在
+        """
+        if not urls:
+            return []
+        positions = [self.bloom.positions(url) for url in urls]
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for url_positions in positions:
+                    for position in url_positions:
+                        pipe.getbit(self.key, position)
+                bits = pipe.execute()
+                k = self.bloom.hash_count
+                return [all(bits[i * k:(i + 1) * k]) for i in range(len(urls))]
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        local_bits = self._get_local_bits()
+        return [
+            all(local_bits[p >> 3] & (1 << (p & 7)) for p in url_positions)
+            for url_positions in positions
+        ]
+
+    def add_many(self, urls: Iterable[str], key: str = None):
+        """
+        将URL加入索引
+        :param urls: URL列表
+        :param key: 写入的Redis键，重建时写入临时键
+        """
+        urls = [url for url in urls if url]
+        if not urls:
+            return
+        key = key or self.key
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for url in urls:
+                    for position in self.bloom.positions(url):
+                        pipe.setbit(key, position, 1)
+                pipe.execute()
+                return
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+        local_bits = self._get_local_bits(key)
+        with self._local_lock:
+            for url in urls:
+                for p in self.bloom.positions(url):
+                    local_bits[p >> 3] |= 1 << (p & 7)
+
+    def known(self, urls: Iterable[str]) -> Set[str]:
+        """
+        查询已入库的URL
+        布隆过滤器命中后通过数据库精确确认，返回结果不含误判
+        :param urls: URL列表
+        :return: 已入库的URL集合
+        """
+        from .persistence import find_existing_urls
+        from news.models import NewsArticle
+
+        urls = list(dict.fromkeys(url for url in urls if url))
+        candidates = [url for url, hit in zip(urls, self.might_contain_many(urls)) if hit]
+        if not candidates:
+            return set()
+        return find_existing_urls(NewsArticle, 'source_url', candidates)
+
+    def rebuild(self, batch_size: int = 5000) -> int:
+        """
+        从 news_article.source_url 重建索引
+        Redis模式下先写入临时键，完成后原子替换，重建期间索引仍可用
+        :param batch_size: 每批读取的URL数量
+        :return: 写入的URL数量
+        """
+        from news.models import NewsArticle
+
+        client = get_redis_client()
+        build_key = f'{self.key}:rebuild' if client is not None else self.key
+        if client is not None:
+            client.delete(build_key)
+        else:
+            with self._local_lock:
+                self._local_bits.pop(self.key, None)
+
+        count = 0
+        batch = []
+        queryset = NewsArticle.objects.values_list('source_url', flat=True)
+        for url in queryset.iterator(chunk_size=batch_size):
+            batch.append(url)
+            if len(batch) >= batch_size:
+                self.add_many(batch, key=build_key)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.add_many(batch, key=build_key)
+            count += len(batch)
+
+        if client is not None:
+            if count:
+                client.rename(build_key, self.key)
+            else:
+                client.delete(self.key)
+
+        logger.info(
+            f"已抓取URL索引重建完成: 共{count}条, 位图大小{self.bloom.size}位, 哈希函数{self.bloom.hash_count}个"
+        )
+        return count
+
+
+_index = None
+
+
+def get_seen_index() -> SeenURLIndex:
+    """获取共享的已抓取URL索引"""
+    global _index
+    if _index is None:
+        _index = SeenURLIndex()
+    return _index
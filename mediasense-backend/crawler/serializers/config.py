@@ -6,14 +6,22 @@ from ..models import CrawlerConfig
 class CrawlerConfigSerializer(serializers.ModelSerializer):
     """爬虫配置序列化器"""
 
+    effective_interval = serializers.FloatField(read_only=True)
+    next_run_time = serializers.DateTimeField(read_only=True)
+    probe_time = serializers.DateTimeField(read_only=True)
+
     class Meta:
         model = CrawlerConfig
         fields = (
             'id', 'name', 'description', 'source_url', 'crawler_type',
             'config_data', 'headers', 'interval', 'max_retries', 'retry_delay',
-            'status', 'is_active', 'last_run_time', 'created_at', 'updated_at'
+            'status', 'is_active', 'last_run_time', 'effective_interval', 'next_run_time',
+            'yield_ewma', 'breaker_state', 'breaker_failures', 'probe_time', 'created_at', 'updated_at'
+        )
+        read_only_fields = (
+            'id', 'is_active', 'last_run_time', 'yield_ewma', 'breaker_state', 'breaker_failures',
+            'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'is_active', 'last_run_time', 'created_at', 'updated_at')
 
     def validate_interval(self, value):
         """验证抓取间隔"""
@@ -1,30 +1,37 @@
 import uuid
 import logging
+import concurrent.futures
 import requests
+import random
 import re
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional, Any
 import datetime
-from django.db import models
 from .models import CrawlerConfig, CrawlerTask
-from news.models import NewsArticle
 import feedparser
 from django.utils.dateparse import parse_datetime
-import time
 from datetime import timedelta
 import json
 import pytz
 import subprocess
-from django.db import IntegrityError
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework import serializers
-from .serializers.article import NewsArticleCreateSerializer
 from urllib.parse import urljoin
 from crawler.crawlers.rss_crawler import RSSCrawler
 from crawler.crawlers.api_crawler import APICrawler
 from crawler.crawlers.web_crawler import WebCrawler
 from crawler.crawlers.base import BaseCrawler
 from crawler.crawlers.infoq_crawler import InfoQCrawler
+from . import breaker
+from .adaptive import record_crawl_result
+from .exceptions import CrawlerError, FetchError
+from .fetcher import get_fetcher
+from .locks import LeaseHeartbeat, get_config_lease
+from .persistence import save_articles, save_stream
+from .records import clean_item, iter_records, iter_unique
+from .source_state import can_save, save_source_state
 
 # 设置日志级别为DEBUG
 logger = logging.getLogger(__name__)
@@ -97,23 +104,28 @@ class CrawlerService:
         logger.info(f"开始创建爬虫任务: {config.name}")
         
         try:
-            # 检查是否有运行中的任务
-            running_tasks = CrawlerTask.objects.filter(
-                config=config,
-                status__in=[0, 1]  # 未开始或运行中
-            )
-            
-            if running_tasks.exists():
-                logger.warning(f"存在运行中的任务: {config.name}")
-                return None
-                
-            # 创建新任务
-            task = CrawlerTask.objects.create(
-                config=config,
-                task_id=str(uuid.uuid4()),  # 使用UUID作为任务ID
-                status=0,  # 未开始状态
-                start_time=timezone.now()
-            )
+            with transaction.atomic():
+                # 锁定配置行，并发创建同一数据源的任务时串行执行检查和创建
+                CrawlerConfig.objects.select_for_update().filter(pk=config.pk).first()
+                cls._reclaim_orphaned_tasks(config)
+
+                # 检查是否有运行中的任务
+                running_tasks = CrawlerTask.objects.filter(
+                    config=config,
+                    status__in=[0, 1]  # 未开始或运行中
+                )
+
+                if running_tasks.exists():
+                    logger.warning(f"存在运行中的任务: {config.name}")
+                    return None
+
+                # 创建新任务
+                task = CrawlerTask.objects.create(
+                    config=config,
+                    task_id=str(uuid.uuid4()),  # 使用UUID作为任务ID
+                    status=0,  # 未开始状态
+                    start_time=timezone.now()
+                )
             
             logger.info(f"成功创建爬虫任务: {config.name} (任务ID: {task.task_id})")
             return task
@@ -122,110 +134,183 @@ class CrawlerService:
             logger.error(f"创建爬虫任务失败: {config.name} - {str(e)}", exc_info=True)
             return None
 
+    @staticmethod
+    def _reclaim_orphaned_tasks(config: CrawlerConfig) -> int:
+        """
+        回收崩溃的worker遗留的运行中任务
+        运行中的任务持有数据源的抓取租约，租约已过期说明worker已退出
+        :param config: 爬虫配置
+        :return: 回收的任务数
+        """
+        if get_config_lease(config.id).is_held():
+            return 0
+        lease_ttl = getattr(settings, 'CRAWLER_CONFIG_LEASE_TTL', 120)
+        reclaimed = CrawlerTask.objects.filter(
+            config=config,
+            status=CrawlerTask.Status.RUNNING,
+            start_time__lt=timezone.now() - timedelta(seconds=lease_ttl)
+        ).update(
+            status=CrawlerTask.Status.ERROR,
+            error_message='任务中断：抓取租约已过期',
+            end_time=timezone.now()
+        )
+        if reclaimed:
+            logger.warning(f"回收中断的爬虫任务: {config.name} - {reclaimed}个")
+        return reclaimed
+
     @classmethod
     def run_task(cls, task: CrawlerTask) -> bool:
         """
         执行爬虫任务
+        失败时不在当前worker中等待重试，而是按退避时间重新入队
         :param task: 爬虫任务
         :return: 是否执行成功
         """
-        MAX_RETRIES = 3  # 最大重试次数
-        RETRY_INTERVAL = 60  # 重试间隔（秒）
-        
-        for retry_count in range(MAX_RETRIES):
-            try:
-                if retry_count > 0:
-                    logger.info(f"第{retry_count}次重试任务: {task.task_id}")
-                    
-                # 更新任务状态为运行中
-                task.status = 1
-                task.start_time = timezone.now()
-                task.retry_count = retry_count
-                task.save()
-
-                # 获取爬虫配置
-                crawler = cls.get_crawler(task.config)
-                if not crawler:
-                    raise ValueError(f"无法创建爬虫实例: {task.config.name}")
-
-                # 执行爬虫
-                result = cls.crawl_website(task.config, task)
-
-                # 更新任务状态为已完成
-                task.status = 2
-                task.end_time = timezone.now()
-                task.result = {
-                    'status': result['status'],
-                    'total': result.get('total', 0),
-                    'crawl_time': task.end_time.isoformat(),
-                    'retry_count': retry_count,
-                    'stats': {
-                        'total': result.get('total', 0),
-                        'saved': result.get('saved', 0),
-                        'filtered': result.get('filtered', 0),
-                        'error': result.get('error', 0),
-                        'duplicate': result.get('duplicate', 0),
-                        'invalid_time': result.get('invalid_time', 0)
-                    }
-                }
-                task.save()
+        try:
+            if task.retry_count > 0:
+                logger.info(f"第{task.retry_count}次重试任务: {task.task_id}")
 
-                # 更新配置最后运行时间
-                task.config.last_run_time = task.end_time
-                task.config.save()
+            # 更新任务状态为运行中
+            task.status = CrawlerTask.Status.RUNNING
+            task.start_time = timezone.now()
+            task.save()
 
-                return result['status'] == 'success'
+            # 执行爬虫
+            result = cls.crawl_website(task.config, task)
+            if result['status'] == 'error' and cls.schedule_retry(task, result.get('message', '未知错误')):
+                return False
+            cls._complete_task(task, result)
+            return result['status'] == 'success'
 
-            except Exception as e:
-                logger.error(f"执行爬虫任务失败 (重试 {retry_count + 1}/{MAX_RETRIES}): {str(e)}", exc_info=True)
-                
-                if retry_count < MAX_RETRIES - 1:
-                    # 等待一段时间后重试
-                    time.sleep(RETRY_INTERVAL)
-                    continue
-                    
-                # 最后一次重试失败，更新任务状态为出错
-                task.status = 4
-                task.end_time = timezone.now()
-                task.error_message = str(e)
-                task.retry_count = retry_count
-                task.save()
-                
+        except Exception as e:
+            logger.error(f"执行爬虫任务失败: {task.task_id} - {str(e)}", exc_info=True)
+            if cls.schedule_retry(task, str(e)):
                 return False
 
+            task.status = CrawlerTask.Status.ERROR
+            task.end_time = timezone.now()
+            task.error_message = str(e)
+            task.save()
+            return False
+
+    @staticmethod
+    def get_retry_delay(config: CrawlerConfig, retry_count: int) -> float:
+        """
+        重试等待时间：以配置的重试延迟为基数指数退避，并在后一半区间内随机抖动，
+        避免同时失败的数据源在同一时刻重试
+        :param config: 爬虫配置
+        :param retry_count: 已重试次数
+        :return: 等待秒数
+        """
+        base = max(1, config.retry_delay or 0)
+        max_delay = getattr(settings, 'CRAWLER_RETRY_MAX_DELAY', 3600)
+        delay = min(max_delay, base * 2 ** retry_count)
+        return random.uniform(delay / 2, delay)
+
     @classmethod
-    def get_pending_configs(cls) -> List[CrawlerConfig]:
+    def schedule_retry(cls, task: CrawlerTask, error_message: str) -> bool:
         """
-        获取待执行的爬虫配置
-        :return: 配置列表
+        失败的任务在退避时间后由Celery重新执行，当前worker立即释放
+        :param task: 爬虫任务
+        :param error_message: 本次失败的原因
+        :return: 是否已安排重试，重试次数用尽时返回False
         """
-        now = timezone.now()
+        config = task.config
+        if task.retry_count >= config.max_retries:
+            return False
+        if config.breaker_state != breaker.CLOSED:
+            # 熔断器已打开，等待冷却期结束后的探测，不再重试
+            logger.info(f"数据源已熔断，不再重试: {config.name} ({task.task_id})")
+            return False
+
+        from .tasks import run_crawler
+
+        countdown = cls.get_retry_delay(config, task.retry_count)
+        task.retry_count += 1
+        task.status = CrawlerTask.Status.PENDING
+        task.error_message = error_message
+        task.save()
+        try:
+            run_crawler.apply_async(kwargs={'task_id': task.task_id}, countdown=countdown)
+        except Exception as e:
+            logger.error(f"提交重试任务失败: {task.task_id} - {str(e)}")
+            task.retry_count -= 1
+            task.save()
+            return False
+
+        logger.info(
+            f"任务将在{countdown:.0f}秒后第{task.retry_count}/{config.max_retries}次重试: "
+            f"{config.name} ({task.task_id})"
+        )
+        return True
+
+    @classmethod
+    def get_pending_configs(cls, now=None) -> List[CrawlerConfig]:
+        """
+        获取待执行的爬虫配置，按 (status, next_run_at) 索引范围查询
+        :param now: 当前时间
+        :return: 配置列表，最早到期的在前
+        """
+        now = now or timezone.now()
         return (
-            CrawlerConfig.objects.filter(status=1)  # 启用状态
-            .filter(
-                # 从未运行或已到达下次运行时间
-                models.Q(last_run_time__isnull=True)
-                | models.Q(last_run_time__lte=now - models.F("interval"))
-            )
-            .order_by("last_run_time")
+            CrawlerConfig.objects.filter(status=1, next_run_at__lte=now)  # 启用且已到达下次运行时间
+            .order_by("next_run_at")
         )
 
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        """初始化统计信息"""
+        return {
+            'total': 0,
+            'saved': 0,
+            'filtered': 0,
+            'errors': 0,
+            'duplicated': 0,
+            'near_duplicated': 0,
+            'refreshed': 0
+        }
+
+    @classmethod
+    def _skipped_result(cls, config) -> Dict[str, Any]:
+        """数据源的抓取租约被其他worker持有时的结果"""
+        logger.warning(f"数据源正在被其他进程抓取，跳过: {config.name}")
+        return {
+            'status': 'skipped',
+            'message': f"数据源正在被其他进程抓取: {config.name}",
+            'total': 0,
+            **cls._empty_stats()
+        }
+
     @classmethod
     def crawl_website(cls, config, task=None):
         """
         爬取网站
+        抓取期间持有数据源的租约，同一数据源同时只有一个worker抓取
+        :param config: 爬虫配置
+        :param task: 爬虫任务
+        :return: 爬取结果，租约被其他worker持有时status为skipped
+        """
+        lease = get_config_lease(config.id)
+        if not lease.acquire():
+            return cls._skipped_result(config)
+        try:
+            with LeaseHeartbeat([lease]):
+                result = cls._crawl_website(config, task)
+            cls._record_breaker(config, result)
+            return result
+        finally:
+            lease.release()
+
+    @classmethod
+    def _crawl_website(cls, config, task=None):
+        """
+        爬取网站，调用方需持有数据源的租约
         :param config: 爬虫配置
         :param task: 爬虫任务
         :return: 爬取结果
         """
         # 初始化统计信息
-        stats = {
-            'total': 0,
-            'saved': 0,
-            'filtered': 0,
-            'errors': 0,
-            'duplicated': 0
-        }
+        stats = cls._empty_stats()
         
         try:
             # 获取爬虫实例
@@ -242,129 +327,265 @@ class CrawlerService:
                 
             # 执行爬虫
             logger.info(f"开始执行爬虫: {config.name}")
+            crawler.streaming = True
             result = crawler.run()
+            # 解析时跳过的已入库文章计入重复
+            stats['duplicated'] += crawler.skipped_known
+            result = cls._process_crawl_result(config, result, stats)
+            cls._save_source_state(config, crawler.source_state, result)
+            cls._record_yield(config, result)
+            return result
             
-            if result['status'] != 'success':
-                logger.warning(f"爬虫执行失败: {result['message']}")
-                return {
+        except Exception as e:
+            error_msg = f"爬取网站失败: {config.name} - {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return {
+                'status': 'error',
+                'message': error_msg,
+                'total': 0,
+                **stats
+            }
+
+    @classmethod
+    def crawl_websites_concurrently(cls, configs) -> Dict[int, Dict[str, Any]]:
+        """
+        在同一个事件循环中并发爬取多个数据源
+        网络请求在共享的异步抓取器中并发执行，解析在线程池中完成，
+        入库按完成顺序在当前线程中进行，整轮耗时取决于最慢的数据源
+        每个数据源抓取期间持有租约，由同一个心跳线程续期，入库完成后释放
+        :param configs: 爬虫配置列表
+        :return: {配置ID: 爬取结果}
+        """
+        fetcher = get_fetcher()
+        results = {}
+        futures = {}
+        leases = {}
+        heartbeat = LeaseHeartbeat()
+
+        for config in configs:
+            lease = get_config_lease(config.id)
+            if not lease.acquire():
+                results[config.id] = cls._skipped_result(config)
+                continue
+            leases[config.id] = lease
+            heartbeat.add(lease)
+
+            crawler = cls.get_crawler(config)
+            if not crawler:
+                error_msg = f"无法创建爬虫实例: {config.name}"
+                logger.error(error_msg)
+                results[config.id] = {
                     'status': 'error',
-                    'message': result['message'],
-                    'total': 0,
-                    **stats
-                }
-                
-            # 获取文章列表
-            items = result.get('data', [])
-            if not items:
-                logger.warning(f"未获取到任何数据: {config.name}")
-                return {
-                    'status': 'success',
-                    'message': '未获取到数据',
+                    'message': error_msg,
                     'total': 0,
-                    **stats
+                    **cls._empty_stats()
                 }
-                
-            logger.info(f"解析完成: {config.name}, 获取{len(items)}条数据")
-            
-            # 清洗数据
-            cleaned_items = []
-            for item in items:
-                try:
-                    cleaned_item = cls._clean_data(item)
-                    if cleaned_item:
-                        cleaned_items.append(cleaned_item)
-                    else:
-                        stats['filtered'] += 1
-                except Exception as e:
-                    logger.error(f"数据清洗失败: {str(e)}")
-                    stats['errors'] += 1
-                    
-            logger.info(f"数据清洗完成: 原始数据{len(items)}条, 清洗后{len(cleaned_items)}条")
-            
-            # 保存数据
-            for item in cleaned_items:
+                continue
+            crawler.streaming = True
+            futures[fetcher.submit(crawler.run_async())] = (config, crawler)
+
+        logger.info(f"开始并发爬取: 共{len(futures)}个数据源")
+        heartbeat.start()
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                config, crawler = futures[future]
+                stats = cls._empty_stats()
                 try:
-                    result = cls._save_article(item, config)
-                    if result == 'saved':
-                        stats['saved'] += 1
-                    elif result == 'duplicated':
-                        stats['duplicated'] += 1
+                    result = future.result()
+                    stats['duplicated'] += crawler.skipped_known
+                    results[config.id] = cls._process_crawl_result(config, result, stats)
+                    cls._save_source_state(config, crawler.source_state, results[config.id])
+                    cls._record_yield(config, results[config.id])
                 except Exception as e:
-                    logger.error(f"保存文章失败: {str(e)}")
-                    stats['errors'] += 1
-                    
-            logger.info(f"爬取完成: {config.name}, 统计信息: {json.dumps(stats, ensure_ascii=False)}")
+                    error_msg = f"爬取网站失败: {config.name} - {str(e)}"
+                    logger.error(error_msg, exc_info=True)
+                    results[config.id] = {
+                        'status': 'error',
+                        'message': error_msg,
+                        'total': 0,
+                        **stats
+                    }
+                finally:
+                    lease = leases.pop(config.id)
+                    heartbeat.discard(lease)
+                    lease.release()
+        finally:
+            heartbeat.stop()
+            for lease in leases.values():
+                lease.release()
+
+        for config in configs:
+            cls._record_breaker(config, results[config.id])
+        return results
+
+    @classmethod
+    def run_tasks_concurrently(cls, tasks: List[CrawlerTask]) -> Dict[str, bool]:
+        """
+        并发执行一批爬虫任务
+        :param tasks: 爬虫任务列表
+        :return: {任务ID: 是否执行成功}
+        """
+        if not tasks:
+            return {}
+
+        for task in tasks:
+            task.status = CrawlerTask.Status.RUNNING
+            task.start_time = timezone.now()
+            task.save()
+
+        results = cls.crawl_websites_concurrently([task.config for task in tasks])
+
+        outcomes = {}
+        for task in tasks:
+            result = results.get(task.config_id, {'status': 'error', 'message': '未获取到爬取结果'})
+            if not (result['status'] == 'error' and cls.schedule_retry(task, result.get('message', '未知错误'))):
+                cls._complete_task(task, result)
+            outcomes[task.task_id] = result['status'] == 'success'
+        return outcomes
+
+    @staticmethod
+    def _save_source_state(config, state: Dict[str, Any], result: Dict[str, Any]):
+        """
+        文章全部入库成功后保存抓取时记录的数据源状态（条件请求的校验头等）
+        入库出错时保留上次的状态，下次重新获取完整的响应
+        :param config: 爬虫配置
+        :param state: 爬虫的 source_state
+        :param result: _process_crawl_result 返回的结果
+        """
+        if not state or not can_save(result):
+            return
+        try:
+            save_source_state(config, state)
+        except Exception as e:
+            logger.error(f"保存数据源状态失败: {config.name} - {str(e)}")
+
+    @staticmethod
+    def _record_yield(config, result: Dict[str, Any]):
+        """按新增文章数调整数据源的自适应抓取间隔"""
+        try:
+            record_crawl_result(config, result)
+        except Exception as e:
+            logger.error(f"更新自适应抓取间隔失败: {config.name} - {str(e)}")
+
+    @staticmethod
+    def _record_breaker(config, result: Dict[str, Any]):
+        """按抓取结果更新数据源的熔断器"""
+        try:
+            breaker.record_outcome(config, result)
+        except Exception as e:
+            logger.error(f"更新熔断器状态失败: {config.name} - {str(e)}")
+
+    @staticmethod
+    def _complete_task(task: CrawlerTask, result: Dict[str, Any]):
+        """
+        根据爬取结果更新任务和配置状态
+        :param task: 爬虫任务
+        :param result: crawl_website返回的结果
+        """
+        task.end_time = timezone.now()
+        retry_count = task.retry_count
+        task.result = {
+            'status': result['status'],
+            'total': result.get('total', 0),
+            'items_count': result.get('saved', 0),
+            'not_modified': result.get('not_modified', False),
+            'crawl_time': task.end_time.isoformat(),
+            'retry_count': retry_count,
+            'stats': {
+                'total': result.get('total', 0),
+                'saved': result.get('saved', 0),
+                'filtered': result.get('filtered', 0),
+                'error': result.get('errors', 0),
+                'duplicate': result.get('duplicated', 0),
+                'near_duplicate': result.get('near_duplicated', 0),
+                'refreshed': result.get('refreshed', 0),
+                'invalid_time': result.get('invalid_time', 0)
+            }
+        }
+        if result['status'] == 'success':
+            task.status = CrawlerTask.Status.COMPLETED
+        elif result['status'] == 'skipped':
+            # 其他worker正在抓取，不更新配置的运行时间
+            task.status = CrawlerTask.Status.CANCELLED
+            task.error_message = result['message']
+            task.save()
+            return
+        else:
+            task.status = CrawlerTask.Status.ERROR
+            task.error_message = result.get('message', '未知错误')
+        task.save()
+
+        task.config.last_run_time = task.end_time
+        task.config.save(update_fields=['last_run_time'])
+
+    @classmethod
+    def _process_crawl_result(cls, config, result: Dict[str, Any], stats: Dict[str, int]) -> Dict[str, Any]:
+        """
+        清洗并保存爬虫运行结果
+        :param config: 爬虫配置
+        :param result: 爬虫run()的返回结果
+        :param stats: 统计信息
+        :return: 爬取结果
+        """
+        if result['status'] != 'success':
+            logger.warning(f"爬虫执行失败: {result['message']}")
+            return {
+                'status': 'error',
+                'message': result['message'],
+                'total': 0,
+                **stats
+            }
             
+        # 数据源未更新，无需解析和入库
+        if result.get('not_modified'):
+            logger.info(f"数据源未更新: {config.name}")
             return {
                 'status': 'success',
-                'message': '爬取成功',
-                'total': len(items),
+                'message': '数据源未更新',
+                'total': 0,
+                'not_modified': True,
                 **stats
             }
-            
-        except Exception as e:
-            error_msg = f"爬取网站失败: {config.name} - {str(e)}"
-            logger.error(error_msg, exc_info=True)
+
+        # 解析结果逐条清洗、去重，每满一个批次写入一次，不保留完整的清洗结果
+        # 分页抓取的结果在 pages 中逐页生成，每页获取后立即入库，不保留之前页面的文章
+        seen_urls = set()
+        try:
+            for items in result.get('pages') or [result.get('data') or []]:
+                save_stream(iter_unique(iter_records(items, stats), stats, seen_urls), config, stats)
+        except FetchError as e:
+            logger.warning(f"爬虫执行失败: {str(e)}")
             return {
                 'status': 'error',
-                'message': error_msg,
-                'total': 0,
+                'message': str(e),
                 **stats
             }
+
+        if not stats['total']:
+            logger.warning(f"未获取到任何数据: {config.name}")
+            return {
+                'status': 'success',
+                'message': '未获取到数据',
+                **stats
+            }
+
+        logger.info(f"爬取完成: {config.name}, 统计信息: {json.dumps(stats, ensure_ascii=False)}")
+
+        return {
+            'status': 'success',
+            'message': '爬取成功',
+            **stats
+        }
     
     @staticmethod
     def _clean_data(item):
-        """清洗数据项"""
+        """清洗数据项，返回字典"""
         try:
-            # 检查输入类型
-            if not isinstance(item, (dict, int, float, str)):
-                logger.error(f"不支持的数据类型: {type(item)}")
-                return None
-                
-            # 如果是数字类型,转换为字典格式
-            if isinstance(item, (int, float)):
-                    item = {
-                    'title': str(item),
-                    'url': '',
-                    'content': str(item),
-                    'description': str(item),
-                    'author': '',
-                    'source': '',
-                    'pub_time': None,
-                    'tags': [],
-                    'images': []
-                }
-                
-            # 如果是字符串,尝试解析为JSON
-            if isinstance(item, str):
-                try:
-                    item = json.loads(item)
-                except json.JSONDecodeError:
-                    logger.error(f"JSON解析失败: {item}")
-                    return None
-
-            # 验证必要字段
-            if not item.get('title') or not item.get('url'):
-                logger.warning(f"缺少必要字段: {item}")
-                return None
-
-            # 清洗各个字段
-            cleaned_item = {
-                'title': item.get('title', '').strip(),
-                'url': item.get('url', '').strip(),
-                'content': item.get('content', '').strip(),
-                'description': item.get('description', '').strip(),
-                'author': item.get('author', '').strip(),
-                'source': item.get('source', '').strip(),
-                'pub_time': item.get('pub_time'),
-                'tags': item.get('tags', []),
-                'images': item.get('images', [])
-            }
-
-            return cleaned_item
+            record = clean_item(item)
         except Exception as e:
             logger.error(f"数据清洗失败: {str(e)}")
             return None
+        return record.to_dict() if record else None
 
     @staticmethod
     def _save_article(item: Dict, config) -> str:
@@ -380,92 +601,13 @@ class CrawlerService:
                 'filtered': 被过滤
                 'duplicated': 重复文章
         """
-        try:
-            # 检查是否已存在
-            source_url = item.get('source_url', item.get('url', ''))
-            if not source_url:
-                logger.warning(f"缺少URL: {item}")
-                return 'filtered'
-                
-            if NewsArticle.objects.filter(source_url=source_url).exists():
-                logger.info(f"文章已存在: {item['title']}")
-                return 'duplicated'
-                
-            # 创建文章对象
-            article_data = {
-                'title': item['title'],
-                'source_url': source_url,
-                'content': item.get('content', ''),
-                'summary': item.get('summary', item.get('description', '')),
-                'author': item.get('author', ''),
-                'source': item.get('source', config.name),
-                'publish_time': item.get('publish_time', item.get('pub_time', timezone.now())),
-                'crawler': config.id,
-                'status': item.get('status', NewsArticle.Status.DRAFT)
-            }
-            
-            # 使用序列化器保存
-            serializer = NewsArticleCreateSerializer(data=article_data)
-            if serializer.is_valid():
-                serializer.save()
-                logger.info(f"保存文章成功: {item['title']}")
-                return 'saved'
-            else:
-                logger.error(f"保存文章失败: {serializer.errors}")
-                return 'filtered'
-            
-        except Exception as e:
-            logger.error(f"保存文章失败: {str(e)}")
-            raise
+        stats = save_articles([item], config)
+        for result in ('saved', 'duplicated', 'filtered'):
+            if stats[result]:
+                return result
+        raise CrawlerError(f"保存文章失败: {item.get('title')}")
 
     def save_news_articles(self, source_name, items, stats, config=None):
         """保存新闻文章"""
-        logger = logging.getLogger(__name__)
         logger.info(f"开始保存{len(items)}条新闻")
-
-        for item in items:
-            source_url = item.get('url')
-            if not source_url:
-                stats['filtered'] += 1
-                logger.warning(f"source_url为空: {item}")
-                continue
-
-            try:
-                # 检查重复
-                if NewsArticle.objects.filter(source_url=source_url).exists():
-                    stats['duplicated'] += 1
-                    logger.info(f"文章已存在: {source_url}")
-                    continue
-
-                # 创建新闻文章
-                article_data = {
-                    'title': item.get('title'),
-                    'source_url': source_url,
-                    'content': item.get('content', ''),
-                    'summary': item.get('description', ''),
-                    'author': item.get('author', ''),
-                    'source': item.get('source', source_name),
-                    'publish_time': item.get('pub_time', timezone.now()),
-                    'crawler': config.id if config else None,
-                    'status': NewsArticle.Status.DRAFT,
-                }
-
-                logger.debug(f"准备保存文章: {article_data}")
-                    
-                serializer = NewsArticleCreateSerializer(data=article_data)
-                if serializer.is_valid():
-                    serializer.save()
-                    stats['saved'] += 1
-                    logger.info(f"成功保存文章: {source_url}")
-                else:
-                    stats['errors'] += 1
-                    logger.error(f"保存文章失败: {serializer.errors}")
-                    logger.error(f"文章数据: {article_data}")
-
-            except Exception as e:
-                stats['errors'] += 1
-                logger.error(f"保存文章失败: {str(e)}", exc_info=True)
-                logger.error(f"文章数据: {article_data}")
-
-        logger.info(f"新闻保存完成，共处理{len(items)}条新闻，成功保存{stats['saved']}条，重复{stats['duplicated']}条，过滤{stats['filtered']}条，错误{stats['errors']}条")
-        return stats
\ No newline at end of file
+        return save_articles(items, config, stats, source_name=source_name)
\ No newline at end of file
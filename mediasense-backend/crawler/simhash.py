@@ -0,0 +1,225 @@
+"""
+近似重复检测
+
+同一篇通稿会以不同URL出现在多个数据源，source_url 唯一约束无法识别。
+入库时对清洗后的标题和正文计算64位 SimHash，并拆成4段16位的分段值分别建索引：
+汉明距离不超过3的两个指纹至少有一段完全相同，因此只需按分段等值查询候选，
+再在候选中精确计算汉明距离。
+
+近似重复的文章仍然入库，但通过 duplicate_of 关联到最早入库的原文，
+AI分析和搜索索引只处理原文。
+"""
+
+import datetime
+import hashlib
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+BAND_FIELDS = tuple(f'simhash_band{i}' for i in range(BAND_COUNT))
+
+# 分段数决定了能保证召回的最大汉明距离
+MAX_DISTANCE = BAND_COUNT - 1
+
+# 中文以相邻两个字符为特征，对首尾增删内容的转载稿比更长的片段稳定
+SHINGLE_SIZE = 2
+# 归一化后少于该长度的文本不计算指纹，过短的文本容易误判
+MIN_TEXT_LENGTH = 100
+
+_STRIP_RE = re.compile(r'<[^>]+>|&[a-zA-Z#0-9]+;|[\W_]+', re.UNICODE)
+
+
+def get_max_distance() -> int:
+    """判定为近似重复的最大汉明距离"""
+    return min(getattr(settings, 'CRAWLER_SIMHASH_DISTANCE', 3), MAX_DISTANCE)
+
+
+def get_window_days() -> int:
+    """只在最近几天入库的文章中查找原文"""
+    return getattr(settings, 'CRAWLER_SIMHASH_WINDOW_DAYS', 7)
+
+
+def normalize_text(text: str) -> str:
+    """去掉HTML标签、实体、空白和标点，转为小写"""
+    return _STRIP_RE.sub('', text or '').lower()
+
+
+def compute_simhash(title: str, content: str) -> Optional[int]:
+    """
+    计算标题和正文的64位 SimHash
+    特征为归一化文本中相邻的 SHINGLE_SIZE 个字符，权重为出现次数
+    :param title: 标题
+    :param content: 正文
+    :return: 无符号64位整数，文本过短时返回None
+    """
+    text = normalize_text(title) + normalize_text(content)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+
+    shingles = Counter(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+    # 按字节累计权重，避免对每个片段逐位循环
+    byte_weights = [[0] * 256 for _ in range(SIMHASH_BITS // 8)]
+    total = 0
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        for position, value in enumerate(digest):
+            byte_weights[position][value] += weight
+        total += weight
+
+    fingerprint = 0
+    for position, weights in enumerate(byte_weights):
+        bit_weights = [0] * 8
+        for value, weight in enumerate(weights):
+            if weight:
+                for bit in range(8):
+                    if value >> bit & 1:
+                        bit_weights[bit] += weight
+        for bit, weight in enumerate(bit_weights):
+            # 该位为1的权重超过一半
+            if weight * 2 > total:
+                fingerprint |= 1 << ((7 - position) * 8 + bit)
+    return fingerprint
+
+
+def to_signed(value: int) -> int:
+    """无符号64位整数转换为 BigIntegerField 可存储的有符号整数"""
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    """有符号整数还原为无符号64位整数"""
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+
+def split_bands(fingerprint: int) -> Tuple[int, ...]:
+    """将指纹拆分为 BAND_COUNT 段"""
+    return tuple((fingerprint >> (i * BAND_BITS)) & BAND_MASK for i in range(BAND_COUNT))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个指纹的汉明距离"""
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count('1')
+
+
+def assign_fingerprint(article) -> Optional[int]:
+    """
+    计算文章指纹并写入 simhash 和分段字段
+    :param article: 未保存的NewsArticle
+    :return: 无符号指纹，文本过短时返回None
+    """
+    fingerprint = compute_simhash(article.title, article.content)
+    if fingerprint is None:
+        return None
+    article.simhash = to_signed(fingerprint)
+    for field, band in zip(BAND_FIELDS, split_bands(fingerprint)):
+        setattr(article, field, band)
+    return fingerprint
+
+
+def find_candidates(model, fingerprints: List[int]) -> List[Tuple[int, int, Optional[int], str]]:
+    """
+    按分段索引一次查询一批指纹的候选文章
+    :param model: 文章模型
+    :param fingerprints: 无符号指纹列表
+    :return: 最近入库的候选 [(id, 无符号指纹, duplicate_of_id, source_url)]，按ID升序
+    """
+    query = Q()
+    for i, field in enumerate(BAND_FIELDS):
+        query |= Q(**{f'{field}__in': {split_bands(fingerprint)[i] for fingerprint in fingerprints}})
+
+    since = timezone.now() - datetime.timedelta(days=get_window_days())
+    rows = (
+        model.objects.filter(query, created_at__gte=since, simhash__isnull=False)
+        .values_list('id', 'simhash', 'duplicate_of_id', 'source_url')
+        .order_by('id')
+    )
+    return [
+        (article_id, to_unsigned(simhash), duplicate_of_id, url)
+        for article_id, simhash, duplicate_of_id, url in rows
+    ]
+
+
+class SimHashIndex:
+    """内存中的分段指纹索引，按加入顺序返回匹配项"""
+
+    def __init__(self, max_distance: Optional[int] = None):
+        self.max_distance = get_max_distance() if max_distance is None else max_distance
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(BAND_COUNT)]
+        self._items: List[Tuple[int, Any]] = []
+
+    def add(self, fingerprint: int, payload: Any):
+        index = len(self._items)
+        self._items.append((fingerprint, payload))
+        for bands, band in zip(self._bands, split_bands(fingerprint)):
+            bands.setdefault(band, []).append(index)
+
+    def find_all(self, fingerprint: int) -> List[Any]:
+        """查找汉明距离不超过阈值的全部项，按加入顺序排列"""
+        matches = set()
+        for bands, band in zip(self._bands, split_bands(fingerprint)):
+            for index in bands.get(band, ()):
+                if index in matches:
+                    continue
+                if hamming_distance(self._items[index][0], fingerprint) <= self.max_distance:
+                    matches.add(index)
+        return [self._items[index][1] for index in sorted(matches)]
+
+
+def link_near_duplicates(model, articles: List[Any], batch_size: int = 500) -> List[Tuple[Any, Any]]:
+    """
+    为未保存的文章计算指纹，并关联最早入库的原文
+    批次内的近似重复文章在入库后才有主键，以 (重复文章, 批次内原文) 返回，由调用方入库后补写
+    :param model: 文章模型
+    :param articles: 未保存的文章
+    :param batch_size: 单次候选查询的指纹数量
+    :return: 批次内的近似重复关系
+    """
+    fingerprints = []
+    for article in articles:
+        fingerprint = assign_fingerprint(article)
+        if fingerprint is not None:
+            fingerprints.append((article, fingerprint))
+    if not fingerprints:
+        return []
+
+    stored = SimHashIndex()
+    try:
+        rows = []
+        for start in range(0, len(fingerprints), batch_size):
+            rows.extend(find_candidates(model, [fp for _, fp in fingerprints[start:start + batch_size]]))
+        for article_id, fingerprint, duplicate_of_id, url in sorted(set(rows)):
+            stored.add(fingerprint, (article_id, duplicate_of_id, url))
+    except Exception as e:
+        logger.error(f"查询近似重复文章失败: {str(e)}")
+
+    batch = SimHashIndex(stored.max_distance)
+    pending = []
+    for article, fingerprint in fingerprints:
+        # 已入库的同URL文章不算原文，该文章会按URL去重
+        matches = [match for match in stored.find_all(fingerprint) if match[2] != article.source_url]
+        if matches:
+            article_id, duplicate_of_id, _ = matches[0]
+            # 候选本身是重复文章时关联到它的原文
+            article.duplicate_of_id = duplicate_of_id or article_id
+            logger.info(f"近似重复文章: {article.source_url} -> {article.duplicate_of_id}")
+            continue
+
+        matches = batch.find_all(fingerprint)
+        if matches:
+            pending.append((article, matches[0]))
+            logger.info(f"近似重复文章: {article.source_url} -> {matches[0].source_url}")
+        else:
+            batch.add(fingerprint, article)
+    return pending
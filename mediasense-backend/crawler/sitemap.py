@@ -0,0 +1,369 @@
+"""
+站点地图增量发现
+
+网页数据源配置 config_data['sitemap'] 后，WebCrawler 不再抓取列表页，而是读取站点地图
+（包括站点地图索引和新闻站点地图），只把新增或 lastmod 更新的URL交给详情页抓取：
+- 站点地图边下载边解析，每处理完一个 <url> 就释放，内存占用与文件大小无关
+- 详情页抓取成功、文章入库后记录URL的 lastmod（SitemapURL），下次 lastmod 没有变化的URL直接跳过
+- 站点地图索引中 lastmod 没有变化的子站点地图不再下载
+- 每次最多发现 max_urls 个URL，剩余的URL留到下次抓取
+
+配置示例:
+    'sitemap': {
+        'urls': ['https://example.com/sitemap_index.xml'],  # 默认为站点根目录的 /sitemap.xml
+        'max_urls': 200,        # 默认为 CRAWLER_SITEMAP_MAX_URLS
+        'max_files': 50,        # 每次最多下载的站点地图文件数，默认为 CRAWLER_SITEMAP_MAX_FILES
+        'include': '/news/',    # 只处理匹配该正则的URL
+        'exclude': '/video/',   # 跳过匹配该正则的URL
+        'max_age_days': 7       # 跳过 lastmod 早于该天数的URL
+    }
+"""
+
+import datetime
+import gzip
+import io
+import logging
+import re
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from lxml import etree
+
+from .dateparse import parse_date
+from .models import SitemapURL
+from .persistence import chunked, get_batch_size
+
+logger = logging.getLogger(__name__)
+
+# 站点地图条目类型
+URL = 'url'
+SITEMAP = 'sitemap'
+
+# 记录在爬虫 source_state 上、入库成功后保存的条目：已抓取的URL和已读完的子站点地图
+STATE_URLS = 'sitemap_urls'
+STATE_SITEMAPS = 'sitemaps'
+
+GZIP_MAGIC = b'\x1f\x8b'
+BATCH_SIZE = 500
+
+
+def get_sitemap_config(config) -> Optional[Dict[str, Any]]:
+    """
+    读取数据源的站点地图配置
+    :param config: 爬虫配置
+    :return: 配置字典，未启用时返回None
+    """
+    value = config.config_data.get('sitemap')
+    if not value:
+        return None
+    if value is True:
+        return {}
+    if isinstance(value, str):
+        return {'urls': [value]}
+    if isinstance(value, list):
+        return {'urls': value}
+    return value if isinstance(value, dict) else None
+
+
+def _localname(tag: Any) -> str:
+    """去掉命名空间的标签名，注释和处理指令返回空字符串"""
+    return etree.QName(tag).localname if isinstance(tag, str) else ''
+
+
+def _text(node) -> Optional[str]:
+    text = (node.text or '').strip()
+    return text or None
+
+
+def iter_sitemap(stream: BinaryIO) -> Iterator[Tuple[str, Dict[str, Optional[str]]]]:
+    """
+    流式解析站点地图
+    :param stream: 站点地图内容的文件对象
+    :return: (条目类型, 条目) 迭代器，条目类型为 'url' 或 'sitemap'，
+             条目包含 url、lastmod，新闻站点地图还包含 title、pub_time
+    :raises: lxml.etree.XMLSyntaxError 当内容不是合法的XML时
+    """
+    context = etree.iterparse(stream, events=('end',), resolve_entities=False, no_network=True, huge_tree=True)
+    for _, elem in context:
+        kind = _localname(elem.tag)
+        if kind not in (URL, SITEMAP):
+            continue
+
+        entry = {'url': None, 'lastmod': None, 'title': None, 'pub_time': None}
+        # 只取直接子节点的 <loc>，<image:image> 等扩展中也有 <loc>
+        for child in elem:
+            name = _localname(child.tag)
+            if name == 'loc':
+                entry['url'] = _text(child)
+            elif name == 'lastmod':
+                entry['lastmod'] = _text(child)
+            elif name == 'news':
+                for item in child:
+                    item_name = _localname(item.tag)
+                    if item_name == 'title':
+                        entry['title'] = _text(item)
+                    elif item_name == 'publication_date':
+                        entry['pub_time'] = _text(item)
+
+        # 释放已处理的节点
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+        if entry['url']:
+            yield kind, entry
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    解析 lastmod，没有时区的时间按UTC处理
+    :return: 带时区的datetime，无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        dt = parse_date(value)
+    except Exception:
+        return None
+    if dt is None:
+        return None
+    if timezone.is_naive(dt):
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt
+
+
+def is_changed(entry: Dict[str, Optional[str]], previous: Optional[datetime.datetime]) -> bool:
+    """
+    已记录过的URL是否有更新
+    :param entry: 站点地图条目
+    :param previous: 上次记录的 lastmod
+    """
+    lastmod = parse_lastmod(entry.get('lastmod'))
+    if lastmod is None:
+        return False
+    return previous is None or lastmod > previous
+
+
+def open_stream(response) -> BinaryIO:
+    """
+    打开响应体的流，.xml.gz 形式的站点地图边读取边解压
+    :param response: 以 stream=True 发送请求得到的 requests.Response
+    """
+    raw = response.raw
+    # 由urllib3处理 Content-Encoding；读完后不自动关闭，否则 BufferedReader 会报错
+    raw.decode_content = True
+    raw.auto_close = False
+    stream = io.BufferedReader(raw)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def get_recorded(config, urls: List[str], is_sitemap: bool = False) -> Dict[str, Optional[datetime.datetime]]:
+    """
+    查询已记录的URL
+    :param config: 爬虫配置
+    :param urls: URL列表
+    :param is_sitemap: 是否查询子站点地图
+    :return: URL到上次记录的 lastmod 的映射
+    """
+    if not config.pk or not urls:
+        return {}
+    return dict(
+        SitemapURL.objects.filter(config_id=config.pk, is_sitemap=is_sitemap, url__in=urls)
+        .values_list('url', 'lastmod')
+    )
+
+
+def record_entries(config, entries: Iterable[Dict[str, Optional[str]]], is_sitemap: bool = False) -> int:
+    """
+    记录已处理的URL及其 lastmod，已有记录时更新
+    :param config: 爬虫配置
+    :param entries: 站点地图条目
+    :param is_sitemap: 是否为子站点地图
+    :return: 记录的URL数
+    """
+    if not config.pk:
+        return 0
+    objs = [
+        SitemapURL(config_id=config.pk, url=entry['url'], lastmod=parse_lastmod(entry.get('lastmod')),
+                   is_sitemap=is_sitemap)
+        for entry in entries
+    ]
+    if not objs:
+        return 0
+    # MySQL 的 ON DUPLICATE KEY UPDATE 不能指定冲突字段
+    unique_fields = ['config', 'url'] if connection.features.supports_update_conflicts_with_target else None
+    SitemapURL.objects.bulk_create(
+        objs,
+        batch_size=get_batch_size(),
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=['lastmod', 'is_sitemap', 'updated_at']
+    )
+    return len(objs)
+
+
+class SitemapDiscovery:
+    """从站点地图中找出新增或更新的URL"""
+
+    def __init__(self, crawler, sitemap: Dict[str, Any]):
+        """
+        :param crawler: WebCrawler，需要提供 request、wait_for_request_slot 和 get_known_urls
+        :param sitemap: get_sitemap_config 返回的配置
+        """
+        self.crawler = crawler
+        self.config = crawler.config
+        urls = sitemap.get('urls') or [urljoin(crawler.source_url, '/sitemap.xml')]
+        self.sitemap_urls = [urls] if isinstance(urls, str) else list(urls)
+        self.max_urls = sitemap.get('max_urls') or getattr(settings, 'CRAWLER_SITEMAP_MAX_URLS', 200)
+        self.max_files = sitemap.get('max_files') or getattr(settings, 'CRAWLER_SITEMAP_MAX_FILES', 50)
+        self.include = re.compile(sitemap['include']) if sitemap.get('include') else None
+        self.exclude = re.compile(sitemap['exclude']) if sitemap.get('exclude') else None
+        max_age_days = sitemap.get('max_age_days')
+        self.min_lastmod = timezone.now() - datetime.timedelta(days=max_age_days) if max_age_days else None
+
+    def accept(self, entry: Dict[str, Optional[str]]) -> bool:
+        """按URL规则和 max_age_days 过滤条目"""
+        url = entry['url']
+        if not url.startswith(('http://', 'https://')):
+            return False
+        if self.include is not None and not self.include.search(url):
+            return False
+        if self.exclude is not None and self.exclude.search(url):
+            return False
+        if self.min_lastmod is not None:
+            lastmod = parse_lastmod(entry.get('lastmod'))
+            if lastmod is not None and lastmod < self.min_lastmod:
+                return False
+        return True
+
+    def select(self, batch: List[Dict[str, Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+        """
+        从一批条目中选出新增或更新的URL
+        新URL中已入库的文章只记录 lastmod，不再抓取
+        :param batch: 站点地图条目
+        :return: 需要抓取的条目
+        """
+        recorded = get_recorded(self.config, [entry['url'] for entry in batch])
+        fresh = [
+            entry for entry in batch
+            if entry['url'] not in recorded or is_changed(entry, recorded[entry['url']])
+        ]
+
+        known = self.crawler.get_known_urls(entry['url'] for entry in fresh if entry['url'] not in recorded)
+        if known:
+            record_entries(self.config, (entry for entry in fresh if entry['url'] in known))
+            fresh = [entry for entry in fresh if entry['url'] not in known]
+        return fresh
+
+    def fresh_sitemaps(self, children: List[Dict[str, Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+        """
+        站点地图索引中需要下载的子站点地图，lastmod 没有变化的跳过
+        :param children: 子站点地图条目
+        """
+        recorded = {}
+        for batch in chunked([entry['url'] for entry in children], BATCH_SIZE):
+            recorded.update(get_recorded(self.config, batch, is_sitemap=True))
+        return [
+            entry for entry in children
+            if entry['url'] not in recorded or is_changed(entry, recorded[entry['url']])
+        ]
+
+    def read(self, url: str, found: List[Dict[str, Optional[str]]],
+             seen: Set[str]) -> Tuple[List[Dict[str, Optional[str]]], bool]:
+        """
+        读取一个站点地图文件
+        :param url: 站点地图URL
+        :param found: 已发现的条目，新发现的条目追加到其中
+        :param seen: 本次已经出现过的URL
+        :return: (子站点地图条目, 是否读完了整个文件)
+        """
+        self.crawler.wait_for_request_slot(url)
+        response = self.crawler.request(url, timeout=30, stream=True)
+        try:
+            response.raise_for_status()
+            children = []
+            batch = []
+            for kind, entry in iter_sitemap(open_stream(response)):
+                if kind == SITEMAP:
+                    children.append(entry)
+                    continue
+                if entry['url'] in seen or not self.accept(entry):
+                    continue
+                seen.add(entry['url'])
+                batch.append(entry)
+                if len(batch) >= BATCH_SIZE:
+                    if self._collect(batch, found):
+                        return children, False
+                    batch = []
+            if batch and self._collect(batch, found):
+                return children, False
+            return children, True
+        finally:
+            response.close()
+
+    def _collect(self, batch: List[Dict[str, Optional[str]]], found: List[Dict[str, Optional[str]]]) -> bool:
+        """
+        把一批条目中需要抓取的URL加入 found
+        :return: 是否已达到 max_urls
+        """
+        fresh = self.select(batch)
+        room = self.max_urls - len(found)
+        found.extend(fresh[:room])
+        return len(fresh) >= room
+
+    def discover(self) -> Dict[str, Any]:
+        """
+        读取站点地图，找出新增或更新的URL
+        :return: 包含状态和数据的字典，data 为需要抓取的条目列表
+        """
+        found: List[Dict[str, Optional[str]]] = []
+        seen: Set[str] = set()
+        visited: Set[str] = set()
+        pending: List[Dict[str, Optional[str]]] = [{'url': url, 'lastmod': None} for url in self.sitemap_urls]
+        fetched = 0
+        errors = []
+
+        while pending and len(found) < self.max_urls:
+            sitemap = pending.pop(0)
+            if sitemap['url'] in visited:
+                continue
+            if fetched >= self.max_files:
+                logger.warning(f"{self.crawler.source_name} 站点地图文件数超过{self.max_files}个，剩余的下次读取")
+                break
+            visited.add(sitemap['url'])
+            fetched += 1
+
+            try:
+                children, complete = self.read(sitemap['url'], found, seen)
+            except Exception as e:
+                logger.error(f"读取站点地图失败: {sitemap['url']}, {str(e)}")
+                errors.append(f"{sitemap['url']}: {str(e)}")
+                continue
+
+            if children:
+                fresh = self.fresh_sitemaps(children)
+                logger.info(f"{self.crawler.source_name} 站点地图索引中有{len(children)}个子站点地图，"
+                            f"{len(fresh)}个有更新")
+                pending.extend(fresh)
+            # 子站点地图全部读完才记录 lastmod，未读完的部分下次继续；入库成功后才保存
+            if complete and not children and sitemap.get('lastmod'):
+                self.crawler.source_state.setdefault(STATE_SITEMAPS, []).append(sitemap)
+
+        logger.info(f"{self.crawler.source_name} 从站点地图发现{len(found)}个新增或更新的URL")
+        if not found and errors:
+            return {
+                'status': 'error',
+                'message': f"读取站点地图失败: {'; '.join(errors)}",
+                'data': []
+            }
+        return {
+            'status': 'success',
+            'message': '成功读取站点地图',
+            'data': found,
+            'sitemap': True
+        }
@@ -0,0 +1,58 @@
+"""
+数据源抓取状态
+
+条件请求的校验头（ETag / Last-Modified）、统计识别出的页面编码、站点地图中已抓取的URL等
+状态在抓取时只记录在爬虫的 source_state 上，随抓取结果交给服务层，文章全部入库成功后才保存。
+解析或入库失败时保留上次的状态，下次抓取重新获取完整的响应，
+不会因为304或站点地图 lastmod 没有变化而丢失没有入库的文章。
+
+保存在抓取之后的同步流程中执行，不会在事件循环中访问数据库。
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from .sitemap import STATE_SITEMAPS, STATE_URLS, record_entries
+
+logger = logging.getLogger(__name__)
+
+# 保存到 CrawlerConfig 上的字段
+CONFIG_FIELDS = ('etag', 'last_modified', 'detected_encoding')
+
+
+def can_save(result: Optional[Dict[str, Any]]) -> bool:
+    """
+    抓取结果是否全部入库成功
+    :param result: 服务层处理后的抓取结果
+    """
+    return bool(result) and result.get('status') == 'success' and not result.get('errors')
+
+
+def save_source_state(config, state: Optional[Dict[str, Any]]) -> bool:
+    """
+    保存抓取时记录的数据源状态，只更新有变化的字段
+    :param config: 爬虫配置
+    :param state: 爬虫的 source_state
+    :return: 是否写入了数据库
+    """
+    if not state or not config.pk:
+        return False
+
+    saved = False
+    if state.get(STATE_URLS):
+        saved = record_entries(config, state[STATE_URLS]) > 0
+    if state.get(STATE_SITEMAPS):
+        saved = record_entries(config, state[STATE_SITEMAPS], is_sitemap=True) > 0 or saved
+
+    fields = {
+        field: state[field] for field in CONFIG_FIELDS
+        if field in state and state[field] != getattr(config, field, None)
+    }
+    if not fields:
+        return saved
+
+    # 只更新这些字段，不覆盖其他字段，也不修改 updated_at
+    type(config).objects.filter(pk=config.pk).update(**fields)
+    for field, value in fields.items():
+        setattr(config, field, value)
+    return True
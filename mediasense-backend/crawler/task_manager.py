@@ -1,22 +1,31 @@
 import logging
 import threading
-import time
 from typing import Optional
 
 from django.conf import settings
+from django.utils import timezone
 
+from .breaker import allow_dispatch
+from .locks import get_scheduler_lease
+from .scheduler import DueScheduler
 from .services import CrawlerService
 
 logger = logging.getLogger(__name__)
 
 
 class CrawlerTaskManager:
-    """爬虫任务调度管理器"""
+    """
+    爬虫任务调度管理器
+    按最早到期的数据源精确休眠，最长不超过检查间隔；
+    多个进程中只有持有调度租约的一个分发任务
+    """
 
     def __init__(self):
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._check_interval = getattr(settings, "CRAWLER_CHECK_INTERVAL", 60)  # 默认60秒检查一次
+        self._wakeup = threading.Event()
+        self._check_interval = getattr(settings, "CRAWLER_CHECK_INTERVAL", 60)  # 最长60秒检查一次
+        self._scheduler = DueScheduler(horizon=self._check_interval)
 
     def start(self):
         """启动任务调度"""
@@ -25,6 +34,7 @@ class CrawlerTaskManager:
             return
 
         self._running = True
+        self._wakeup.clear()
         self._thread = threading.Thread(target=self._run)
         self._thread.daemon = True
         self._thread.start()
@@ -37,38 +47,63 @@ class CrawlerTaskManager:
             return
 
         self._running = False
+        self._wakeup.set()
         if self._thread:
             self._thread.join()
             self._thread = None
+        get_scheduler_lease().release()
         logger.info("任务调度管理器已停止")
 
     def _run(self):
         """运行任务调度循环"""
+        lease = get_scheduler_lease()
         while self._running:
             try:
-                # 获取待执行的爬虫配置
-                configs = CrawlerService.get_pending_configs()
+                if not lease.acquire_or_renew():
+                    # 其他进程是领导者，租约到期前再尝试
+                    self._wakeup.wait(lease.ttl / 3)
+                    continue
+                self._run_due()
+                timeout = self._scheduler.seconds_until_next()
+            except Exception as e:
+                logger.error(f"任务调度循环出错: {str(e)}")
+                timeout = self._check_interval
 
-                # 为每个配置创建并执行任务
-                for config in configs:
-                    try:
-                        # 创建任务
-                        task = CrawlerService.create_task(config)
-                        if not task:
-                            continue
+            # 休眠到下一个数据源到期
+            self._wakeup.wait(min(timeout, self._check_interval))
 
-                        # 执行任务
-                        CrawlerService.run_task(task)
+    def _run_due(self):
+        """执行已到期的爬虫配置"""
+        now = timezone.now()
+        if self._scheduler.needs_reload(now):
+            self._scheduler.load(now)
 
-                    except Exception as e:
-                        logger.error(f"处理爬虫配置 {config.name} 时出错: {str(e)}")
-                        continue
+        config_ids = self._scheduler.pop_due(now)
+        if not config_ids:
+            return
 
-            except Exception as e:
-                logger.error(f"任务调度循环出错: {str(e)}")
+        # 堆中的时间可能已过期，按索引确认仍然到期
+        configs = list(CrawlerService.get_pending_configs(now).filter(id__in=config_ids))
 
-            # 等待下次检查
-            time.sleep(self._check_interval)
+        # 为每个配置创建任务
+        tasks = []
+        for config in configs:
+            try:
+                if not allow_dispatch(config):
+                    logger.info(f"数据源已熔断，跳过调度: {config.name}")
+                    continue
+                task = CrawlerService.create_task(config)
+                if task:
+                    tasks.append(task)
+            except Exception as e:
+                logger.error(f"处理爬虫配置 {config.name} 时出错: {str(e)}")
+                continue
+
+        # 在同一个事件循环中并发执行本轮所有任务
+        if tasks:
+            CrawlerService.run_tasks_concurrently(tasks)
+            for task in tasks:
+                self._scheduler.push(task.config)
 
 
 # 创建全局任务管理器实例
@@ -1,10 +1,14 @@
 import logging
+import time
 import uuid
-from celery import shared_task
+from celery import chain, chord, shared_task
 from celery.utils.log import get_task_logger
+from django.conf import settings
 from django.utils import timezone
-from datetime import timedelta
 
+from .breaker import allow_dispatch
+from . import pipeline
+from .locks import get_scheduler_lease
 from .models import CrawlerTask, CrawlerConfig
 from .services import CrawlerService
 
@@ -21,6 +25,7 @@ logger.addHandler(file_handler)
 def run_crawler(self, config_id=None, task_id=None):
     """
     运行爬虫任务
+    失败时按配置的 max_retries/retry_delay 指数退避后重新入队，不阻塞当前worker
     :param config_id: 配置ID
     :param task_id: 任务ID
     :return: 爬虫结果
@@ -57,6 +62,11 @@ def run_crawler(self, config_id=None, task_id=None):
         if result['status'] == 'success':
             task.status = 2  # completed
             task.result = result
+        elif result['status'] == 'skipped':
+            task.status = 3  # cancelled，其他worker正在抓取该数据源
+            task.error_message = result['message']
+        elif CrawlerService.schedule_retry(task, result.get('message', '未知错误')):
+            return {**result, 'retry_count': task.retry_count}
         else:
             task.status = 4  # failed
             task.error_message = result.get('message', '未知错误')
@@ -68,6 +78,12 @@ def run_crawler(self, config_id=None, task_id=None):
         
     except Exception as e:
         logger.error(f"爬虫任务执行失败: {str(e)}", exc_info=True)
+        if task and CrawlerService.schedule_retry(task, str(e)):
+            return {
+                'status': 'error',
+                'message': str(e),
+                'retry_count': task.retry_count
+            }
         if task:  # 只有在task存在时才更新状态
             task.status = 4  # failed
             task.error_message = str(e)
@@ -79,28 +95,49 @@ def run_crawler(self, config_id=None, task_id=None):
         }
 
 
+@shared_task
+def run_crawler_batch(task_ids):
+    """
+    在同一个事件循环中并发运行一批爬虫任务
+    :param task_ids: 任务ID列表
+    :return: 每个任务的执行结果
+    """
+    tasks = list(CrawlerTask.objects.select_related('config').filter(task_id__in=task_ids))
+    logger.info(f"开始批量运行爬虫任务: 共{len(tasks)}个")
+    outcomes = CrawlerService.run_tasks_concurrently(tasks)
+    return {
+        'status': 'success',
+        'total': len(outcomes),
+        'succeeded': sum(1 for ok in outcomes.values() if ok),
+        'results': outcomes
+    }
+
+
 @shared_task
 def schedule_crawlers():
     """
     调度爬虫任务
+    只有持有调度租约的进程分发任务，到期的配置通过 next_run_at 索引一次查出
     """
+    if not get_scheduler_lease().acquire_or_renew():
+        logger.info("其他进程正在调度爬虫任务，跳过")
+        return
+
     logger.info("开始调度爬虫任务")
+    pipeline_mode = pipeline.is_enabled()
+    batch_mode = getattr(settings, 'CRAWLER_ASYNC_BATCH', True)
+    batch_task_ids = []
     
-    # 获取所有启用的爬虫配置
-    configs = CrawlerConfig.objects.filter(
-        status=1,  # 启用状态
-        is_active=True
-    )
+    # 获取已到达运行时间的爬虫配置，间隔按新增文章数自适应调整
+    configs = CrawlerService.get_pending_configs().filter(is_active=True)
     
     for config in configs:
         try:
-            # 检查是否需要运行
-            if config.last_run_time:
-                next_run_time = config.last_run_time + timedelta(minutes=config.interval)
-                if timezone.now() < next_run_time:
-                    logger.info(f"爬虫 {config.name} 未到运行时间")
-                    continue
-                    
+            # 熔断器打开的数据源在冷却期结束前不调度
+            if not allow_dispatch(config):
+                logger.info(f"数据源已熔断，跳过调度: {config.name}")
+                continue
+
             # 创建任务
             task = CrawlerTask.objects.create(
                 config=config,
@@ -110,11 +147,128 @@ def schedule_crawlers():
             
             # 更新最后运行时间
             config.last_run_time = timezone.now()
-            config.save()
+            config.save(update_fields=['last_run_time'])
             
             # 启动任务
-            run_crawler.delay(task_id=task.task_id)
+            if pipeline_mode:
+                pipeline_fetch.delay(task.task_id, time.time())
+            elif batch_mode:
+                batch_task_ids.append(task.task_id)
+            else:
+                run_crawler.delay(task_id=task.task_id)
             logger.info(f"已创建爬虫任务: {config.name}")
             
         except Exception as e:
             logger.error(f"调度爬虫失败 {config.name}: {str(e)}", exc_info=True)
+
+    # 批量模式下所有到期的数据源在一个事件循环中并发抓取
+    if batch_task_ids:
+        run_crawler_batch.delay(batch_task_ids)
+        logger.info(f"已提交批量爬虫任务: 共{len(batch_task_ids)}个")
+
+
+@shared_task
+def check_proxy_pool():
+    """
+    并发探测代理池中所有代理的可用性
+    :return: 探测统计
+    """
+    from .proxy import check_proxies
+
+    try:
+        stats = check_proxies()
+        return {'status': 'success', **stats}
+    except Exception as e:
+        logger.error(f"代理探测失败: {str(e)}", exc_info=True)
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task
+def purge_fetch_archive():
+    """
+    清理过期的抓取归档
+    :return: 清理统计
+    """
+    from .archive import purge_archive
+
+    try:
+        stats = purge_archive()
+        return {'status': 'success', **stats}
+    except Exception as e:
+        logger.error(f"清理抓取归档失败: {str(e)}", exc_info=True)
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task
+def pipeline_fetch(task_id, enqueued_at=None):
+    """
+    流水线fetch阶段，完成后把数据交给parse队列
+    :param task_id: 任务ID
+    :param enqueued_at: 入队时间
+    """
+    message = pipeline.fetch(task_id, enqueued_at)
+    if message:
+        pipeline_parse.apply_async(
+            (task_id, message, time.time()),
+            link_error=pipeline_failed.s(task_id, message['token'])
+        )
+
+
+@shared_task
+def pipeline_parse(task_id, message, enqueued_at=None):
+    """
+    流水线parse阶段，解析结果分批经过clean和persist，全部入库后完成任务
+    :param task_id: 任务ID
+    :param message: fetch阶段的消息
+    :param enqueued_at: 入队时间
+    """
+    planned = pipeline.parse(task_id, message, enqueued_at)
+    if planned is None:
+        return
+    batches, context = planned
+    now = time.time()
+    # clean/persist的异常随消息传到complete；其他异常导致chord不执行回调时由errback完成任务并释放租约
+    chord(
+        chain(pipeline_clean.s(task_id, batch, now), pipeline_persist.s(task_id))
+        for batch in batches
+    )(pipeline_complete.s(task_id, context).on_error(pipeline_failed.s(task_id, context['token'])))
+
+
+@shared_task
+def pipeline_clean(task_id, items, enqueued_at=None):
+    """流水线clean阶段"""
+    try:
+        return pipeline.clean(task_id, items, enqueued_at)
+    except Exception as e:
+        logger.error(f"流水线清洗失败: {task_id} - {str(e)}", exc_info=True)
+        return pipeline.failed_batch(e)
+
+
+@shared_task
+def pipeline_persist(message, task_id):
+    """流水线persist阶段，message为clean阶段的返回值"""
+    try:
+        return pipeline.persist(task_id, message)
+    except Exception as e:
+        logger.error(f"流水线入库失败: {task_id} - {str(e)}", exc_info=True)
+        return {**CrawlerService._empty_stats(), 'error': str(e)}
+
+
+@shared_task
+def pipeline_complete(batch_stats, task_id, context):
+    """流水线全部批次入库后完成任务"""
+    return pipeline.complete(task_id, batch_stats, context)
+
+
+@shared_task
+def pipeline_failed(request, exc, traceback, task_id, token):
+    """
+    流水线阶段的errback，按失败完成任务并释放租约
+    :param request: 失败任务的请求上下文
+    :param exc: 异常
+    :param traceback: 异常堆栈
+    :param task_id: 任务ID
+    :param token: 租约令牌
+    """
+    logger.error(f"流水线任务失败: {request.id} - {str(exc)}")
+    pipeline.fail(task_id, token, exc)
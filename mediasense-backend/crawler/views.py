@@ -7,6 +7,7 @@ from django.db.models import Count, Q
 import sys
 import uuid
 
+from . import breaker, pipeline
 from .models import CrawlerConfig, CrawlerTask
 from .serializers import (
     CrawlerConfigSerializer, 
@@ -197,6 +198,7 @@ class CrawlerConfigViewSet(viewsets.ModelViewSet):
                 config = CrawlerConfig.objects.get(id=config_id)
                 for key, value in item.items():
                     setattr(config, key, value)
+                config.refresh_next_run_at()
                 configs.append(config)
         
         if configs:
@@ -204,7 +206,7 @@ class CrawlerConfigViewSet(viewsets.ModelViewSet):
                 configs,
                 ['name', 'description', 'source_url', 'crawler_type', 
                  'config_data', 'headers', 'interval', 'max_retries', 
-                 'retry_delay', 'status', 'is_active']
+                 'retry_delay', 'status', 'is_active', 'next_run_at']
             )
 
     @action(detail=False, methods=['post'])
@@ -239,12 +241,29 @@ class CrawlerConfigViewSet(viewsets.ModelViewSet):
         active_configs = CrawlerConfig.objects.filter(is_active=True).count()
         total_tasks = CrawlerTask.objects.count()
         task_status_counts = dict(CrawlerTask.objects.values('status').annotate(count=Count('id')))
+        breaker_counts = dict(
+            CrawlerConfig.objects.values_list('breaker_state').annotate(count=Count('id')).order_by()
+        )
+        breakers = [
+            {
+                'id': config.id,
+                'name': config.name,
+                'state': config.breaker_state,
+                'failures': config.breaker_failures,
+                'trips': config.breaker_trips,
+                'changed_at': config.breaker_changed_at,
+                'probe_time': config.probe_time
+            }
+            for config in CrawlerConfig.objects.exclude(breaker_state=breaker.CLOSED).order_by('breaker_changed_at')
+        ]
         
         return Response({
             'total_configs': total_configs,
             'active_configs': active_configs,
             'total_tasks': total_tasks,
-            'task_status_counts': task_status_counts
+            'task_status_counts': task_status_counts,
+            'breaker_counts': breaker_counts,
+            'breakers': breakers
         })
 
 
@@ -342,3 +361,11 @@ class CrawlerTaskViewSet(viewsets.ModelViewSet):
             'status_counts': status_counts,
             'success_rate': success_rate
         })
+
+    @action(detail=False, methods=['get'])
+    def pipeline(self, request):
+        """获取分阶段流水线各队列的积压数量和延迟"""
+        return Response({
+            'enabled': pipeline.is_enabled(),
+            'stages': pipeline.get_pipeline_stats()
+        })
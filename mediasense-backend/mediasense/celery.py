@@ -28,9 +28,17 @@ app.autodiscover_tasks()
 
 # 配置定时任务
 app.conf.beat_schedule = {
-    'crawl-news-every-hour': {
+    'schedule-due-crawlers': {
         'task': 'crawler.tasks.schedule_crawlers',
-        'schedule': crontab(minute='0'),  # 每小时执行一次
+        'schedule': crontab(minute='*/1'),  # 每分钟分发到期的爬虫，间隔由各数据源的 next_run_at 决定
+    },
+    'check-proxy-pool': {
+        'task': 'crawler.tasks.check_proxy_pool',
+        'schedule': crontab(minute='*/10'),  # 每10分钟并发探测一次代理池
+    },
+    'purge-fetch-archive': {
+        'task': 'crawler.tasks.purge_fetch_archive',
+        'schedule': crontab(hour=3, minute=30),  # 每天清理过期的抓取归档
     },
     'collect-system-metrics': {
         'task': 'monitoring.tasks.collect_system_metrics',
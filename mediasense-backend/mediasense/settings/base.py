@@ -212,3 +212,72 @@ SEARCH_RESULT_PAGE_SIZE = 10
 SEARCH_MAX_SUGGESTIONS = 10
 SEARCH_HOT_THRESHOLD = 100  # 热门搜索阈值
 SEARCH_HISTORY_MAX_SIZE = 50  # 每个用户最多保存50条搜索历史
+
+# 爬虫配置
+CRAWLER_ASYNC_BATCH = True  # 到期的数据源在一个事件循环中并发抓取
+CRAWLER_FETCH_POOL_SIZE = 100  # 共享连接池的最大连接数
+CRAWLER_FETCH_PER_HOST = 4  # 单个主机的最大并发连接数
+CRAWLER_FETCH_TIMEOUT = 30  # 默认请求超时（秒）
+CRAWLER_BULK_BATCH_SIZE = 500  # 文章批量入库和URL去重查询的批次大小
+CRAWLER_REDIS_URL = os.getenv('CRAWLER_REDIS_URL')  # 未配置时复用django_redis缓存连接
+CRAWLER_SEEN_INDEX_CAPACITY = 1000000  # 已抓取URL索引容量
+CRAWLER_SEEN_INDEX_ERROR_RATE = 0.001  # 已抓取URL索引误判率
+CRAWLER_DETAIL_CONCURRENCY = 8  # 详情页抓取的最大并发数
+CRAWLER_DETAIL_PER_HOST = 2  # 详情页抓取的单主机并发数
+CRAWLER_DETAIL_TIMEOUT = 10  # 单个详情页的超时（秒）
+CRAWLER_DETAIL_DEADLINE = 60  # 一批详情页抓取的总时限（秒）
+CRAWLER_RSS_EARLY_STOP = 1  # RSS连续遇到几篇已入库文章后停止解析，0表示解析全部条目
+CRAWLER_HTML_PARSER = 'html.parser'  # HTML解析后端: html.parser 或 lxml，可通过 config_data['html_parser'] 覆盖
+CRAWLER_SIMHASH_ENABLED = True  # 入库时检测跨数据源的近似重复文章
+CRAWLER_SIMHASH_DISTANCE = 3  # 判定为近似重复的最大汉明距离（不超过3）
+CRAWLER_SIMHASH_WINDOW_DAYS = 7  # 只在最近几天入库的文章中查找原文
+CRAWLER_ADAPTIVE_INTERVAL = True  # 根据每次新增文章数自动调整抓取间隔，可通过 config_data['adaptive'] 按数据源关闭
+CRAWLER_ADAPTIVE_MIN_INTERVAL = 5  # 自适应间隔下限（分钟）
+CRAWLER_ADAPTIVE_MAX_INTERVAL = 1440  # 自适应间隔上限（分钟）
+CRAWLER_ADAPTIVE_STEP = 10  # 没有新文章时间隔增加的步长（分钟）
+CRAWLER_ADAPTIVE_DECREASE = 0.5  # 新文章达到目标数时间隔缩短的比例
+CRAWLER_ADAPTIVE_TARGET_YIELD = 2  # 每次抓取期望的新增文章数
+CRAWLER_ADAPTIVE_SMOOTHING = 0.3  # 新增文章数滑动平均的平滑系数
+CRAWLER_SCHEDULER_LEASE_TTL = 90  # 调度器领导者租约有效期（秒），只有持有者分发爬虫任务
+CRAWLER_CONFIG_LEASE_TTL = 120  # 数据源抓取租约有效期（秒），抓取期间每1/3有效期续期一次
+CRAWLER_RETRY_MAX_DELAY = 3600  # 失败任务重试的最长退避时间（秒），基数为配置的 retry_delay
+CRAWLER_BREAKER_ENABLED = True  # 数据源熔断器，连续失败或出错率过高时暂停调度
+CRAWLER_BREAKER_FAILURE_THRESHOLD = 5  # 连续失败次数达到该值时打开
+CRAWLER_BREAKER_ERROR_RATE = 0.8  # 最近任务的出错率达到该值时打开
+CRAWLER_BREAKER_WINDOW = 10  # 计算出错率的最近任务数
+CRAWLER_BREAKER_MIN_SAMPLES = 5  # 计算出错率的最少任务数
+CRAWLER_BREAKER_COOLDOWN = 600  # 打开后的冷却时间（秒），结束后放行一次探测
+CRAWLER_PROXY_PROBE_URL = 'https://www.baidu.com'  # 代理健康检查的探测地址
+CRAWLER_PROXY_CHECK_TIMEOUT = 10  # 单个代理探测的超时（秒）
+CRAWLER_PROXY_CHECK_CONCURRENCY = 20  # 代理探测的最大并发数
+CRAWLER_PROXY_STICKY_TTL = 600  # 同一主机固定使用同一代理的时间（秒）
+CRAWLER_PROXY_REFRESH_INTERVAL = 60  # 代理统计写回数据库并重新加载的间隔（秒）
+CRAWLER_PROXY_SMOOTHING = 0.2  # 请求反馈更新成功率和速度的平滑系数
+CRAWLER_PROXY_MIN_SUCCESS_RATE = 20  # 成功率（0-100）低于该值的代理不再选择
+CRAWLER_PROXY_LATENCY_SCALE = 1000  # 选择权重中延迟的归一化尺度（毫秒）
+CRAWLER_PIPELINE = False  # 调度时使用分阶段流水线（fetch/parse/clean/persist 各自的队列）
+CRAWLER_PIPELINE_BATCH_SIZE = 100  # 流水线阶段之间每条消息携带的文章数
+CRAWLER_ARCHIVE_ENABLED = True  # 按内容哈希压缩归档原始响应，可通过 config_data['archive'] 按数据源关闭
+CRAWLER_ARCHIVE_STORAGE = {  # 归档存储后端，格式与 STORAGES 的条目相同，可换成对象存储
+    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'OPTIONS': {'location': os.path.join(BASE_DIR, 'data', 'crawler_archive')},
+}
+CRAWLER_ARCHIVE_TTL_DAYS = 30  # 归档保留天数，按最近一次抓取时间计算
+CRAWLER_ARCHIVE_MAX_SIZE = 10 * 1024 * 1024  # 超过该大小（字节）的响应不归档
+CRAWLER_ARCHIVE_COMPRESS_LEVEL = 6  # gzip压缩级别
+CRAWLER_PAGINATION_CONCURRENCY = 4  # 分页API同时请求的页面数，可通过 config_data['pagination']['concurrency'] 覆盖
+CRAWLER_PAGINATION_CHECKPOINT_TTL = 3600  # 分页抓取检查点的有效期（秒），任务在此期间重试时从检查点继续
+CRAWLER_PARSE_PROCESSES = 0  # HTML和订阅源解析使用的进程数，0表示在抓取线程中解析
+CRAWLER_CHARSET_SNIFF_BYTES = 4096  # 在文档开头多少字节内查找 <meta charset> 和XML声明
+CRAWLER_CHARSET_DETECT_BYTES = 64 * 1024  # 统计识别编码时最多取样的字节数
+CRAWLER_SITEMAP_MAX_URLS = 200  # 站点地图每次最多抓取的URL数，可通过 config_data['sitemap']['max_urls'] 覆盖
+CRAWLER_SITEMAP_MAX_FILES = 50  # 站点地图模式每次最多下载的站点地图文件数
+
+# 流水线各阶段使用独立的队列，按负载分别启动worker
+CELERY_TASK_ROUTES = {
+    'crawler.tasks.pipeline_fetch': {'queue': 'crawler.fetch'},
+    'crawler.tasks.pipeline_parse': {'queue': 'crawler.parse'},
+    'crawler.tasks.pipeline_clean': {'queue': 'crawler.clean'},
+    'crawler.tasks.pipeline_persist': {'queue': 'crawler.persist'},
+    'crawler.tasks.pipeline_complete': {'queue': 'crawler.persist'},
+}
@@ -80,8 +80,8 @@ PASSWORD_HASHERS = (
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
 # 禁用 Celery
-CELERY_ALWAYS_EAGER = True
-CELERY_EAGER_PROPAGATES_EXCEPTIONS = True
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
 
 # JWT配置
 SIMPLE_JWT = {
@@ -118,6 +118,13 @@ OPENAI_CACHE_TTL = 3600  # 缓存过期时间（秒）
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media_test')
 MEDIA_URL = '/media/'
 
+# 抓取归档存储，归档测试使用临时目录单独开启
+CRAWLER_ARCHIVE_ENABLED = False
+CRAWLER_ARCHIVE_STORAGE = {
+    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'OPTIONS': {'location': os.path.join(BASE_DIR, 'media_test', 'crawler_archive')},
+}
+
 # 静态文件配置
 STATIC_ROOT = os.path.join(BASE_DIR, 'static_test')
 STATIC_URL = '/static/'
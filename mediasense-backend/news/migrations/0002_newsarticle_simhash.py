@@ -0,0 +1,63 @@
+# Generated by Django 5.1.5 on 2026-10-17 07:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crawler', '0002_crawlerconfig_conditional_get'),
+        ('news', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='news.newsarticle', verbose_name='重复于'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='内容指纹'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash_band0',
+            field=models.IntegerField(blank=True, null=True, verbose_name='指纹分段0'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash_band1',
+            field=models.IntegerField(blank=True, null=True, verbose_name='指纹分段1'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash_band2',
+            field=models.IntegerField(blank=True, null=True, verbose_name='指纹分段2'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash_band3',
+            field=models.IntegerField(blank=True, null=True, verbose_name='指纹分段3'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['simhash_band0'], name='news_articl_simhash_e2688b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['simhash_band1'], name='news_articl_simhash_3e89b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['simhash_band2'], name='news_articl_simhash_1d470a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['simhash_band3'], name='news_articl_simhash_2386f9_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-17 08:26
+
+import hashlib
+
+from django.db import migrations, models
+
+# 迁移中固定哈希的字段和算法，不随 news.models 的后续修改变化
+CONTENT_HASH_FIELDS = ("title", "content", "summary", "author")
+
+
+def compute_content_hash(title, content, summary, author):
+    """计算文章内容哈希，与本迁移创建时的 news.models.compute_content_hash 一致"""
+    digest = hashlib.sha256()
+    for value in (title, content, summary, author):
+        digest.update((value or "").strip().encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """为已有文章计算内容哈希，避免第一次刷新时所有文章都被当作有更新"""
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+    batch = []
+    for article in NewsArticle.objects.only('id', *CONTENT_HASH_FIELDS).iterator(chunk_size=1000):
+        article.content_hash = compute_content_hash(*(getattr(article, field) for field in CONTENT_HASH_FIELDS))
+        batch.append(article)
+        if len(batch) >= 1000:
+            NewsArticle.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        NewsArticle.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_newsarticle_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='内容哈希'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
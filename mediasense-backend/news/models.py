@@ -1,9 +1,27 @@
+import hashlib
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
 
+# 参与内容哈希的字段，任一字段变化都视为文章内容有更新
+CONTENT_HASH_FIELDS = ("title", "content", "summary", "author")
+
+
+def compute_content_hash(title, content, summary, author):
+    """
+    计算文章内容哈希
+    :return: SHA-256 十六进制字符串
+    """
+    digest = hashlib.sha256()
+    for value in (title, content, summary, author):
+        digest.update((value or "").strip().encode("utf-8"))
+        # 分隔符避免字段边界移动后哈希相同
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
 
 class NewsCategory(models.Model):
     """新闻分类模型"""
@@ -106,6 +124,22 @@ class NewsArticle(models.Model):
         db_constraint=False  # 不创建外键约束
     )
 
+    # 近似重复检测，分段字段用于按汉明距离查找候选
+    content_hash = models.CharField(_("内容哈希"), max_length=64, blank=True, default="")
+    simhash = models.BigIntegerField(_("内容指纹"), null=True, blank=True)
+    simhash_band0 = models.IntegerField(_("指纹分段0"), null=True, blank=True)
+    simhash_band1 = models.IntegerField(_("指纹分段1"), null=True, blank=True)
+    simhash_band2 = models.IntegerField(_("指纹分段2"), null=True, blank=True)
+    simhash_band3 = models.IntegerField(_("指纹分段3"), null=True, blank=True)
+    duplicate_of = models.ForeignKey(
+        "self",
+        verbose_name=_("重复于"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="near_duplicates",
+    )
+
     class Meta:
         verbose_name = _("新闻文章")
         verbose_name_plural = _("新闻文章")
@@ -119,11 +153,24 @@ class NewsArticle(models.Model):
             models.Index(fields=["read_count"]),
             models.Index(fields=["like_count"]),
             models.Index(fields=["comment_count"]),
+            models.Index(fields=["simhash_band0"]),
+            models.Index(fields=["simhash_band1"]),
+            models.Index(fields=["simhash_band2"]),
+            models.Index(fields=["simhash_band3"]),
         ]
 
     def __str__(self):
         return self.title
 
+    def compute_content_hash(self):
+        """按当前字段计算内容哈希"""
+        return compute_content_hash(*(getattr(self, field) for field in CONTENT_HASH_FIELDS))
+
+    @property
+    def is_near_duplicate(self):
+        """是否为其他文章的近似重复"""
+        return self.duplicate_of_id is not None
+
     @property
     def is_published(self):
         """是否已发布"""
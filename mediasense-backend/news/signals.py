@@ -0,0 +1,15 @@
+"""
+新闻文章信号
+
+article_content_changed 在抓取刷新更新了已入库文章的内容后发送（事务提交之后），
+news_search 连接该信号重新建索引，ai_service 连接该信号把原有的分析结果标记为无效并重新分析。
+bulk_update 不会触发 post_save，下游服务不能依赖 post_save 感知这类更新。
+
+参数:
+    sender: NewsArticle
+    article_ids: 内容有变化的文章ID列表
+"""
+
+from django.dispatch import Signal
+
+article_content_changed = Signal()
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class NewsSearchConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "news_search"
-    verbose_name = "新闻搜索" 
\ No newline at end of file
+    verbose_name = "新闻搜索"
+
+    def ready(self):
+        # 连接文章内容更新信号
+        from . import signals  # noqa: F401
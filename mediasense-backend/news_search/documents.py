@@ -69,6 +69,14 @@ class NewsArticleDocument(Document):
             'id',
         ]
 
+    def get_queryset(self):
+        """近似重复的文章不建索引，只索引原文"""
+        return super().get_queryset().filter(duplicate_of__isnull=True)
+
+    def should_index_object(self, obj):
+        """保存文章时同样跳过近似重复的文章"""
+        return obj.duplicate_of_id is None
+
     def prepare_category(self, instance):
         """准备分类数据"""
         if instance.category:
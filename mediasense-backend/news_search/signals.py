@@ -0,0 +1,24 @@
+"""
+新闻搜索信号处理
+
+抓取刷新更新了已入库文章的内容后，提交异步任务重新建索引。
+"""
+
+import logging
+
+from django.dispatch import receiver
+
+from news.signals import article_content_changed
+
+from .tasks import reindex_articles
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(article_content_changed, dispatch_uid="news_search_reindex_changed_articles")
+def reindex_changed_articles(sender, article_ids, **kwargs):
+    """内容有变化的文章交给异步任务重新索引，不阻塞抓取流程"""
+    try:
+        reindex_articles.delay(list(article_ids))
+    except Exception as e:
+        logger.error(f"提交重新索引任务失败: {str(e)}", exc_info=True)
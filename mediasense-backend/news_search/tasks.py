@@ -0,0 +1,27 @@
+import logging
+
+from celery import shared_task
+
+from news.models import NewsArticle
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reindex_articles(article_ids):
+    """
+    重新索引内容有变化的文章
+    :param article_ids: 文章ID列表
+    """
+    try:
+        # 文档定义依赖 django_elasticsearch_dsl，执行任务时才导入
+        from .documents import NewsArticleDocument
+
+        # 近似重复的文章不建索引
+        articles = NewsArticle.objects.filter(id__in=article_ids, duplicate_of__isnull=True)
+        NewsArticleDocument().update(articles)
+        return {"status": "success", "total": len(article_ids)}
+
+    except Exception as e:
+        logger.error(f"重新索引文章失败: {str(e)}", exc_info=True)
+        return {"status": "failed", "error": str(e)}
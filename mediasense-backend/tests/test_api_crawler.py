@@ -4,6 +4,7 @@ from unittest.mock import patch, MagicMock, call
 from django.utils import timezone
 from crawler.crawlers.api_crawler import APICrawler
 from crawler.models import CrawlerConfig
+from crawler.ratelimit import get_rate_limiter
 import requests
 import json
 from datetime import datetime
@@ -347,7 +348,8 @@ class TestAPICrawler(TestCase):
         self.config.save()
         
         with patch('time.sleep') as mock_sleep, \
-             patch('requests.Session.get') as mock_get:
+             patch('requests.Session.get') as mock_get, \
+             patch('crawler.ratelimit.time.monotonic', return_value=1000.0):
             # Mock响应
             mock_response = MagicMock(
                 status_code=200,
@@ -366,8 +368,7 @@ class TestAPICrawler(TestCase):
             mock_get.return_value = mock_response
             
             # 连续发送3个请求
-            start_time = time.time()
-            self.crawler._last_request_time = start_time
+            get_rate_limiter().reset('host:api.test.com')
             
             # 第一个请求
             result1 = self.crawler.fetch_data()
@@ -385,8 +386,9 @@ class TestAPICrawler(TestCase):
             self.assertEqual(mock_sleep.call_count, 2)  # 第三个请求需要延迟
             
             # 验证延迟时间
-            expected_delay = 1 / 2  # 每秒2个请求，所以间隔是0.5秒
-            for call in mock_sleep.call_args_list:
+            # 每秒2个请求，所以间隔是0.5秒；限速器预约时间点，休眠被mock后后续请求顺延
+            expected_delays = [0.5, 1.0]
+            for call, expected_delay in zip(mock_sleep.call_args_list, expected_delays):
                 delay = call.args[0]
                 self.assertAlmostEqual(delay, expected_delay, places=1)
 
@@ -0,0 +1,98 @@
+import datetime
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch
+from crawler.adaptive import IntervalPolicy, is_due, record_crawl_result
+from crawler.models import CrawlerConfig
+from crawler.services import CrawlerService
+
+
+@override_settings(
+    CRAWLER_ADAPTIVE_MIN_INTERVAL=5,
+    CRAWLER_ADAPTIVE_MAX_INTERVAL=120,
+    CRAWLER_ADAPTIVE_STEP=10,
+    CRAWLER_ADAPTIVE_DECREASE=0.5,
+    CRAWLER_ADAPTIVE_TARGET_YIELD=2
+)
+class TestAdaptiveInterval(TestCase):
+    """自适应抓取间隔测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            interval=60,
+            status=1
+        )
+
+    def record(self, saved, **extra):
+        record_crawl_result(self.config, {'status': 'success', 'saved': saved, **extra})
+        self.config.refresh_from_db()
+        return self.config.effective_interval
+
+    def test_aimd(self):
+        """测试有新文章时按比例缩短，没有新文章时按步长增加"""
+        self.assertEqual(self.config.effective_interval, 60)
+        self.assertEqual(self.record(5), 30)
+        self.assertEqual(self.record(3), 15)
+        self.assertEqual(self.record(1), 15)
+        self.assertEqual(self.record(0), 25)
+        self.assertEqual(self.record(0, not_modified=True), 35)
+
+    def test_bounds(self):
+        """测试间隔限制在上下限之间"""
+        for _ in range(10):
+            self.record(10)
+        self.assertEqual(self.config.effective_interval, 5)
+        for _ in range(20):
+            self.record(0)
+        self.assertEqual(self.config.effective_interval, 120)
+
+        self.config.config_data = {'min_interval': 15, 'max_interval': 30}
+        self.config.save()
+        self.assertEqual(self.record(10), 30)
+        self.assertEqual(self.record(10), 15)
+        self.assertEqual(self.record(10), 15)
+
+    def test_yield_ewma(self):
+        """测试新增文章数的滑动平均"""
+        with override_settings(CRAWLER_ADAPTIVE_SMOOTHING=0.5):
+            self.record(4)
+            self.assertAlmostEqual(self.config.yield_ewma, 2.0)
+            self.record(0)
+            self.assertAlmostEqual(self.config.yield_ewma, 1.0)
+
+    def test_errors_and_disabled(self):
+        """测试抓取失败不调整，关闭自适应时使用固定间隔"""
+        record_crawl_result(self.config, {'status': 'error', 'message': '请求失败'})
+        self.config.refresh_from_db()
+        self.assertIsNone(self.config.adaptive_interval)
+
+        self.record(10)
+        self.config.config_data = {'adaptive': False}
+        self.assertEqual(self.config.effective_interval, 60)
+        self.assertEqual(IntervalPolicy.for_config(self.config).next_interval(60, 10), 30)
+
+    def test_next_run_time(self):
+        """测试下次运行时间使用自适应间隔"""
+        self.assertIsNone(self.config.next_run_time)
+        self.assertTrue(is_due(self.config))
+
+        now = timezone.now()
+        self.config.last_run_time = now
+        self.config.adaptive_interval = 15
+        self.assertEqual(self.config.next_run_time, now + datetime.timedelta(minutes=15))
+        self.assertFalse(is_due(self.config, now + datetime.timedelta(minutes=10)))
+        self.assertTrue(is_due(self.config, now + datetime.timedelta(minutes=15)))
+
+    def test_crawl_updates_interval(self):
+        """测试爬取完成后更新间隔"""
+        result = {'status': 'success', 'data': [], 'message': '未获取到数据'}
+        with patch.object(CrawlerService, 'get_crawler') as mock_get_crawler:
+            mock_get_crawler.return_value.run.return_value = result
+            mock_get_crawler.return_value.skipped_known = 0
+            CrawlerService.crawl_website(self.config)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.adaptive_interval, 70)
@@ -0,0 +1,123 @@
+import asyncio
+import datetime
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import AsyncMock, patch, MagicMock
+from crawler import archive
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.fetcher import FetchResponse
+from crawler.models import CrawlerConfig, FetchArchive
+from news.models import NewsArticle
+
+RSS_CONTENT = ''.join([
+    '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>测试源</title>',
+    *(f'<item><title>测试文章{i}</title><link>https://test.com/article/{i}</link>'
+      f'<description>测试描述{i}</description></item>' for i in range(3)),
+    '</channel></rss>'
+]).encode('utf-8')
+
+
+def make_response(content, url='https://test.com/rss'):
+    response = MagicMock()
+    response.status_code = 200
+    response.url = url
+    response.content = content
+    response.headers = {'Content-Type': 'application/rss+xml', 'ETag': '"v1"'}
+    response.encoding = 'utf-8'
+    return response
+
+
+class TestFetchArchive(TestCase):
+    """抓取响应归档测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.root = tempfile.mkdtemp()
+        storage = {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': self.root},
+        }
+        self.settings_override = override_settings(CRAWLER_ARCHIVE_ENABLED=True, CRAWLER_ARCHIVE_STORAGE=storage)
+        self.settings_override.enable()
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1,
+            config_data={'skip_known': False}
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @patch('requests.Session.get')
+    def test_archive_dedup(self, mock_get):
+        """测试响应按内容哈希压缩保存，相同内容只保存一份"""
+        mock_get.return_value = make_response(RSS_CONTENT)
+        RSSCrawler(self.config).fetch_data()
+        RSSCrawler(self.config).fetch_data()
+
+        record = FetchArchive.objects.get()
+        self.assertEqual(record.size, len(RSS_CONTENT))
+        self.assertLess(record.compressed_size, record.size)
+        self.assertEqual(record.headers['ETag'], '"v1"')
+        self.assertGreater(record.last_fetched_at, record.fetched_at)
+        self.assertEqual(archive.load_body(record), RSS_CONTENT)
+
+        # 其他数据源的相同内容只增加记录，不重复保存内容
+        other = CrawlerConfig.objects.create(
+            name='镜像源', crawler_type=1, source_url='https://mirror.com/rss', status=1
+        )
+        archive.archive_response(other, make_response(RSS_CONTENT, 'https://mirror.com/rss'))
+        self.assertEqual(FetchArchive.objects.values('content_hash').distinct().count(), 1)
+        self.assertEqual(FetchArchive.objects.count(), 2)
+
+        other.config_data = {'archive': False}
+        self.assertIsNone(archive.archive_response(other, make_response(b'<rss/>')))
+
+    def test_archive_async(self):
+        """测试在事件循环中抓取时，归档放到线程池中执行"""
+        on_loop = []
+
+        def check_loop(response):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+
+        response = FetchResponse('https://test.com/rss', 200, {'ETag': '"v1"'}, RSS_CONTENT, 'utf-8')
+        with patch.object(RSSCrawler, 'fetch_async', AsyncMock(return_value=response)), \
+                patch.object(RSSCrawler, 'archive_response', side_effect=check_loop):
+            result = asyncio.run(RSSCrawler(self.config).fetch_data_async())
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(on_loop, [False])
+
+    @patch('requests.Session.get')
+    def test_reparse_without_network(self, mock_get):
+        """测试reparse命令用当前的解析计划重新解析归档，不发送网络请求"""
+        archive.archive_response(self.config, make_response(RSS_CONTENT))
+        call_command('reparse', '--config', str(self.config.id), '--save', stdout=MagicMock())
+
+        mock_get.assert_not_called()
+        self.assertEqual(NewsArticle.objects.filter(crawler=self.config).count(), 3)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.etag, '')
+
+    def test_purge(self):
+        """测试清理过期记录和不再引用的内容"""
+        old = timezone.now() - datetime.timedelta(days=40)
+        expired = archive.archive_response(self.config, make_response(RSS_CONTENT), fetched_at=old)
+        shared = archive.archive_response(self.config, make_response(b'<rss>shared</rss>', 'https://test.com/a'),
+                                          fetched_at=old)
+        archive.archive_response(self.config, make_response(b'<rss>shared</rss>', 'https://test.com/b'))
+
+        stats = archive.purge_archive(ttl_days=30)
+        self.assertEqual(stats, {'records': 2, 'blobs': 1})
+        storage = archive.get_archive_storage()
+        self.assertFalse(storage.exists(archive.blob_name(expired.content_hash)))
+        self.assertTrue(storage.exists(archive.blob_name(shared.content_hash)))
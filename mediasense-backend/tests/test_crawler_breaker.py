@@ -0,0 +1,93 @@
+import datetime
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch
+from crawler import breaker
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.services import CrawlerService
+
+
+@override_settings(
+    CRAWLER_BREAKER_FAILURE_THRESHOLD=3,
+    CRAWLER_BREAKER_ERROR_RATE=0.6,
+    CRAWLER_BREAKER_WINDOW=5,
+    CRAWLER_BREAKER_MIN_SAMPLES=5,
+    CRAWLER_BREAKER_COOLDOWN=600
+)
+class TestCircuitBreaker(TestCase):
+    """数据源熔断器测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            interval=60,
+            status=1
+        )
+        self.error = {'status': 'error', 'message': '连接超时'}
+        self.success = {'status': 'success', 'saved': 1}
+
+    def test_consecutive_failures_open(self):
+        """测试连续失败达到阈值时打开，成功后清零"""
+        breaker.record_outcome(self.config, self.error)
+        breaker.record_outcome(self.config, self.error)
+        breaker.record_outcome(self.config, self.success)
+        self.assertEqual(self.config.breaker_failures, 0)
+
+        now = timezone.now()
+        for _ in range(3):
+            breaker.record_outcome(self.config, self.error, now)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.breaker_state, breaker.OPEN)
+        self.assertEqual(self.config.breaker_trips, 1)
+        self.assertEqual(self.config.next_run_at, now + datetime.timedelta(seconds=600))
+
+    def test_error_rate_opens(self):
+        """测试最近任务的出错率超过阈值时打开"""
+        for status in (4, 2, 4, 4):
+            CrawlerTask.objects.create(config=self.config, status=status)
+        breaker.record_outcome(self.config, self.error)
+        self.assertEqual(self.config.breaker_failures, 1)
+        self.assertEqual(self.config.breaker_state, breaker.OPEN)
+
+    def test_half_open_single_probe(self):
+        """测试冷却期结束后只放行一次探测，探测结果决定关闭或重新打开"""
+        now = timezone.now()
+        for _ in range(3):
+            breaker.record_outcome(self.config, self.error, now)
+        self.assertFalse(breaker.allow_dispatch(self.config, now + datetime.timedelta(seconds=60)))
+
+        later = now + datetime.timedelta(seconds=601)
+        stale = CrawlerConfig.objects.get(pk=self.config.pk)
+        self.assertTrue(breaker.allow_dispatch(self.config, later))
+        self.assertFalse(breaker.allow_dispatch(stale, later))
+        self.assertFalse(breaker.allow_dispatch(self.config, later))
+
+        breaker.record_outcome(self.config, self.error, later)
+        self.assertEqual(self.config.breaker_state, breaker.OPEN)
+        self.assertEqual(self.config.breaker_trips, 2)
+
+        probe_at = later + datetime.timedelta(seconds=601)
+        self.assertTrue(breaker.allow_dispatch(self.config, probe_at))
+        breaker.record_outcome(self.config, self.success, probe_at)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.breaker_state, breaker.CLOSED)
+        self.assertTrue(breaker.allow_dispatch(self.config))
+
+    def test_open_skips_dispatch_and_retry(self):
+        """测试熔断后不再调度和重试，skipped 结果不计入"""
+        breaker.record_outcome(self.config, {'status': 'skipped'})
+        self.assertEqual(self.config.breaker_failures, 0)
+
+        task = CrawlerTask.objects.create(config=self.config, status=CrawlerTask.Status.PENDING)
+        self.config.breaker_failures = 2
+        self.config.save()
+        with patch.object(CrawlerService, '_crawl_website', return_value=self.error), \
+                patch('crawler.tasks.run_crawler.apply_async') as mock_apply:
+            self.assertFalse(CrawlerService.run_task(task))
+        mock_apply.assert_not_called()
+        task.refresh_from_db()
+        self.assertEqual(task.status, CrawlerTask.Status.ERROR)
+        self.assertFalse(CrawlerService.get_pending_configs().filter(pk=self.config.pk).exists())
@@ -0,0 +1,117 @@
+import asyncio
+import codecs
+import requests
+from django.test import TestCase, override_settings
+from unittest.mock import AsyncMock, patch
+from crawler import charset
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.fetcher import FetchResponse
+from crawler.models import CrawlerConfig
+from crawler.services import CrawlerService
+
+GBK_HTML = ('<html><head><title>测试</title></head><body>'
+            + '<div class="item"><a href="https://test.com/a">国内新闻标题</a></div>' * 50
+            + '</body></html>').encode('gbk')
+
+
+def make_response(content, content_type='text/html'):
+    """构造真实的 requests.Response，编码由 requests 按响应头设置"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = 'https://test.com/news'
+    response._content = content
+    response.headers['Content-Type'] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class TestCharsetResolver(TestCase):
+    """响应编码识别测试类"""
+
+    def test_declared_encoding(self):
+        """测试BOM、响应头和文档声明优先于统计识别"""
+        with patch('crawler.charset.from_bytes') as mock_detect:
+            self.assertEqual(charset.resolve_encoding(codecs.BOM_UTF8 + b'{}'), ('utf-8-sig', charset.BOM))
+            self.assertEqual(
+                charset.resolve_encoding(GBK_HTML, {'content-type': 'text/html; charset=GB2312'}),
+                ('gb18030', charset.HEADER)
+            )
+            self.assertEqual(
+                charset.resolve_encoding(b'<html><head><meta charset="gbk">' + GBK_HTML),
+                ('gb18030', charset.DECLARED)
+            )
+            self.assertEqual(
+                charset.resolve_encoding(b'<?xml version="1.0" encoding="big5"?><rss/>'),
+                ('big5', charset.DECLARED)
+            )
+            self.assertEqual(
+                charset.resolve_encoding(
+                    '<p>新闻</p>'.encode('utf-8'), {'Content-Type': 'text/html; charset=ISO-8859-1'}
+                ),
+                ('utf-8', charset.DETECTED)
+            )
+        mock_detect.assert_not_called()
+
+    @override_settings(CRAWLER_CHARSET_DETECT_BYTES=1024)
+    def test_detect_bounded_sample(self):
+        """测试统计识别只使用开头的样本"""
+        body = GBK_HTML * 20
+        encoding, source = charset.resolve_encoding(body, {'Content-Type': 'text/html'})
+        self.assertEqual((encoding, source), ('gb18030', charset.DETECTED))
+
+        with patch('crawler.charset.from_bytes', wraps=charset.from_bytes) as mock_detect:
+            charset.resolve_encoding(body)
+        self.assertEqual(len(mock_detect.call_args[0][0]), 1024)
+
+        # 记住的编码能解码样本时不再识别，不能解码时重新识别
+        with patch('crawler.charset.from_bytes') as mock_detect:
+            self.assertEqual(charset.resolve_encoding(body, remembered='gbk'), ('gb18030', charset.REMEMBERED))
+            self.assertEqual(charset.resolve_encoding('新闻'.encode('utf-8'), remembered='ascii'),
+                             ('utf-8', charset.DETECTED))
+        mock_detect.assert_not_called()
+
+
+class TestEncodingMemory(TestCase):
+    """数据源编码记忆测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试网站',
+            crawler_type=3,
+            source_url='https://test.com/news',
+            status=1,
+            config_data={'list_selector': '.item', 'title_selector': 'a', 'link_selector': 'a'}
+        )
+
+    @patch('requests.Session.get')
+    def test_remember_detected_encoding(self, mock_get):
+        """测试识别出的编码在入库成功后保存到数据源，之后的抓取跳过识别"""
+        mock_get.return_value = make_response(GBK_HTML)
+        crawler = WebCrawler(self.config)
+        result = crawler.fetch_data()
+        self.assertIn('国内新闻标题', result['data'])
+        self.assertEqual(crawler.source_state['detected_encoding'], 'gb18030')
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.detected_encoding, '')
+
+        mock_get.return_value = make_response(GBK_HTML)
+        result = CrawlerService.crawl_website(self.config)
+        self.assertEqual((result['status'], result['errors']), ('success', 0))
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.detected_encoding, 'gb18030')
+
+        mock_get.return_value = make_response(GBK_HTML)
+        with patch('crawler.charset.from_bytes') as mock_detect:
+            result = WebCrawler(self.config).fetch_data()
+        mock_detect.assert_not_called()
+        self.assertIn('国内新闻标题', result['data'])
+
+    def test_detect_async_without_orm(self):
+        """测试在事件循环中抓取时识别编码不访问数据库"""
+        response = FetchResponse('https://test.com/news', 200, {'Content-Type': 'text/html'}, GBK_HTML, None)
+        crawler = WebCrawler(self.config)
+        with patch.object(WebCrawler, 'fetch_async', AsyncMock(return_value=response)):
+            result = asyncio.run(crawler.fetch_data_async())
+        self.assertIn('国内新闻标题', result['data'])
+        self.assertEqual(crawler.source_state['detected_encoding'], 'gb18030')
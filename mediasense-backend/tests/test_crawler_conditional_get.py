@@ -0,0 +1,149 @@
+import asyncio
+from django.test import TestCase
+from unittest.mock import AsyncMock, patch, MagicMock
+from crawler.crawlers.api_crawler import APICrawler
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.fetcher import FetchResponse
+from crawler.models import CrawlerConfig
+from crawler.services import CrawlerService
+
+RSS_CONTENT = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>测试源</title>
+<item><title>测试文章</title><link>https://test.com/article/1</link>
+<description>测试描述</description></item>
+</channel></rss>'''.encode('utf-8')
+
+
+def make_response(status_code, content=b'', headers=None, json_data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    response.encoding = 'utf-8'
+    if json_data is not None:
+        response.json.return_value = json_data
+    return response
+
+
+class TestConditionalGet(TestCase):
+    """条件请求测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.rss_config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1
+        )
+        self.api_config = CrawlerConfig.objects.create(
+            name='测试API源',
+            crawler_type=2,
+            source_url='https://api.test.com/news',
+            status=1,
+            config_data={
+                'data_path': 'items',
+                'title_path': 'title',
+                'link_path': 'url'
+            }
+        )
+
+    @patch('requests.Session.get')
+    def test_rss_store_and_send_validators(self, mock_get):
+        """测试保存校验头并在下次请求时发送"""
+        mock_get.return_value = make_response(200, RSS_CONTENT, {
+            'ETag': '"abc123"',
+            'Last-Modified': 'Wed, 20 Mar 2024 10:00:00 GMT'
+        })
+        result = CrawlerService.crawl_website(self.rss_config)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['saved'], 1)
+        self.assertNotIn('If-None-Match', mock_get.call_args.kwargs['headers'])
+
+        config = CrawlerConfig.objects.get(pk=self.rss_config.pk)
+        self.assertEqual(config.etag, '"abc123"')
+        self.assertEqual(config.last_modified, 'Wed, 20 Mar 2024 10:00:00 GMT')
+
+        mock_get.return_value = make_response(304)
+        result = RSSCrawler(config).run()
+        headers = mock_get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"abc123"')
+        self.assertEqual(headers['If-Modified-Since'], 'Wed, 20 Mar 2024 10:00:00 GMT')
+        self.assertEqual(result['status'], 'success')
+        self.assertTrue(result['not_modified'])
+        self.assertEqual(result['data'], [])
+
+    @patch('crawler.crawlers.rss_crawler.iter_feed_entries')
+    @patch('requests.Session.get')
+    def test_rss_not_modified_skips_parsing(self, mock_get, mock_parse):
+        """测试304响应不再解析和入库"""
+        self.rss_config.etag = '"abc123"'
+        self.rss_config.save()
+        mock_get.return_value = make_response(304)
+
+        with patch.object(CrawlerService, '_save_article') as mock_save:
+            result = CrawlerService.crawl_website(self.rss_config)
+
+        mock_parse.assert_not_called()
+        mock_save.assert_not_called()
+        self.assertEqual(result['status'], 'success')
+        self.assertTrue(result['not_modified'])
+
+    @patch('requests.Session.get')
+    def test_validators_saved_after_persist(self, mock_get):
+        """测试抓取时只记录校验头，入库失败时不保存，下次仍获取完整的响应"""
+        mock_get.return_value = make_response(200, RSS_CONTENT, {'ETag': '"abc123"'})
+        crawler = RSSCrawler(self.rss_config)
+        crawler.run()
+        self.assertEqual(crawler.source_state['etag'], '"abc123"')
+        self.assertEqual(CrawlerConfig.objects.get(pk=self.rss_config.pk).etag, '')
+
+        with patch('crawler.persistence.bulk_insert_new', return_value=([], 0, 1)):
+            result = CrawlerService.crawl_website(self.rss_config)
+        self.assertEqual(result['errors'], 1)
+        self.assertEqual(CrawlerConfig.objects.get(pk=self.rss_config.pk).etag, '')
+
+        result = CrawlerService.crawl_website(self.rss_config)
+        self.assertNotIn('If-None-Match', mock_get.call_args.kwargs['headers'])
+        self.assertEqual(result['saved'], 1)
+        self.assertEqual(CrawlerConfig.objects.get(pk=self.rss_config.pk).etag, '"abc123"')
+
+    def test_async_fetch_without_orm(self):
+        """测试在事件循环中抓取时不访问数据库，校验头随爬虫交给服务层"""
+        self.rss_config.config_data = {'archive': False}
+        response = FetchResponse('https://test.com/rss', 200, {'ETag': '"abc123"'}, RSS_CONTENT, 'utf-8')
+        crawler = RSSCrawler(self.rss_config)
+        with patch.object(RSSCrawler, 'fetch_async', AsyncMock(return_value=response)):
+            result = asyncio.run(crawler.fetch_data_async())
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(crawler.source_state['etag'], '"abc123"')
+
+    def test_conditional_get_disabled(self):
+        """测试关闭条件请求"""
+        self.rss_config.etag = '"abc123"'
+        self.rss_config.config_data = {'conditional_get': False}
+        crawler = RSSCrawler(self.rss_config)
+        self.assertEqual(crawler.get_conditional_headers(), {})
+
+    @patch('requests.Session.get')
+    def test_api_not_modified(self, mock_get):
+        """测试API数据源的条件请求"""
+        mock_get.return_value = make_response(200, headers={'ETag': 'W/"v1"'}, json_data={
+            'items': [{'title': '测试文章', 'url': 'https://test.com/article/1'}]
+        })
+        result = CrawlerService.crawl_website(self.api_config)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(CrawlerConfig.objects.get(pk=self.api_config.pk).etag, 'W/"v1"')
+
+        mock_get.return_value = make_response(304)
+        result = APICrawler(self.api_config).run()
+        self.assertEqual(mock_get.call_args.kwargs['headers']['If-None-Match'], 'W/"v1"')
+        self.assertEqual(result['status'], 'success')
+        self.assertTrue(result['not_modified'])
+
+    def test_api_pagination_without_validators(self):
+        """测试分页请求不使用条件请求"""
+        self.api_config.etag = 'W/"v1"'
+        self.api_config.config_data['pagination'] = {'enabled': True}
+        crawler = APICrawler(self.api_config)
+        self.assertEqual(crawler.get_conditional_headers(), {})
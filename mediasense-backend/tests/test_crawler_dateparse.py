@@ -0,0 +1,109 @@
+import datetime
+from django.test import TestCase
+from unittest.mock import patch
+from crawler import dateparse
+from crawler.crawlers.api_crawler import APICrawler
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.dateparse import (
+    CHINESE, ISO8601, RFC822, clear_date_cache, date_cache_info, get_learned_format, parse_date
+)
+from crawler.models import CrawlerConfig
+from crawler.parse_plan import clear_parse_plans
+
+UTC = datetime.timezone.utc
+
+
+class TestDateParse(TestCase):
+    """时间解析测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        clear_date_cache()
+        clear_parse_plans()
+
+    def test_fast_paths(self):
+        """测试常见格式的快速路径"""
+        cases = [
+            ('2024-03-20T10:00:00Z', datetime.datetime(2024, 3, 20, 10, 0, tzinfo=UTC)),
+            ('2024-03-20T10:00:00.123+08:00', datetime.datetime(
+                2024, 3, 20, 10, 0, 0, 123000, tzinfo=datetime.timezone(datetime.timedelta(hours=8))
+            )),
+            ('2024-03-20 10:00', datetime.datetime(2024, 3, 20, 10, 0)),
+            ('2024/03/20', datetime.datetime(2024, 3, 20)),
+            ('Wed, 20 Mar 2024 10:00:00 GMT', datetime.datetime(2024, 3, 20, 10, 0, tzinfo=UTC)),
+            ('2024年03月20日 10:00', datetime.datetime(2024, 3, 20, 10, 0)),
+            ('2024年3月20日', datetime.datetime(2024, 3, 20)),
+            ('2024.03.20', datetime.datetime(2024, 3, 20)),
+        ]
+        with patch('crawler.dateparse._parse_dateutil') as mock_dateutil:
+            for value, expected in cases:
+                self.assertEqual(parse_date(value), expected, value)
+            mock_dateutil.assert_not_called()
+
+    def test_invalid_values(self):
+        """测试无法解析的值"""
+        for value in ('invalid_date', '', '   ', None, '2024-13-40', True, {'time': 1}):
+            self.assertIsNone(parse_date(value), value)
+
+    def test_timestamps(self):
+        """测试时间戳"""
+        expected = datetime.datetime.fromtimestamp(1710900000)
+        self.assertEqual(parse_date(1710900000), expected)
+        self.assertEqual(parse_date('1710900000'), expected)
+        self.assertEqual(parse_date('1710900000000'), expected)
+
+    def test_learned_format_first(self):
+        """测试记住数据源上次成功的格式并优先尝试"""
+        self.assertEqual(parse_date('20 Mar 2024 10:00:00 +0800', key=1), datetime.datetime(
+            2024, 3, 20, 10, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=8))
+        ))
+        self.assertEqual(get_learned_format(1), RFC822)
+        self.assertIsNone(get_learned_format(2))
+
+        tried = []
+        original = dateparse._try
+
+        def record(name, value):
+            tried.append(name)
+            return original(name, value)
+
+        with patch('crawler.dateparse._try', side_effect=record):
+            parse_date('21 Mar 2024 08:30:00 +0800', key=1)
+        self.assertEqual(tried, [RFC822])
+
+        parse_date('2024年03月22日', key=1)
+        self.assertEqual(get_learned_format(1), CHINESE)
+
+    def test_result_cache(self):
+        """测试重复的时间字符串只解析一次"""
+        with patch('crawler.dateparse._try', wraps=dateparse._try) as mock_try:
+            for _ in range(5):
+                self.assertEqual(parse_date('2024-03-20 10:00:00'), datetime.datetime(2024, 3, 20, 10, 0))
+            self.assertEqual(mock_try.call_count, 1)
+        self.assertEqual(date_cache_info()['hits'], 4)
+
+    def test_crawlers_share_parser(self):
+        """测试各爬虫使用同一解析逻辑"""
+        config = CrawlerConfig.objects.create(
+            name='测试数据源',
+            crawler_type=2,
+            source_url='https://api.test.com/news',
+            status=1,
+            config_data={'date_format': '%d/%m/%Y %H:%M'}
+        )
+        api_crawler = APICrawler(config)
+        self.assertEqual(api_crawler._parse_datetime('20/03/2024 10:00'), datetime.datetime(2024, 3, 20, 10, 0))
+        self.assertEqual(get_learned_format(config.pk), '%d/%m/%Y %H:%M')
+        self.assertEqual(
+            api_crawler._parse_datetime('2024-03-20T10:00:00Z'),
+            datetime.datetime(2024, 3, 20, 10, 0, tzinfo=UTC)
+        )
+        self.assertEqual(get_learned_format(config.pk), ISO8601)
+
+        web_crawler = WebCrawler(config)
+        self.assertEqual(
+            web_crawler.parse_datetime('2024-03-20T10:00:00+08:00'),
+            datetime.datetime(2024, 3, 20, 2, 0)
+        )
+        with patch.object(web_crawler, 'get_current_time', return_value=datetime.datetime(2024, 1, 1)):
+            self.assertEqual(web_crawler.parse_datetime('invalid_date'), datetime.datetime(2024, 1, 1))
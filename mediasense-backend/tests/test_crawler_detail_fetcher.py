@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from django.test import TestCase
+
+from crawler.crawlers.api_crawler import APICrawler
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.detail_fetcher import DetailFetcher
+from crawler.models import CrawlerConfig
+
+
+class DetailPageHandler(BaseHTTPRequestHandler):
+    """详情页测试服务，/slow 开头的页面5秒后才返回"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path.startswith('/slow'):
+            time.sleep(5)
+            self.send_response(504)
+            self.end_headers()
+            return
+
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(0.3)
+            if self.path.startswith('/missing'):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = f'<html><body><div class="content">正文{self.path}</div></body></html>'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDetailFetcher(TestCase):
+    """详情页并发抓取测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), DetailPageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        DetailPageHandler.max_active = 0
+
+    def test_ordered_results_with_host_limit(self):
+        """测试结果顺序和单主机并发限制"""
+        urls = [f'{self.base_url}/article/{i}' for i in range(6)]
+        urls.insert(2, f'{self.base_url}/missing')
+        fetcher = DetailFetcher(max_concurrency=10, per_host=3, timeout=3, deadline=10)
+
+        start = time.time()
+        pages = fetcher.fetch_all(urls)
+        elapsed = time.time() - start
+
+        self.assertEqual(len(pages), 7)
+        self.assertIsNone(pages[2])
+        for url, page in zip(urls[:2] + urls[3:], pages[:2] + pages[3:]):
+            self.assertIn(f'正文{url[len(self.base_url):]}', page)
+        self.assertLessEqual(DetailPageHandler.max_active, 3)
+        # 串行需要 7 * 0.3 秒
+        self.assertLess(elapsed, 7 * 0.3)
+
+    def test_deadline(self):
+        """测试超过总时限的页面直接放弃"""
+        fetcher = DetailFetcher(timeout=10, deadline=1)
+        start = time.time()
+        pages = fetcher.fetch_all([f'{self.base_url}/article/1', f'{self.base_url}/slow/1'])
+        self.assertLess(time.time() - start, 3)
+        self.assertIsNotNone(pages[0])
+        self.assertIsNone(pages[1])
+
+    def test_reserve_off_loop(self):
+        """测试限速预约在线程池中执行，不阻塞事件循环"""
+        in_loop = []
+
+        def reserve(url):
+            try:
+                asyncio.get_running_loop()
+                in_loop.append(True)
+            except RuntimeError:
+                in_loop.append(False)
+            return 0
+
+        fetcher = DetailFetcher(max_concurrency=4, per_host=2, timeout=3, deadline=10, reserve=reserve)
+        pages = fetcher.fetch_all([f'{self.base_url}/article/{i}' for i in range(2)])
+        self.assertTrue(all(pages))
+        self.assertEqual(in_loop, [False, False])
+
+    def test_web_crawler_need_content(self):
+        """测试网页爬虫并发获取正文，超时的文章保留摘要"""
+        html = ''.join(
+            f'<li><a href="{path}">标题{index}</a><p>摘要{index}</p></li>'
+            for index, path in enumerate(['/article/1', '/slow/2', '/article/3'])
+        )
+        config = CrawlerConfig.objects.create(
+            name='测试网页源',
+            crawler_type=3,
+            source_url=f'{self.base_url}/list',
+            status=1,
+            config_data={
+                'list_selector': 'li',
+                'title_selector': 'a',
+                'link_selector': 'a',
+                'summary_selector': 'p',
+                'content_selector': '.content',
+                'need_content': True,
+                'detail': {'deadline': 1}
+            }
+        )
+        articles = WebCrawler(config).parse_response({'status': 'success', 'data': f'<ul>{html}</ul>'})
+        self.assertEqual([article['content'] for article in articles], ['正文/article/1', '摘要1', '正文/article/3'])
+
+    def test_api_crawler_missing_content(self):
+        """测试API爬虫为缺少正文的文章抓取详情页"""
+        config = CrawlerConfig.objects.create(
+            name='测试API源',
+            crawler_type=2,
+            source_url=f'{self.base_url}/api',
+            status=1,
+            config_data={
+                'data_path': 'items',
+                'title_path': 'title',
+                'link_path': 'url',
+                'content_path': 'content',
+                'description_path': 'summary',
+                'content_selector': '.content'
+            }
+        )
+        items = [
+            {'title': '有正文', 'url': f'{self.base_url}/article/1', 'content': '原有正文'},
+            {'title': '无正文', 'url': f'{self.base_url}/article/2', 'summary': '摘要'},
+            {'title': '详情失败', 'url': f'{self.base_url}/missing/3', 'summary': '摘要3'},
+        ]
+        articles = APICrawler(config).parse_response({'status': 'success', 'data': {'items': items}})
+        self.assertEqual([article['content'] for article in articles], ['原有正文', '正文/article/2', '摘要3'])
@@ -0,0 +1,99 @@
+import datetime
+from pathlib import Path
+from django.test import TestCase
+from unittest.mock import patch
+from crawler import feed_parser
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.feed_parser import iter_feed_entries, iter_feedparser_entries
+from crawler.models import CrawlerConfig
+
+FEEDS_DIR = Path(__file__).resolve().parents[1] / 'crawler' / 'benchmarks' / 'feeds'
+
+RSS_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>测试源</title>{items}</channel></rss>'''
+
+ITEM_TEMPLATE = '''<item><title>测试文章{i}</title><link>https://test.com/article/{i}</link>
+<description>&lt;p&gt;测试描述{i}&lt;/p&gt;</description></item>'''
+
+
+class TestFeedParser(TestCase):
+    """RSS流式解析测试类"""
+
+    def test_consistent_with_feedparser(self):
+        """测试样例订阅源的解析结果与feedparser一致"""
+        for name in ('rss2_news.xml', 'atom_blog.xml', 'rss1_rdf.xml'):
+            data = (FEEDS_DIR / name).read_bytes()
+            streamed = list(iter_feed_entries(data))
+            expected = list(iter_feedparser_entries(data))
+            self.assertEqual(len(streamed), len(expected), name)
+            for entry, other in zip(streamed, expected):
+                for field in ('title', 'link', 'author', 'published', 'tags', 'images'):
+                    self.assertEqual(entry[field], other[field], f'{name} {field}')
+
+    def test_fields(self):
+        """测试字段提取"""
+        entry = next(iter_feed_entries((FEEDS_DIR / 'atom_blog.xml').read_bytes()))
+        self.assertEqual(entry['link'], 'https://blog.example.com/posts/latency')
+        self.assertEqual(entry['author'], '陈工')
+        self.assertEqual(entry['published'], datetime.datetime(2024, 3, 20, 4, 0))
+        self.assertIn('<p>', entry['content'])
+
+    def test_fallback_on_invalid_xml(self):
+        """测试非法XML退回feedparser且不重复产出条目"""
+        entries = list(iter_feed_entries((FEEDS_DIR / 'rss2_html_entities.xml').read_bytes()))
+        self.assertEqual([entry['link'] for entry in entries], [
+            'https://local.example.com/news/1001.html',
+            'https://local.example.com/news/1002.html'
+        ])
+
+        data = RSS_TEMPLATE.format(items=ITEM_TEMPLATE.format(i=1) + ITEM_TEMPLATE.format(i=2) + '&nbsp;')
+        entries = list(iter_feed_entries(data.encode('utf-8')))
+        self.assertEqual([entry['link'] for entry in entries], [
+            'https://test.com/article/1',
+            'https://test.com/article/2'
+        ])
+
+
+class TestRSSEarlyStop(TestCase):
+    """RSS提前停止解析测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1
+        )
+        # 订阅源按时间倒序，编号小于60的文章已入库
+        items = ''.join(ITEM_TEMPLATE.format(i=i) for i in range(99, -1, -1))
+        self.feed = {'status': 'success', 'data': RSS_TEMPLATE.format(items=items).encode('utf-8')}
+        patcher = patch.object(RSSCrawler, 'get_known_urls', lambda crawler, urls: {
+            url for url in urls if int(url.rsplit('/', 1)[1]) < 60
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stop_at_first_known(self):
+        """测试遇到第一篇已入库文章后停止解析"""
+        crawler = RSSCrawler(self.config)
+        with patch('crawler.feed_parser._parse_entry', wraps=feed_parser._parse_entry) as mock_parse:
+            articles = crawler.parse_response(self.feed)
+        self.assertEqual(len(articles), 40)
+        self.assertEqual(articles[-1]['url'], 'https://test.com/article/60')
+        self.assertEqual(crawler.skipped_known, 1)
+        self.assertLess(mock_parse.call_count, 100)
+
+    def test_early_stop_threshold(self):
+        """测试连续遇到多篇已入库文章后才停止"""
+        self.config.config_data = {'early_stop': 3}
+        crawler = RSSCrawler(self.config)
+        self.assertEqual(len(crawler.parse_response(self.feed)), 40)
+        self.assertEqual(crawler.skipped_known, 3)
+
+    def test_early_stop_disabled(self):
+        """测试关闭提前停止后解析全部条目"""
+        self.config.config_data = {'early_stop': 0}
+        crawler = RSSCrawler(self.config)
+        self.assertEqual(len(crawler.parse_response(self.feed)), 40)
+        self.assertEqual(crawler.skipped_known, 60)
@@ -0,0 +1,111 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from django.test import TransactionTestCase
+
+from crawler.exceptions import FetchError
+from crawler.fetcher import AsyncFetcher
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.services import CrawlerService
+from news.models import NewsArticle
+
+RSS_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>测试源</title>
+<item><title>测试文章{path}</title><link>https://test.com/article{path}</link>
+<description>测试描述</description></item>
+</channel></rss>'''
+
+
+class SlowFeedHandler(BaseHTTPRequestHandler):
+    """每个请求延迟0.3秒返回的RSS源"""
+
+    delay = 0.3
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = RSS_TEMPLATE.format(path=self.path).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncFetcher(TransactionTestCase):
+    """异步抓取引擎测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowFeedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_fetch_sync(self):
+        """测试同步接口获取响应"""
+        fetcher = AsyncFetcher(limit=10, limit_per_host=2)
+        try:
+            response = fetcher.fetch_sync(f'{self.base_url}/feed')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('测试文章/feed', response.text)
+
+            response = fetcher.fetch_sync(f'{self.base_url}/missing')
+            self.assertFalse(response.ok)
+            with self.assertRaises(FetchError):
+                response.raise_for_status()
+        finally:
+            fetcher.close()
+
+    def test_connection_error(self):
+        """测试网络错误转换为FetchError"""
+        fetcher = AsyncFetcher()
+        try:
+            with self.assertRaises(FetchError):
+                fetcher.fetch_sync('http://127.0.0.1:1/feed', timeout=2)
+        finally:
+            fetcher.close()
+
+    def test_run_tasks_concurrently(self):
+        """测试多个数据源在同一事件循环中并发抓取"""
+        configs = [
+            CrawlerConfig.objects.create(
+                name=f'测试RSS源{i}',
+                crawler_type=1,
+                source_url=f'{self.base_url}/feed{i}',
+                status=1
+            )
+            for i in range(8)
+        ]
+        configs.append(CrawlerConfig.objects.create(
+            name='失效的RSS源',
+            crawler_type=1,
+            source_url=f'{self.base_url}/missing',
+            status=1
+        ))
+        tasks = [CrawlerService.create_task(config) for config in configs]
+
+        start = time.time()
+        results = CrawlerService.run_tasks_concurrently(tasks)
+        elapsed = time.time() - start
+
+        # 串行执行至少需要 9 * 0.3 秒
+        self.assertLess(elapsed, 9 * SlowFeedHandler.delay)
+        self.assertEqual(sum(results.values()), 8)
+        self.assertEqual(NewsArticle.objects.count(), 8)
+        self.assertEqual(CrawlerTask.objects.filter(status=CrawlerTask.Status.COMPLETED).count(), 8)
+        failed = CrawlerTask.objects.get(config=configs[-1])
+        self.assertEqual(failed.status, CrawlerTask.Status.ERROR)
+        self.assertTrue(failed.error_message)
@@ -0,0 +1,104 @@
+from pathlib import Path
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.html_backend import HTML_PARSER, LXML, CompiledSelector, html_to_text, parse_html
+from crawler.models import CrawlerConfig
+from crawler.parse_plan import clear_parse_plans, get_parse_plan
+
+PAGES_DIR = Path(__file__).resolve().parents[1] / 'crawler' / 'benchmarks' / 'pages'
+
+
+class TestHTMLBackend(TestCase):
+    """HTML解析后端测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        clear_parse_plans()
+        self.config = CrawlerConfig.objects.create(
+            name='测试网页源',
+            crawler_type=3,
+            source_url='https://web.test.com/news/',
+            status=1,
+            config_data={
+                'list_selector': 'ul.news-list > li.news-item',
+                'title_selector': 'a.news-title',
+                'link_selector': 'a.news-title',
+                'author_selector': '.news-meta .author',
+                'time_selector': '.news-meta .time',
+                'summary_selector': 'p.news-summary',
+                'tags_selector': '.news-tags .tag',
+                'image_selector': 'img.news-cover',
+                'date_format': '%Y-%m-%d %H:%M',
+                'content_selector': 'article .article-content',
+                'skip_known': False
+            }
+        )
+        self.list_page = {'status': 'success', 'data': (PAGES_DIR / 'news_list.html').read_text(encoding='utf-8')}
+
+    def parse_with(self, parser):
+        self.config.config_data = {**self.config.config_data, 'html_parser': parser}
+        crawler = WebCrawler(self.config)
+        self.assertEqual(crawler.plan.html.parser, parser)
+        return crawler.parse_response(self.list_page)
+
+    def test_backends_consistent(self):
+        """测试两种后端的解析结果一致"""
+        lxml_articles = self.parse_with(LXML)
+        soup_articles = self.parse_with(HTML_PARSER)
+        self.assertEqual(len(lxml_articles), 30)
+        self.assertEqual(lxml_articles, soup_articles)
+        self.assertEqual(lxml_articles[0]['tags'], ['人工智能', '行业'])
+        self.assertEqual(lxml_articles[0]['images'], ['https://web.test.com/images/cover/1000.jpg'])
+
+    def test_detail_content_consistent(self):
+        """测试两种后端提取的正文一致"""
+        html = (PAGES_DIR / 'article.html').read_text(encoding='utf-8')
+        selector = CompiledSelector('article .article-content')
+        lxml_content = WebCrawler._extract_detail_content(html, selector, LXML)
+        soup_content = WebCrawler._extract_detail_content(html, selector, HTML_PARSER)
+        self.assertEqual(lxml_content, soup_content)
+        self.assertNotIn('loadRelated', lxml_content)
+        self.assertNotIn('ad-slot', lxml_content)
+
+    def test_html_to_text_consistent(self):
+        """测试两种后端清理HTML标签的结果一致"""
+        samples = (
+            '<p>第一段</p><p>第二段 &amp; 更多</p>结尾',
+            '纯文本 &amp; 实体',
+            '<div><script>x=1</script>正文</div>',
+            '<div>\n  <p>段落</p>\n  <pre>  代码\n  </pre> </div>',
+        )
+        for html in samples:
+            self.assertEqual(html_to_text(html, LXML), html_to_text(html, HTML_PARSER))
+
+    def test_default_parser(self):
+        """测试默认使用html.parser，lxml需要按数据源启用"""
+        self.assertEqual(get_parse_plan(self.config).html.parser, HTML_PARSER)
+
+    @override_settings(CRAWLER_HTML_PARSER=LXML)
+    def test_global_setting(self):
+        """测试全局配置解析后端"""
+        self.assertEqual(get_parse_plan(self.config).html.parser, LXML)
+
+    def test_soupsieve_only_selector(self):
+        """测试lxml不支持的选择器退回BeautifulSoup"""
+        self.config.config_data = {
+            **self.config.config_data,
+            'html_parser': LXML,
+            'title_selector': 'a:-soup-contains("人工智能")'
+        }
+        self.assertEqual(get_parse_plan(self.config).html.parser, HTML_PARSER)
+        articles = WebCrawler(self.config).parse_response(self.list_page)
+        self.assertEqual(len(articles), 3)
+
+    def test_fallback_to_beautifulsoup(self):
+        """测试lxml解析失败时退回BeautifulSoup"""
+        self.config.config_data = {**self.config.config_data, 'html_parser': LXML}
+        crawler = WebCrawler(self.config)
+        with patch('crawler.crawlers.web_crawler.parse_html', side_effect=[ValueError('解析失败'), parse_html(
+            self.list_page['data'], HTML_PARSER
+        )]) as mock_parse:
+            articles = crawler.parse_response(self.list_page)
+        self.assertEqual(len(articles), 30)
+        self.assertEqual([call.args[1] for call in mock_parse.call_args_list], [LXML, HTML_PARSER])
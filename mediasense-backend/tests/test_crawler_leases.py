@@ -0,0 +1,103 @@
+import datetime
+import time
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch
+from crawler.locks import Lease, LeaseHeartbeat, get_config_lease
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.services import CrawlerService
+
+
+class TestConfigLease(TestCase):
+    """数据源抓取租约测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            interval=60,
+            status=1
+        )
+        self.result = {'status': 'success', 'data': [], 'message': '未获取到数据'}
+
+    def crawl(self):
+        with patch.object(CrawlerService, 'get_crawler') as mock_get_crawler:
+            mock_get_crawler.return_value.run.return_value = self.result
+            mock_get_crawler.return_value.skipped_known = 0
+            return CrawlerService.crawl_website(self.config), mock_get_crawler
+
+    def test_skip_when_leased(self):
+        """测试其他worker持有租约时跳过抓取"""
+        other = get_config_lease(self.config.id)
+        self.assertTrue(other.acquire())
+        try:
+            result, mock_get_crawler = self.crawl()
+        finally:
+            other.release()
+        self.assertEqual(result['status'], 'skipped')
+        mock_get_crawler.assert_not_called()
+
+        result, mock_get_crawler = self.crawl()
+        self.assertEqual(result['status'], 'success')
+        self.assertFalse(get_config_lease(self.config.id).is_held())
+
+    def test_expired_lease_reclaimed(self):
+        """测试崩溃的worker遗留的租约到期后可以重新获取"""
+        crashed = Lease('test-config', ttl=0.05)
+        self.assertTrue(crashed.acquire())
+        other = Lease('test-config', ttl=30)
+        self.assertFalse(other.acquire())
+        time.sleep(0.1)
+        self.assertFalse(crashed.is_held())
+        self.assertTrue(other.acquire())
+        self.assertFalse(crashed.renew())
+        other.release()
+
+    def test_heartbeat_renews(self):
+        """测试心跳线程在有效期内续期"""
+        lease = Lease('test-heartbeat', ttl=0.15)
+        self.assertTrue(lease.acquire())
+        with LeaseHeartbeat([lease], interval=0.03) as heartbeat:
+            time.sleep(0.4)
+            self.assertTrue(lease.is_held())
+            self.assertFalse(heartbeat.lost)
+        lease.release()
+
+    def test_run_task_cancelled_when_skipped(self):
+        """测试租约被占用时任务标记为已取消，不更新运行时间"""
+        task = CrawlerTask.objects.create(config=self.config, status=CrawlerTask.Status.PENDING)
+        other = get_config_lease(self.config.id)
+        other.acquire()
+        try:
+            with patch.object(CrawlerService, 'get_crawler'):
+                self.assertFalse(CrawlerService.run_task(task))
+            CrawlerService.run_tasks_concurrently([task])
+        finally:
+            other.release()
+        task.refresh_from_db()
+        self.config.refresh_from_db()
+        self.assertEqual(task.status, CrawlerTask.Status.CANCELLED)
+        self.assertIsNone(self.config.last_run_time)
+
+    @override_settings(CRAWLER_CONFIG_LEASE_TTL=60)
+    def test_create_task_reclaims_orphans(self):
+        """测试创建任务时回收租约已过期的运行中任务"""
+        task = CrawlerTask.objects.create(
+            config=self.config,
+            status=CrawlerTask.Status.RUNNING,
+            start_time=timezone.now() - datetime.timedelta(minutes=5)
+        )
+        lease = get_config_lease(self.config.id)
+        lease.acquire()
+        try:
+            self.assertIsNone(CrawlerService.create_task(self.config))
+        finally:
+            lease.release()
+
+        new_task = CrawlerService.create_task(self.config)
+        self.assertIsNotNone(new_task)
+        task.refresh_from_db()
+        self.assertEqual(task.status, CrawlerTask.Status.ERROR)
+        self.assertIsNone(CrawlerService.create_task(self.config))
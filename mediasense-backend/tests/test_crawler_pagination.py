@@ -0,0 +1,125 @@
+import threading
+from django.core.cache import cache
+from django.test import TestCase
+from unittest.mock import patch, MagicMock
+from crawler.crawlers.api_crawler import APICrawler
+from crawler.models import CrawlerConfig
+from crawler.services import CrawlerService
+from news.models import NewsArticle
+
+PAGE_COUNT = 6
+
+
+def make_page_response(page):
+    response = MagicMock()
+    response.status_code = 200
+    response.encoding = 'utf-8'
+    items = [{'title': f'文章{page}-{i}', 'url': f'https://test.com/{page}/{i}'} for i in range(2)]
+    response.json.return_value = {'items': items if page <= PAGE_COUNT else []}
+    return response
+
+
+class TestPaginationExecutor(TestCase):
+    """分页并发抓取测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试API源',
+            crawler_type=2,
+            source_url='https://api.test.com/news',
+            status=1,
+            config_data={
+                'data_path': 'items',
+                'title_path': 'title',
+                'link_path': 'url',
+                'content_path': 'title',
+                'skip_known': False,
+                'archive': False,
+                'params': {'lang': 'zh'},
+                'pagination': {'enabled': True, 'max_pages': 20, 'page_size': 2, 'concurrency': 4}
+            }
+        )
+        cache.delete(f'crawler:pagination:{self.config.pk}')
+        self.pages = []
+        self.threads = set()
+
+    def fake_get(self, url, **kwargs):
+        params = kwargs['params']
+        self.pages.append(params['page'])
+        self.threads.add(threading.get_ident())
+        return make_page_response(params['page'])
+
+    def test_concurrent_pages_stop_on_empty(self):
+        """测试并发请求页面，按页码顺序合并，遇到空页停止"""
+        with patch('requests.Session.get', side_effect=self.fake_get):
+            result = APICrawler(self.config).run()
+
+        self.assertEqual(result['status'], 'success')
+        titles = [article['title'] for article in result['data']]
+        self.assertEqual(titles, [f'文章{page}-{i}' for page in range(1, PAGE_COUNT + 1) for i in range(2)])
+        # 第7页为空，同一批次的第8页已经发出，之后不再请求
+        self.assertEqual(sorted(self.pages), list(range(1, 9)))
+        self.assertGreater(len(self.threads), 1)
+        self.assertEqual(self.config.config_data['params'], {'lang': 'zh'})
+        self.assertIsNone(cache.get(f'crawler:pagination:{self.config.pk}'))
+
+    def test_stop_on_known_page(self):
+        """测试某一页全部是已入库的文章时停止"""
+        self.config.config_data['skip_known'] = True
+        self.config.config_data['pagination']['concurrency'] = 1
+        known = {f'https://test.com/3/{i}' for i in range(2)}
+        with patch('requests.Session.get', side_effect=self.fake_get), \
+                patch.object(APICrawler, 'get_known_urls', lambda crawler, urls: known & set(urls)):
+            crawler = APICrawler(self.config)
+            result = crawler.run()
+        self.assertEqual(len(result['data']), 4)
+        self.assertEqual(crawler.skipped_known, 2)
+        self.assertEqual(self.pages, [1, 2, 3])
+
+    def test_pages_saved_before_next_fetch(self):
+        """测试服务层抓取时每页入库后才请求下一批页面，不保留之前页面的文章"""
+        self.config.config_data['pagination']['concurrency'] = 1
+        self.config.save()
+        events = []
+
+        def logging_get(url, **kwargs):
+            events.append(('fetch', kwargs['params']['page']))
+            return self.fake_get(url, **kwargs)
+
+        def logging_save(records, config, stats):
+            events.append(('save', len(list(records))))
+            return stats
+
+        with patch('requests.Session.get', side_effect=logging_get), \
+                patch('crawler.services.save_stream', side_effect=logging_save):
+            result = CrawlerService.crawl_website(self.config)
+        self.assertEqual(result['status'], 'success')
+        expected = [event for page in range(1, PAGE_COUNT + 1) for event in (('fetch', page), ('save', 2))]
+        self.assertEqual(events, expected + [('fetch', PAGE_COUNT + 1)])
+
+    def test_resume_from_checkpoint(self):
+        """测试逐页入库，中途失败后检查点只记录页码，重试时从失败的页面继续"""
+        self.config.config_data['pagination']['concurrency'] = 2
+        self.config.save()
+
+        def flaky_get(url, **kwargs):
+            if kwargs['params']['page'] == 4:
+                raise ConnectionError('连接被重置')
+            return self.fake_get(url, **kwargs)
+
+        with patch('requests.Session.get', side_effect=flaky_get):
+            result = CrawlerService.crawl_website(self.config)
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('第4页', result['message'])
+        self.assertEqual(result['saved'], 6)
+        self.assertEqual(cache.get(f'crawler:pagination:{self.config.pk}'), {'start_page': 1, 'page': 3})
+
+        self.pages = []
+        with patch('requests.Session.get', side_effect=self.fake_get):
+            result = CrawlerService.crawl_website(self.config)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['saved'], (PAGE_COUNT - 3) * 2)
+        self.assertEqual(min(self.pages), 4)
+        self.assertEqual(NewsArticle.objects.filter(crawler=self.config).count(), PAGE_COUNT * 2)
+        self.assertIsNone(cache.get(f'crawler:pagination:{self.config.pk}'))
@@ -0,0 +1,118 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import patch
+from crawler.crawlers.api_crawler import APICrawler
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.exceptions import ParseError
+from crawler.models import CrawlerConfig
+from crawler.parse_plan import FieldPath, clear_parse_plans, get_parse_plan
+
+HTML_CONTENT = '''<html><body><ul class="news">
+<li><a class="title" href="/article/1">测试文章1</a><span class="time">2024年03月20日 10:00</span>
+<span class="tag">科技</span><span class="tag">互联网</span><img src="/img/1.jpg"/></li>
+<li><a class="title" href="/article/2">测试文章2</a><span class="time">2024年03月19日 08:30</span></li>
+</ul></body></html>'''
+
+
+class TestParsePlan(TestCase):
+    """解析计划测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        clear_parse_plans()
+        self.api_config = CrawlerConfig.objects.create(
+            name='测试API源',
+            crawler_type=2,
+            source_url='https://api.test.com/news',
+            status=1,
+            config_data={
+                'data_path': 'data.items',
+                'title_path': 'title',
+                'link_path': 'links[0].href',
+                'pub_time_path': 'meta.time',
+                'date_format': '%Y年%m月%d日 %H:%M'
+            }
+        )
+        self.web_config = CrawlerConfig.objects.create(
+            name='测试网页源',
+            crawler_type=3,
+            source_url='https://web.test.com/news',
+            status=1,
+            config_data={
+                'list_selector': 'ul.news li',
+                'title_selector': 'a.title',
+                'link_selector': 'a.title',
+                'time_selector': '.time',
+                'tags_selector': '.tag',
+                'image_selector': 'img',
+                'date_format': ['%Y-%m-%d', '%Y年%m月%d日 %H:%M']
+            }
+        )
+
+    def test_field_path(self):
+        """测试字段路径预先拆分"""
+        path = FieldPath.compile('items[1].author.name')
+        self.assertEqual(path.steps, ('items', 1, 'author', 'name'))
+        data = {'items': [{}, {'author': {'name': '测试作者'}}]}
+        self.assertEqual(path.get(data), '测试作者')
+        self.assertIsNone(path.get({'items': []}))
+        self.assertIsNone(FieldPath.compile(''))
+
+    def test_plan_cached_by_config_data(self):
+        """测试解析计划按配置ID和解析配置缓存，只更新运行时间的保存不重新编译"""
+        plan = get_parse_plan(self.api_config)
+        with patch('crawler.parse_plan.compile_plan') as mock_compile:
+            self.assertIs(get_parse_plan(self.api_config), plan)
+            self.assertIs(get_parse_plan(CrawlerConfig.objects.get(pk=self.api_config.pk)), plan)
+            self.api_config.last_run_time = timezone.now()
+            self.api_config.save()
+            self.assertIs(get_parse_plan(CrawlerConfig.objects.get(pk=self.api_config.pk)), plan)
+            mock_compile.assert_not_called()
+
+        self.api_config.config_data['title_path'] = 'headline'
+        self.api_config.save()
+        new_plan = get_parse_plan(self.api_config)
+        self.assertIsNot(new_plan, plan)
+        self.assertEqual(new_plan.api.title.path, 'headline')
+
+    def test_unsaved_change_recompiles(self):
+        """测试未保存的配置修改也会重新编译"""
+        plan = get_parse_plan(self.api_config)
+        self.api_config.config_data = {**self.api_config.config_data, 'title_path': 'headline'}
+        self.assertEqual(get_parse_plan(self.api_config).api.title.path, 'headline')
+        self.assertEqual(plan.api.title.path, 'title')
+
+    def test_api_execute_plan(self):
+        """测试API爬虫执行解析计划"""
+        data = {'status': 'success', 'data': {'data': {'items': [{
+            'title': '测试文章',
+            'links': [{'href': 'https://api.test.com/article/1'}],
+            'content': '测试内容',
+            'meta': {'time': '2024年03月20日 10:00'}
+        }]}}}
+        self.api_config.config_data['content_path'] = 'content'
+        articles = APICrawler(self.api_config).parse_response(data)
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(articles[0]['url'], 'https://api.test.com/article/1')
+        self.assertEqual(articles[0]['pub_time'], datetime.datetime(2024, 3, 20, 10, 0))
+
+    def test_web_execute_plan(self):
+        """测试网页爬虫执行预编译的选择器"""
+        crawler = WebCrawler(self.web_config)
+        articles = crawler.parse_response({'status': 'success', 'data': HTML_CONTENT})
+        self.assertEqual([article['url'] for article in articles], [
+            'https://web.test.com/article/1',
+            'https://web.test.com/article/2'
+        ])
+        self.assertEqual(articles[0]['tags'], ['科技', '互联网'])
+        self.assertEqual(articles[0]['images'], ['https://web.test.com/img/1.jpg'])
+        self.assertEqual(articles[1]['pub_time'], datetime.datetime(2024, 3, 19, 8, 30))
+
+    def test_invalid_selector(self):
+        """测试无效的选择器"""
+        self.web_config.config_data['title_selector'] = 'a[title'
+        with self.assertRaises(ParseError):
+            get_parse_plan(self.web_config)
+        crawler = WebCrawler(self.web_config)
+        self.assertEqual(crawler.parse_response({'status': 'success', 'data': HTML_CONTENT}), [])
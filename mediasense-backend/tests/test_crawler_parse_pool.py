@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import Future
+from django.test import TestCase, override_settings
+from unittest.mock import AsyncMock, patch
+from crawler import parse_pool
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.models import CrawlerConfig
+
+RSS_FEED = (
+    '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>测试源</title>'
+    + ''.join(
+        f'<item><title>测试文章{i}</title><link>https://test.com/article/{i}</link>'
+        f'<description>&lt;p&gt;测试&lt;b&gt;描述{i}&lt;/b&gt;&lt;/p&gt;</description></item>'
+        for i in range(20)
+    )
+    + '</channel></rss>'
+).encode('utf-8')
+
+
+@override_settings(CRAWLER_PARSE_PROCESSES=2)
+class TestParsePool(TestCase):
+    """解析进程池测试类"""
+
+    @classmethod
+    def tearDownClass(cls):
+        parse_pool.shutdown_parse_pool()
+        super().tearDownClass()
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1,
+            is_active=True,
+            config_data={'skip_known': False}
+        )
+        self.fetch_result = {'status': 'success', 'data': RSS_FEED}
+
+    def test_parse_in_worker_process(self):
+        """测试在子进程中解析，结果与当前线程解析一致"""
+        crawler = RSSCrawler(self.config)
+        expected = crawler.parse_response(self.fetch_result)
+
+        with patch.object(parse_pool, 'submit_parse', wraps=parse_pool.submit_parse) as mock_submit, \
+                patch.object(parse_pool, '_handle_failure') as mock_failure, \
+                patch.object(RSSCrawler, 'fetch_data', return_value=self.fetch_result), \
+                patch.object(RSSCrawler, 'fetch_data_async', AsyncMock(return_value=self.fetch_result)):
+            result = RSSCrawler(self.config).run()
+            async_result = asyncio.run(RSSCrawler(self.config).run_async())
+
+        self.assertEqual(mock_submit.call_count, 2)
+        mock_failure.assert_not_called()
+        self.assertIsNotNone(parse_pool.get_parse_pool())
+        for run_result in (result, async_result):
+            self.assertEqual(run_result['status'], 'success')
+            self.assertEqual([(a['title'], a['content']) for a in run_result['data']],
+                             [(a['title'], a['content']) for a in expected])
+
+    def test_fallback_on_pool_failure(self):
+        """测试进程池解析失败时在当前线程解析"""
+        failed = Future()
+        failed.set_exception(RuntimeError('子进程退出'))
+        crawler = RSSCrawler(self.config)
+        with patch.object(parse_pool, 'submit_parse', return_value=failed):
+            articles = crawler.parse_in_pool(self.fetch_result)
+        self.assertEqual(len(articles), 20)
+
+    @override_settings(CRAWLER_PARSE_PROCESSES=0)
+    def test_disabled(self):
+        """测试未启用时不创建进程池"""
+        self.assertIsNone(parse_pool.submit_parse(RSSCrawler(self.config), self.fetch_result))
+
+    def test_child_parses_only(self):
+        """测试子进程只做CPU解析，查询已入库的URL和抓取详情页在当前进程中完成"""
+        with patch.object(RSSCrawler, 'get_known_urls', side_effect=AssertionError('子进程不能访问数据库')):
+            articles = parse_pool.parse_in_process(RSSCrawler, self.config, self.fetch_result)
+        self.assertEqual(len(articles), 20)
+
+        # 已入库的文章跳过，连续遇到early_stop篇后丢弃剩余文章
+        self.config.config_data = {'early_stop': 2}
+        crawler = RSSCrawler(self.config)
+        known = {'https://test.com/article/3', 'https://test.com/article/5', 'https://test.com/article/6'}
+        with patch.object(RSSCrawler, 'get_known_urls', return_value=known):
+            fresh = crawler.complete_items(articles)
+        self.assertEqual([a['url'] for a in fresh], [f'https://test.com/article/{i}' for i in (0, 1, 2, 4)])
+        self.assertEqual(crawler.skipped_known, 3)
+
+    def test_detail_pages_in_parent(self):
+        """测试网页数据源的详情页在当前进程中抓取"""
+        config = CrawlerConfig.objects.create(
+            name='测试网站', crawler_type=3, source_url='https://test.com/news', status=1,
+            config_data={'list_selector': '.item', 'title_selector': 'a', 'link_selector': 'a',
+                         'content_selector': '.content', 'need_content': True, 'skip_known': False}
+        )
+        html = ''.join(f'<div class="item"><a href="/a/{i}">标题{i}</a></div>' for i in range(3))
+        result = {'status': 'success', 'data': f'<html><body>{html}</body></html>'}
+        with patch.object(WebCrawler, 'fetch_detail_pages', side_effect=AssertionError('子进程不能发送请求')):
+            articles = parse_pool.parse_in_process(WebCrawler, config, result)
+        self.assertEqual([a['content'] for a in articles], ['', '', ''])
+
+        with patch.object(WebCrawler, 'fetch_detail_contents', return_value=['正文0', None, '正文2']):
+            fresh = WebCrawler(config).complete_items(articles)
+        self.assertEqual([a['content'] for a in fresh], ['正文0', '', '正文2'])
+        self.assertFalse(WebCrawler(config).can_parse_in_process({'status': 'success', 'sitemap': True}))
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from crawler.models import CrawlerConfig
+from crawler.persistence import save_articles
+from crawler.services import CrawlerService
+from news.models import NewsArticle
+
+
+class TestArticlePersistence(TestCase):
+    """文章批量入库测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试数据源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1
+        )
+
+    def make_items(self, count, start=0):
+        return [
+            {
+                'title': f'测试文章{i}',
+                'url': f'https://test.com/article/{i}',
+                'content': f'测试内容{i}',
+                'description': f'测试描述{i}',
+                'author': '测试作者',
+                'source': '测试来源',
+                'pub_time': timezone.now()
+            }
+            for i in range(start, start + count)
+        ]
+
+    def test_bulk_save(self):
+        """测试批量保存和统计"""
+        NewsArticle.objects.create(
+            title='已存在的文章',
+            content='内容',
+            source_url='https://test.com/article/0'
+        )
+        items = self.make_items(5)
+        items.append(dict(items[1]))  # 批次内重复
+        items.append({'title': '', 'url': 'https://test.com/article/empty', 'content': '内容'})
+        items.append({'title': '无效链接', 'url': 'ftp://test.com/article', 'content': '内容'})
+
+        stats = save_articles(items, self.config)
+
+        self.assertEqual(stats, {'saved': 4, 'duplicated': 2, 'near_duplicated': 0, 'filtered': 2, 'errors': 0})
+        self.assertEqual(NewsArticle.objects.count(), 5)
+        article = NewsArticle.objects.get(source_url='https://test.com/article/1')
+        self.assertEqual(article.summary, '测试描述1')
+        self.assertEqual(article.crawler_id, self.config.id)
+        self.assertEqual(article.status, NewsArticle.Status.DRAFT)
+
+    def test_query_count(self):
+        """测试查询次数与文章数量无关"""
+        with CaptureQueriesContext(connection) as queries:
+            stats = save_articles(self.make_items(200), self.config)
+        self.assertEqual(stats['saved'], 200)
+        # 逐条保存需要400次以上查询
+        self.assertLess(len(queries), 20)
+
+        with self.assertNumQueries(1):
+            stats = save_articles(self.make_items(200), self.config)
+        self.assertEqual(stats['duplicated'], 200)
+
+    def test_concurrent_insert_counted_as_duplicate(self):
+        """测试查询已存在URL之后被其他进程写入的文章计入重复，不计入新增"""
+        NewsArticle.objects.create(title='并发写入', content='内容', source_url='https://test.com/article/1')
+        with patch('crawler.persistence.find_existing_urls', return_value=set()):
+            stats = save_articles(self.make_items(3), self.config)
+        self.assertEqual((stats['saved'], stats['duplicated']), (2, 1))
+        self.assertEqual(NewsArticle.objects.get(source_url='https://test.com/article/1').title, '并发写入')
+
+    def test_chunked_insert(self):
+        """测试分批写入"""
+        with self.settings(CRAWLER_BULK_BATCH_SIZE=30):
+            stats = save_articles(self.make_items(100), self.config)
+        self.assertEqual(stats['saved'], 100)
+        self.assertEqual(NewsArticle.objects.count(), 100)
+
+    def test_save_article_compat(self):
+        """测试单篇保存接口保持原有返回值"""
+        item = self.make_items(1)[0]
+        self.assertEqual(CrawlerService._save_article(item, self.config), 'saved')
+        self.assertEqual(CrawlerService._save_article(item, self.config), 'duplicated')
+        self.assertEqual(CrawlerService._save_article({'title': '无链接'}, self.config), 'filtered')
+
+    def test_crawler_news_model(self):
+        """测试爬虫文章模型的批量保存"""
+        from crawler.models import NewsArticle as CrawlerNewsArticle
+
+        articles = [dict(item, config=self.config) for item in self.make_items(3)]
+        articles.append(dict(articles[0]))
+        articles.append({'title': '缺少时间', 'url': 'https://test.com/no-time', 'config': self.config})
+
+        self.assertEqual(CrawlerNewsArticle.save_news_articles(articles), 3)
+        self.assertEqual(CrawlerNewsArticle.save_news_articles(articles), 0)
+        self.assertEqual(CrawlerNewsArticle.objects.count(), 3)
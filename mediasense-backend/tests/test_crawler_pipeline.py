@@ -0,0 +1,119 @@
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from crawler import locks, pipeline
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.locks import get_config_lease
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.redis_utils import get_redis_client
+from crawler.tasks import pipeline_fetch
+from news.models import NewsArticle
+
+RSS_ITEMS = ''.join(
+    f'<item><title>测试文章{i}</title><link>https://test.com/article/{i}</link>'
+    f'<description>测试描述{i}</description><pubDate>Mon, 06 Jan 2025 08:00:00 +0800</pubDate></item>'
+    for i in range(5)
+)
+RSS_FEED = (
+    '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>测试源</title>'
+    + RSS_ITEMS
+    + '<item><title>测试文章0</title><link>https://test.com/article/0</link></item>'
+    + '</channel></rss>'
+).encode('utf-8')
+
+
+def release_config_lease(config_id):
+    """不论持有者是谁都释放数据源租约"""
+    key = get_config_lease(config_id).key
+    client = get_redis_client()
+    if client is not None:
+        client.delete(key)
+    with locks._local_lock:
+        locks._local_leases.pop(key, None)
+
+
+@override_settings(CRAWLER_PIPELINE_BATCH_SIZE=2)
+class TestCrawlPipeline(TestCase):
+    """分阶段抓取流水线测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1,
+            config_data={'skip_known': False}
+        )
+        self.task = CrawlerTask.objects.create(config=self.config, status=CrawlerTask.Status.PENDING)
+        pipeline.reset_stage_metrics()
+
+    def tearDown(self):
+        """释放测试中未释放的租约，避免影响其他测试"""
+        release_config_lease(self.config.id)
+
+    def run_pipeline(self, fetch_result):
+        with patch.object(RSSCrawler, 'fetch_data', return_value=fetch_result):
+            pipeline_fetch(self.task.task_id)
+        self.task.refresh_from_db()
+
+    def test_stages_end_to_end(self):
+        """测试四个阶段分批处理后完成任务并释放租约"""
+        self.run_pipeline({'status': 'success', 'data': RSS_FEED})
+
+        self.assertEqual(self.task.status, CrawlerTask.Status.COMPLETED)
+        stats = self.task.result['stats']
+        self.assertEqual(stats['total'], 6)
+        self.assertEqual(stats['saved'], 5)
+        self.assertEqual(stats['duplicate'], 1)
+        self.assertEqual(NewsArticle.objects.filter(crawler=self.config).count(), 5)
+        self.assertFalse(get_config_lease(self.config.id).is_held())
+
+        metrics = pipeline.get_stage_metrics()
+        self.assertEqual(metrics['fetch']['processed'], 1)
+        self.assertEqual(metrics['parse']['items'], 6)
+        self.assertEqual(metrics['clean']['processed'], 3)
+        self.assertEqual(metrics['persist']['processed'], 3)
+
+    def test_failed_stage_releases_lease(self):
+        """测试批次处理异常时按失败完成任务并释放租约"""
+        self.config.max_retries = 0
+        self.config.save()
+        with patch.object(pipeline, 'clean', side_effect=RuntimeError('数据库不可用')):
+            self.run_pipeline({'status': 'success', 'data': RSS_FEED})
+
+        self.assertEqual(self.task.status, CrawlerTask.Status.ERROR)
+        self.assertIn('数据库不可用', self.task.error_message)
+        self.assertFalse(get_config_lease(self.config.id).is_held())
+
+    def test_fetch_error_and_not_modified(self):
+        """测试抓取失败或未更新时在fetch阶段结束任务"""
+        self.config.max_retries = 0
+        self.config.save()
+        self.run_pipeline({'status': 'error', 'message': '请求失败: 500', 'data': None})
+        self.assertEqual(self.task.status, CrawlerTask.Status.ERROR)
+        self.assertEqual(self.task.error_message, '请求失败: 500')
+
+        self.task.status = CrawlerTask.Status.PENDING
+        self.task.save()
+        self.run_pipeline({'status': 'not_modified', 'data': None})
+        self.assertEqual(self.task.status, CrawlerTask.Status.COMPLETED)
+        self.assertTrue(self.task.result['not_modified'])
+        self.assertEqual(pipeline.get_stage_metrics()['parse']['processed'], 0)
+
+    def test_skipped_when_leased(self):
+        """测试租约被占用时不进入后续阶段"""
+        lease = get_config_lease(self.config.id)
+        lease.acquire()
+        try:
+            self.run_pipeline({'status': 'success', 'data': RSS_FEED})
+        finally:
+            lease.release()
+        self.assertEqual(self.task.status, CrawlerTask.Status.CANCELLED)
+        self.assertFalse(NewsArticle.objects.exists())
+
+    def test_payload_encoding(self):
+        """测试bytes数据编码后可以还原"""
+        message = pipeline.encode_fetch_result({'status': 'success', 'data': RSS_FEED})
+        self.assertIsInstance(message['data'], str)
+        self.assertEqual(pipeline.decode_fetch_result(message)['data'], RSS_FEED)
+        self.assertEqual(pipeline.encode_fetch_result({'data': [1]}), {'data': [1]})
@@ -0,0 +1,166 @@
+import socket
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from crawler.models import CrawlerConfig, ProxyPool
+from crawler.proxy import ProxySelector, check_proxies
+from crawler.crawlers.rss_crawler import RSSCrawler
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """本地代理替身，记录经过的请求并返回200"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        body = b'<rss version="2.0"><channel><title>ok</title></channel></rss>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestProxySelector(TestCase):
+    """代理选择器测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.fast = ProxyPool.objects.create(ip='10.0.0.1', port=8080, protocol='http',
+                                             speed=100, success_rate=95, status=1)
+        self.slow = ProxyPool.objects.create(ip='10.0.0.2', port=8080, protocol='http',
+                                             speed=3000, success_rate=60, status=1)
+        ProxyPool.objects.create(ip='10.0.0.3', port=8080, protocol='http', speed=50, success_rate=90, status=2)
+        self.selector = ProxySelector(refresh_interval=3600, sticky_ttl=600, smoothing=0.5, min_success_rate=20)
+
+    def test_weighted_choice(self):
+        """测试按成功率和延迟加权选择，不选择不可用的代理"""
+        counts = Counter(self.selector.choose(f'http://host{i}.com/rss') for i in range(400))
+        self.assertEqual(set(counts), {self.fast.proxy_url, self.slow.proxy_url})
+        self.assertGreater(counts[self.fast.proxy_url], counts[self.slow.proxy_url] * 5)
+
+    def test_sticky_per_host(self):
+        """测试同一主机固定使用同一代理，失败后重新选择"""
+        proxy = self.selector.choose('http://news.com/a')
+        for path in ('b', 'c', 'd'):
+            self.assertEqual(self.selector.choose(f'http://news.com/{path}'), proxy)
+
+        self.selector.report(proxy, False)
+        self.assertNotIn('news.com', self.selector._sticky)
+
+    def test_feedback_and_flush(self):
+        """测试请求反馈更新统计，成功率过低时停用并写回数据库"""
+        self.selector.refresh()
+        self.selector.report(self.fast.proxy_url, True, 0.3)
+        self.selector.report(self.slow.proxy_url, False)
+        self.selector.report(self.slow.proxy_url, False)
+        self.selector.flush()
+
+        self.fast.refresh_from_db()
+        self.slow.refresh_from_db()
+        self.assertAlmostEqual(self.fast.success_rate, 97.5)
+        self.assertEqual(self.fast.speed, 200)
+        self.assertAlmostEqual(self.slow.success_rate, 15)
+        self.assertEqual(self.slow.status, 2)
+
+        self.selector.refresh()
+        self.assertEqual(self.selector.choose('http://other.com/'), self.fast.proxy_url)
+
+    def test_flush_does_not_enable(self):
+        """测试写回反馈不会重新启用健康检查停用的代理"""
+        self.selector.refresh()
+        ProxyPool.objects.filter(pk=self.fast.pk).update(status=2)
+        self.selector.report(self.fast.proxy_url, True, 0.1)
+        self.selector.flush()
+
+        self.fast.refresh_from_db()
+        self.assertEqual(self.fast.status, 2)
+
+    def test_flush_from_multiple_processes(self):
+        """测试多个进程的反馈以数据库中的当前值为基准累加，不互相覆盖"""
+        other = ProxySelector(refresh_interval=3600, sticky_ttl=600, smoothing=0.5, min_success_rate=20)
+        for selector in (self.selector, other):
+            selector.refresh()
+            selector.report(self.fast.proxy_url, False)
+        self.selector.flush()
+        other.flush()
+
+        self.fast.refresh_from_db()
+        self.assertAlmostEqual(self.fast.success_rate, 23.75)
+        self.assertEqual(self.fast.status, 1)
+        self.assertEqual(self.fast.speed, 100)
+
+
+class TestProxyHealthCheck(TestCase):
+    """代理健康检查测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ProxyHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_check_proxies(self):
+        """测试并发探测代理并更新状态"""
+        alive = ProxyPool.objects.create(ip='127.0.0.1', port=self.port, protocol='http', success_rate=50)
+        dead = ProxyPool.objects.create(ip='127.0.0.1', port=unused_port(), protocol='http',
+                                        success_rate=60, status=1)
+        stats = check_proxies(probe_url='http://probe.test/health', timeout=2)
+        self.assertEqual(stats, {'total': 2, 'available': 1, 'unavailable': 1})
+        self.assertIn('http://probe.test/health', ProxyHandler.requests_seen)
+
+        alive.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual(alive.status, 1)
+        self.assertAlmostEqual(alive.success_rate, (50 * 5 + 100) / 6)
+        self.assertIsNotNone(alive.last_check_time)
+        self.assertEqual(dead.status, 2)
+        self.assertAlmostEqual(dead.success_rate, 50)
+
+    def test_check_keeps_feedback(self):
+        """测试探测结果在已写回的请求反馈基础上更新，不覆盖反馈"""
+        proxy = ProxyPool.objects.create(ip='127.0.0.1', port=self.port, protocol='http',
+                                         success_rate=50, status=1)
+        selector = ProxySelector(refresh_interval=3600, smoothing=0.5, min_success_rate=20)
+        selector.refresh()
+        selector.report(proxy.proxy_url, False)
+        with patch('crawler.proxy.get_proxy_selector', return_value=selector):
+            check_proxies(probe_url='http://probe.test/health', timeout=2)
+
+        proxy.refresh_from_db()
+        self.assertAlmostEqual(proxy.success_rate, (25 * 5 + 100) / 6)
+        self.assertEqual(proxy.status, 1)
+
+    @override_settings(DEBUG=True)
+    def test_crawler_uses_pool(self):
+        """测试启用代理池的数据源通过代理请求"""
+        ProxyPool.objects.create(ip='127.0.0.1', port=self.port, protocol='http', success_rate=90, status=1)
+        config = CrawlerConfig.objects.create(
+            name='测试RSS源', crawler_type=1, source_url='http://feeds.test/rss', status=1,
+            config_data={'proxy_pool': True}
+        )
+        crawler = RSSCrawler(config)
+        with patch('crawler.crawlers.base.get_proxy_selector', return_value=ProxySelector()):
+            result = crawler.fetch_data()
+        self.assertEqual(result['status'], 'success')
+        self.assertIn('http://feeds.test/rss', ProxyHandler.requests_seen)
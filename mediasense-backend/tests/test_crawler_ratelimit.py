@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from django.test import TestCase
+from unittest.mock import patch
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.models import CrawlerConfig
+from crawler.ratelimit import HostRateLimiter
+
+
+class TestHostRateLimiter(TestCase):
+    """按主机限速测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.limiter = HostRateLimiter()
+
+    def test_reserve_intervals(self):
+        """测试预约时间点按间隔顺延"""
+        waits = [self.limiter.reserve('host:a.com', 0.5) for _ in range(3)]
+        self.assertAlmostEqual(waits[0], 0, places=2)
+        self.assertAlmostEqual(waits[1], 0.5, places=2)
+        self.assertAlmostEqual(waits[2], 1.0, places=2)
+
+    def test_burst(self):
+        """测试突发请求额度"""
+        waits = [self.limiter.reserve('host:a.com', 1, burst=3) for _ in range(4)]
+        self.assertEqual([round(wait) for wait in waits], [0, 0, 0, 1])
+
+    def test_recover_after_idle(self):
+        """测试空闲后额度恢复"""
+        self.limiter.reserve('host:a.com', 0.1)
+        time.sleep(0.15)
+        self.assertEqual(self.limiter.reserve('host:a.com', 0.1), 0)
+
+    def test_key_scope(self):
+        """测试按主机和按数据源限速"""
+        rate_config = {'requests': 1, 'per_seconds': 2}
+        self.assertEqual(self.limiter.reserve_for('https://a.com/rss', rate_config, 1), 0)
+        # 同一主机的其他数据源共享额度
+        wait = self.limiter.reserve_for('https://a.com/api', rate_config, 2)
+        self.assertAlmostEqual(wait, 2, places=1)
+        # 其他主机不受影响
+        self.assertEqual(self.limiter.reserve_for('https://b.com/rss', rate_config, 3), 0)
+
+        rate_config['scope'] = 'config'
+        self.assertEqual(self.limiter.reserve_for('https://a.com/rss', rate_config, 1), 0)
+        self.assertEqual(self.limiter.reserve_for('https://a.com/api', rate_config, 2), 0)
+
+    def test_redis_unavailable_fallback(self):
+        """测试Redis命令失败时退回进程内限速"""
+        class BrokenRedis:
+            def register_script(self, script):
+                def run(**kwargs):
+                    raise ConnectionError('Redis连接失败')
+                return run
+
+        with patch('crawler.ratelimit.get_redis_client', return_value=BrokenRedis()), \
+             patch('crawler.ratelimit.mark_redis_unavailable') as mock_mark:
+            self.assertEqual(self.limiter.reserve('host:a.com', 1), 0)
+            self.assertAlmostEqual(self.limiter.reserve('host:a.com', 1), 1, places=1)
+        self.assertEqual(mock_mark.call_count, 2)
+
+    def test_async_wait_does_not_block_loop(self):
+        """测试异步等待限速时不阻塞其他数据源"""
+        config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://slow.test.com/rss',
+            status=1,
+            config_data={'rate_limit': {'requests': 1, 'per_seconds': 0.5}}
+        )
+        crawler = RSSCrawler(config)
+        limiter = HostRateLimiter()
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.05)
+                    ticks += 1
+
+            start = time.monotonic()
+            await asyncio.gather(
+                crawler.wait_for_request_slot_async(),
+                crawler.wait_for_request_slot_async(),
+                ticker()
+            )
+            return time.monotonic() - start, ticks
+
+        with patch('crawler.crawlers.base.get_rate_limiter', return_value=limiter):
+            elapsed, ticks = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.45)
+        self.assertEqual(ticks, 5)
@@ -0,0 +1,53 @@
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from crawler import persistence
+from crawler.models import CrawlerConfig
+from crawler.records import ArticleRecord, clean_item
+from crawler.services import CrawlerService
+from news.models import NewsArticle
+
+
+def generate_items(count):
+    for i in range(count):
+        yield {'title': f' 测试文章{i} ', 'url': f'https://test.com/article/{i % (count - 1)}', 'content': '内容'}
+    yield {'title': '', 'url': 'https://test.com/empty'}
+
+
+class TestStreamingPersistence(TestCase):
+    """流式清洗和分批入库测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试API源',
+            crawler_type=2,
+            source_url='https://api.test.com/news',
+            status=1
+        )
+
+    def test_clean_item(self):
+        """测试清洗为定长字段的文章记录"""
+        record = clean_item({'title': ' 标题 ', 'url': 'https://test.com/1', 'content': None, 'extra': 1})
+        self.assertIsInstance(record, ArticleRecord)
+        self.assertEqual(record.title, '标题')
+        self.assertEqual(record.content, '')
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(set(record.to_dict()), {'title', 'url', 'content', 'description', 'author',
+                                                'source', 'pub_time', 'tags', 'images'})
+        self.assertIsNone(clean_item({'title': '标题'}))
+        self.assertIsNone(clean_item(42))
+
+    @override_settings(CRAWLER_BULK_BATCH_SIZE=4)
+    def test_generator_flushes_in_batches(self):
+        """测试生成器产生的文章每满一批写入一次"""
+        with patch.object(persistence, 'save_articles', wraps=persistence.save_articles) as mock_save:
+            result = CrawlerService._process_crawl_result(
+                self.config, {'status': 'success', 'data': generate_items(10)}, CrawlerService._empty_stats()
+            )
+
+        self.assertEqual([len(call.args[0]) for call in mock_save.call_args_list], [4, 4, 1])
+        self.assertEqual(result['total'], 11)
+        self.assertEqual(result['saved'], 9)
+        self.assertEqual(result['duplicated'], 1)
+        self.assertEqual(result['filtered'], 1)
+        self.assertEqual(NewsArticle.objects.filter(crawler=self.config).count(), 9)
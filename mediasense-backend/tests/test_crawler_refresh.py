@@ -0,0 +1,99 @@
+import importlib
+from django.apps import apps
+from django.test import TestCase
+from django.utils import timezone
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.models import CrawlerConfig
+from crawler.persistence import save_articles
+from news.models import NewsArticle, compute_content_hash
+from news.signals import article_content_changed
+
+
+class TestContentRefresh(TestCase):
+    """已入库文章按内容哈希刷新测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试数据源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1,
+            config_data={'refresh': True}
+        )
+        self.changed_ids = []
+        article_content_changed.connect(self.on_changed)
+
+    def tearDown(self):
+        article_content_changed.disconnect(self.on_changed)
+
+    def on_changed(self, sender, article_ids, **kwargs):
+        self.changed_ids.extend(article_ids)
+
+    def make_items(self, count, suffix=''):
+        return [
+            {
+                'title': f'测试文章{i}',
+                'url': f'https://test.com/article/{i}',
+                'content': f'测试内容{i}{suffix if i == 1 else ""}',
+                'description': f'测试描述{i}',
+                'author': '测试作者',
+                'pub_time': timezone.now()
+            }
+            for i in range(count)
+        ]
+
+    def test_refresh_changed_only(self):
+        """测试只更新内容哈希变化的文章，并在提交后发送信号"""
+        stats = save_articles(self.make_items(3), self.config)
+        self.assertEqual(stats['saved'], 3)
+        article = NewsArticle.objects.get(source_url='https://test.com/article/1')
+        self.assertEqual(article.content_hash, article.compute_content_hash())
+        NewsArticle.objects.filter(pk=article.pk).update(status=NewsArticle.Status.PUBLISHED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = save_articles(self.make_items(3, suffix='（更正）'), self.config)
+        self.assertEqual((stats['saved'], stats['refreshed'], stats['duplicated']), (0, 1, 2))
+        self.assertEqual(self.changed_ids, [article.pk])
+
+        article.refresh_from_db()
+        self.assertEqual(article.content, '测试内容1（更正）')
+        self.assertEqual(article.content_hash, article.compute_content_hash())
+        # 状态等非内容字段保持不变
+        self.assertEqual(article.status, NewsArticle.Status.PUBLISHED)
+
+        # 内容没有变化时不更新
+        self.changed_ids = []
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = save_articles(self.make_items(3, suffix='（更正）'), self.config)
+        self.assertEqual((stats['refreshed'], stats['duplicated']), (0, 3))
+        self.assertEqual(self.changed_ids, [])
+
+    def test_refresh_query_count(self):
+        """测试比较哈希的查询次数与文章数量无关"""
+        save_articles(self.make_items(200), self.config)
+        # 查询已存在的URL和内容哈希各一次，一次批量更新（含事务的开始和提交）
+        with self.assertNumQueries(5):
+            stats = save_articles(self.make_items(200, suffix='（更正）'), self.config)
+        self.assertEqual(stats['refreshed'], 1)
+
+    def test_refresh_disabled(self):
+        """测试未开启刷新时已存在的文章计入重复"""
+        save_articles(self.make_items(2), self.config)
+        stats = save_articles(self.make_items(2, suffix='（更正）'), self.config, refresh=False)
+        self.assertEqual(stats['duplicated'], 2)
+        self.assertNotIn('refreshed', stats)
+        self.assertEqual(NewsArticle.objects.get(source_url='https://test.com/article/1').content, '测试内容1')
+
+    def test_skip_known_default(self):
+        """测试开启刷新时解析阶段默认不跳过已入库的URL"""
+        self.assertEqual(RSSCrawler(self.config).get_known_urls(['https://test.com/article/1']), set())
+
+    def test_backfill_migration(self):
+        """测试迁移为已有文章补充内容哈希"""
+        article = NewsArticle.objects.create(title='旧文章', content='内容', source_url='https://test.com/old')
+        self.assertEqual(article.content_hash, '')
+        migration = importlib.import_module('news.migrations.0003_newsarticle_content_hash')
+        migration.backfill_content_hash(apps, None)
+        article.refresh_from_db()
+        self.assertEqual(article.content_hash, compute_content_hash('旧文章', '内容', '', ''))
@@ -0,0 +1,82 @@
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.services import CrawlerService
+from crawler.tasks import run_crawler
+
+
+class TestCrawlerRetry(TestCase):
+    """失败任务退避重试测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            interval=60,
+            max_retries=2,
+            retry_delay=30,
+            status=1
+        )
+        self.task = CrawlerTask.objects.create(config=self.config, status=CrawlerTask.Status.PENDING)
+        self.error = {'status': 'error', 'message': '请求失败', 'total': 0}
+
+    @override_settings(CRAWLER_RETRY_MAX_DELAY=100)
+    def test_backoff_with_jitter(self):
+        """测试指数退避、抖动范围和上限"""
+        for retry_count, delay in ((0, 30), (1, 60), (2, 100), (5, 100)):
+            for _ in range(20):
+                countdown = CrawlerService.get_retry_delay(self.config, retry_count)
+                self.assertGreaterEqual(countdown, delay / 2)
+                self.assertLessEqual(countdown, delay)
+
+    def test_run_task_requeues_without_sleep(self):
+        """测试失败任务重新入队，不在当前worker中等待"""
+        with patch.object(CrawlerService, 'crawl_website', return_value=self.error), \
+                patch('crawler.tasks.run_crawler.apply_async') as mock_apply, \
+                patch('time.sleep') as mock_sleep:
+            self.assertFalse(CrawlerService.run_task(self.task))
+            self.assertFalse(CrawlerService.run_task(self.task))
+            self.assertFalse(CrawlerService.run_task(self.task))
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_apply.call_count, 2)
+        first, second = (call.kwargs['countdown'] for call in mock_apply.call_args_list)
+        self.assertLessEqual(first, 30)
+        self.assertGreaterEqual(second, 30)
+        self.assertEqual(mock_apply.call_args.kwargs['kwargs'], {'task_id': self.task.task_id})
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.retry_count, 2)
+        self.assertEqual(self.task.status, CrawlerTask.Status.ERROR)
+        self.assertEqual(self.task.error_message, '请求失败')
+
+    def test_celery_task_retries(self):
+        """测试Celery任务失败后按任务ID重新入队，成功后完成"""
+        with patch.object(CrawlerService, 'crawl_website', return_value=self.error), \
+                patch('crawler.tasks.run_crawler.apply_async') as mock_apply:
+            result = run_crawler(task_id=self.task.task_id)
+        self.assertEqual(result['retry_count'], 1)
+        mock_apply.assert_called_once()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, CrawlerTask.Status.PENDING)
+
+        success = {'status': 'success', 'total': 1, 'saved': 1}
+        with patch.object(CrawlerService, 'crawl_website', return_value=success):
+            run_crawler(task_id=self.task.task_id)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, CrawlerTask.Status.COMPLETED)
+        self.assertEqual(self.task.retry_count, 1)
+
+    def test_no_retry_when_disabled(self):
+        """测试最大重试次数为0时直接标记失败"""
+        self.config.max_retries = 0
+        self.config.save()
+        with patch.object(CrawlerService, 'crawl_website', side_effect=RuntimeError('连接超时')), \
+                patch('crawler.tasks.run_crawler.apply_async') as mock_apply:
+            self.assertFalse(CrawlerService.run_task(self.task))
+        mock_apply.assert_not_called()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, CrawlerTask.Status.ERROR)
+        self.assertEqual(self.task.retry_count, 0)
@@ -0,0 +1,108 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import patch
+from crawler.locks import Lease
+from crawler.models import CrawlerConfig, CrawlerTask
+from crawler.scheduler import DueScheduler
+from crawler.services import CrawlerService
+from crawler.task_manager import CrawlerTaskManager
+from crawler.tasks import schedule_crawlers
+
+
+class TestScheduler(TestCase):
+    """到期数据源调度测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.now = timezone.now()
+        self.configs = [
+            CrawlerConfig.objects.create(
+                name=f'测试数据源{i}',
+                crawler_type=1,
+                source_url=f'https://test{i}.com/rss',
+                interval=interval,
+                status=1,
+                last_run_time=self.now - datetime.timedelta(minutes=30)
+            )
+            for i, interval in enumerate((10, 31, 60))
+        ]
+
+    def test_next_run_at_materialized(self):
+        """测试保存配置时计算 next_run_at"""
+        config = self.configs[0]
+        self.assertEqual(config.next_run_at, self.now - datetime.timedelta(minutes=20))
+
+        config.adaptive_interval = 40
+        config.save(update_fields=['adaptive_interval'])
+        config.refresh_from_db()
+        self.assertEqual(config.next_run_at, self.now + datetime.timedelta(minutes=10))
+
+        new_config = CrawlerConfig.objects.create(
+            name='新数据源', crawler_type=1, source_url='https://new.com/rss', status=1
+        )
+        self.assertLessEqual(new_config.next_run_at, timezone.now())
+
+    def test_pending_configs(self):
+        """测试按 next_run_at 范围查询到期的配置"""
+        pending = CrawlerService.get_pending_configs(self.now)
+        self.assertEqual([config.id for config in pending], [self.configs[0].id])
+        pending = CrawlerService.get_pending_configs(self.now + datetime.timedelta(minutes=2))
+        self.assertEqual([config.id for config in pending], [self.configs[0].id, self.configs[1].id])
+
+        self.configs[0].status = 0
+        self.configs[0].save()
+        self.assertFalse(CrawlerService.get_pending_configs(self.now).exists())
+
+    def test_due_heap(self):
+        """测试最小堆按到期时间弹出并计算休眠时间"""
+        scheduler = DueScheduler(horizon=120)
+        scheduler.load(self.now)
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.pop_due(self.now), [self.configs[0].id])
+        self.assertAlmostEqual(scheduler.seconds_until_next(self.now), 60, delta=1)
+        self.assertEqual(scheduler.pop_due(self.now + datetime.timedelta(seconds=61)), [self.configs[1].id])
+        self.assertAlmostEqual(scheduler.seconds_until_next(self.now), 120, delta=1)
+        self.assertFalse(scheduler.needs_reload(self.now))
+        self.assertTrue(scheduler.needs_reload(self.now + datetime.timedelta(seconds=120)))
+
+    def test_lease(self):
+        """测试租约互斥、续期和释放"""
+        leader = Lease('test-scheduler', ttl=30)
+        follower = Lease('test-scheduler', ttl=30)
+        self.assertTrue(leader.acquire())
+        self.assertFalse(follower.acquire_or_renew())
+        self.assertTrue(leader.acquire_or_renew())
+        follower.release()
+        self.assertFalse(follower.acquire())
+        leader.release()
+        self.assertTrue(follower.acquire())
+        follower.release()
+
+    def test_schedule_crawlers_leader_only(self):
+        """测试只有领导者分发到期的配置"""
+        with patch('crawler.tasks.run_crawler_batch.delay') as mock_delay:
+            with patch('crawler.tasks.get_scheduler_lease') as mock_lease:
+                mock_lease.return_value.acquire_or_renew.return_value = False
+                schedule_crawlers()
+            mock_delay.assert_not_called()
+            self.assertFalse(CrawlerTask.objects.exists())
+
+            with patch('crawler.tasks.get_scheduler_lease') as mock_lease:
+                mock_lease.return_value.acquire_or_renew.return_value = True
+                schedule_crawlers()
+            mock_delay.assert_called_once()
+
+        task = CrawlerTask.objects.get()
+        self.assertEqual(task.config, self.configs[0])
+        self.configs[0].refresh_from_db()
+        self.assertGreater(self.configs[0].next_run_at, self.now)
+
+    def test_task_manager_runs_due(self):
+        """测试调度管理器只执行堆中到期且仍然到期的配置"""
+        manager = CrawlerTaskManager()
+        with patch.object(CrawlerService, 'run_tasks_concurrently') as mock_run:
+            manager._run_due()
+        tasks = mock_run.call_args.args[0]
+        self.assertEqual([task.config_id for task in tasks], [self.configs[0].id])
+        self.assertGreater(manager._scheduler.seconds_until_next(), 0)
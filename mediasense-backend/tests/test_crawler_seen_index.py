@@ -0,0 +1,97 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from unittest.mock import patch
+from crawler.crawlers.rss_crawler import RSSCrawler
+from crawler.html_backend import html_to_text
+from crawler.models import CrawlerConfig
+from crawler.persistence import save_articles
+from crawler.seen_index import SeenURLIndex
+from news.models import NewsArticle
+
+RSS_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>测试源</title>{items}</channel></rss>'''
+
+ITEM_TEMPLATE = '''<item><title>测试文章{i}</title><link>https://test.com/article/{i}</link>
+<description>&lt;p&gt;测试描述{i}&lt;/p&gt;</description></item>'''
+
+
+class TestSeenURLIndex(TestCase):
+    """已抓取URL索引测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.index = SeenURLIndex(capacity=1000, error_rate=0.01, key=f'test:seen:{self._testMethodName}')
+        patcher = patch('crawler.seen_index._index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        SeenURLIndex._local_bits.pop(self.index.key, None)
+
+        self.config = CrawlerConfig.objects.create(
+            name='测试RSS源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1
+        )
+
+    def make_feed(self, start, end):
+        items = ''.join(ITEM_TEMPLATE.format(i=i) for i in range(start, end))
+        return {'status': 'success', 'data': RSS_TEMPLATE.format(items=items).encode('utf-8')}
+
+    def test_no_false_negative(self):
+        """测试已加入的URL一定命中"""
+        urls = [f'https://test.com/article/{i}' for i in range(500)]
+        self.index.add_many(urls)
+        self.assertTrue(all(self.index.might_contain_many(urls)))
+
+        others = [f'https://other.com/article/{i}' for i in range(500)]
+        false_positives = sum(self.index.might_contain_many(others))
+        self.assertLess(false_positives, 25)
+
+    def test_known_confirmed_by_database(self):
+        """测试误判的URL经数据库确认后剔除"""
+        NewsArticle.objects.create(title='已入库', content='内容', source_url='https://test.com/article/1')
+        self.index.add_many(['https://test.com/article/1', 'https://test.com/article/2'])
+
+        known = self.index.known([
+            'https://test.com/article/1',
+            'https://test.com/article/2',
+            'https://test.com/article/3'
+        ])
+        self.assertEqual(known, {'https://test.com/article/1'})
+
+    def test_parse_skips_known_articles(self):
+        """测试解析时跳过已入库的文章"""
+        crawler = RSSCrawler(self.config)
+        articles = crawler.parse_response(self.make_feed(0, 5))
+        stats = save_articles(articles, self.config)
+        self.assertEqual(stats['saved'], 5)
+
+        # 已入库的文章排在前面，关闭提前停止
+        self.config.config_data = {'early_stop': 0}
+        crawler = RSSCrawler(self.config)
+        with patch('crawler.crawlers.rss_crawler.html_to_text', wraps=html_to_text) as mock_clean:
+            articles = crawler.parse_response(self.make_feed(0, 8))
+        self.assertEqual([a['url'] for a in articles], [f'https://test.com/article/{i}' for i in range(5, 8)])
+        self.assertEqual(crawler.skipped_known, 5)
+        self.assertEqual(mock_clean.call_count, 3)
+
+    def test_skip_known_disabled(self):
+        """测试关闭跳过已入库文章"""
+        save_articles(RSSCrawler(self.config).parse_response(self.make_feed(0, 3)), self.config)
+        self.config.config_data = {'skip_known': False}
+        crawler = RSSCrawler(self.config)
+        self.assertEqual(len(crawler.parse_response(self.make_feed(0, 3))), 3)
+        self.assertEqual(crawler.skipped_known, 0)
+
+    def test_rebuild_command(self):
+        """测试从文章表重建索引"""
+        for i in range(3):
+            NewsArticle.objects.create(title=f'文章{i}', content='内容', source_url=f'https://test.com/article/{i}')
+        self.assertEqual(self.index.known([f'https://test.com/article/{i}' for i in range(3)]), set())
+
+        call_command('rebuild_seen_index', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(
+            self.index.known([f'https://test.com/article/{i}' for i in range(4)]),
+            {f'https://test.com/article/{i}' for i in range(3)}
+        )
@@ -0,0 +1,104 @@
+from django.test import TestCase, override_settings
+from crawler.models import CrawlerConfig
+from crawler.persistence import save_articles
+from crawler.simhash import compute_simhash, hamming_distance, split_bands, to_signed, to_unsigned
+from news.models import NewsArticle
+
+ARTICLE = (
+    '国家统计局今天发布数据显示，今年前三季度国内生产总值同比增长百分之五点二，其中第三季度增长百分之四点九。'
+    '分产业看，第一产业增加值同比增长百分之四，第二产业增加值增长百分之四点四，第三产业增加值增长百分之六。'
+    '从需求看，社会消费品零售总额同比增长百分之六点八，其中九月份增长百分之五点五，比上月加快板块明显；'
+    '全国固定资产投资同比增长百分之三点一，扣除房地产开发投资后增长百分之七点八。货物进出口总额同比下降百分之零点二，'
+    '出口与上年同期基本持平，贸易结构继续优化。城镇调查失业率平均值为百分之五点三，比上半年下降零点一个百分点。'
+    '全国居民人均可支配收入实际增长百分之五点九，农村居民收入增速快于城镇居民。国家统计局新闻发言人表示，'
+    '前三季度国民经济持续恢复向好，生产供给稳步增加，市场需求逐步扩大，就业物价总体稳定，居民收入继续增加，'
+    '高质量发展扎实推进。但也要看到，外部环境依然复杂严峻，国内需求仍显不足，经济回升向好的基础还需要巩固。'
+    '下阶段，要加大宏观政策调控力度，着力扩大内需、提振信心、防范风险，推动经济运行持续好转、内生动力持续增强、'
+    '社会预期持续改善、风险隐患持续化解，为实现全年经济社会发展目标打下坚实基础。'
+)
+OTHER = (
+    '某科技公司今天在北京举行秋季发布会，推出新一代旗舰手机，搭载公司自研的移动芯片和全新的影像系统，'
+    '售价四千九百九十九元起，将于下周在各大电商平台正式开售。公司高管在发布会上表示，新机在拍照、续航和散热方面'
+    '均有大幅提升，并将同步推出配套的平板电脑、智能手表和无线耳机产品，构建完整的智能设备生态。业内人士认为，'
+    '随着高端市场竞争加剧，国产手机厂商正加快在芯片和操作系统等核心技术上的投入，以摆脱对外部供应链的依赖。'
+)
+
+
+class TestSimHash(TestCase):
+    """近似重复检测测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.sina = CrawlerConfig.objects.create(
+            name='新浪财经', crawler_type=1, source_url='https://finance.sina.com.cn/rss', status=1
+        )
+        self.kr36 = CrawlerConfig.objects.create(
+            name='36氪', crawler_type=1, source_url='https://36kr.com/feed', status=1
+        )
+
+    def item(self, url, title='前三季度GDP同比增长5.2%', content=ARTICLE):
+        return {'title': title, 'url': url, 'content': content, 'description': ''}
+
+    def test_fingerprint(self):
+        """测试转载稿的指纹接近，不同文章的指纹差异大"""
+        original = compute_simhash('前三季度GDP同比增长5.2%', ARTICLE)
+        reprint = compute_simhash('统计局：前三季度GDP同比增长5.2%', '【新浪财经讯】' + ARTICLE + '（责任编辑：王明）')
+        other = compute_simhash('新款手机发布', OTHER)
+        self.assertLessEqual(hamming_distance(original, reprint), 3)
+        self.assertGreater(hamming_distance(original, other), 10)
+        self.assertIsNone(compute_simhash('短标题', '短内容'))
+
+    def test_signed_storage(self):
+        """测试指纹与有符号整数互转"""
+        fingerprint = (1 << 64) - 2
+        self.assertLess(to_signed(fingerprint), 0)
+        self.assertEqual(to_unsigned(to_signed(fingerprint)), fingerprint)
+        self.assertEqual(hamming_distance(to_signed(fingerprint), fingerprint), 0)
+        self.assertEqual(len(split_bands(fingerprint)), 4)
+
+    def test_link_cross_source(self):
+        """测试其他数据源的转载稿关联到原文"""
+        save_articles([self.item('https://36kr.com/p/1')], self.kr36)
+        original = NewsArticle.objects.get(source_url='https://36kr.com/p/1')
+        self.assertIsNotNone(original.simhash)
+        self.assertIsNone(original.duplicate_of_id)
+
+        stats = save_articles([
+            self.item('https://finance.sina.com.cn/a/1', '统计局：前三季度GDP同比增长5.2%',
+                      '【新浪财经讯】' + ARTICLE + '（责任编辑：王明）'),
+            self.item('https://finance.sina.com.cn/a/2', '新款手机发布', OTHER)
+        ], self.sina)
+        self.assertEqual(stats['saved'], 2)
+        self.assertEqual(stats['near_duplicated'], 1)
+        self.assertEqual(NewsArticle.objects.get(source_url='https://finance.sina.com.cn/a/1').duplicate_of, original)
+        self.assertIsNone(NewsArticle.objects.get(source_url='https://finance.sina.com.cn/a/2').duplicate_of_id)
+
+        # 转载稿的转载稿关联到最早的原文
+        save_articles([self.item('https://www.huxiu.com/article/1', content=ARTICLE + '本文来自新浪财经。')], None)
+        self.assertEqual(NewsArticle.objects.get(source_url='https://www.huxiu.com/article/1').duplicate_of, original)
+        self.assertEqual(original.near_duplicates.count(), 2)
+
+    def test_link_within_batch(self):
+        """测试同一批次内的近似重复"""
+        stats = save_articles([
+            self.item('https://36kr.com/p/1'),
+            self.item('https://36kr.com/p/2', content=ARTICLE + '（完）')
+        ], self.kr36)
+        self.assertEqual(stats['near_duplicated'], 1)
+        first = NewsArticle.objects.get(source_url='https://36kr.com/p/1')
+        self.assertEqual(NewsArticle.objects.get(source_url='https://36kr.com/p/2').duplicate_of, first)
+
+    def test_same_url_not_linked(self):
+        """测试URL重复的文章不关联到自身"""
+        save_articles([self.item('https://36kr.com/p/1')], self.kr36)
+        stats = save_articles([self.item('https://36kr.com/p/1')], self.kr36)
+        self.assertEqual(stats['duplicated'], 1)
+        self.assertEqual(stats['near_duplicated'], 0)
+        self.assertIsNone(NewsArticle.objects.get().duplicate_of_id)
+
+    @override_settings(CRAWLER_SIMHASH_ENABLED=False)
+    def test_disabled(self):
+        """测试关闭近似重复检测"""
+        save_articles([self.item('https://36kr.com/p/1'), self.item('https://36kr.com/p/2')], self.kr36)
+        self.assertFalse(NewsArticle.objects.filter(duplicate_of__isnull=False).exists())
+        self.assertFalse(NewsArticle.objects.filter(simhash__isnull=False).exists())
@@ -0,0 +1,175 @@
+import gzip
+import io
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from unittest.mock import patch
+from django.test import TestCase
+
+from crawler.crawlers.web_crawler import WebCrawler
+from crawler.models import CrawlerConfig, SitemapURL
+from crawler.services import CrawlerService
+from crawler.sitemap import iter_sitemap
+from crawler.source_state import save_source_state
+
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+NEWS_NS = 'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9"'
+IMAGE_NS = 'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"'
+
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    """站点地图测试服务：索引 + 新闻站点地图 + gzip压缩的站点地图 + 详情页"""
+
+    lastmods = {}
+    index_lastmods = {}
+    requested = []
+
+    def render(self):
+        cls = type(self)
+        if self.path == '/sitemap_index.xml':
+            children = ''.join(
+                f'<sitemap><loc>{self.base}{path}</loc><lastmod>{lastmod}</lastmod></sitemap>'
+                for path, lastmod in cls.index_lastmods.items()
+            )
+            return f'<?xml version="1.0"?><sitemapindex {SITEMAP_NS}>{children}</sitemapindex>'.encode('utf-8')
+        if self.path == '/news.xml':
+            urls = ''.join(
+                f'<url><loc>{self.base}/news/{i}</loc><lastmod>{cls.lastmods[i]}</lastmod>'
+                f'<news:news><news:title>新闻{i}</news:title></news:news></url>'
+                for i in range(3)
+            )
+            return f'<urlset {SITEMAP_NS} {NEWS_NS}>{urls}</urlset>'.encode('utf-8')
+        if self.path == '/pages.xml.gz':
+            urls = ''.join(
+                f'<url><loc>{self.base}/pages/{i}</loc></url>' for i in range(2)
+            ) + f'<url><loc>{self.base}/video/1</loc></url>'
+            return gzip.compress(f'<urlset {SITEMAP_NS}>{urls}</urlset>'.encode('utf-8'))
+        if self.path.startswith(('/news/', '/pages/')):
+            return (f'<html><head><title>页面{self.path}</title></head>'
+                    f'<body><div class="content">正文{self.path}</div></body></html>').encode('utf-8')
+        return None
+
+    def do_GET(self):
+        self.base = f'http://{self.headers["Host"]}'
+        type(self).requested.append(self.path)
+        body = self.render()
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8' if '.xml' not in self.path else 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSitemapDiscovery(TestCase):
+    """站点地图增量发现测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SitemapHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        """测试初始化"""
+        SitemapHandler.lastmods = {i: '2026-10-01T08:00:00+08:00' for i in range(3)}
+        SitemapHandler.index_lastmods = {'/news.xml': '2026-10-01', '/pages.xml.gz': '2026-09-01'}
+        SitemapHandler.requested = []
+        self.config = CrawlerConfig.objects.create(
+            name='测试站点地图源',
+            crawler_type=3,
+            source_url=f'{self.base_url}/',
+            status=1,
+            is_active=True,
+            config_data={
+                'sitemap': {'urls': [f'{self.base_url}/sitemap_index.xml'], 'exclude': '/video/'},
+                'content_selector': '.content',
+                'skip_known': False
+            }
+        )
+
+    def crawl(self):
+        """抓取一次，并像服务层入库成功后一样保存站点地图状态"""
+        crawler = WebCrawler(self.config)
+        result = crawler.run()
+        save_source_state(self.config, crawler.source_state)
+        return result
+
+    def test_iter_sitemap(self):
+        """测试解析新闻站点地图，忽略图片扩展中的loc"""
+        xml = (f'<urlset {SITEMAP_NS} {NEWS_NS} {IMAGE_NS}><url><loc>https://test.com/a</loc>'
+               '<image:image><image:loc>https://test.com/a.jpg</image:loc></image:image>'
+               '<news:news><news:publication_date>2026-10-01</news:publication_date>'
+               '<news:title>标题</news:title></news:news></url>'
+               '<url><lastmod>2026-10-02</lastmod></url></urlset>').encode('utf-8')
+        entries = list(iter_sitemap(io.BytesIO(xml)))
+        self.assertEqual(entries, [('url', {
+            'url': 'https://test.com/a', 'lastmod': None, 'title': '标题', 'pub_time': '2026-10-01'
+        })])
+
+    def test_incremental_discovery(self):
+        """测试只抓取新增或lastmod更新的URL，未更新的子站点地图不再下载"""
+        result = self.crawl()
+        self.assertEqual(result['status'], 'success')
+        articles = {article['url'][len(self.base_url):]: article for article in result['data']}
+        self.assertEqual(set(articles), {'/news/0', '/news/1', '/news/2', '/pages/0', '/pages/1'})
+        self.assertEqual(articles['/news/0']['title'], '新闻0')
+        self.assertEqual(articles['/pages/1']['title'], '页面/pages/1')
+        self.assertEqual(articles['/pages/1']['content'], '正文/pages/1')
+        self.assertEqual(SitemapURL.objects.filter(config=self.config, is_sitemap=False).count(), 5)
+
+        # 没有更新时只下载索引
+        SitemapHandler.requested = []
+        result = self.crawl()
+        self.assertEqual(result['data'], [])
+        self.assertEqual(SitemapHandler.requested, ['/sitemap_index.xml'])
+
+        # 只有lastmod更新的URL重新抓取
+        SitemapHandler.lastmods[1] = '2026-10-02T08:00:00+08:00'
+        SitemapHandler.index_lastmods['/news.xml'] = '2026-10-02'
+        SitemapHandler.requested = []
+        result = self.crawl()
+        self.assertEqual([article['url'] for article in result['data']], [f'{self.base_url}/news/1'])
+        self.assertEqual(SitemapHandler.requested, ['/sitemap_index.xml', '/news.xml', '/news/1'])
+
+    def test_max_urls(self):
+        """测试超过max_urls的URL留到下次抓取"""
+        self.config.config_data['sitemap']['max_urls'] = 2
+        self.config.save()
+        first = self.crawl()['data']
+        second = self.crawl()['data']
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({article['url'] for article in first} & {article['url'] for article in second})
+
+    def test_record_after_persist(self):
+        """测试抓取时不记录lastmod，入库失败时下次重新抓取"""
+        crawler = WebCrawler(self.config)
+        self.assertEqual(len(crawler.run()['data']), 5)
+        self.assertEqual(len(crawler.source_state['sitemap_urls']), 5)
+        self.assertFalse(SitemapURL.objects.filter(config=self.config).exists())
+
+        with patch('crawler.persistence.bulk_insert_new', return_value=([], 0, 5)):
+            result = CrawlerService.crawl_website(self.config)
+        self.assertEqual(result['errors'], 5)
+        self.assertFalse(SitemapURL.objects.filter(config=self.config).exists())
+
+        SitemapHandler.requested = []
+        result = CrawlerService.crawl_website(self.config)
+        self.assertEqual(result['saved'], 5)
+        self.assertIn('/news/0', SitemapHandler.requested)
+        self.assertEqual(SitemapURL.objects.filter(config=self.config, is_sitemap=False).count(), 5)
+        self.assertTrue(SitemapURL.objects.filter(config=self.config, is_sitemap=True).exists())
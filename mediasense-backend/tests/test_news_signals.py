@@ -0,0 +1,67 @@
+from unittest.mock import AsyncMock, patch
+from django.test import TestCase
+from django.utils import timezone
+from ai_service.models import AnalysisResult
+from ai_service.tasks import reanalyze_articles
+from crawler.models import CrawlerConfig
+from crawler.persistence import save_articles
+from news.models import NewsArticle
+from news_search.tasks import reindex_articles
+
+
+class TestContentChangedReceivers(TestCase):
+    """文章内容更新信号的下游处理测试类"""
+
+    def setUp(self):
+        """测试初始化"""
+        self.config = CrawlerConfig.objects.create(
+            name='测试数据源',
+            crawler_type=1,
+            source_url='https://test.com/rss',
+            status=1,
+            config_data={'refresh': True}
+        )
+        self.article = NewsArticle.objects.create(
+            title='测试文章', content='测试内容', source_url='https://test.com/article/1'
+        )
+        self.result = AnalysisResult.objects.create(
+            news=self.article, analysis_type='sentiment', result={'sentiment': 'neutral'}
+        )
+
+    def refresh_article(self):
+        items = [{
+            'title': '测试文章',
+            'url': 'https://test.com/article/1',
+            'content': '测试内容（更正）',
+            'pub_time': timezone.now()
+        }]
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = save_articles(items, self.config)
+        self.assertEqual(stats['refreshed'], 1)
+
+    def test_reindex_and_reanalyze_queued(self):
+        """测试内容更新后提交重新索引和重新分析任务，原有的分析结果标记为无效"""
+        with patch.object(reindex_articles, 'delay') as mock_reindex, \
+                patch.object(reanalyze_articles, 'delay') as mock_reanalyze:
+            self.refresh_article()
+
+        mock_reindex.assert_called_once_with([self.article.pk])
+        mock_reanalyze.assert_called_once_with([self.article.pk])
+        self.result.refresh_from_db()
+        self.assertFalse(self.result.is_valid)
+
+    def test_reanalyze_existing_types(self):
+        """测试只重新执行已有的分析类型，分析成功后结果恢复有效"""
+        self.result.is_valid = False
+        self.result.save()
+        with patch('ai_service.tasks.AIService') as mock_service:
+            mock_service.return_value.batch_analyze = AsyncMock(return_value={
+                self.article.pk: {'sentiment': {'sentiment': 'positive', 'success': True}}
+            })
+            stats = reanalyze_articles([self.article.pk])
+
+        self.assertEqual(stats, {'status': 'success', 'total': 1, 'processed': 1})
+        self.assertEqual(mock_service.return_value.batch_analyze.call_args.kwargs['analysis_types'], ['sentiment'])
+        self.result.refresh_from_db()
+        self.assertTrue(self.result.is_valid)
+        self.assertEqual(self.result.result['sentiment'], 'positive')